@@ -15,6 +15,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from src.core.gestor_datos_global import obtener_gestor
 from src.core.optimizacion_rendimiento import optimizar_rendimiento_sistema, configurar_tkinter_rendimiento
+from src.core.instancia_unica import abrir_o_enfocar
 
 
 # Control opcional de optimizaciones pesadas (evita bloqueos en arranque)
@@ -144,31 +145,29 @@ class MenuPrincipal:
         
         return btn
 
-    def _lanzar_proceso(self, script_path):
+    def _lanzar_proceso(self, script_path, argumentos=()):
         """Lanza un script Python en ventana oculta en Windows."""
         if sys.platform == 'win32':
             pythonw_exe = sys.executable.replace("python.exe", "pythonw.exe")
             if os.path.exists(pythonw_exe):
-                return subprocess.Popen([pythonw_exe, script_path])
+                return subprocess.Popen([pythonw_exe, script_path, *argumentos])
             CREATE_NO_WINDOW = 0x08000000
-            return subprocess.Popen([sys.executable, script_path], creationflags=CREATE_NO_WINDOW)
-        return subprocess.Popen([sys.executable, script_path])
+            return subprocess.Popen([sys.executable, script_path, *argumentos], creationflags=CREATE_NO_WINDOW)
+        return subprocess.Popen([sys.executable, script_path, *argumentos])
 
-    def _abrir_modulo_externo(self, attr_nombre, script_relativo, titulo, mensaje_existente, nombre_modulo=None):
-        """Controla apertura de módulos evitando instancias duplicadas."""
-        nombre_modulo = nombre_modulo or titulo
-        proceso = getattr(self, attr_nombre)
-        if proceso is not None:
-            if proceso.poll() is None:
-                messagebox.showinfo(titulo, mensaje_existente)
-                return
-            setattr(self, attr_nombre, None)
+    def _abrir_modulo_externo(self, attr_nombre, instancia, script_relativo, nombre_modulo, argumentos=()):
+        """
+        Abre un módulo o, si ya corre (lanzado desde aquí o desde otro lado),
+        trae su ventana al frente y le pasa los argumentos.
+        """
         try:
             script_dir = os.path.dirname(os.path.abspath(__file__))
             script_path = os.path.join(script_dir, *script_relativo)
-            nuevo_proceso = self._lanzar_proceso(script_path)
-            setattr(self, attr_nombre, nuevo_proceso)
-            self.procesos_externos.append(nuevo_proceso)
+            nuevo_proceso = abrir_o_enfocar(instancia, lambda: self._lanzar_proceso(script_path, argumentos),
+                                            list(argumentos))
+            if nuevo_proceso is not None:
+                setattr(self, attr_nombre, nuevo_proceso)
+                self.procesos_externos.append(nuevo_proceso)
         except Exception as e:
             messagebox.showerror("Error", f"No se pudo abrir {nombre_modulo}:\n{str(e)}")
     
@@ -176,9 +175,8 @@ class MenuPrincipal:
         """Abrir sistema de censo"""
         self._abrir_modulo_externo(
             attr_nombre="proceso_censo",
+            instancia="censo",
             script_relativo=["src", "modules", "censo", "censo_habitantes.py"],
-            titulo="Censo Abierto",
-            mensaje_existente="El sistema de censo ya está abierto.\n\nBusca la ventana existente.",
             nombre_modulo="Censo"
         )
     
@@ -186,9 +184,8 @@ class MenuPrincipal:
         """Abrir control de pagos (con su propio login)"""
         self._abrir_modulo_externo(
             attr_nombre="proceso_pagos",
+            instancia="pagos",
             script_relativo=["src", "modules", "pagos", "control_pagos.py"],
-            titulo="Control de Pagos",
-            mensaje_existente="El módulo de Pagos ya está abierto.",
             nombre_modulo="Control de Pagos"
         )
     
@@ -196,9 +193,8 @@ class MenuPrincipal:
         """Abrir registro de faenas (con su propio login)"""
         self._abrir_modulo_externo(
             attr_nombre="proceso_faenas",
+            instancia="faenas",
             script_relativo=["src", "modules", "faenas", "control_faenas.py"],
-            titulo="Registro de Faenas",
-            mensaje_existente="El módulo de Faenas ya está abierto.",
             nombre_modulo="Registro de Faenas"
         )
     
@@ -3,89 +3,106 @@ Sistema de autenticacion y manejo de usuarios
 Gestiona login, sesiones y control de acceso - Usa SQLite
 """
 
+import atexit
 import json
 import os
+import threading
+import time
 from datetime import datetime, timedelta
-import bcrypt
-from src.config import RUTA_SEGURA
+from src.config import RUTA_SEGURA, SESIONES_HORAS_VIGENCIA, SESIONES_INTERVALO_ACCESO_SEG
 from src.core.logger import registrar_acceso, registrar_operacion, registrar_error
 from src.core.base_datos_sqlite import obtener_bd
+from src.core.autorizacion import (
+    ARCHIVO_CLAVE_SESIONES, ROLES, CacheAutorizacion, obtener_cache_autorizacion, rol_tiene_permiso
+)
+from src.core.credenciales import ARCHIVO_CALIBRACION, ServicioCredenciales, obtener_servicio_credenciales
+from src.core.fechas import FORMATO_FECHA_HORA_ISO, ahora_iso, normalizar_fecha_iso
 
 class GestorAutenticacion:
     """Gestor de autenticacion de usuarios con SQLite"""
     
-    # Roles disponibles del sistema
-    ROLES = {
-        'admin': {'nombre': 'Administrador', 'permisos': ['*']},  # Todos los permisos
-        'operador': {'nombre': 'Operador', 'permisos': ['ver', 'crear', 'editar', 'pagar']},
-        'lectura': {'nombre': 'Solo Lectura', 'permisos': ['ver']},
-        'reportes': {'nombre': 'Reportes', 'permisos': ['ver', 'exportar']}
-    }
+    # Roles disponibles del sistema (definidos en src.core.autorizacion)
+    ROLES = ROLES
     
-    def __init__(self):
-        self.bd = obtener_bd()
-        self.archivo_sesiones = os.path.join(RUTA_SEGURA, 'sesiones.json')
-        self.sesiones = self._cargar_sesiones()
-    
-    def _cargar_usuarios(self):
-        """Carga usuarios de SQLite"""
-        return self.bd.obtener_usuarios()
+    def __init__(self, bd=None, directorio=None):
+        """
+        Args:
+            bd: BaseDatosSQLite a usar (por defecto la global)
+            directorio: Carpeta de sesiones.json, clave de sesiones y calibración
+                        (por defecto RUTA_SEGURA)
+        """
+        self.bd = bd if bd is not None else obtener_bd()
+        directorio = directorio or RUTA_SEGURA
+        if bd is None and directorio == RUTA_SEGURA:
+            self.cache = obtener_cache_autorizacion()
+            self.credenciales = obtener_servicio_credenciales()
+        else:
+            self.cache = CacheAutorizacion(self.bd, os.path.join(directorio, ARCHIVO_CLAVE_SESIONES))
+            self.credenciales = ServicioCredenciales(os.path.join(directorio, ARCHIVO_CALIBRACION))
+        # Archivo de sesiones anterior a la tabla sesiones (solo para migrar)
+        self.archivo_sesiones = os.path.join(directorio, 'sesiones.json')
+        # token -> último acceso aún no guardado
+        self._accesos_pendientes = {}
+        self._ultimo_volcado = time.monotonic()
+        self._lock_accesos = threading.Lock()
+        self._migrar_sesiones_json()
+        self.bd.eliminar_sesiones_expiradas()
+        atexit.register(self.volcar_accesos)
     
     @property
     def usuarios(self):
-        """Propiedad para obtener usuarios actuales"""
-        return self._cargar_usuarios()
-    
-    def _cargar_usuarios(self):
-        """Carga usuarios de SQLite"""
-        return self.bd.obtener_usuarios()
+        """Usuarios por nombre; se relee de SQLite solo si la tabla cambió"""
+        return self.cache.usuarios()
     
     def _guardar_usuarios(self):
         """En SQLite los usuarios se guardan automáticamente"""
         pass
     
-    def _cargar_sesiones(self):
-        """Carga sesiones desde archivo"""
+    def _migrar_sesiones_json(self):
+        """Pasa a SQLite las sesiones del antiguo sesiones.json y elimina el archivo"""
+        if not os.path.exists(self.archivo_sesiones):
+            return
         try:
-            if os.path.exists(self.archivo_sesiones):
-                with open(self.archivo_sesiones, 'r', encoding='utf-8') as f:
-                    sesiones = json.load(f)
-                    # Limpiar sesiones expiradas
-                    self._limpiar_sesiones_expiradas(sesiones)
-                    return sesiones
+            with open(self.archivo_sesiones, 'r', encoding='utf-8') as f:
+                sesiones = json.load(f)
+            for token, sesion in sesiones.items():
+                expiracion = normalizar_fecha_iso(sesion.get('expiracion'), con_hora=True)
+                if not expiracion or expiracion < ahora_iso():
+                    continue
+                permisos = sesion.get('permisos')
+                self.bd.guardar_sesion(token, sesion.get('usuario'), sesion.get('rol'),
+                                       normalizar_fecha_iso(sesion.get('inicio'), con_hora=True),
+                                       expiracion, json.dumps(permisos) if permisos else None)
+            os.remove(self.archivo_sesiones)
         except Exception as e:
-            registrar_error('autenticacion', 'cargar_sesiones', str(e))
-        return {}
+            registrar_error('autenticacion', 'migrar_sesiones_json', str(e))
     
-    def _guardar_sesiones(self):
-        """Guarda sesiones en archivo"""
-        try:
-            with open(self.archivo_sesiones, 'w', encoding='utf-8') as f:
-                json.dump(self.sesiones, f, indent=2, ensure_ascii=False)
-            
-            # Ocultar archivo
-            try:
-                import ctypes
-                FILE_ATTRIBUTE_HIDDEN = 0x02
-                ctypes.windll.kernel32.SetFileAttributesW(self.archivo_sesiones, FILE_ATTRIBUTE_HIDDEN)
-            except:
-                pass
-        except Exception as e:
-            registrar_error('autenticacion', 'guardar_sesiones', str(e))
+    @staticmethod
+    def _sesion_desde_fila(fila):
+        """Fila de la tabla sesiones -> dict con el formato de siempre"""
+        return {
+            'usuario': fila['usuario'],
+            'rol': fila['rol'],
+            'inicio': fila['inicio'],
+            'expiracion': fila['expiracion'],
+            'ultimo_acceso': fila['ultimo_acceso'],
+            'permisos': json.loads(fila['permisos']) if fila['permisos'] else None
+        }
     
-    def _limpiar_sesiones_expiradas(self, sesiones):
-        """Elimina sesiones expiradas"""
-        sesiones_a_eliminar = []
-        for token, sesion in sesiones.items():
-            try:
-                expiracion = datetime.fromisoformat(sesion.get('expiracion'))
-                if datetime.now() > expiracion:
-                    sesiones_a_eliminar.append(token)
-            except:
-                sesiones_a_eliminar.append(token)
-        
-        for token in sesiones_a_eliminar:
-            del sesiones[token]
+    def _registrar_acceso(self, token, momento):
+        """Anota el último acceso en memoria; se guarda en lote cada cierto intervalo"""
+        with self._lock_accesos:
+            self._accesos_pendientes[token] = momento
+            vencido = time.monotonic() - self._ultimo_volcado >= SESIONES_INTERVALO_ACCESO_SEG
+        if vencido:
+            self.volcar_accesos()
+    
+    def volcar_accesos(self):
+        """Escribe en una sola transacción los últimos accesos pendientes"""
+        with self._lock_accesos:
+            pendientes, self._accesos_pendientes = self._accesos_pendientes, {}
+            self._ultimo_volcado = time.monotonic()
+        return self.bd.actualizar_accesos_sesiones(pendientes)
     
     def _crear_usuario_predeterminado(self):
         """Crea usuario admin predeterminado en primera instalación"""
@@ -120,7 +137,7 @@ class GestorAutenticacion:
     def login(self, usuario, contraseña):
         """Intenta hacer login contra SQLite"""
         try:
-            usuario_datos = self.bd.obtener_usuario(usuario)
+            usuario_datos = self.cache.obtener_usuario(usuario)
             
             if not usuario_datos:
                 registrar_acceso(usuario, 'FALLIDO - Usuario no existe')
@@ -130,26 +147,29 @@ class GestorAutenticacion:
                 registrar_acceso(usuario, 'FALLIDO - Usuario inactivo')
                 return {'exito': False, 'error': 'Usuario inactivo'}
             
-            # Verificar contraseña (usando SHA256)
-            import hashlib
-            hash_ingresado = hashlib.sha256(contraseña.encode()).hexdigest()
+            # Verificar contraseña (bcrypt o SHA256 heredado, que se actualiza aquí)
+            hash_guardado = usuario_datos['contraseña']
+            valida, hash_nuevo = self.credenciales.verificar_y_actualizar(contraseña, hash_guardado)
             
-            if hash_ingresado != usuario_datos['contraseña']:
+            if not valida:
                 registrar_acceso(usuario, 'FALLIDO - Contraseña incorrecta')
                 return {'exito': False, 'error': 'Usuario o contraseña incorrectos'}
             
-            # Crear sesion
-            token = self._generar_token()
-            expiracion = (datetime.now() + timedelta(hours=8)).isoformat()
+            if hash_nuevo:
+                self.bd.actualizar_hash_contraseña(usuario, hash_nuevo, hash_guardado)
             
-            self.sesiones[token] = {
-                'usuario': usuario,
-                'rol': usuario_datos['rol'],
-                'inicio': datetime.now().isoformat(),
-                'expiracion': expiracion
-            }
+            # Crear sesion (una fila; de paso se borran las vencidas por índice)
+            token = self._generar_token()
+            inicio = datetime.now()
+            expiracion = inicio + timedelta(hours=SESIONES_HORAS_VIGENCIA)
+            permisos = self.cache.emitir_snapshot(usuario, usuario_datos['rol'],
+                                                  horas=SESIONES_HORAS_VIGENCIA)
             
-            self._guardar_sesiones()
+            self.bd.eliminar_sesiones_expiradas()
+            self.bd.guardar_sesion(token, usuario, usuario_datos['rol'],
+                                   inicio.strftime(FORMATO_FECHA_HORA_ISO),
+                                   expiracion.strftime(FORMATO_FECHA_HORA_ISO),
+                                   json.dumps(permisos))
             
             registrar_acceso(usuario, 'EXITOSO')
             
@@ -157,7 +177,8 @@ class GestorAutenticacion:
                 'exito': True,
                 'token': token,
                 'usuario': usuario,
-                'rol': usuario_datos['rol']
+                'rol': usuario_datos['rol'],
+                'permisos': permisos
             }
             
         except Exception as e:
@@ -174,31 +195,32 @@ class GestorAutenticacion:
         Returns:
             dict: Informacion de sesion si es valida
         """
-        if token not in self.sesiones:
+        fila = self.bd.obtener_sesion(token) if token else None
+        if not fila:
             return None
         
-        sesion = self.sesiones[token]
-        
-        try:
-            expiracion = datetime.fromisoformat(sesion['expiracion'])
-            if datetime.now() > expiracion:
-                del self.sesiones[token]
-                self._guardar_sesiones()
-                return None
-        except:
+        ahora = ahora_iso()
+        if fila['expiracion'] < ahora:
+            self.bd.eliminar_sesion(token)
+            with self._lock_accesos:
+                self._accesos_pendientes.pop(token, None)
             return None
         
-        return sesion
+        # Sin escritura por cada validación: el acceso se guarda en lote
+        self._registrar_acceso(token, ahora)
+        return self._sesion_desde_fila(fila)
     
     def cerrar_sesion(self, token):
         """Cierra una sesion"""
-        if token in self.sesiones:
-            usuario = self.sesiones[token]['usuario']
-            del self.sesiones[token]
-            self._guardar_sesiones()
-            registrar_operacion('CERRAR_SESION', f'Sesion cerrada para {usuario}', {})
-            return True
-        return False
+        fila = self.bd.obtener_sesion(token) if token else None
+        if not fila:
+            return False
+        
+        with self._lock_accesos:
+            self._accesos_pendientes.pop(token, None)
+        self.bd.eliminar_sesion(token)
+        registrar_operacion('CERRAR_SESION', f'Sesion cerrada para {fila["usuario"]}', {})
+        return True
     
     def cambiar_contraseña(self, usuario, contraseña_actual, contraseña_nueva):
         """
@@ -213,14 +235,12 @@ class GestorAutenticacion:
             dict: Resultado del cambio
         """
         try:
-            if usuario not in self.usuarios:
+            user_data = self.usuarios.get(usuario)
+            if not user_data:
                 return {'exito': False, 'error': 'Usuario no existe'}
             
-            user_data = self.usuarios[usuario]
-            
             # Verificar contraseña actual
-            hash_almacenado = user_data['contraseña_hash'].encode()
-            if not bcrypt.checkpw(contraseña_actual.encode(), hash_almacenado):
+            if not self.credenciales.verificar(contraseña_actual, user_data['contraseña']):
                 return {'exito': False, 'error': 'Contraseña actual incorrecta'}
             
             # Validar nueva contraseña
@@ -228,10 +248,10 @@ class GestorAutenticacion:
                 return {'exito': False, 'error': 'La nueva contraseña debe tener al menos 6 caracteres'}
             
             # Actualizar contraseña
-            nuevo_hash = bcrypt.hashpw(contraseña_nueva.encode(), bcrypt.gensalt(rounds=12))
-            self.usuarios[usuario]['contraseña_hash'] = nuevo_hash.decode()
+            exito, mensaje = self.bd.actualizar_contraseña(usuario, contraseña_nueva)
+            if not exito:
+                return {'exito': False, 'error': mensaje}
             
-            self._guardar_usuarios()
             registrar_operacion('CAMBIO_CONTRASEÑA', f'Contraseña cambiada para {usuario}', {})
             
             return {'exito': True, 'mensaje': 'Contraseña actualizada correctamente'}
@@ -260,12 +280,11 @@ class GestorAutenticacion:
         if not sesion:
             return False
         
-        rol = sesion.get('rol')
-        if rol not in self.ROLES:
-            return False
-        
-        permisos = self.ROLES[rol]['permisos']
-        return '*' in permisos or permiso in permisos
+        return self.tiene_permiso(sesion.get('rol'), permiso)
+    
+    def tiene_permiso(self, rol, permiso):
+        """Verifica un permiso de rol contra los frozensets compilados (sin BD)"""
+        return rol_tiene_permiso(rol, permiso)
 
 # Instancia global
 gestor_auth = GestorAutenticacion()
@@ -6,9 +6,9 @@ Datos cifrados y persistentes para futura app de escritorio
 
 import os
 import json
-import bcrypt
 from datetime import datetime
 from src.auth.seguridad import seguridad
+from src.core.credenciales import obtener_servicio_credenciales
 from src.config import RUTA_SEGURA
 from src.core.logger import registrar_operacion
 
@@ -52,15 +52,12 @@ class GestorPerfiles:
             )
     
     def _hash_password(self, password):
-        """Hash seguro de contraseña con bcrypt"""
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(12)).decode('utf-8')
+        """Hash seguro de contraseña (bcrypt con costo calibrado)"""
+        return obtener_servicio_credenciales().hashear(password)
     
     def _verify_password(self, password, hash_password):
         """Verificar contraseña contra hash"""
-        try:
-            return bcrypt.checkpw(password.encode('utf-8'), hash_password.encode('utf-8'))
-        except:
-            return False
+        return obtener_servicio_credenciales().verificar(password, hash_password)
     
     def _cargar_perfiles(self):
         """Cargar perfiles desde archivo cifrado"""
@@ -114,7 +111,9 @@ class GestorPerfiles:
             )
             return False, "Usuario inactivo", None
         
-        if not self._verify_password(password, perfil.get('password_hash', '')):
+        valida, hash_nuevo = obtener_servicio_credenciales().verificar_y_actualizar(
+            password, perfil.get('password_hash', ''))
+        if not valida:
             registrar_operacion(
                 tipo='ACCESO_FALLIDO',
                 accion=f'Contraseña incorrecta para usuario: {usuario}',
@@ -123,7 +122,10 @@ class GestorPerfiles:
             )
             return False, "Contraseña incorrecta", None
         
-        # Actualizar último acceso
+        if hash_nuevo:
+            perfil['password_hash'] = hash_nuevo
+        
+        # Actualizar último acceso (guarda también el hash actualizado)
         perfil['ultimo_acceso'] = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
         self._guardar_perfiles()
         
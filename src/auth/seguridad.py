@@ -1,6 +1,5 @@
 import os
 import json
-import bcrypt
 import hmac
 import hashlib
 import shutil
@@ -8,6 +7,7 @@ from pathlib import Path
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from src.core.credenciales import obtener_servicio_credenciales
 
 class SeguridadManager:
     """Gestor de seguridad para cifrado de archivos y protección de datos"""
@@ -194,16 +194,12 @@ class SeguridadManager:
             return None
     
     def hash_password(self, password):
-        """Crea un hash seguro de contraseña con bcrypt"""
-        return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=12))
+        """Crea un hash seguro de contraseña con bcrypt (costo calibrado)"""
+        return obtener_servicio_credenciales().hashear(password).encode()
     
     def verificar_password(self, password, hash_guardado):
         """Verifica una contraseña contra su hash"""
-        if hash_guardado is None:
-            return False
-        if isinstance(hash_guardado, str):
-            hash_guardado = hash_guardado.encode()
-        return bcrypt.checkpw(password.encode(), hash_guardado)
+        return obtener_servicio_credenciales().verificar(password, hash_guardado)
     
     def obtener_ruta_archivo(self, nombre_archivo):
         """Obtiene la ruta completa de un archivo en la carpeta segura"""
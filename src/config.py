@@ -18,6 +18,29 @@ except ImportError:
 PASSWORD_CIFRADO = os.getenv("PASSWORD_CIFRADO", "SistemaComunidad2026")
 SALT_CIFRADO = os.getenv("SALT_CIFRADO", "SistemaComunidad2026Salt").encode()
 BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Costo de bcrypt calibrado por equipo (src/core/credenciales.py)
+CREDENCIALES_LATENCIA_OBJETIVO_MS = int(os.getenv("CREDENCIALES_LATENCIA_OBJETIVO_MS", "250"))
+CREDENCIALES_COSTO_MIN = BCRYPT_ROUNDS   # Piso: el costo fijo anterior; la calibración solo sube
+CREDENCIALES_COSTO_MAX = 15
+# Sesiones (tabla sesiones en SQLite)
+SESIONES_HORAS_VIGENCIA = 8
+SESIONES_INTERVALO_ACCESO_SEG = 60   # Cada cuánto se guardan en lote los últimos accesos
+# Mantenimiento automático de SQLite (src/core/mantenimiento_bd.py)
+MANTENIMIENTO_INTERVALO_SEG = 300      # Cada cuánto se intenta un paso en tiempo ocioso
+MANTENIMIENTO_WAL_PASIVO_MB = 8        # Checkpoint PASSIVE al superar este tamaño de WAL
+MANTENIMIENTO_WAL_TRUNCAR_MB = 32      # Checkpoint TRUNCATE (reduce el archivo -wal)
+MANTENIMIENTO_PAGINAS_POR_PASO = 256   # Páginas liberadas por cada incremental_vacuum
+MANTENIMIENTO_CONVERSION_MAX_MB = 256  # BD anteriores: VACUUM único al cerrar solo por debajo de este tamaño
+MANTENIMIENTO_CONVERSION_ESPERA_MS = 2000  # Espera máxima si otro módulo tiene la BD ocupada
+# Instrumentación de consultas (src/core/instrumentacion_bd.py)
+BD_INSTRUMENTACION_CAPACIDAD = 500     # Ejecuciones guardadas en el buffer circular
+BD_CONSULTA_LENTA_MS = float(os.getenv("BD_CONSULTA_LENTA_MS", "200"))
+BD_MODO_DESARROLLO = os.getenv("BD_MODO_DESARROLLO", "0") == "1"   # EXPLAIN QUERY PLAN de cada sentencia nueva
+BD_TABLA_GRANDE_FILAS = 1000           # Recorridos completos por debajo de esto no se marcan
+BD_CACHE_SENTENCIAS = 256              # Sentencias compiladas por conexión (sqlite3 usa 128)
+# Instancia única por módulo (src/core/instancia_unica.py)
+INSTANCIA_INTERVALO_MS = 250           # Cada cuánto la ventana de Tk atiende peticiones de otros lanzamientos
+INSTANCIA_TIEMPO_ESPERA_SEG = 3        # Espera máxima a que la instancia abierta confirme una petición
 
 # Base de datos
 ARCHIVO_HABITANTES = os.getenv("ARCHIVO_HABITANTES", "base_datos_habitantes.json")
@@ -132,17 +155,24 @@ UI_DEBOUNCE_SEARCH = 300       # Búsqueda en tiempo real (reducido para mejor r
 UI_DEBOUNCE_FILTER = 300       # Filtros
 UI_DEBOUNCE_INPUT = 200        # Input general
 UI_DEBOUNCE_SAVE = 1000        # Guardado automático
+UI_DEBOUNCE_SELECCION = 80     # Panel de detalles al mover la selección con flechas
 
 # Virtualización de tablas
 UI_VIRTUAL_TABLE_VISIBLE_ROWS = 25   # Filas visibles en viewport
 UI_VIRTUAL_TABLE_BUFFER_ROWS = 10    # Filas de buffer arriba/abajo
+UI_FILAS_POR_PAGINA = 200            # Filas insertadas por página en tablas de resultados
 
 # Caché
 UI_CACHE_MAX_SIZE = 200        # Máximo de entradas en caché
 UI_CACHE_TTL_SECONDS = 600     # Tiempo de vida del caché (10 min)
 
+# Caché global de datos (src/core/cache.py)
+CACHE_MAX_ENTRADAS = 1000              # Entradas máximas antes de expulsar (LRU)
+CACHE_MAX_BYTES = 32 * 1024 * 1024     # Tamaño aproximado máximo (32 MB)
+
 # Workers
 UI_MAX_BACKGROUND_WORKERS = 4  # Threads simultáneos máximos
+UI_WORKER_PUMP_MS = 16         # Intervalo del bombeo de callbacks al hilo de Tk
 
 # Censo - Optimizaciones adicionales
 CENSO_BATCH_INSERT_SIZE = 100  # Número de items a insertar por lote
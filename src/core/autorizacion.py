@@ -0,0 +1,181 @@
+"""
+Caché de autorización
+Usuarios cargados una sola vez, roles compilados a frozensets y snapshots de
+permisos firmados por sesión.
+
+La tabla ``usuarios`` tiene triggers que incrementan un contador en
+``versiones_tabla``; la caché solo vuelve a leer los usuarios cuando ese
+contador cambia (también si lo cambió otro proceso). ``tiene_permiso`` no toca
+la base de datos: es una búsqueda en un frozenset.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, FrozenSet, Optional
+
+from src.config import RUTA_SEGURA
+from src.core.logger import registrar_error
+
+# Roles disponibles del sistema ('*' = todos los permisos)
+ROLES = {
+    'admin': {'nombre': 'Administrador', 'permisos': ['*']},
+    'operador': {'nombre': 'Operador', 'permisos': ['ver', 'crear', 'editar', 'pagar']},
+    'lectura': {'nombre': 'Solo Lectura', 'permisos': ['ver']},
+    'reportes': {'nombre': 'Reportes', 'permisos': ['ver', 'exportar']}
+}
+
+COMODIN = '*'
+HORAS_VIGENCIA_SNAPSHOT = 8
+ARCHIVO_CLAVE_SESIONES = '.clave_sesiones'
+
+SIN_PERMISOS: FrozenSet[str] = frozenset()
+
+
+def compilar_roles(roles: Dict[str, Dict[str, Any]]) -> Dict[str, FrozenSet[str]]:
+    """Rol -> frozenset de permisos, calculado una sola vez"""
+    return {rol: frozenset(datos.get('permisos', ())) for rol, datos in roles.items()}
+
+
+PERMISOS_POR_ROL = compilar_roles(ROLES)
+
+
+def permisos_de_rol(rol: Optional[str]) -> FrozenSet[str]:
+    """Permisos compilados de un rol (vacío si el rol no existe)"""
+    return PERMISOS_POR_ROL.get(rol, SIN_PERMISOS)
+
+
+def rol_tiene_permiso(rol: Optional[str], permiso: str) -> bool:
+    """Verificación O(1) sin consultar la base de datos"""
+    permisos = PERMISOS_POR_ROL.get(rol, SIN_PERMISOS)
+    return permiso in permisos or COMODIN in permisos
+
+
+class CacheAutorizacion:
+    """Usuarios en memoria validados contra el contador de versión de la tabla"""
+
+    def __init__(self, bd=None, ruta_clave: Optional[str] = None):
+        if bd is None:
+            from src.core.base_datos_sqlite import obtener_bd
+            bd = obtener_bd()
+        self.bd = bd
+        self.ruta_clave = ruta_clave or os.path.join(RUTA_SEGURA, ARCHIVO_CLAVE_SESIONES)
+        self._lock = threading.RLock()
+        self._usuarios: Dict[str, Dict[str, Any]] = {}
+        self._version: Optional[int] = None
+        self._clave: Optional[bytes] = None
+        self.recargas = 0
+
+    # ==================== USUARIOS ====================
+
+    def _vigente(self) -> bool:
+        return self._version is not None and self._version == self.bd.obtener_version_tabla('usuarios')
+
+    def _recargar(self) -> None:
+        version = self.bd.obtener_version_tabla('usuarios')
+        self._usuarios = {u['nombre_usuario']: u
+                          for u in self.bd.obtener_usuarios(activos_solo=False)}
+        self._version = version
+        self.recargas += 1
+
+    def usuarios(self) -> Dict[str, Dict[str, Any]]:
+        """nombre_usuario -> fila de usuario (incluye inactivos); no modificar"""
+        with self._lock:
+            if not self._vigente():
+                self._recargar()
+            return self._usuarios
+
+    def obtener_usuario(self, nombre_usuario: str) -> Optional[Dict[str, Any]]:
+        return self.usuarios().get(nombre_usuario)
+
+    def invalidar(self) -> None:
+        """Forzar la recarga en el próximo acceso"""
+        with self._lock:
+            self._version = None
+
+    @property
+    def version(self) -> Optional[int]:
+        return self._version
+
+    # ==================== SNAPSHOTS DE SESIÓN ====================
+
+    def _obtener_clave(self) -> bytes:
+        """Clave HMAC compartida por los procesos de la instalación"""
+        if self._clave is None:
+            try:
+                with open(self.ruta_clave, 'rb') as f:
+                    self._clave = f.read()
+            except FileNotFoundError:
+                clave = secrets.token_bytes(32)
+                try:
+                    fd = os.open(self.ruta_clave, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                    with os.fdopen(fd, 'wb') as f:
+                        f.write(clave)
+                    self._clave = clave
+                except FileExistsError:
+                    # Otro proceso la creó al mismo tiempo
+                    with open(self.ruta_clave, 'rb') as f:
+                        self._clave = f.read()
+        return self._clave
+
+    def _firmar(self, datos: Dict[str, Any]) -> str:
+        contenido = json.dumps(datos, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hmac.new(self._obtener_clave(), contenido, hashlib.sha256).hexdigest()
+
+    def emitir_snapshot(self, usuario: str, rol: str,
+                        horas: int = HORAS_VIGENCIA_SNAPSHOT) -> Dict[str, Any]:
+        """
+        Foto firmada de los permisos de una sesión
+
+        Returns:
+            dict con usuario, rol, permisos, version, expiracion y firma
+        """
+        datos = {
+            'usuario': usuario,
+            'rol': rol,
+            'permisos': sorted(permisos_de_rol(rol)),
+            'version': self._version,
+            'expiracion': (datetime.now() + timedelta(hours=horas)).isoformat()
+        }
+        datos['firma'] = self._firmar(datos)
+        return datos
+
+    def verificar_snapshot(self, snapshot: Optional[Dict[str, Any]],
+                           permiso: Optional[str] = None) -> bool:
+        """
+        Verificar firma, vigencia y (opcional) un permiso sin consultar la BD
+
+        Sirve para otros procesos que comparten la carpeta segura.
+        """
+        if not snapshot or 'firma' not in snapshot:
+            return False
+        try:
+            datos = {k: v for k, v in snapshot.items() if k != 'firma'}
+            if not hmac.compare_digest(snapshot['firma'], self._firmar(datos)):
+                return False
+            if datetime.now() > datetime.fromisoformat(snapshot['expiracion']):
+                return False
+        except Exception as e:
+            registrar_error('CacheAutorizacion', 'verificar_snapshot', str(e))
+            return False
+
+        if permiso is None:
+            return True
+        permisos = snapshot['permisos']
+        return permiso in permisos or COMODIN in permisos
+
+
+# Instancia global única
+_cache_global = None
+
+
+def obtener_cache_autorizacion() -> CacheAutorizacion:
+    """Obtener instancia global de la caché de autorización"""
+    global _cache_global
+    if _cache_global is None:
+        _cache_global = CacheAutorizacion()
+    return _cache_global
@@ -81,6 +81,10 @@ class BaseDatos:
     
     def obtener_habitante_por_nombre(self, nombre):
         """Obtener habitante por nombre exacto"""
+        habitante = self.bd.obtener_habitante_por_nombre(nombre)
+        if habitante:
+            return habitante
+        # Sin coincidencia exacta: primer resultado de la búsqueda parcial
         resultados = self.bd.buscar_habitante(nombre)
         return resultados[0] if resultados else None
     
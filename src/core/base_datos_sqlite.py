@@ -5,33 +5,172 @@ Reemplaza el sistema JSON anterior con SQLite para mejor rendimiento y escalabil
 
 import sqlite3
 import os
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from src.config import RUTA_SEGURA
+from src.config import BD_CACHE_SENTENCIAS, RUTA_SEGURA
 from src.core.logger import registrar_operacion, registrar_error
-import hashlib
+from src.core.credenciales import obtener_servicio_credenciales
+from src.core.instrumentacion_bd import ConexionInstrumentada
+from src.core.fechas import (
+    ahora_iso, hoy_iso, normalizar_fecha_iso, rango_dias, sql_ddmmyyyy_a_iso
+)
 import time
 
+# Versión del esquema (PRAGMA user_version); cada migración incrementa este número
+VERSION_ESQUEMA = 1
+
+# Columnas de fecha migradas de 'DD/MM/YYYY[ HH:MM:SS]' a ISO-8601 en la versión 1
+COLUMNAS_FECHA = (
+    ('usuarios', 'fecha_creacion'),
+    ('usuarios', 'ultimo_acceso'),
+    ('habitantes', 'fecha_registro'),
+    ('pagos', 'fecha_pago'),
+    ('pagos', 'fecha_registro'),
+    ('faenas', 'fecha_inicio'),
+    ('faenas', 'fecha_fin'),
+    ('faenas', 'fecha_creacion'),
+    ('participacion_faenas', 'fecha_participacion'),
+    ('historial', 'fecha_evento'),
+    ('pagos_coop', 'fecha_pago'),
+)
+
+# Consultas frecuentes con nombre. Se ejecutan siempre con el mismo texto, así
+# la caché de sentencias de la conexión las reutiliza ya compiladas; usar con
+# filas()/fila()/valor()/registros() en lugar de armar SQL en cada llamada.
+CONSULTAS = {
+    'habitante_por_folio': "SELECT * FROM habitantes WHERE folio = ? AND activo = 1",
+    'habitante_por_nombre': "SELECT * FROM habitantes WHERE nombre = ? AND activo = 1",
+    'pagos_habitante': "SELECT * FROM pagos WHERE habitante_id = ? ORDER BY fecha_registro DESC",
+    'usuario_por_nombre': "SELECT * FROM usuarios WHERE nombre_usuario = ?",
+    'sesion_por_token': "SELECT * FROM sesiones WHERE token = ?",
+    'personas_cooperacion': """
+        SELECT pc.id, pc.habitante_id, h.folio, h.nombre,
+               pc.monto_esperado, pc.estado, pc.notas, pc.fecha_agregado
+        FROM personas_cooperacion pc
+        LEFT JOIN habitantes h ON pc.habitante_id = h.id
+        WHERE pc.cooperacion_id = ?
+        ORDER BY h.nombre
+    """,
+    'pagos_persona_cooperacion': """
+        SELECT id, monto, fecha_pago, hora_pago, concepto, anulado
+        FROM pagos_coop
+        WHERE persona_coop_id = ?
+        ORDER BY fecha_pago DESC, hora_pago DESC
+    """,
+    # Todos los pagos de una cooperación en una consulta (evita una por persona)
+    'pagos_de_cooperacion': """
+        SELECT pg.persona_coop_id, pg.id, pg.monto, pg.fecha_pago, pg.hora_pago,
+               pg.concepto, pg.anulado
+        FROM pagos_coop pg
+        JOIN personas_cooperacion pc ON pg.persona_coop_id = pc.id
+        WHERE pc.cooperacion_id = ?
+        ORDER BY pg.persona_coop_id, pg.fecha_pago DESC, pg.hora_pago DESC
+    """,
+    # Horas de faena registradas en participacion_faenas (cuotas)
+    'faenas_habitante': """
+        SELECT f.id, f.nombre, f.fecha_inicio AS fecha, pf.horas_trabajadas
+        FROM participacion_faenas pf
+        JOIN faenas f ON pf.faena_id = f.id
+        WHERE pf.habitante_id = ? AND f.estado != 'cancelada'
+        ORDER BY f.fecha_inicio DESC
+    """,
+    'horas_faenas_periodo': """
+        SELECT pf.habitante_id, SUM(COALESCE(pf.horas_trabajadas, 0))
+        FROM faenas f
+        JOIN participacion_faenas pf ON pf.faena_id = f.id
+        WHERE f.fecha_inicio >= ? AND f.fecha_inicio < ? AND f.estado != 'cancelada'
+        GROUP BY pf.habitante_id
+    """,
+}
+
+
+class ConexionBD(ConexionInstrumentada):
+    """
+    Conexión de la aplicación con soporte para BaseDatosSQLite.transaccion()
+    
+    Dentro de una transacción, commit() no confirma (lo hace la transacción
+    más externa al terminar) y rollback() la marca para deshacerse al final.
+    Cuenta las confirmaciones reales, cada una es una escritura sincronizada
+    del WAL.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.profundidad_transaccion = 0
+        self.solo_deshacer = False
+        self.confirmaciones = 0
+        # Filas de auditoría y avisos que esperan al commit de la transacción
+        self.auditoria_pendiente = []
+        self.al_confirmar_pendiente = []
+    
+    def commit(self):
+        if self.profundidad_transaccion:
+            return
+        self.confirmar()
+    
+    def rollback(self):
+        if self.profundidad_transaccion:
+            self.solo_deshacer = True
+            return
+        super().rollback()
+    
+    def confirmar(self):
+        """commit real, aunque haya una transacción abierta"""
+        if self.in_transaction:
+            self.confirmaciones += 1
+        super().commit()
+    
+    def deshacer(self):
+        """rollback real, aunque haya una transacción abierta"""
+        super().rollback()
+
+
 class BaseDatosSQLite:
     """Gestor de base de datos SQLite para el sistema"""
     
-    def __init__(self):
-        self.ruta_db = os.path.join(RUTA_SEGURA, 'sistema.db')
+    def __init__(self, ruta_db=None):
+        """
+        Args:
+            ruta_db (str): Archivo de la BD; por omisión sistema.db en RUTA_SEGURA
+                (otra ruta sirve para pruebas y benchmarks aislados)
+        """
+        self.ruta_db = ruta_db or os.path.join(RUTA_SEGURA, 'sistema.db')
         self.conexion = None
+        self._lecturas = threading.local()
+        self._tipos_registro = {}
         self.inicializar_bd()
         
     def conectar(self):
-        """Conectar a la base de datos con reintentos automáticos"""
+        """
+        Conexión de larga vida a la base de datos (se abre con reintentos la primera vez)
+        
+        Reutilizar la conexión conserva su caché de sentencias compiladas; antes
+        cada llamada abría una nueva y repetía los PRAGMA.
+        """
+        if self.conexion is not None:
+            return self.conexion
+        
         max_intentos = 5
         tiempo_espera = 0.2
         
         for intento in range(max_intentos):
             try:
                 # Timeout más largo para evitar "database is locked"
-                self.conexion = sqlite3.connect(self.ruta_db, timeout=60.0, check_same_thread=False)
+                bd_nueva = not os.path.exists(self.ruta_db)
+                # Cada sentencia queda medida (ver instrumentacion_bd)
+                self.conexion = sqlite3.connect(self.ruta_db, timeout=60.0, check_same_thread=False,
+                                                factory=ConexionBD,
+                                                cached_statements=BD_CACHE_SENTENCIAS)
                 self.conexion.row_factory = sqlite3.Row
                 # Habilitar claves foráneas
                 self.conexion.execute("PRAGMA foreign_keys = ON")
+                if bd_nueva:
+                    # Páginas libres recuperables por tramos (solo surte efecto al crear
+                    # la BD, por eso va antes de activar WAL; ver mantenimiento_bd)
+                    self.conexion.execute("PRAGMA auto_vacuum=INCREMENTAL")
                 # Configurar WAL mode para mejor concurrencia (permite lecturas mientras se escribe)
                 self.conexion.execute("PRAGMA journal_mode=WAL")
                 # Timeout para operaciones bloqueadas (10 segundos)
@@ -55,9 +194,205 @@ class BaseDatosSQLite:
     def desconectar(self):
         """Desconectar de la base de datos"""
         if self.conexion:
+            try:
+                # Actualizar estadísticas del planificador antes de cerrar
+                self.conexion.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
             self.conexion.close()
             self.conexion = None
     
+    # ==================== TRANSACCIONES ====================
+    
+    @contextmanager
+    def transaccion(self):
+        """
+        Unidad de trabajo: todo lo escrito dentro se confirma con un solo commit
+        
+        Uso:
+            with bd.transaccion():
+                bd.registrar_pago_coop_bd(...)
+                bd.registrar_auditoria(...)
+        
+        Las transacciones anidadas usan SAVEPOINT: una excepción dentro de la
+        interna deshace solo su parte. Las filas de auditoría se acumulan y se
+        insertan juntas antes del commit; los callbacks de al_confirmar() se
+        ejecutan después, y se descartan si la transacción se deshace.
+        """
+        conexion = self.conectar()
+        pendientes = conexion.auditoria_pendiente
+        callbacks = conexion.al_confirmar_pendiente
+        externa = conexion.profundidad_transaccion == 0
+        
+        if externa:
+            if conexion.in_transaction:
+                # Escritura implícita anterior sin confirmar: no mezclarla con esta
+                conexion.confirmar()
+            conexion.execute("BEGIN IMMEDIATE")
+            conexion.solo_deshacer = False
+        else:
+            punto = f"sp_{conexion.profundidad_transaccion}"
+            conexion.execute(f"SAVEPOINT {punto}")
+        marca_auditoria = len(pendientes)
+        marca_callbacks = len(callbacks)
+        conexion.profundidad_transaccion += 1
+        
+        try:
+            yield self
+        except BaseException:
+            conexion.profundidad_transaccion -= 1
+            del pendientes[marca_auditoria:]
+            del callbacks[marca_callbacks:]
+            if externa:
+                conexion.deshacer()
+            else:
+                conexion.execute(f"ROLLBACK TO {punto}")
+                conexion.execute(f"RELEASE {punto}")
+            raise
+        
+        conexion.profundidad_transaccion -= 1
+        if not externa:
+            conexion.execute(f"RELEASE {punto}")
+            return
+        
+        if conexion.solo_deshacer:
+            pendientes.clear()
+            callbacks.clear()
+            conexion.deshacer()
+            return
+        try:
+            if pendientes:
+                conexion.executemany('''
+                    INSERT INTO auditoria
+                    (usuario, accion, tabla, registro_id, fecha_operacion, detalles, resultado)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', pendientes)
+            conexion.confirmar()
+        except BaseException:
+            conexion.deshacer()
+            raise
+        finally:
+            pendientes.clear()
+            avisos = callbacks[:]
+            callbacks.clear()
+        
+        for callback in avisos:
+            try:
+                callback()
+            except Exception as e:
+                registrar_error('BaseDatosSQLite', 'transaccion', str(e))
+    
+    def en_transaccion(self):
+        """True si hay un bloque transaccion() abierto"""
+        return self.conexion is not None and self.conexion.profundidad_transaccion > 0
+    
+    def al_confirmar(self, callback):
+        """
+        Ejecutar callback cuando se confirme la transacción en curso
+        
+        Para efectos fuera de la BD (log, avisos) que no deben quedar si la
+        operación se deshace. Sin transacción abierta se ejecuta de inmediato.
+        """
+        if self.en_transaccion():
+            self.conexion.al_confirmar_pendiente.append(callback)
+        else:
+            callback()
+    
+    # ==================== LECTURAS EN INSTANTÁNEA ====================
+    
+    @contextmanager
+    def lectura(self, temporales=False):
+        """
+        Conexión de solo lectura con una instantánea coherente de la BD
+        
+        Para reportes, estadísticas y auditorías, idealmente en un hilo de
+        trabajo. Se abre aparte de la conexión de la UI con mode=ro y
+        query_only. BEGIN (diferido) fija la instantánea del WAL en la primera
+        lectura, así todas las consultas del bloque ven los mismos datos
+        aunque la UI siga registrando pagos. En WAL, lectores y escritor no se
+        bloquean entre sí.
+        
+        Dentro del bloque, los métodos de lectura de esta clase (filas(),
+        obtener_todos_habitantes(), obtener_estadisticas()...) llamados desde el
+        mismo hilo usan esta conexión. Un lectura() anidado reutiliza la
+        instantánea abierta.
+        
+        Args:
+            temporales (bool): Omitir query_only para poder crear tablas TEMP;
+                la BD principal sigue protegida por mode=ro
+        """
+        local = self._lecturas
+        abierta = getattr(local, 'conexion', None)
+        if abierta is not None:
+            yield abierta
+            return
+        
+        uri = Path(self.ruta_db).resolve().as_uri() + '?mode=ro'
+        conexion = sqlite3.connect(uri, uri=True, timeout=60.0, isolation_level=None,
+                                   factory=ConexionInstrumentada)
+        try:
+            conexion.row_factory = sqlite3.Row
+            conexion.execute("PRAGMA busy_timeout=10000")
+            if not temporales:
+                conexion.execute("PRAGMA query_only=ON")
+            conexion.execute("BEGIN")
+            local.conexion = conexion
+            yield conexion
+        finally:
+            local.conexion = None
+            # Cerrar con la transacción abierta la descarta (y las tablas TEMP)
+            conexion.close()
+    
+    def _cursor_lectura(self):
+        """Cursor de la instantánea abierta en este hilo, o de la conexión principal"""
+        conexion = getattr(self._lecturas, 'conexion', None)
+        return (conexion or self.conexion or self.conectar()).cursor()
+    
+    # ==================== CONSULTAS CON NOMBRE ====================
+    
+    def _ejecutar_consulta(self, nombre, parametros=()):
+        """Cursor que devuelve tuplas para una consulta de CONSULTAS"""
+        cursor = self._cursor_lectura()
+        cursor.row_factory = None
+        cursor.execute(CONSULTAS[nombre], parametros)
+        return cursor
+    
+    def filas(self, nombre, parametros=()):
+        """Todas las filas de una consulta con nombre, como tuplas"""
+        return self._ejecutar_consulta(nombre, parametros).fetchall()
+    
+    def fila(self, nombre, parametros=()):
+        """Primera fila como tupla, o None"""
+        return self._ejecutar_consulta(nombre, parametros).fetchone()
+    
+    def valor(self, nombre, parametros=(), defecto=None):
+        """Primera columna de la primera fila"""
+        resultado = self._ejecutar_consulta(nombre, parametros).fetchone()
+        return resultado[0] if resultado else defecto
+    
+    def registros(self, nombre, parametros=()):
+        """Filas como namedtuples (acceso por atributo, sin armar dicts)"""
+        cursor = self._ejecutar_consulta(nombre, parametros)
+        tipo = self._tipo_registro(nombre, cursor.description)
+        return list(map(tipo._make, cursor.fetchall()))
+    
+    def registro(self, nombre, parametros=()):
+        """Primera fila como namedtuple, o None"""
+        cursor = self._ejecutar_consulta(nombre, parametros)
+        resultado = cursor.fetchone()
+        if resultado is None:
+            return None
+        return self._tipo_registro(nombre, cursor.description)._make(resultado)
+    
+    def _tipo_registro(self, nombre, descripcion):
+        """namedtuple de una consulta, armado con sus columnas la primera vez"""
+        tipos = self._tipos_registro
+        tipo = tipos.get(nombre)
+        if tipo is None:
+            tipo = namedtuple(f"Fila_{nombre}", [columna[0] for columna in descripcion], rename=True)
+            tipos[nombre] = tipo
+        return tipo
+    
     def inicializar_bd(self):
         """Inicializar estructura de base de datos"""
         self.conectar()
@@ -224,72 +559,7 @@ class BaseDatosSQLite:
                 ON auditoria(tabla)
             ''')
             
-            # ===== ÍNDICES PARA COOPERACIONES (Centro de Pagos) =====
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_cooperaciones_activa 
-                ON cooperaciones(activa)
-            ''')
-            
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_cooperaciones_nombre 
-                ON cooperaciones(nombre)
-            ''')
-            
-            # Índices para personas_cooperacion
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_personas_coop_coop_id 
-                ON personas_cooperacion(cooperacion_id)
-            ''')
-            
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_personas_coop_habitante_id 
-                ON personas_cooperacion(habitante_id)
-            ''')
-            
-            # Índices para pagos_coop
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_pagos_coop_persona_id 
-                ON pagos_coop(persona_coop_id)
-            ''')
-            
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_pagos_coop_fecha 
-                ON pagos_coop(fecha_pago DESC)
-            ''')
-            
             # ===== TABLAS PARA COOPERACIONES (Centro de Pagos) =====
-            # Índices de rendimiento para cooperaciones
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_cooperaciones_activa 
-                ON cooperaciones(activa)
-            ''')
-            
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_cooperaciones_nombre 
-                ON cooperaciones(nombre)
-            ''')
-            
-            # Índices para personas_cooperacion (búsquedas frecuentes)
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_personas_coop_coop_id 
-                ON personas_cooperacion(cooperacion_id)
-            ''')
-            
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_personas_coop_habitante_id 
-                ON personas_cooperacion(habitante_id)
-            ''')
-            
-            # Índices para pagos_coop (búsquedas de historial)
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_pagos_coop_persona_id 
-                ON pagos_coop(persona_coop_id)
-            ''')
-            
-            cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_pagos_coop_fecha 
-                ON pagos_coop(fecha_pago DESC)
-            ''')
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS cooperaciones (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -334,8 +604,95 @@ class BaseDatosSQLite:
                     FOREIGN KEY (registrado_por) REFERENCES usuarios(id)
                 )
             ''')
+
+            # Fecha de pago normalizada a ISO (YYYY-MM-DD) para agregaciones por fecha
+            self._asegurar_fecha_pago_iso(cursor)
+
+            # ===== ÍNDICES PARA COOPERACIONES (Centro de Pagos) =====
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_cooperaciones_activa 
+                ON cooperaciones(activa)
+            ''')
             
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_cooperaciones_nombre 
+                ON cooperaciones(nombre)
+            ''')
+            
+            # Índices para personas_cooperacion
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_personas_coop_coop_id 
+                ON personas_cooperacion(cooperacion_id)
+            ''')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_personas_coop_habitante_id 
+                ON personas_cooperacion(habitante_id)
+            ''')
+            
+            # Índices para pagos_coop
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_pagos_coop_persona_id 
+                ON pagos_coop(persona_coop_id)
+            ''')
+            
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_pagos_coop_fecha 
+                ON pagos_coop(fecha_pago DESC)
+            ''')
+
+            # Índices de fecha (ISO-8601) para consultas por rango
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_historial_fecha
+                ON historial(fecha_evento)
+            ''')
+
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_faenas_fecha_inicio
+                ON faenas(fecha_inicio)
+            ''')
+
+            # UNIQUE(faena_id, habitante_id) no sirve para buscar por habitante
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_participacion_faenas_habitante
+                ON participacion_faenas(habitante_id)
+            ''')
+
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_pagos_fecha
+                ON pagos(fecha_pago)
+            ''')
+
+            # Índice cubriente para estadísticas: totales e histogramas sin leer la tabla
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_pagos_coop_estadisticas
+                ON pagos_coop(persona_coop_id, anulado, monto, fecha_pago_iso, hora_pago)
+            ''')
+
+            # Sesiones de login: búsqueda por token (PK) y limpieza por expiración
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS sesiones (
+                    token TEXT PRIMARY KEY,
+                    usuario TEXT NOT NULL,
+                    rol TEXT,
+                    inicio TEXT,
+                    expiracion TEXT NOT NULL,
+                    ultimo_acceso TEXT,
+                    permisos TEXT
+                ) WITHOUT ROWID
+            ''')
+
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_sesiones_expiracion
+                ON sesiones(expiracion)
+            ''')
+
+            # Contador de cambios por tabla (invalidación de cachés entre procesos)
+            self._crear_versiones_tabla(cursor)
+
             self.conexion.commit()
+
+            self._migrar_esquema(cursor)
             
             # Crear usuario admin si no existe
             self._crear_admin_default()
@@ -350,6 +707,90 @@ class BaseDatosSQLite:
             self.conexion.rollback()
             raise
     
+    def _migrar_esquema(self, cursor):
+        """Aplicar migraciones pendientes según PRAGMA user_version"""
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version >= VERSION_ESQUEMA:
+            return
+
+        try:
+            if version < 1:
+                # Fechas 'DD/MM/YYYY[ HH:MM:SS]' -> 'YYYY-MM-DD[ HH:MM:SS]'
+                for tabla, columna in COLUMNAS_FECHA:
+                    cursor.execute(
+                        f"UPDATE {tabla} SET {columna} = {sql_ddmmyyyy_a_iso(columna)} "
+                        f"WHERE {columna} LIKE '__/__/____%'"
+                    )
+            cursor.execute(f"PRAGMA user_version = {VERSION_ESQUEMA}")
+            self.conexion.commit()
+            registrar_operacion('BD_MIGRACION', f'Esquema migrado a versión {VERSION_ESQUEMA}',
+                                {'version_anterior': version})
+        except sqlite3.Error as e:
+            self.conexion.rollback()
+            registrar_error('BaseDatosSQLite', '_migrar_esquema', str(e))
+            raise
+
+    def _asegurar_fecha_pago_iso(self, cursor):
+        """
+        Agregar a pagos_coop la columna generada fecha_pago_iso si no existe.
+
+        fecha_pago se guarda en ISO desde la versión 1 del esquema; la columna
+        virtual también normaliza filas DD/MM/YYYY que pudieran escribir versiones
+        antiguas de la aplicación, para agrupar y ordenar por fecha en SQL.
+        """
+        cursor.execute("PRAGMA table_xinfo(pagos_coop)")
+        columnas = {row[1] for row in cursor.fetchall()}
+        if 'fecha_pago_iso' in columnas:
+            return
+
+        cursor.execute('''
+            ALTER TABLE pagos_coop ADD COLUMN fecha_pago_iso TEXT
+            GENERATED ALWAYS AS (
+                CASE WHEN fecha_pago LIKE '__/__/____%'
+                     THEN substr(fecha_pago, 7, 4) || '-' || substr(fecha_pago, 4, 2)
+                          || '-' || substr(fecha_pago, 1, 2)
+                     ELSE substr(fecha_pago, 1, 10)
+                END
+            ) VIRTUAL
+        ''')
+
+    def _crear_versiones_tabla(self, cursor):
+        """
+        Tabla versiones_tabla y triggers que la incrementan cuando cambian usuarios.
+
+        Solo cuentan las columnas que afectan autenticación y permisos; los
+        cambios de ultimo_acceso o intentos_fallidos no invalidan la caché.
+        """
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS versiones_tabla (
+                tabla TEXT PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO versiones_tabla (tabla, version) VALUES ('usuarios', 0)")
+
+        incremento = "UPDATE versiones_tabla SET version = version + 1 WHERE tabla = 'usuarios';"
+        for nombre, evento in (
+            ('trg_usuarios_version_insert', 'AFTER INSERT ON usuarios'),
+            ('trg_usuarios_version_delete', 'AFTER DELETE ON usuarios'),
+            ('trg_usuarios_version_update',
+             'AFTER UPDATE OF nombre_usuario, contraseña, email, rol, activo, bloqueado ON usuarios'),
+        ):
+            cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre} {evento} BEGIN {incremento} END")
+
+    def obtener_version_tabla(self, tabla):
+        """Contador de cambios de una tabla (0 si no se lleva)"""
+        # Se consulta muy seguido: reutilizar la conexión abierta
+        cursor = (self.conexion or self.conectar()).cursor()
+
+        try:
+            cursor.execute("SELECT version FROM versiones_tabla WHERE tabla = ?", (tabla,))
+            fila = cursor.fetchone()
+            return fila[0] if fila else 0
+        except sqlite3.Error as e:
+            registrar_error('BaseDatosSQLite', 'obtener_version_tabla', str(e))
+            return None
+
     def _crear_admin_default(self):
         """Crear usuario admin por defecto si no existe"""
         cursor = self.conexion.cursor()
@@ -358,14 +799,13 @@ class BaseDatosSQLite:
             cursor.execute("SELECT id FROM usuarios WHERE nombre_usuario = 'admin'")
             if not cursor.fetchone():
                 # Hash de contraseña: admin3112
-                hash_pwd = hashlib.sha256("admin3112".encode()).hexdigest()
+                hash_pwd = obtener_servicio_credenciales().hashear("admin3112")
                 
                 cursor.execute('''
                     INSERT INTO usuarios 
                     (nombre_usuario, contraseña, email, rol, activo, fecha_creacion)
                     VALUES (?, ?, ?, ?, ?, ?)
-                ''', ('admin', hash_pwd, 'admin@comunidad.local', 'admin', 1, 
-                      datetime.now().strftime("%d/%m/%Y")))
+                ''', ('admin', hash_pwd, 'admin@comunidad.local', 'admin', 1, hoy_iso()))
                 
                 self.conexion.commit()
                 print("[OK] Usuario admin creado")
@@ -411,7 +851,7 @@ class BaseDatosSQLite:
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (folio, nombre, apellidos, rut, telefono, email, direccion,
                   fecha_nacimiento, nota, grupo_familiar, 1 if activo else 0,
-                  datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+                  ahora_iso()))
             
             self.conexion.commit()
             registrar_operacion('HABITANTES', f'Habitante creado: {nombre}', {'folio': folio})
@@ -453,7 +893,7 @@ class BaseDatosSQLite:
     
     def obtener_todos_habitantes(self):
         """Obtener todos los habitantes activos ordenados por folio"""
-        cursor = self.conectar().cursor()
+        cursor = self._cursor_lectura()
         
         try:
             cursor.execute("""
@@ -487,12 +927,24 @@ class BaseDatosSQLite:
             registrar_error('BaseDatosSQLite', 'buscar_habitante', str(e))
             return []
     
+    def obtener_habitante_por_nombre(self, nombre):
+        """Obtener habitante activo por nombre exacto (usa idx_habitantes_nombre)"""
+        cursor = (self.conexion or self.conectar()).cursor()
+        
+        try:
+            cursor.execute(CONSULTAS['habitante_por_nombre'], (nombre,))
+            resultado = cursor.fetchone()
+            return dict(resultado) if resultado else None
+        except sqlite3.Error as e:
+            registrar_error('BaseDatosSQLite', 'obtener_habitante_por_nombre', str(e))
+            return None
+    
     def obtener_habitante_por_folio(self, folio):
         """Obtener habitante por folio"""
         cursor = self.conectar().cursor()
         
         try:
-            cursor.execute("SELECT * FROM habitantes WHERE folio = ? AND activo = 1", (folio,))
+            cursor.execute(CONSULTAS['habitante_por_folio'], (folio,))
             resultado = cursor.fetchone()
             return dict(resultado) if resultado else None
         except sqlite3.Error as e:
@@ -553,7 +1005,7 @@ class BaseDatosSQLite:
                 (habitante_id, monto, concepto, estado, observaciones, registrado_por, fecha_registro, fecha_pago)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             ''', (habitante_id, monto, concepto, 'completado', observaciones, usuario_id,
-                  datetime.now().strftime("%d/%m/%Y"), datetime.now().strftime("%d/%m/%Y")))
+                  hoy_iso(), hoy_iso()))
             
             self.conexion.commit()
             registrar_operacion('PAGOS', f'Pago registrado', {'habitante_id': habitante_id, 'monto': monto})
@@ -568,10 +1020,7 @@ class BaseDatosSQLite:
         cursor = self.conectar().cursor()
         
         try:
-            cursor.execute("""
-                SELECT * FROM pagos WHERE habitante_id = ? 
-                ORDER BY fecha_registro DESC
-            """, (habitante_id,))
+            cursor.execute(CONSULTAS['pagos_habitante'], (habitante_id,))
             return [dict(row) for row in cursor.fetchall()]
         except sqlite3.Error as e:
             registrar_error('BaseDatosSQLite', 'obtener_pagos_habitante', str(e))
@@ -579,7 +1028,7 @@ class BaseDatosSQLite:
     
     def obtener_todos_pagos(self):
         """Obtener todos los pagos"""
-        cursor = self.conectar().cursor()
+        cursor = self._cursor_lectura()
         
         try:
             cursor.execute("""
@@ -604,8 +1053,10 @@ class BaseDatosSQLite:
                 INSERT INTO faenas 
                 (nombre, descripcion, fecha_inicio, fecha_fin, horas_requeridas, encargado_id, fecha_creacion, estado)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (nombre, descripcion, fecha_inicio, fecha_fin, horas_requeridas, encargado_id,
-                  datetime.now().strftime("%d/%m/%Y"), 'pendiente'))
+            ''', (nombre, descripcion,
+                  normalizar_fecha_iso(fecha_inicio) or fecha_inicio,
+                  normalizar_fecha_iso(fecha_fin) or fecha_fin,
+                  horas_requeridas, encargado_id, hoy_iso(), 'pendiente'))
             
             self.conexion.commit()
             registrar_operacion('FAENAS', f'Faena creada: {nombre}', {})
@@ -617,7 +1068,7 @@ class BaseDatosSQLite:
     
     def obtener_todas_faenas(self):
         """Obtener todas las faenas activas"""
-        cursor = self.conectar().cursor()
+        cursor = self._cursor_lectura()
         
         try:
             cursor.execute("""
@@ -629,6 +1080,19 @@ class BaseDatosSQLite:
             registrar_error('BaseDatosSQLite', 'obtener_todas_faenas', str(e))
             return []
     
+    def obtener_faenas_habitante(self, habitante_id):
+        """Faenas en que participó un habitante, con sus horas (fecha = fecha_inicio ISO)"""
+        return [registro._asdict() for registro in self.registros('faenas_habitante', (habitante_id,))]
+    
+    def obtener_horas_faenas_periodo(self, fecha_desde, fecha_hasta):
+        """
+        Horas de faena por habitante en el rango [fecha_desde, fecha_hasta)
+        
+        Returns:
+            dict: habitante_id -> horas
+        """
+        return dict(self.filas('horas_faenas_periodo', (fecha_desde, fecha_hasta)))
+    
     def registrar_participacion_faena(self, faena_id, habitante_id, horas=0):
         """Registrar participación en faena"""
         cursor = self.conectar().cursor()
@@ -638,7 +1102,7 @@ class BaseDatosSQLite:
                 INSERT OR REPLACE INTO participacion_faenas 
                 (faena_id, habitante_id, horas_trabajadas, fecha_participacion)
                 VALUES (?, ?, ?, ?)
-            ''', (faena_id, habitante_id, horas, datetime.now().strftime("%d/%m/%Y")))
+            ''', (faena_id, habitante_id, horas, hoy_iso()))
             
             self.conexion.commit()
             return True, "Participación registrada"
@@ -654,7 +1118,7 @@ class BaseDatosSQLite:
         cursor = self.conectar().cursor()
         
         try:
-            cursor.execute("SELECT * FROM usuarios WHERE nombre_usuario = ?", (nombre_usuario,))
+            cursor.execute(CONSULTAS['usuario_por_nombre'], (nombre_usuario,))
             resultado = cursor.fetchone()
             return dict(resultado) if resultado else None
         except sqlite3.Error as e:
@@ -680,14 +1144,14 @@ class BaseDatosSQLite:
         cursor = self.conectar().cursor()
         
         try:
-            # Hash de contraseña
-            hash_pwd = hashlib.sha256(contraseña.encode()).hexdigest()
+            # Hash de contraseña (bcrypt con el costo calibrado para este equipo)
+            hash_pwd = obtener_servicio_credenciales().hashear(contraseña)
             
             cursor.execute('''
                 INSERT INTO usuarios 
                 (nombre_usuario, contraseña, email, rol, activo, fecha_creacion)
                 VALUES (?, ?, ?, ?, ?, ?)
-            ''', (nombre_usuario, hash_pwd, email, rol, 1, datetime.now().strftime("%d/%m/%Y")))
+            ''', (nombre_usuario, hash_pwd, email, rol, 1, hoy_iso()))
             
             self.conexion.commit()
             registrar_operacion('USUARIOS', f'Usuario creado: {nombre_usuario}', {})
@@ -704,7 +1168,7 @@ class BaseDatosSQLite:
         cursor = self.conectar().cursor()
         
         try:
-            hash_pwd = hashlib.sha256(nueva_contraseña.encode()).hexdigest()
+            hash_pwd = obtener_servicio_credenciales().hashear(nueva_contraseña)
             cursor.execute("""
                 UPDATE usuarios SET contraseña = ? WHERE nombre_usuario = ?
             """, (hash_pwd, nombre_usuario))
@@ -717,6 +1181,104 @@ class BaseDatosSQLite:
             registrar_error('BaseDatosSQLite', 'actualizar_contraseña', str(e))
             return False, f"Error: {str(e)}"
     
+    def actualizar_hash_contraseña(self, nombre_usuario, hash_nuevo, hash_anterior):
+        """
+        Reemplazar un hash ya calculado (actualización transparente tras el login)
+
+        Solo escribe si el hash guardado sigue siendo hash_anterior, para no pisar
+        un cambio de contraseña hecho mientras tanto.
+        """
+        cursor = self.conectar().cursor()
+        
+        try:
+            cursor.execute("""
+                UPDATE usuarios SET contraseña = ?
+                WHERE nombre_usuario = ? AND contraseña = ?
+            """, (hash_nuevo, nombre_usuario, hash_anterior))
+            
+            self.conexion.commit()
+            return cursor.rowcount == 1
+            
+        except sqlite3.Error as e:
+            registrar_error('BaseDatosSQLite', 'actualizar_hash_contraseña', str(e))
+            return False
+    
+    # ==================== SESIONES ====================
+    
+    def guardar_sesion(self, token, usuario, rol, inicio, expiracion, permisos=None):
+        """Insertar o reemplazar una sesión (una sola fila)"""
+        cursor = (self.conexion or self.conectar()).cursor()
+        
+        try:
+            cursor.execute('''
+                INSERT INTO sesiones (token, usuario, rol, inicio, expiracion, ultimo_acceso, permisos)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(token) DO UPDATE SET
+                    usuario = excluded.usuario, rol = excluded.rol,
+                    expiracion = excluded.expiracion, permisos = excluded.permisos
+            ''', (token, usuario, rol, inicio, expiracion, inicio, permisos))
+            self.conexion.commit()
+            return True
+        except sqlite3.Error as e:
+            registrar_error('BaseDatosSQLite', 'guardar_sesion', str(e))
+            return False
+    
+    def obtener_sesion(self, token):
+        """Buscar una sesión por token (clave primaria)"""
+        cursor = (self.conexion or self.conectar()).cursor()
+        
+        try:
+            cursor.execute(CONSULTAS['sesion_por_token'], (token,))
+            resultado = cursor.fetchone()
+            return dict(resultado) if resultado else None
+        except sqlite3.Error as e:
+            registrar_error('BaseDatosSQLite', 'obtener_sesion', str(e))
+            return None
+    
+    def eliminar_sesion(self, token):
+        """Eliminar una sesión"""
+        cursor = (self.conexion or self.conectar()).cursor()
+        
+        try:
+            cursor.execute("DELETE FROM sesiones WHERE token = ?", (token,))
+            self.conexion.commit()
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            registrar_error('BaseDatosSQLite', 'eliminar_sesion', str(e))
+            return False
+    
+    def eliminar_sesiones_expiradas(self, ahora=None):
+        """Eliminar sesiones vencidas usando el índice de expiración"""
+        cursor = (self.conexion or self.conectar()).cursor()
+        
+        try:
+            cursor.execute("DELETE FROM sesiones WHERE expiracion < ?", (ahora or ahora_iso(),))
+            self.conexion.commit()
+            return cursor.rowcount
+        except sqlite3.Error as e:
+            registrar_error('BaseDatosSQLite', 'eliminar_sesiones_expiradas', str(e))
+            return 0
+    
+    def actualizar_accesos_sesiones(self, accesos):
+        """
+        Guardar en un solo lote el último acceso de varias sesiones
+
+        Args:
+            accesos: dict token -> fecha/hora ISO del último acceso
+        """
+        if not accesos:
+            return 0
+        cursor = (self.conexion or self.conectar()).cursor()
+        
+        try:
+            cursor.executemany("UPDATE sesiones SET ultimo_acceso = ? WHERE token = ?",
+                               [(fecha, token) for token, fecha in accesos.items()])
+            self.conexion.commit()
+            return len(accesos)
+        except sqlite3.Error as e:
+            registrar_error('BaseDatosSQLite', 'actualizar_accesos_sesiones', str(e))
+            return 0
+    
     # ==================== HISTORIAL ====================
     
     def registrar_evento(self, tipo_evento, descripcion="", usuario_id=None, habitante_id=None, detalles=""):
@@ -729,7 +1291,7 @@ class BaseDatosSQLite:
                 (tipo_evento, descripcion, usuario_id, habitante_id, fecha_evento, detalles)
                 VALUES (?, ?, ?, ?, ?, ?)
             ''', (tipo_evento, descripcion, usuario_id, habitante_id, 
-                  datetime.now().strftime("%d/%m/%Y %H:%M:%S"), detalles))
+                  ahora_iso(), detalles))
             
             self.conexion.commit()
         except sqlite3.Error as e:
@@ -737,7 +1299,7 @@ class BaseDatosSQLite:
     
     def obtener_historial(self, limite=100):
         """Obtener historial de eventos"""
-        cursor = self.conectar().cursor()
+        cursor = self._cursor_lectura()
         
         try:
             cursor.execute("""
@@ -752,7 +1314,38 @@ class BaseDatosSQLite:
         except sqlite3.Error as e:
             registrar_error('BaseDatosSQLite', 'obtener_historial', str(e))
             return []
-    
+
+    def obtener_historial_fecha(self, fecha_inicio, fecha_fin):
+        """
+        Obtener eventos del historial entre dos fechas (inclusivas)
+
+        Args:
+            fecha_inicio (str): Fecha DD/MM/YYYY o YYYY-MM-DD
+            fecha_fin (str): Fecha DD/MM/YYYY o YYYY-MM-DD
+
+        Returns:
+            list: Eventos ordenados por fecha, resuelto con idx_historial_fecha
+        """
+        rango = rango_dias(fecha_inicio, fecha_fin)
+        if rango is None:
+            return []
+
+        cursor = self._cursor_lectura()
+
+        try:
+            cursor.execute("""
+                SELECT h.*, u.nombre_usuario, hab.nombre as habitante_nombre
+                FROM historial h
+                LEFT JOIN usuarios u ON h.usuario_id = u.id
+                LEFT JOIN habitantes hab ON h.habitante_id = hab.id
+                WHERE h.fecha_evento >= ? AND h.fecha_evento < ?
+                ORDER BY h.fecha_evento
+            """, rango)
+            return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            registrar_error('BaseDatosSQLite', 'obtener_historial_fecha', str(e))
+            return []
+
     # ==================== BACKUP Y MANTENIMIENTO ====================
     
     def vaciar_base_datos(self):
@@ -779,26 +1372,27 @@ class BaseDatosSQLite:
             return False, f"Error: {str(e)}"
     
     def obtener_estadisticas(self):
-        """Obtener estadísticas de la base de datos"""
-        cursor = self.conectar().cursor()
-        
+        """Obtener estadísticas de la base de datos (todas de la misma instantánea)"""
         try:
             stats = {}
             
-            cursor.execute("SELECT COUNT(*) as total FROM habitantes WHERE activo = 1")
-            stats['habitantes'] = cursor.fetchone()['total']
-            
-            cursor.execute("SELECT COUNT(*) as total FROM pagos")
-            stats['pagos'] = cursor.fetchone()['total']
-            
-            cursor.execute("SELECT SUM(monto) as total FROM pagos WHERE estado = 'completado'")
-            stats['monto_pagos'] = cursor.fetchone()['total'] or 0
-            
-            cursor.execute("SELECT COUNT(*) as total FROM faenas WHERE estado = 'activa'")
-            stats['faenas_activas'] = cursor.fetchone()['total']
-            
-            cursor.execute("SELECT COUNT(*) as total FROM usuarios WHERE activo = 1")
-            stats['usuarios'] = cursor.fetchone()['total']
+            with self.lectura() as conexion:
+                cursor = conexion.cursor()
+                
+                cursor.execute("SELECT COUNT(*) as total FROM habitantes WHERE activo = 1")
+                stats['habitantes'] = cursor.fetchone()['total']
+                
+                cursor.execute("SELECT COUNT(*) as total FROM pagos")
+                stats['pagos'] = cursor.fetchone()['total']
+                
+                cursor.execute("SELECT SUM(monto) as total FROM pagos WHERE estado = 'completado'")
+                stats['monto_pagos'] = cursor.fetchone()['total'] or 0
+                
+                cursor.execute("SELECT COUNT(*) as total FROM faenas WHERE estado = 'activa'")
+                stats['faenas_activas'] = cursor.fetchone()['total']
+                
+                cursor.execute("SELECT COUNT(*) as total FROM usuarios WHERE activo = 1")
+                stats['usuarios'] = cursor.fetchone()['total']
             
             return stats
         except sqlite3.Error as e:
@@ -818,19 +1412,25 @@ class BaseDatosSQLite:
             registro_id (int): ID del registro afectado
             detalles (str): Detalles adicionales de la operación
             
+        Dentro de transaccion() la fila se inserta junto con el resto, en el
+        mismo commit.
+        
         Returns:
             bool: True si se registró exitosamente
         """
+        fila = (usuario, accion, tabla, registro_id, ahora_iso(), detalles, 'exitoso')
+        if self.en_transaccion():
+            self.conexion.auditoria_pendiente.append(fila)
+            return True
+        
         cursor = self.conectar().cursor()
         
         try:
-            fecha = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
             cursor.execute('''
                 INSERT INTO auditoria 
                 (usuario, accion, tabla, registro_id, fecha_operacion, detalles, resultado)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (usuario, accion, tabla, registro_id, fecha, detalles, 'exitoso'))
+            ''', fila)
             
             self.conexion.commit()
             return True
@@ -852,7 +1452,7 @@ class BaseDatosSQLite:
         Returns:
             list: Lista de registros de auditoría ordenados por fecha descendente
         """
-        cursor = self.conectar().cursor()
+        cursor = self._cursor_lectura()
         
         try:
             query = 'SELECT * FROM auditoria WHERE 1=1'
@@ -900,28 +1500,33 @@ class BaseDatosSQLite:
             self.conexion.commit()
             
             filas_eliminadas = cursor.rowcount
+            
+            # Devolver parte del espacio liberado; el resto lo hace el mantenimiento ocioso
+            from src.core.mantenimiento_bd import MantenimientoBD
+            MantenimientoBD(self).vacuum_incremental()
             return True, f"Se eliminaron {filas_eliminadas} registros de auditoría antiguos"
             
         except sqlite3.Error as e:
             registrar_error('BaseDatosSQLite', 'limpiar_auditoria_antigua', str(e))
             return False, f"Error: {str(e)}"
     
-    def crear_cooperacion_bd(self, nombre, proyecto, monto_cooperacion):
+    def crear_cooperacion_bd(self, nombre, proyecto, monto_cooperacion, usuario='Sistema'):
         """Crear una cooperación en BD SQLite"""
-        cursor = self.conectar().cursor()
         try:
             from datetime import datetime
             ahora = datetime.now().isoformat()
             
-            cursor.execute('''
-                INSERT INTO cooperaciones (nombre, proyecto, monto_cooperacion, activa, fecha_creacion)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (nombre, proyecto, monto_cooperacion, 1, ahora))
-            
-            self.conexion.commit()
-            coop_id = cursor.lastrowid
-            registrar_operacion('CREAR_COOP', f'Cooperación creada: {nombre}', 
-                {'id': coop_id, 'monto': monto_cooperacion})
+            with self.transaccion():
+                cursor = self.conexion.cursor()
+                cursor.execute('''
+                    INSERT INTO cooperaciones (nombre, proyecto, monto_cooperacion, activa, fecha_creacion)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (nombre, proyecto, monto_cooperacion, 1, ahora))
+                coop_id = cursor.lastrowid
+                self.registrar_auditoria(usuario, 'CREAR_COOP', 'cooperaciones', coop_id, nombre)
+                self.al_confirmar(lambda: registrar_operacion(
+                    'CREAR_COOP', f'Cooperación creada: {nombre}',
+                    {'id': coop_id, 'monto': monto_cooperacion}))
             return coop_id
         except sqlite3.IntegrityError as e:
             registrar_error('BaseDatosSQLite', 'crear_cooperacion_bd', f'Duplicado: {str(e)}')
@@ -930,23 +1535,25 @@ class BaseDatosSQLite:
             registrar_error('BaseDatosSQLite', 'crear_cooperacion_bd', str(e))
             return None
     
-    def agregar_persona_coop_bd(self, coop_id, habitante_id, monto_esperado, notas=''):
+    def agregar_persona_coop_bd(self, coop_id, habitante_id, monto_esperado, notas='', usuario='Sistema'):
         """Agregar una persona a una cooperación en BD SQLite"""
-        cursor = self.conectar().cursor()
         try:
             from datetime import datetime
             ahora = datetime.now().isoformat()
             
-            cursor.execute('''
-                INSERT INTO personas_cooperacion 
-                (cooperacion_id, habitante_id, monto_esperado, estado, notas, fecha_agregado)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (coop_id, habitante_id, monto_esperado, 'pendiente', notas, ahora))
-            
-            self.conexion.commit()
-            persona_coop_id = cursor.lastrowid
-            registrar_operacion('AGREGAR_PERSONA_COOP', f'Persona agregada a cooperación {coop_id}',
-                {'persona_coop_id': persona_coop_id, 'habitante_id': habitante_id})
+            with self.transaccion():
+                cursor = self.conexion.cursor()
+                cursor.execute('''
+                    INSERT INTO personas_cooperacion 
+                    (cooperacion_id, habitante_id, monto_esperado, estado, notas, fecha_agregado)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (coop_id, habitante_id, monto_esperado, 'pendiente', notas, ahora))
+                persona_coop_id = cursor.lastrowid
+                self.registrar_auditoria(usuario, 'AGREGAR_PERSONA_COOP', 'personas_cooperacion',
+                                         persona_coop_id, f'cooperacion={coop_id} habitante={habitante_id}')
+                self.al_confirmar(lambda: registrar_operacion(
+                    'AGREGAR_PERSONA_COOP', f'Persona agregada a cooperación {coop_id}',
+                    {'persona_coop_id': persona_coop_id, 'habitante_id': habitante_id}))
             return persona_coop_id
         except sqlite3.IntegrityError as e:
             registrar_error('BaseDatosSQLite', 'agregar_persona_coop_bd', f'Duplicado: {str(e)}')
@@ -955,28 +1562,58 @@ class BaseDatosSQLite:
             registrar_error('BaseDatosSQLite', 'agregar_persona_coop_bd', str(e))
             return None
     
-    def registrar_pago_coop_bd(self, persona_coop_id, monto, fecha_pago, hora_pago, concepto, registrado_por=None):
-        """Registrar un pago en cooperación en BD SQLite"""
-        cursor = self.conectar().cursor()
+    def registrar_pago_coop_bd(self, persona_coop_id, monto, fecha_pago, hora_pago, concepto, registrado_por=None,
+                               usuario='Sistema'):
+        """
+        Registrar un pago en cooperación en BD SQLite (fecha_pago se guarda en ISO)
+        
+        El pago y su fila de auditoría se confirman juntos; dentro de una
+        transaccion() del llamador quedan en el commit de esa transacción.
+        """
         try:
             from datetime import datetime
             ahora = datetime.now().isoformat()
+            fecha_pago = normalizar_fecha_iso(fecha_pago) or fecha_pago
             
-            cursor.execute('''
-                INSERT INTO pagos_coop
-                (persona_coop_id, monto, fecha_pago, hora_pago, concepto, registrado_por, fecha_registro, anulado)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (persona_coop_id, monto, fecha_pago, hora_pago, concepto, registrado_por, ahora, 0))
-            
-            self.conexion.commit()
-            pago_id = cursor.lastrowid
-            registrar_operacion('PAGO_REGISTRADO', 'Pago registrado en cooperación',
-                {'pago_id': pago_id, 'monto': monto, 'fecha': fecha_pago})
+            with self.transaccion():
+                cursor = self.conexion.cursor()
+                cursor.execute('''
+                    INSERT INTO pagos_coop
+                    (persona_coop_id, monto, fecha_pago, hora_pago, concepto, registrado_por, fecha_registro, anulado)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (persona_coop_id, monto, fecha_pago, hora_pago, concepto, registrado_por, ahora, 0))
+                pago_id = cursor.lastrowid
+                self.registrar_auditoria(usuario, 'PAGO_REGISTRADO', 'pagos_coop', pago_id,
+                                         f'persona_coop={persona_coop_id} monto={monto}')
+                self.al_confirmar(lambda: registrar_operacion(
+                    'PAGO_REGISTRADO', 'Pago registrado en cooperación',
+                    {'pago_id': pago_id, 'monto': monto, 'fecha': fecha_pago}))
             return pago_id
         except Exception as e:
             registrar_error('BaseDatosSQLite', 'registrar_pago_coop_bd', str(e))
             return None
     
+    def obtener_pagos_coop_rango(self, coop_id, fecha_inicio, fecha_fin):
+        """Obtener pagos (no anulados) de una cooperación entre dos fechas inclusivas"""
+        rango = rango_dias(fecha_inicio, fecha_fin)
+        if rango is None:
+            return []
+
+        cursor = self._cursor_lectura()
+        try:
+            cursor.execute('''
+                SELECT p.*, pc.habitante_id
+                FROM pagos_coop p
+                JOIN personas_cooperacion pc ON pc.id = p.persona_coop_id
+                WHERE pc.cooperacion_id = ? AND p.anulado = 0
+                  AND p.fecha_pago >= ? AND p.fecha_pago < ?
+                ORDER BY p.fecha_pago, p.hora_pago
+            ''', (coop_id, *rango))
+            return [dict(row) for row in cursor.fetchall()]
+        except sqlite3.Error as e:
+            registrar_error('BaseDatosSQLite', 'obtener_pagos_coop_rango', str(e))
+            return []
+
     def actualizar_persona_coop_bd(self, persona_coop_id, monto_esperado=None, estado=None, notas=None):
         """Actualizar datos de persona en cooperación en BD SQLite"""
         cursor = self.conectar().cursor()
@@ -1031,22 +1668,23 @@ class BaseDatosSQLite:
             registrar_error('BaseDatosSQLite', 'eliminar_persona_coop_bd', str(e))
             return False
     
-    def crear_cooperacion_bd(self, nombre, proyecto, monto_cooperacion):
+    def crear_cooperacion_bd(self, nombre, proyecto, monto_cooperacion, usuario='Sistema'):
         """Crear una cooperación en BD SQLite"""
-        cursor = self.conectar().cursor()
         try:
             from datetime import datetime
             ahora = datetime.now().isoformat()
             
-            cursor.execute('''
-                INSERT INTO cooperaciones (nombre, proyecto, monto_cooperacion, activa, fecha_creacion)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (nombre, proyecto, monto_cooperacion, 1, ahora))
-            
-            self.conexion.commit()
-            coop_id = cursor.lastrowid
-            registrar_operacion('CREAR_COOP', f'Cooperación creada: {nombre}', 
-                {'id': coop_id, 'monto': monto_cooperacion})
+            with self.transaccion():
+                cursor = self.conexion.cursor()
+                cursor.execute('''
+                    INSERT INTO cooperaciones (nombre, proyecto, monto_cooperacion, activa, fecha_creacion)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (nombre, proyecto, monto_cooperacion, 1, ahora))
+                coop_id = cursor.lastrowid
+                self.registrar_auditoria(usuario, 'CREAR_COOP', 'cooperaciones', coop_id, nombre)
+                self.al_confirmar(lambda: registrar_operacion(
+                    'CREAR_COOP', f'Cooperación creada: {nombre}',
+                    {'id': coop_id, 'monto': monto_cooperacion}))
             return coop_id
         except sqlite3.IntegrityError as e:
             registrar_error('BaseDatosSQLite', 'crear_cooperacion_bd', f'Duplicado: {str(e)}')
@@ -1055,23 +1693,25 @@ class BaseDatosSQLite:
             registrar_error('BaseDatosSQLite', 'crear_cooperacion_bd', str(e))
             return None
     
-    def agregar_persona_coop_bd(self, coop_id, habitante_id, monto_esperado, notas=''):
+    def agregar_persona_coop_bd(self, coop_id, habitante_id, monto_esperado, notas='', usuario='Sistema'):
         """Agregar una persona a una cooperación en BD SQLite"""
-        cursor = self.conectar().cursor()
         try:
             from datetime import datetime
             ahora = datetime.now().isoformat()
             
-            cursor.execute('''
-                INSERT INTO personas_cooperacion 
-                (cooperacion_id, habitante_id, monto_esperado, estado, notas, fecha_agregado)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (coop_id, habitante_id, monto_esperado, 'pendiente', notas, ahora))
-            
-            self.conexion.commit()
-            persona_coop_id = cursor.lastrowid
-            registrar_operacion('AGREGAR_PERSONA_COOP', f'Persona agregada a cooperación {coop_id}',
-                {'persona_coop_id': persona_coop_id, 'habitante_id': habitante_id})
+            with self.transaccion():
+                cursor = self.conexion.cursor()
+                cursor.execute('''
+                    INSERT INTO personas_cooperacion 
+                    (cooperacion_id, habitante_id, monto_esperado, estado, notas, fecha_agregado)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (coop_id, habitante_id, monto_esperado, 'pendiente', notas, ahora))
+                persona_coop_id = cursor.lastrowid
+                self.registrar_auditoria(usuario, 'AGREGAR_PERSONA_COOP', 'personas_cooperacion',
+                                         persona_coop_id, f'cooperacion={coop_id} habitante={habitante_id}')
+                self.al_confirmar(lambda: registrar_operacion(
+                    'AGREGAR_PERSONA_COOP', f'Persona agregada a cooperación {coop_id}',
+                    {'persona_coop_id': persona_coop_id, 'habitante_id': habitante_id}))
             return persona_coop_id
         except sqlite3.IntegrityError as e:
             registrar_error('BaseDatosSQLite', 'agregar_persona_coop_bd', f'Duplicado: {str(e)}')
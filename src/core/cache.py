@@ -1,210 +1,385 @@
 """
 Sistema de Cache en Memoria
-Proporciona caching con TTL (Time To Live) para optimizar performance
+Proporciona caching LRU acotado (entradas y bytes aproximados) con TTL
 Reduce accesos a disco y BD
 """
 
-from datetime import datetime, timedelta
+from collections import OrderedDict
 from functools import wraps
+import hashlib
+import itertools
+import sys
 import threading
+import time
+import weakref
+
+from src.config import CACHE_MAX_ENTRADAS, CACHE_MAX_BYTES
+
+
+# Marca para distinguir "no está en cache" de un valor cacheado None
+_SIN_VALOR = object()
+
+# Token por objeto vivo (id -> (weakref, token)). Los tokens no se reutilizan,
+# así que un id reciclado tras el GC no encuentra resultados del objeto anterior
+_tokens_objetos = {}
+_contador_tokens = itertools.count(1)
+_lock_tokens = threading.Lock()
+
+
+def estimar_tamaño(valor, _profundidad=0, _vistos=None):
+    """
+    Estimar el tamaño en bytes de un valor (aproximado)
+
+    Recorre listas, tuplas, sets y diccionarios hasta 4 niveles; el resto se mide
+    con sys.getsizeof. Suficiente para acotar la memoria del cache, no es exacto.
+    """
+    if _vistos is None:
+        _vistos = set()
+    if id(valor) in _vistos:
+        return 0
+    _vistos.add(id(valor))
+
+    tamaño = sys.getsizeof(valor, 64)
+    if _profundidad >= 4:
+        return tamaño
+
+    if isinstance(valor, dict):
+        for k, v in valor.items():
+            tamaño += estimar_tamaño(k, _profundidad + 1, _vistos)
+            tamaño += estimar_tamaño(v, _profundidad + 1, _vistos)
+    elif isinstance(valor, (list, tuple, set, frozenset)):
+        for item in valor:
+            tamaño += estimar_tamaño(item, _profundidad + 1, _vistos)
+    return tamaño
+
+
+def _normalizar_argumento(valor):
+    """Representación estable de un argumento para construir claves de cache"""
+    if valor is None or isinstance(valor, (str, int, float, bool, bytes)):
+        return valor
+    if isinstance(valor, (list, tuple)):
+        return tuple(_normalizar_argumento(v) for v in valor)
+    if isinstance(valor, (set, frozenset)):
+        return ('set', tuple(sorted(repr(_normalizar_argumento(v)) for v in valor)))
+    if isinstance(valor, dict):
+        return ('dict', tuple(sorted((repr(k), _normalizar_argumento(v))
+                                     for k, v in valor.items())))
+    # Objetos (p.ej. self): token ligado a su vida en lugar de su repr, que puede ser enorme o variable
+    return (type(valor).__qualname__, _token_objeto(valor))
+
+
+def _token_objeto(valor):
+    """
+    Token único de un objeto mientras viva
+
+    Raises:
+        TypeError: si el objeto no admite weakref; en ese caso usar clave_custom
+    """
+    clave = id(valor)
+    with _lock_tokens:
+        registro = _tokens_objetos.get(clave)
+        if registro is not None and registro[0]() is valor:
+            return registro[1]
+
+        def _olvidar(ref, clave=clave):
+            if _tokens_objetos.get(clave, (None,))[0] is ref:
+                del _tokens_objetos[clave]
+
+        try:
+            ref = weakref.ref(valor, _olvidar)
+        except TypeError:
+            raise TypeError(f"No se puede generar clave de cache para {type(valor).__qualname__}; "
+                            f"usar clave_custom") from None
+        token = next(_contador_tokens)
+        _tokens_objetos[clave] = (ref, token)
+        return token
+
+
+def generar_clave(func, args, kwargs):
+    """
+    Generar una clave estable para una llamada a función
+
+    Returns:
+        str con el formato 'modulo.funcion:hash'
+    """
+    normalizado = (_normalizar_argumento(args), _normalizar_argumento(kwargs))
+    digest = hashlib.blake2b(repr(normalizado).encode('utf-8'), digest_size=12).hexdigest()
+    return f"{func.__module__}.{func.__qualname__}:{digest}"
+
+
+class _Entrada:
+    """Valor cacheado con su expiración (reloj monotónico), tamaño y etiquetas"""
+    __slots__ = ('valor', 'expira', 'tamaño', 'etiquetas')
+
+    def __init__(self, valor, expira, tamaño, etiquetas):
+        self.valor = valor
+        self.expira = expira
+        self.tamaño = tamaño
+        self.etiquetas = etiquetas
 
 
 class Cache:
-    """Cache en memoria con soporte para TTL (expiracion)"""
-    
-    def __init__(self):
-        self._cache = {}
-        self._ttl = {}
-        self._lock = threading.Lock()
-    
-    def set(self, clave, valor, ttl_segundos=300):
+    """Cache LRU en memoria con TTL, límite de entradas/bytes e invalidación por etiquetas"""
+
+    def __init__(self, max_entradas=CACHE_MAX_ENTRADAS, max_bytes=CACHE_MAX_BYTES):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._cache = OrderedDict()
+        self._por_etiqueta = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        # Contadores
+        self._aciertos = 0
+        self._fallos = 0
+        self._expulsiones = 0
+        self._expirados = 0
+
+    def set(self, clave, valor, ttl_segundos=300, etiquetas=()):
         """
         Guardar valor en cache con TTL opcional
-        
+
         Args:
             clave (str): Clave del item
             valor: Valor a cachear
             ttl_segundos (int): Tiempo de vida en segundos (0 = sin expiracion)
+            etiquetas (iterable): Etiquetas para invalidar en grupo (ej. 'habitantes', 'coop:3')
         """
+        tamaño = estimar_tamaño(valor)
+        expira = time.monotonic() + ttl_segundos if ttl_segundos > 0 else None
+        etiquetas = frozenset(etiquetas)
+
         with self._lock:
-            self._cache[clave] = valor
-            
-            if ttl_segundos > 0:
-                self._ttl[clave] = datetime.now() + timedelta(seconds=ttl_segundos)
-            else:
-                self._ttl.pop(clave, None)  # Sin expiracion
-    
+            self._quitar(clave)
+
+            # Un valor más grande que todo el cache no se guarda
+            if tamaño > self.max_bytes:
+                return
+
+            self._cache[clave] = _Entrada(valor, expira, tamaño, etiquetas)
+            self._bytes += tamaño
+            for etiqueta in etiquetas:
+                self._por_etiqueta.setdefault(etiqueta, set()).add(clave)
+
+            # Expulsar los menos usados recientemente hasta respetar los límites
+            while self._cache and (len(self._cache) > self.max_entradas
+                                   or self._bytes > self.max_bytes):
+                clave_lru = next(iter(self._cache))
+                self._quitar(clave_lru)
+                self._expulsiones += 1
+
     def get(self, clave, default=None):
         """
         Obtener valor del cache
-        
+
         Args:
             clave (str): Clave del item
             default: Valor por defecto si no existe o expiro
-            
+
         Returns:
             Valor cacheado o default
         """
         with self._lock:
-            # Verificar si existe
-            if clave not in self._cache:
+            entrada = self._cache.get(clave)
+            if entrada is None:
+                self._fallos += 1
                 return default
-            
-            # Verificar si expiro
-            if clave in self._ttl:
-                if datetime.now() > self._ttl[clave]:
-                    # Expiro, eliminar y retornar default
-                    del self._cache[clave]
-                    del self._ttl[clave]
-                    return default
-            
-            return self._cache[clave]
-    
+
+            if entrada.expira is not None and time.monotonic() > entrada.expira:
+                self._quitar(clave)
+                self._expirados += 1
+                self._fallos += 1
+                return default
+
+            self._cache.move_to_end(clave)
+            self._aciertos += 1
+            return entrada.valor
+
     def existe(self, clave):
         """Verificar si una clave existe y no expiro"""
-        return self.get(clave) is not None
-    
+        return self.get(clave, _SIN_VALOR) is not _SIN_VALOR
+
     def eliminar(self, clave):
         """Eliminar una clave del cache"""
         with self._lock:
-            self._cache.pop(clave, None)
-            self._ttl.pop(clave, None)
-    
+            self._quitar(clave)
+
     def invalidar(self, clave):
         """
         Invalidar una clave específica del cache (alias de eliminar)
-        
+
         Args:
             clave (str): Clave a invalidar
-            
+
         Returns:
             bool: True si se invalidó, False si no existía
         """
         with self._lock:
-            if clave in self._cache:
-                del self._cache[clave]
-                self._ttl.pop(clave, None)
-                return True
-            return False
-    
+            return self._quitar(clave)
+
+    def invalidar_etiqueta(self, *etiquetas):
+        """
+        Invalidar todas las claves asociadas a una o más etiquetas
+
+        Returns:
+            int: Cantidad de claves invalidadas
+        """
+        with self._lock:
+            claves = set()
+            for etiqueta in etiquetas:
+                claves |= self._por_etiqueta.get(etiqueta, set())
+            for clave in claves:
+                self._quitar(clave)
+            return len(claves)
+
     def invalidar_patron(self, patron):
         """
         Invalidar claves que coincidan con un patrón regex
-        
+
         Args:
             patron (str): Patrón regex para buscar claves
-            
+
         Returns:
             int: Cantidad de claves invalidadas
         """
         import re
         with self._lock:
             pattern = re.compile(patron)
-            claves_eliminar = [k for k in self._cache.keys() 
+            claves_eliminar = [k for k in self._cache.keys()
                              if pattern.match(k)]
-            
+
             for clave in claves_eliminar:
-                del self._cache[clave]
-                self._ttl.pop(clave, None)
-            
+                self._quitar(clave)
+
             return len(claves_eliminar)
-    
+
     def limpiar(self):
         """Limpiar todo el cache"""
         with self._lock:
             self._cache.clear()
-            self._ttl.clear()
-    
+            self._por_etiqueta.clear()
+            self._bytes = 0
+
     def limpiar_expirados(self):
         """Eliminar items expirados"""
         with self._lock:
-            ahora = datetime.now()
+            ahora = time.monotonic()
             claves_expiradas = [
-                clave for clave, expiracion in self._ttl.items()
-                if ahora > expiracion
+                clave for clave, entrada in self._cache.items()
+                if entrada.expira is not None and ahora > entrada.expira
             ]
-            
+
             for clave in claves_expiradas:
-                del self._cache[clave]
-                del self._ttl[clave]
-            
+                self._quitar(clave)
+            self._expirados += len(claves_expiradas)
+
             return len(claves_expiradas)
-    
+
     def obtener_estadisticas(self):
         """Obtener estadisticas del cache"""
         with self._lock:
+            consultas = self._aciertos + self._fallos
             return {
                 'total_items': len(self._cache),
-                'items_con_ttl': len(self._ttl),
+                'items_con_ttl': sum(1 for e in self._cache.values() if e.expira is not None),
+                'bytes_aprox': self._bytes,
+                'max_entradas': self.max_entradas,
+                'max_bytes': self.max_bytes,
+                'aciertos': self._aciertos,
+                'fallos': self._fallos,
+                'tasa_aciertos': (self._aciertos / consultas) if consultas else 0.0,
+                'expulsiones': self._expulsiones,
+                'expirados': self._expirados,
+                'etiquetas': sorted(self._por_etiqueta),
                 'claves': list(self._cache.keys())
             }
-    
+
+    def _quitar(self, clave):
+        """Quitar una clave y su contabilidad (llamar con el lock tomado)"""
+        entrada = self._cache.pop(clave, None)
+        if entrada is None:
+            return False
+        self._bytes -= entrada.tamaño
+        for etiqueta in entrada.etiquetas:
+            claves = self._por_etiqueta.get(etiqueta)
+            if claves is not None:
+                claves.discard(clave)
+                if not claves:
+                    del self._por_etiqueta[etiqueta]
+        return True
+
     def __len__(self):
         """Retornar cantidad de items en cache"""
         return len(self._cache)
-    
+
     def __repr__(self):
         """Representacion del cache"""
-        return f"Cache(items={len(self._cache)}, con_ttl={len(self._ttl)})"
+        return (f"Cache(items={len(self._cache)}/{self.max_entradas}, "
+                f"bytes≈{self._bytes}/{self.max_bytes})")
 
 
 # Instancia global de cache
 _cache_global = Cache()
 
 
-def cached(ttl_segundos=300, clave_custom=None):
+def cached(ttl_segundos=300, clave_custom=None, etiquetas=()):
     """
     Decorador para cachear resultados de funciones
-    
+
     Args:
         ttl_segundos (int): Tiempo de vida del cache en segundos
-        clave_custom (function): Funcion para generar clave personalizada
-        
+        clave_custom (function): Funcion para generar clave personalizada. Obligatoria
+            si algún argumento es un objeto que no admite weakref
+        etiquetas (iterable o function): Etiquetas fijas, o funcion que las calcula
+            a partir de los argumentos (ej. lambda coop_id: [f'coop:{coop_id}'])
+
     Ejemplo:
-        @cached(ttl_segundos=600)
+        @cached(ttl_segundos=600, etiquetas=['habitantes'])
         def obtener_habitantes():
             return db.obtener_todos()
     """
     def decorador(func):
+        # Etiqueta implícita para limpiar solo las entradas de esta función
+        etiqueta_funcion = f"func:{func.__module__}.{func.__qualname__}"
+
+        def _clave(args, kwargs):
+            if clave_custom:
+                return clave_custom(*args, **kwargs)
+            return generar_clave(func, args, kwargs)
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Generar clave de cache
-            if clave_custom:
-                clave = clave_custom(*args, **kwargs)
-            else:
-                # Usar nombre de funcion + argumentos
-                args_str = str(args) + str(kwargs)
-                clave = f"{func.__name__}:{args_str}"
-            
+            clave = _clave(args, kwargs)
+
             # Intentar obtener del cache
-            resultado = _cache_global.get(clave)
-            
-            if resultado is not None:
+            resultado = _cache_global.get(clave, _SIN_VALOR)
+            if resultado is not _SIN_VALOR:
                 return resultado
-            
+
             # Si no esta en cache, ejecutar funcion
             resultado = func(*args, **kwargs)
-            
-            # Guardar en cache
-            _cache_global.set(clave, resultado, ttl_segundos)
-            
+
+            etiquetas_llamada = etiquetas(*args, **kwargs) if callable(etiquetas) else etiquetas
+            _cache_global.set(clave, resultado, ttl_segundos,
+                              etiquetas=(etiqueta_funcion, *etiquetas_llamada))
+
             return resultado
-        
+
         # Agregar metodos para control manual
-        wrapper.cache_clear = lambda: _cache_global.limpiar()
+        wrapper.cache_clear = lambda: _cache_global.invalidar_etiqueta(etiqueta_funcion)
         wrapper.cache_invalidate = lambda *args, **kwargs: _cache_global.eliminar(
-            f"{func.__name__}:{str(args) + str(kwargs)}"
+            _clave(args, kwargs)
         )
-        
+
         return wrapper
-    
+
     return decorador
 
 
 # Cache predefinidos para datos frecuentes
 class CachePredefinido:
     """Cache predefinido para datos comunes del sistema"""
-    
+
     # Tiempos de expiracion (en segundos)
     TTL_HABITANTES = 300  # 5 minutos
     TTL_PAGOS_PENDIENTES = 300  # 5 minutos
@@ -212,60 +387,72 @@ class CachePredefinido:
     TTL_COOPERACIONES = 600  # 10 minutos
     TTL_FAENAS_ACTIVAS = 120  # 2 minutos
     TTL_REPORTES = 3600  # 1 hora
-    
+
     @staticmethod
     def obtener_habitantes():
         """Obtener lista de habitantes cacheada"""
         return _cache_global.get('habitantes_list')
-    
+
     @staticmethod
     def guardar_habitantes(habitantes):
         """Guardar lista de habitantes en cache"""
-        _cache_global.set('habitantes_list', habitantes, CachePredefinido.TTL_HABITANTES)
-    
+        _cache_global.set('habitantes_list', habitantes, CachePredefinido.TTL_HABITANTES,
+                          etiquetas=('habitantes',))
+
     @staticmethod
     def limpiar_habitantes():
-        """Limpiar cache de habitantes"""
-        _cache_global.eliminar('habitantes_list')
-    
+        """Limpiar cache de habitantes (y todo lo etiquetado 'habitantes')"""
+        _cache_global.invalidar_etiqueta('habitantes')
+
     @staticmethod
     def obtener_pagos_pendientes():
         """Obtener pagos pendientes cacheados"""
         return _cache_global.get('pagos_pendientes')
-    
+
     @staticmethod
     def guardar_pagos_pendientes(pagos):
         """Guardar pagos pendientes en cache"""
-        _cache_global.set('pagos_pendientes', pagos, CachePredefinido.TTL_PAGOS_PENDIENTES)
-    
+        _cache_global.set('pagos_pendientes', pagos, CachePredefinido.TTL_PAGOS_PENDIENTES,
+                          etiquetas=('pagos',))
+
     @staticmethod
     def limpiar_pagos_pendientes():
         """Limpiar cache de pagos pendientes"""
         _cache_global.eliminar('pagos_pendientes')
-    
+
     @staticmethod
     def obtener_estadisticas(tipo):
         """Obtener estadisticas cacheadas"""
         return _cache_global.get(f'estadisticas_{tipo}')
-    
+
     @staticmethod
     def guardar_estadisticas(tipo, datos):
         """Guardar estadisticas en cache"""
-        _cache_global.set(f'estadisticas_{tipo}', datos, CachePredefinido.TTL_ESTADISTICAS)
-    
+        _cache_global.set(f'estadisticas_{tipo}', datos, CachePredefinido.TTL_ESTADISTICAS,
+                          etiquetas=('estadisticas',))
+
+    @staticmethod
+    def limpiar_estadisticas(tipo=None):
+        """Limpiar estadisticas cacheadas de un tipo (o todas si tipo es None)"""
+        if tipo is None:
+            _cache_global.invalidar_etiqueta('estadisticas')
+        else:
+            _cache_global.eliminar(f'estadisticas_{tipo}')
+
     @staticmethod
     def limpiar_todo():
         """Limpiar todo el cache predefinido"""
         _cache_global.limpiar()
 
 
-def invalidar_cache_al_cambiar(claves_cache):
+def invalidar_cache_al_cambiar(claves_cache=(), etiquetas=()):
     """
     Decorador para invalidar cache automaticamente al cambiar datos
-    
+
     Args:
         claves_cache (list): Lista de claves de cache a invalidar
-        
+        etiquetas (list): Etiquetas a invalidar (ej. ['habitantes', 'coop:3'])
+
     Ejemplo:
         @invalidar_cache_al_cambiar(['habitantes_list', 'estadisticas_censo'])
         def agregar_habitante(nombre):
@@ -276,32 +463,39 @@ def invalidar_cache_al_cambiar(claves_cache):
         def wrapper(*args, **kwargs):
             # Ejecutar funcion
             resultado = func(*args, **kwargs)
-            
+
             # Invalidar cache especificado
             for clave in claves_cache:
                 if clave.startswith('estadisticas_'):
-                    tipo = clave.split('_')[1]
-                    CachePredefinido.limpiar_estadisticas(tipo)
+                    CachePredefinido.limpiar_estadisticas(clave[len('estadisticas_'):])
                 elif clave == 'habitantes_list':
                     CachePredefinido.limpiar_habitantes()
                 elif clave == 'pagos_pendientes':
                     CachePredefinido.limpiar_pagos_pendientes()
                 else:
                     _cache_global.eliminar(clave)
-            
+
+            if etiquetas:
+                _cache_global.invalidar_etiqueta(*etiquetas)
+
             return resultado
-        
+
         return wrapper
-    
+
     return decorador
 
 
 # Funciones utilitarias
 def obtener_estadisticas_cache():
-    """Obtener estadisticas del sistema de cache"""
+    """Obtener estadisticas del sistema de cache (items, bytes, aciertos, fallos, expulsiones)"""
     return _cache_global.obtener_estadisticas()
 
 
+def invalidar_etiqueta(*etiquetas):
+    """Invalidar en el cache global todas las entradas con esas etiquetas"""
+    return _cache_global.invalidar_etiqueta(*etiquetas)
+
+
 def limpiar_cache_global():
     """Limpiar todo el cache global"""
     _cache_global.limpiar()
@@ -0,0 +1,188 @@
+"""
+Servicio unificado de credenciales
+Un solo lugar para generar y verificar hashes de contraseña.
+
+Cada hash lleva su algoritmo y su costo: los de bcrypt tienen el formato
+'$2b$<costo>$...' y los heredados son SHA256 hexadecimal sin sal (64 caracteres).
+El costo de bcrypt se calibra una vez por equipo para que una verificación tarde
+cerca de CREDENCIALES_LATENCIA_OBJETIVO_MS, sin bajar de CREDENCIALES_COSTO_MIN.
+Tras un login correcto, los hashes SHA256 o con costo menor al actual se
+regeneran (``verificar_y_actualizar``).
+"""
+
+import hashlib
+import hmac
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import bcrypt
+
+from src.config import (
+    BCRYPT_ROUNDS, CREDENCIALES_COSTO_MAX, CREDENCIALES_COSTO_MIN,
+    CREDENCIALES_LATENCIA_OBJETIVO_MS, RUTA_SEGURA
+)
+from src.core.logger import registrar_error, registrar_operacion
+
+ALGORITMO_BCRYPT = 'bcrypt'
+ALGORITMO_SHA256 = 'sha256'
+ARCHIVO_CALIBRACION = 'credenciales.json'
+
+
+def describir_hash(hash_guardado: Optional[str]) -> Dict[str, Any]:
+    """
+    Algoritmo y costo de un hash guardado
+
+    Returns:
+        dict con 'algoritmo' ('bcrypt', 'sha256' o None) y 'costo'
+    """
+    if isinstance(hash_guardado, bytes):
+        hash_guardado = hash_guardado.decode('utf-8', 'ignore')
+    texto = (hash_guardado or '').strip()
+    if texto.startswith('$2') and texto.count('$') >= 3:
+        try:
+            return {'algoritmo': ALGORITMO_BCRYPT, 'costo': int(texto.split('$')[2])}
+        except ValueError:
+            pass
+    elif len(texto) == 64 and all(c in '0123456789abcdef' for c in texto.lower()):
+        return {'algoritmo': ALGORITMO_SHA256, 'costo': 0}
+    return {'algoritmo': None, 'costo': 0}
+
+
+def medir_verificacion(costo: int, repeticiones: int = 3) -> float:
+    """Mediana en milisegundos de bcrypt.checkpw con el costo indicado"""
+    hash_prueba = bcrypt.hashpw(b'calibracion', bcrypt.gensalt(rounds=costo))
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        bcrypt.checkpw(b'calibracion', hash_prueba)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    tiempos.sort()
+    return tiempos[len(tiempos) // 2]
+
+
+class ServicioCredenciales:
+    """Genera, verifica y actualiza hashes de contraseña"""
+
+    def __init__(self, ruta_calibracion: Optional[str] = None,
+                 objetivo_ms: int = CREDENCIALES_LATENCIA_OBJETIVO_MS):
+        self.ruta_calibracion = ruta_calibracion or os.path.join(RUTA_SEGURA, ARCHIVO_CALIBRACION)
+        self.objetivo_ms = objetivo_ms
+        self._costo: Optional[int] = None
+        self._lock = threading.Lock()
+
+    # ==================== CALIBRACIÓN ====================
+
+    @property
+    def costo(self) -> int:
+        """Costo vigente: el guardado para este equipo o se calibra la primera vez"""
+        if self._costo is None:
+            with self._lock:
+                if self._costo is None:
+                    self._costo = self._cargar_calibracion() or self.calibrar()
+        return self._costo
+
+    def _cargar_calibracion(self) -> Optional[int]:
+        try:
+            with open(self.ruta_calibracion, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+            # Una calibración guardada bajo el piso actual se descarta y se recalibra
+            if datos.get('objetivo_ms') == self.objetivo_ms and int(datos['costo']) >= CREDENCIALES_COSTO_MIN:
+                return int(datos['costo'])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            registrar_error('ServicioCredenciales', '_cargar_calibracion', str(e))
+        return None
+
+    def calibrar(self, objetivo_ms: Optional[int] = None) -> int:
+        """
+        Elegir el costo de bcrypt más alto cuya verificación quepa en el objetivo
+
+        Se mide una vez con el costo mínimo; cada punto de costo duplica el
+        tiempo, así que el resto se extrapola sin pagar los costos altos.
+        """
+        objetivo_ms = objetivo_ms or self.objetivo_ms
+        try:
+            base_ms = max(medir_verificacion(CREDENCIALES_COSTO_MIN), 0.01)
+            extra = int(math.floor(math.log2(objetivo_ms / base_ms))) if objetivo_ms > base_ms else 0
+            costo = max(CREDENCIALES_COSTO_MIN, min(CREDENCIALES_COSTO_MAX, CREDENCIALES_COSTO_MIN + extra))
+        except Exception as e:
+            registrar_error('ServicioCredenciales', 'calibrar', str(e))
+            return max(BCRYPT_ROUNDS, CREDENCIALES_COSTO_MIN)
+
+        try:
+            with open(self.ruta_calibracion, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'costo': costo,
+                    'objetivo_ms': objetivo_ms,
+                    'base_ms': round(base_ms, 2),
+                    'fecha': datetime.now().isoformat(timespec='seconds')
+                }, f, indent=2)
+        except OSError as e:
+            registrar_error('ServicioCredenciales', 'calibrar', str(e))
+
+        registrar_operacion('CREDENCIALES_CALIBRACION', f'Costo bcrypt calibrado a {costo}',
+                            {'base_ms': round(base_ms, 2), 'objetivo_ms': objetivo_ms})
+        self._costo = costo
+        return costo
+
+    # ==================== HASH Y VERIFICACIÓN ====================
+
+    def hashear(self, contraseña: str, costo: Optional[int] = None) -> str:
+        """Hash bcrypt con el costo calibrado (el costo queda dentro del hash)"""
+        salt = bcrypt.gensalt(rounds=costo or self.costo)
+        return bcrypt.hashpw(contraseña.encode('utf-8'), salt).decode('utf-8')
+
+    def verificar(self, contraseña: str, hash_guardado: Optional[str]) -> bool:
+        """Verificar contra un hash bcrypt o SHA256 heredado"""
+        if not hash_guardado or contraseña is None:
+            return False
+        if isinstance(hash_guardado, bytes):
+            hash_guardado = hash_guardado.decode('utf-8', 'ignore')
+
+        algoritmo = describir_hash(hash_guardado)['algoritmo']
+        try:
+            if algoritmo == ALGORITMO_BCRYPT:
+                return bcrypt.checkpw(contraseña.encode('utf-8'), hash_guardado.encode('utf-8'))
+            if algoritmo == ALGORITMO_SHA256:
+                calculado = hashlib.sha256(contraseña.encode()).hexdigest()
+                return hmac.compare_digest(calculado, hash_guardado.lower())
+        except ValueError as e:
+            registrar_error('ServicioCredenciales', 'verificar', str(e))
+        return False
+
+    def necesita_rehash(self, hash_guardado: Optional[str]) -> bool:
+        """True si el hash es heredado o tiene un costo menor al vigente"""
+        info = describir_hash(hash_guardado)
+        return info['algoritmo'] != ALGORITMO_BCRYPT or info['costo'] < self.costo
+
+    def verificar_y_actualizar(self, contraseña: str,
+                               hash_guardado: Optional[str]) -> Tuple[bool, Optional[str]]:
+        """
+        Verificar y, si corresponde, generar el hash de reemplazo
+
+        Returns:
+            (valida, nuevo_hash): nuevo_hash es None si no hay que actualizar
+        """
+        if not self.verificar(contraseña, hash_guardado):
+            return False, None
+        if self.necesita_rehash(hash_guardado):
+            return True, self.hashear(contraseña)
+        return True, None
+
+
+# Instancia global única
+_servicio_global = None
+
+
+def obtener_servicio_credenciales() -> ServicioCredenciales:
+    """Obtener instancia global del servicio de credenciales"""
+    global _servicio_global
+    if _servicio_global is None:
+        _servicio_global = ServicioCredenciales()
+    return _servicio_global
@@ -0,0 +1,130 @@
+"""
+Accesores centralizados de fechas
+Formato de almacenamiento: ISO-8601 ('YYYY-MM-DD' y 'YYYY-MM-DD HH:MM:SS')
+Formato de presentación: 'DD/MM/YYYY' (lo que ve y escribe el usuario)
+
+Las fechas ISO se ordenan lexicográficamente igual que cronológicamente, así que
+los filtros por rango y por mes se resuelven con comparaciones de texto en SQL
+(indexables) en lugar de strptime fila por fila.
+"""
+
+from datetime import date, datetime, timedelta
+
+FORMATO_FECHA_ISO = '%Y-%m-%d'
+FORMATO_FECHA_HORA_ISO = '%Y-%m-%d %H:%M:%S'
+FORMATO_FECHA_UI = '%d/%m/%Y'
+
+_FORMATOS_ENTRADA = (
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%dT%H:%M:%S.%f',
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%d',
+    '%d/%m/%Y %H:%M:%S',
+    '%d/%m/%Y %H:%M',
+    '%d/%m/%Y',
+)
+
+
+def hoy_iso():
+    """Fecha actual como 'YYYY-MM-DD'"""
+    return date.today().strftime(FORMATO_FECHA_ISO)
+
+
+def ahora_iso():
+    """Fecha y hora actual como 'YYYY-MM-DD HH:MM:SS'"""
+    return datetime.now().strftime(FORMATO_FECHA_HORA_ISO)
+
+
+def parsear_fecha(valor):
+    """
+    Convertir una fecha en cualquiera de los formatos usados por el sistema a datetime
+
+    Args:
+        valor: str (ISO o DD/MM/YYYY, con o sin hora), date o datetime
+
+    Returns:
+        datetime o None si el valor está vacío o no es reconocible
+    """
+    if not valor:
+        return None
+    if isinstance(valor, datetime):
+        return valor
+    if isinstance(valor, date):
+        return datetime(valor.year, valor.month, valor.day)
+
+    texto = str(valor).strip()
+    for formato in _FORMATOS_ENTRADA:
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            continue
+    return None
+
+
+def normalizar_fecha_iso(valor, con_hora=False):
+    """
+    Normalizar una fecha a ISO-8601 para almacenamiento
+
+    Args:
+        valor: Fecha en cualquier formato aceptado por parsear_fecha
+        con_hora: Incluir 'HH:MM:SS'
+
+    Returns:
+        str ISO o None si no es reconocible
+    """
+    fecha = parsear_fecha(valor)
+    if fecha is None:
+        return None
+    return fecha.strftime(FORMATO_FECHA_HORA_ISO if con_hora else FORMATO_FECHA_ISO)
+
+
+def formatear_fecha_ui(valor):
+    """Convertir una fecha almacenada a 'DD/MM/YYYY' (devuelve el valor original si no es válida)"""
+    fecha = parsear_fecha(valor)
+    if fecha is None:
+        return valor or ''
+    return fecha.strftime(FORMATO_FECHA_UI)
+
+
+def pertenece_a_mes(valor, mes, anio):
+    """Verificar si una fecha (ISO o DD/MM/YYYY) cae en el mes y año indicados"""
+    if not valor:
+        return False
+    texto = str(valor)
+    # Camino rápido: ISO, basta comparar el prefijo 'YYYY-MM'
+    if len(texto) >= 7 and texto[4] == '-':
+        return texto[:7] == f'{anio:04d}-{mes:02d}'
+    fecha = parsear_fecha(texto)
+    return fecha is not None and fecha.month == mes and fecha.year == anio
+
+
+def rango_mes(mes, anio):
+    """
+    Rango semiabierto [inicio, fin) de un mes en ISO, para consultas
+    'WHERE fecha >= ? AND fecha < ?' que aprovechan el índice de la columna
+    """
+    inicio = date(anio, mes, 1)
+    siguiente = date(anio + (mes // 12), (mes % 12) + 1, 1)
+    return inicio.strftime(FORMATO_FECHA_ISO), siguiente.strftime(FORMATO_FECHA_ISO)
+
+
+def rango_dias(fecha_inicio, fecha_fin):
+    """
+    Rango semiabierto [inicio, fin + 1 día) en ISO a partir de dos fechas inclusivas
+
+    Returns:
+        tuple (str, str) o None si alguna fecha no es válida
+    """
+    inicio = parsear_fecha(fecha_inicio)
+    fin = parsear_fecha(fecha_fin)
+    if inicio is None or fin is None:
+        return None
+    return (inicio.strftime(FORMATO_FECHA_ISO),
+            (fin.date() + timedelta(days=1)).strftime(FORMATO_FECHA_ISO))
+
+
+def sql_ddmmyyyy_a_iso(columna):
+    """Expresión SQL que convierte una columna 'DD/MM/YYYY[ HH:MM:SS]' a ISO (migraciones)"""
+    return (f"substr({columna}, 7, 4) || '-' || substr({columna}, 4, 2) || '-' "
+            f"|| substr({columna}, 1, 2) || substr({columna}, 11)")
@@ -54,6 +54,7 @@ class GestorDatosGlobal:
         self._cache_habitantes = None
         self._cache_timestamp = None
         self._cache_ttl = 30  # Aumentado a 30 segundos para mejor rendimiento
+        self._version_datos = 0  # Aumenta con cada cambio o recarga de habitantes
         print("[GestorDatosGlobal] OK - Inicializado correctamente")
     
     # ============================================================================
@@ -82,6 +83,7 @@ class GestorDatosGlobal:
                 habitantes = self.bd.obtener_todos()
                 self._cache_habitantes = habitantes
                 self._cache_timestamp = ahora
+                self._version_datos += 1
             
             # Filtrar inactivos si es necesario
             if not incluir_inactivos:
@@ -448,10 +450,21 @@ class GestorDatosGlobal:
             registrar_error('GestorDatosGlobal', 'obtener_estadisticas', str(e))
             return {}
     
+    @property
+    def version_datos(self) -> int:
+        """
+        Token de versión de los datos de habitantes
+        
+        Cambia en cada alta, edición, baja o recarga; sirve como parte de la
+        clave de cachés derivados (ej. UIOptimizer.cached_filter).
+        """
+        return self._version_datos
+    
     def _invalidar_cache(self):
         """Invalidar cache de habitantes"""
         self._cache_habitantes = None
         self._cache_timestamp = None
+        self._version_datos += 1
     
     def refrescar_cache(self):
         """Forzar recarga del cache"""
@@ -4,19 +4,41 @@ Proporciona credenciales globales para toda la aplicación
 """
 
 import hashlib
+import os
 from datetime import datetime
+from src.config import RUTA_SEGURA
 from src.core.base_datos_sqlite import obtener_bd
+from src.core.autorizacion import (
+    ARCHIVO_CLAVE_SESIONES, CacheAutorizacion, obtener_cache_autorizacion, rol_tiene_permiso
+)
+from src.core.credenciales import ARCHIVO_CALIBRACION, ServicioCredenciales, obtener_servicio_credenciales
 from src.core.logger import registrar_operacion, registrar_error
 
+# Roles a los que este gestor concede permisos; 'reportes' nunca tuvo acceso aquí
+ROLES_CON_PERMISOS = frozenset({'admin', 'operador', 'lectura'})
+
 
 class GestorUsuariosGlobal:
     """Gestor centralizado de usuarios y autenticación global"""
     
-    def __init__(self):
-        self.bd = obtener_bd()
+    def __init__(self, bd=None, directorio=None):
+        """
+        Args:
+            bd: BaseDatosSQLite a usar (por defecto la global)
+            directorio: Carpeta de la clave de sesiones y la calibración (por defecto RUTA_SEGURA)
+        """
+        self.bd = bd if bd is not None else obtener_bd()
+        directorio = directorio or RUTA_SEGURA
+        if bd is None and directorio == RUTA_SEGURA:
+            self.cache = obtener_cache_autorizacion()
+            self.credenciales = obtener_servicio_credenciales()
+        else:
+            self.cache = CacheAutorizacion(self.bd, os.path.join(directorio, ARCHIVO_CLAVE_SESIONES))
+            self.credenciales = ServicioCredenciales(os.path.join(directorio, ARCHIVO_CALIBRACION))
         self.usuario_actual = None
         self.rol_actual = None
         self.token_sesion = None
+        self.snapshot_permisos = None
     
     def login(self, nombre_usuario, contraseña):
         """
@@ -30,7 +52,7 @@ class GestorUsuariosGlobal:
             dict con resultado de login y datos del usuario
         """
         try:
-            usuario = self.bd.obtener_usuario(nombre_usuario)
+            usuario = self.cache.obtener_usuario(nombre_usuario)
             
             if not usuario:
                 registrar_error('GestorUsuariosGlobal', 'login', f'Usuario no existe: {nombre_usuario}')
@@ -40,11 +62,14 @@ class GestorUsuariosGlobal:
                 registrar_error('GestorUsuariosGlobal', 'login', f'Usuario inactivo: {nombre_usuario}')
                 return {'exito': False, 'error': 'Usuario inactivo'}
             
-            # Verificar contraseña
-            hash_ingresado = hashlib.sha256(contraseña.encode()).hexdigest()
-            if hash_ingresado != usuario.get('contraseña'):
+            # Verificar contraseña (los hashes SHA256 heredados se actualizan a bcrypt)
+            hash_guardado = usuario.get('contraseña')
+            valida, hash_nuevo = self.credenciales.verificar_y_actualizar(contraseña, hash_guardado)
+            if not valida:
                 registrar_error('GestorUsuariosGlobal', 'login', f'Contraseña incorrecta: {nombre_usuario}')
                 return {'exito': False, 'error': 'Usuario o contraseña incorrectos'}
+            if hash_nuevo:
+                self.bd.actualizar_hash_contraseña(nombre_usuario, hash_nuevo, hash_guardado)
             
             # Crear sesión
             self.usuario_actual = nombre_usuario
@@ -52,6 +77,7 @@ class GestorUsuariosGlobal:
             self.token_sesion = hashlib.sha256(
                 f"{nombre_usuario}{datetime.now().isoformat()}".encode()
             ).hexdigest()
+            self.snapshot_permisos = self.cache.emitir_snapshot(nombre_usuario, self.rol_actual)
             
             registrar_operacion(
                 'LOGIN',
@@ -64,7 +90,8 @@ class GestorUsuariosGlobal:
                 'usuario': nombre_usuario,
                 'rol': self.rol_actual,
                 'email': usuario.get('email', ''),
-                'token': self.token_sesion
+                'token': self.token_sesion,
+                'permisos': self.snapshot_permisos
             }
         
         except Exception as e:
@@ -77,6 +104,7 @@ class GestorUsuariosGlobal:
         self.usuario_actual = None
         self.rol_actual = None
         self.token_sesion = None
+        self.snapshot_permisos = None
         
         if usuario:
             registrar_operacion('LOGOUT', f'Usuario cerró sesión: {usuario}', {'usuario': usuario})
@@ -102,19 +130,11 @@ class GestorUsuariosGlobal:
         if not self.usuario_actual:
             return False
         
-        # Admin tiene todos los permisos
-        if self.rol_actual == 'admin':
-            return True
-        
-        # Operador tiene permisos de edición
-        if self.rol_actual == 'operador':
-            return permiso in ['ver', 'crear', 'editar', 'pagar']
-        
-        # Lectura tiene solo permiso de ver
-        if self.rol_actual == 'lectura':
-            return permiso == 'ver'
+        if self.rol_actual not in ROLES_CON_PERMISOS:
+            return False
         
-        return False
+        # Roles compilados a frozensets: O(1) y sin consultar la BD
+        return rol_tiene_permiso(self.rol_actual, permiso)
     
     def puede_editar(self):
         """Verificar si usuario actual puede editar datos"""
@@ -182,9 +202,8 @@ class GestorUsuariosGlobal:
         
         # Validar contraseña actual si no es admin
         if self.rol_actual != 'admin':
-            usuario = self.bd.obtener_usuario(nombre_usuario)
-            hash_actual = hashlib.sha256(contraseña_actual.encode()).hexdigest()
-            if hash_actual != usuario.get('contraseña'):
+            usuario = self.cache.obtener_usuario(nombre_usuario) or {}
+            if not self.credenciales.verificar(contraseña_actual, usuario.get('contraseña')):
                 return {'exito': False, 'error': 'Contraseña actual incorrecta'}
         
         exito, mensaje = self.bd.actualizar_contraseña(nombre_usuario, contraseña_nueva)
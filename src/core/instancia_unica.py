@@ -0,0 +1,328 @@
+"""
+Instancia única por módulo (censo, pagos, faenas)
+Evita que el mismo módulo corra dos veces y cargue dos veces todos sus datos.
+
+- La instancia principal toma un bloqueo exclusivo sobre
+  ``instancias/<modulo>.lock``; el sistema operativo lo suelta si el proceso
+  muere, así que no quedan bloqueos huérfanos.
+- Escucha en un puerto local de 127.0.0.1 y deja puerto y token en
+  ``instancias/<modulo>.json``. Solo se aceptan peticiones con ese token.
+- Un segundo lanzamiento no arranca otro intérprete: entrega su petición
+  (acción y argumentos, p. ej. ``['FOL-0042']``) y la ventana existente pasa
+  al frente. Las peticiones llegan en un hilo y se atienden en el de Tk.
+  Mientras no hay manejador (p. ej. en la ventana de login) se guarda la
+  última y se entrega al pasar a la ventana principal.
+"""
+
+import atexit
+import hmac
+import json
+import os
+import queue
+import secrets
+import socket
+import sys
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+from src.config import INSTANCIA_INTERVALO_MS, INSTANCIA_TIEMPO_ESPERA_SEG, RUTA_SEGURA
+from src.core.logger import registrar_error, registrar_operacion
+
+if sys.platform == 'win32':
+    import msvcrt
+else:
+    import fcntl
+
+ACCION_MOSTRAR = 'mostrar'
+CARPETA_INSTANCIAS = 'instancias'
+TAMANO_MAXIMO_MENSAJE = 64 * 1024
+
+
+def _bloquear(archivo) -> bool:
+    """Bloqueo exclusivo sin espera; False si otro proceso ya lo tiene"""
+    try:
+        if sys.platform == 'win32':
+            archivo.seek(0)
+            msvcrt.locking(archivo.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(archivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+def _desbloquear(archivo) -> None:
+    try:
+        if sys.platform == 'win32':
+            archivo.seek(0)
+            msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+    except OSError:
+        pass
+
+
+def _leer_linea(conexion: socket.socket) -> bytes:
+    datos = b''
+    while b'\n' not in datos and len(datos) < TAMANO_MAXIMO_MENSAJE:
+        parte = conexion.recv(4096)
+        if not parte:
+            break
+        datos += parte
+    return datos.split(b'\n', 1)[0]
+
+
+def traer_al_frente(ventana) -> None:
+    """Restaurar, elevar y enfocar una ventana de Tk"""
+    ventana.deiconify()
+    ventana.lift()
+    # -topmost momentáneo: en Windows lift() solo no gana el foco a otra aplicación
+    ventana.attributes('-topmost', True)
+    ventana.after_idle(ventana.attributes, '-topmost', False)
+    ventana.focus_force()
+
+
+class InstanciaUnica:
+    """Bloqueo y canal de peticiones de un módulo"""
+
+    def __init__(self, nombre: str, directorio: Optional[str] = None):
+        self.nombre = nombre
+        self.directorio = directorio or os.path.join(RUTA_SEGURA, CARPETA_INSTANCIAS)
+        self.ruta_bloqueo = os.path.join(self.directorio, f'{nombre}.lock')
+        self.ruta_contacto = os.path.join(self.directorio, f'{nombre}.json')
+        self._archivo = None
+        self._servidor: Optional[socket.socket] = None
+        self._token: Optional[str] = None
+        self._mensajes: 'queue.Queue[Tuple[str, List[str]]]' = queue.Queue()
+        self._root = None
+        self._after_id = None
+        self._manejador: Optional[Callable[[str, List[str]], Any]] = None
+        self._retenida: Optional[Tuple[str, List[str]]] = None
+
+    @property
+    def es_principal(self) -> bool:
+        return self._archivo is not None
+
+    # ==================== INSTANCIA PRINCIPAL ====================
+
+    def adquirir(self) -> bool:
+        """
+        Tomar el bloqueo del módulo y empezar a escuchar peticiones
+
+        Returns:
+            True si este proceso queda como instancia principal
+        """
+        if self.es_principal:
+            return True
+        os.makedirs(self.directorio, exist_ok=True)
+        archivo = open(self.ruta_bloqueo, 'a+')
+        if not _bloquear(archivo):
+            archivo.close()
+            return False
+        self._archivo = archivo
+        try:
+            self._escuchar()
+        except OSError as e:
+            # Sigue siendo la única instancia; solo no podrá recibir peticiones
+            registrar_error('InstanciaUnica', 'adquirir', str(e), {'modulo': self.nombre})
+        atexit.register(self.liberar)
+        return True
+
+    def _escuchar(self) -> None:
+        servidor = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        servidor.bind(('127.0.0.1', 0))
+        servidor.listen(4)
+        self._servidor = servidor
+        self._token = secrets.token_hex(16)
+
+        temporal = self.ruta_contacto + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump({'pid': os.getpid(), 'puerto': servidor.getsockname()[1], 'token': self._token}, f)
+        os.replace(temporal, self.ruta_contacto)
+
+        threading.Thread(target=self._atender_conexiones, args=(servidor,),
+                         name=f'instancia-{self.nombre}', daemon=True).start()
+
+    def _atender_conexiones(self, servidor: socket.socket) -> None:
+        while True:
+            try:
+                conexion, _ = servidor.accept()
+            except OSError:
+                return  # Servidor cerrado en liberar()
+            with conexion:
+                try:
+                    conexion.settimeout(INSTANCIA_TIEMPO_ESPERA_SEG)
+                    mensaje = json.loads(_leer_linea(conexion).decode('utf-8'))
+                    if not hmac.compare_digest(str(mensaje.get('token', '')), self._token):
+                        continue
+                    argumentos = [str(a) for a in mensaje.get('argumentos') or []]
+                    self._mensajes.put((str(mensaje.get('accion') or ACCION_MOSTRAR), argumentos))
+                    conexion.sendall(b'ok\n')
+                except (OSError, ValueError, AttributeError) as e:
+                    registrar_error('InstanciaUnica', '_atender_conexiones', str(e), {'modulo': self.nombre})
+
+    def procesar_pendientes(self) -> int:
+        """
+        Atender las peticiones recibidas (llamar desde el hilo de Tk)
+
+        Returns:
+            Cantidad de peticiones atendidas
+        """
+        atendidas = 0
+        while True:
+            try:
+                accion, argumentos = self._mensajes.get_nowait()
+            except queue.Empty:
+                return atendidas
+            atendidas += 1
+            try:
+                if self._root is not None:
+                    traer_al_frente(self._root)
+            except Exception as e:
+                registrar_error('InstanciaUnica', 'procesar_pendientes', str(e), {'modulo': self.nombre})
+            self._entregar(accion, argumentos)
+
+    def _entregar(self, accion: str, argumentos: List[str]) -> None:
+        if self._manejador is None:
+            # Sin ventana que la atienda todavía: vale la última petición
+            self._retenida = (accion, argumentos)
+            return
+        try:
+            self._manejador(accion, argumentos)
+        except Exception as e:
+            registrar_error('InstanciaUnica', '_entregar', str(e),
+                            {'modulo': self.nombre, 'accion': accion, 'argumentos': argumentos})
+
+    def atender(self, root, manejador: Optional[Callable[[str, List[str]], Any]] = None) -> None:
+        """
+        Atender peticiones en la ventana indicada (reemplaza la anterior,
+        p. ej. al pasar de la ventana de login a la principal)
+
+        Args:
+            root: Ventana que se trae al frente
+            manejador: función(accion, argumentos) para lo que pida el otro lanzamiento;
+                recibe enseguida la petición que llegó mientras no había manejador
+        """
+        self.detener()
+        self._root = root
+        self._manejador = manejador
+        if manejador is not None and self._retenida is not None:
+            retenida, self._retenida = self._retenida, None
+            self._entregar(*retenida)
+
+        def ciclo():
+            if self._root is not root:
+                return
+            self.procesar_pendientes()
+            self._after_id = root.after(INSTANCIA_INTERVALO_MS, ciclo)
+
+        self._after_id = root.after(INSTANCIA_INTERVALO_MS, ciclo)
+
+    def detener(self) -> None:
+        if self._root is not None and self._after_id is not None:
+            try:
+                self._root.after_cancel(self._after_id)
+            except Exception:
+                pass  # La ventana ya fue destruida
+        self._root = None
+        self._after_id = None
+        self._manejador = None
+
+    def liberar(self) -> None:
+        """Cerrar el canal y soltar el bloqueo"""
+        self.detener()
+        if self._servidor is not None:
+            try:
+                self._servidor.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._servidor.close()
+            self._servidor = None
+        if self._archivo is not None:
+            try:
+                os.remove(self.ruta_contacto)
+            except OSError:
+                pass
+            _desbloquear(self._archivo)
+            self._archivo.close()
+            self._archivo = None
+
+    # ==================== OTROS LANZAMIENTOS ====================
+
+    def en_ejecucion(self) -> bool:
+        """True si algún proceso tiene el bloqueo del módulo"""
+        if self.es_principal:
+            return True
+        os.makedirs(self.directorio, exist_ok=True)
+        with open(self.ruta_bloqueo, 'a+') as archivo:
+            if _bloquear(archivo):
+                _desbloquear(archivo)
+                return False
+        return True
+
+    def enviar(self, accion: str = ACCION_MOSTRAR, argumentos: Optional[List[str]] = None,
+               espera_seg: float = INSTANCIA_TIEMPO_ESPERA_SEG) -> bool:
+        """
+        Entregar una petición a la instancia principal
+
+        Si la principal todavía está arrancando (sin archivo de contacto o sin
+        escuchar), reintenta hasta ``espera_seg``.
+
+        Returns:
+            True si la instancia principal confirmó la petición
+        """
+        limite = time.monotonic() + espera_seg
+        while True:
+            try:
+                with open(self.ruta_contacto, 'r', encoding='utf-8') as f:
+                    contacto = json.load(f)
+                with socket.create_connection(('127.0.0.1', int(contacto['puerto'])),
+                                              timeout=espera_seg) as conexion:
+                    conexion.sendall(json.dumps({
+                        'token': contacto['token'],
+                        'accion': accion,
+                        'argumentos': list(argumentos or [])
+                    }).encode('utf-8') + b'\n')
+                    return _leer_linea(conexion) == b'ok'
+            except (OSError, ValueError, KeyError, TypeError):
+                if time.monotonic() >= limite:
+                    return False
+                time.sleep(0.1)
+
+
+def asegurar_instancia_unica(nombre: str, argumentos: Optional[List[str]] = None) -> Optional[InstanciaUnica]:
+    """
+    Llamar al inicio de main() de cada módulo
+
+    Returns:
+        La instancia si este proceso es el principal; None si el módulo ya
+        estaba abierto y recibió la petición (este proceso debe terminar)
+    """
+    instancia = InstanciaUnica(nombre)
+    if instancia.adquirir():
+        return instancia
+    if instancia.enviar(ACCION_MOSTRAR, argumentos):
+        registrar_operacion('INSTANCIA_REUTILIZADA', f'{nombre} ya estaba abierto; se le pasó la petición',
+                            {'argumentos': argumentos or []})
+        return None
+    # La instancia principal se cerró entre el bloqueo y el envío
+    return instancia if instancia.adquirir() else None
+
+
+def abrir_o_enfocar(nombre: str, lanzar: Callable[[], Any], argumentos: Optional[List[str]] = None) -> Any:
+    """
+    Traer al frente el módulo si ya corre; si no, lanzarlo
+
+    Args:
+        nombre: Nombre de instancia del módulo ('censo', 'pagos', 'faenas')
+        lanzar: Función que arranca el proceso (solo se llama si hace falta)
+        argumentos: Petición para la instancia abierta
+
+    Returns:
+        Lo que devuelva ``lanzar`` (el proceso nuevo) o None si ya estaba abierto
+    """
+    instancia = InstanciaUnica(nombre)
+    if instancia.en_ejecucion() and instancia.enviar(ACCION_MOSTRAR, argumentos):
+        return None
+    return lanzar()
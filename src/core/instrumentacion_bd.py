@@ -0,0 +1,334 @@
+"""
+Instrumentación de consultas SQLite
+Mide cada sentencia que pasa por la conexión de BaseDatosSQLite.
+
+Cada ejecución deja un registro (SQL, duración, filas y lugar de llamada) en un
+buffer circular y suma a un agregado por sentencia, del que sale el reporte de
+las más lentas o las más frecuentes. Las que superan BD_CONSULTA_LENTA_MS se
+registran como advertencia.
+
+En modo desarrollo (BD_MODO_DESARROLLO=1) la primera vez que aparece una
+sentencia se ejecuta su EXPLAIN QUERY PLAN y se marcan los recorridos completos
+(SCAN sin índice) sobre tablas con al menos BD_TABLA_GRANDE_FILAS filas.
+
+Las filas de un SELECT se cuentan al leerlas con fetchone/fetchmany/fetchall.
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from src.config import (
+    BD_CONSULTA_LENTA_MS, BD_INSTRUMENTACION_CAPACIDAD, BD_MODO_DESARROLLO,
+    BD_TABLA_GRANDE_FILAS
+)
+from src.core.logger import registrar_advertencia
+
+ORDENES_REPORTE = ('tiempo', 'frecuencia', 'maximo')
+
+_ESTE_ARCHIVO = os.path.normcase(os.path.abspath(__file__))
+_PATRON_TABLAS = re.compile(r'\b(?:FROM|JOIN)\s+"?(\w+)"?(?:\s+(?:AS\s+)?(?!WHERE|ON|JOIN|LEFT|INNER|ORDER|GROUP|LIMIT|USING)(\w+))?',
+                            re.IGNORECASE)
+_SENTENCIAS_CON_PLAN = ('SELECT', 'WITH', 'UPDATE', 'DELETE')
+
+
+def normalizar_sql(sql: str) -> str:
+    """Espacios colapsados: la misma sentencia escrita en varias líneas cuenta una vez"""
+    return ' '.join(sql.split())
+
+
+def _origen_llamada() -> str:
+    """'archivo.py:línea función' del primer marco fuera de este módulo"""
+    marco = sys._getframe(2)
+    while marco is not None and os.path.normcase(marco.f_code.co_filename) == _ESTE_ARCHIVO:
+        marco = marco.f_back
+    if marco is None:
+        return '?'
+    codigo = marco.f_code
+    return f"{os.path.basename(codigo.co_filename)}:{marco.f_lineno} {codigo.co_name}"
+
+
+class RegistroConsulta:
+    """Una ejecución en el buffer circular"""
+
+    __slots__ = ('sql', 'duracion_ms', 'filas', 'origen', 'instante')
+
+    def __init__(self, sql, duracion_ms, filas, origen, instante):
+        self.sql = sql
+        self.duracion_ms = duracion_ms
+        self.filas = filas
+        self.origen = origen
+        self.instante = instante
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class AgregadoConsulta:
+    """Totales acumulados de una sentencia normalizada"""
+
+    __slots__ = ('sql', 'ejecuciones', 'total_ms', 'maximo_ms', 'filas', 'origenes')
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.ejecuciones = 0
+        self.total_ms = 0.0
+        self.maximo_ms = 0.0
+        self.filas = 0
+        self.origenes = set()
+
+    def como_dict(self) -> Dict[str, Any]:
+        return {
+            'sql': self.sql,
+            'ejecuciones': self.ejecuciones,
+            'total_ms': round(self.total_ms, 3),
+            'promedio_ms': round(self.total_ms / self.ejecuciones, 3) if self.ejecuciones else 0,
+            'maximo_ms': round(self.maximo_ms, 3),
+            'filas': self.filas,
+            'origenes': sorted(self.origenes)
+        }
+
+
+class InstrumentacionBD:
+    """Buffer circular, agregados por sentencia y análisis de planes"""
+
+    def __init__(self, capacidad: int = BD_INSTRUMENTACION_CAPACIDAD,
+                 umbral_lento_ms: float = BD_CONSULTA_LENTA_MS,
+                 modo_desarrollo: bool = BD_MODO_DESARROLLO,
+                 tabla_grande: int = BD_TABLA_GRANDE_FILAS):
+        self.umbral_lento_ms = umbral_lento_ms
+        self.modo_desarrollo = modo_desarrollo
+        self.tabla_grande = tabla_grande
+        self.activa = True
+        self._lock = threading.Lock()
+        self._recientes = deque(maxlen=capacidad)
+        self._normalizadas: Dict[str, str] = {}
+        self._agregados: Dict[str, AgregadoConsulta] = {}
+        # sql normalizada -> recorridos completos detectados (vacía si el plan usa índices)
+        self._planes: Dict[str, List[Dict[str, Any]]] = {}
+        self._filas_tabla: Dict[str, int] = {}
+
+    def configurar(self, **opciones) -> None:
+        """Cambiar umbral_lento_ms, modo_desarrollo, tabla_grande o activa"""
+        for nombre, valor in opciones.items():
+            if nombre not in ('umbral_lento_ms', 'modo_desarrollo', 'tabla_grande', 'activa'):
+                raise ValueError(f"Opción de instrumentación desconocida: {nombre}")
+            setattr(self, nombre, valor)
+
+    def reiniciar(self) -> None:
+        """Vaciar buffer, agregados y planes analizados"""
+        with self._lock:
+            self._recientes.clear()
+            self._agregados.clear()
+            self._planes.clear()
+            self._filas_tabla.clear()
+
+    # ==================== REGISTRO ====================
+
+    def registrar(self, conexion, sql: str, parametros, duracion_ms: float,
+                  filas: int) -> RegistroConsulta:
+        normalizada = self._normalizadas.get(sql)
+        if normalizada is None:
+            normalizada = self._normalizadas[sql] = normalizar_sql(sql)
+        origen = _origen_llamada()
+        registro = RegistroConsulta(normalizada, duracion_ms, filas, origen, time.time())
+
+        with self._lock:
+            self._recientes.append(registro)
+            agregado = self._agregados.get(normalizada)
+            if agregado is None:
+                agregado = self._agregados[normalizada] = AgregadoConsulta(normalizada)
+            agregado.ejecuciones += 1
+            agregado.total_ms += duracion_ms
+            agregado.filas += filas
+            if duracion_ms > agregado.maximo_ms:
+                agregado.maximo_ms = duracion_ms
+            agregado.origenes.add(origen)
+
+        if duracion_ms >= self.umbral_lento_ms:
+            registrar_advertencia('Consulta lenta',
+                                  f"{duracion_ms:.1f} ms en {origen}: {normalizada[:300]}")
+        if self.modo_desarrollo and normalizada not in self._planes:
+            self._analizar_plan(conexion, sql, normalizada, parametros, origen)
+        return registro
+
+    def sumar_filas(self, registro: RegistroConsulta, filas: int) -> None:
+        """Filas leídas después de ejecutar (SELECT)"""
+        registro.filas += filas
+        agregado = self._agregados.get(registro.sql)
+        if agregado is not None:
+            agregado.filas += filas
+
+    # ==================== PLANES ====================
+
+    def _contar_filas(self, conexion, tabla: str) -> int:
+        filas = self._filas_tabla.get(tabla)
+        if filas is None:
+            try:
+                cursor = sqlite3.Cursor(conexion)
+                filas = cursor.execute(f'SELECT COUNT(*) FROM "{tabla}"').fetchone()[0]
+            except sqlite3.Error:
+                filas = 0
+            self._filas_tabla[tabla] = filas
+        return filas
+
+    def _analizar_plan(self, conexion, sql: str, normalizada: str, parametros, origen: str) -> None:
+        self._planes[normalizada] = []
+        if not normalizada.upper().startswith(_SENTENCIAS_CON_PLAN):
+            return
+        try:
+            # Cursor base: el EXPLAIN no debe volver a pasar por la instrumentación
+            cursor = sqlite3.Cursor(conexion)
+            plan = cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parametros or ()).fetchall()
+        except sqlite3.Error:
+            return
+
+        alias = {}
+        for tabla, nombre_alias in _PATRON_TABLAS.findall(sql):
+            alias[tabla] = tabla
+            if nombre_alias:
+                alias[nombre_alias] = tabla
+
+        escaneos = []
+        for fila in plan:
+            detalle = fila[3]
+            if not detalle.startswith('SCAN ') or ' USING ' in detalle:
+                continue
+            nombre = detalle.split()[1]
+            tabla = alias.get(nombre, nombre)
+            filas = self._contar_filas(conexion, tabla)
+            if filas >= self.tabla_grande:
+                escaneos.append({'tabla': tabla, 'filas_tabla': filas, 'detalle': detalle})
+
+        if escaneos:
+            self._planes[normalizada] = escaneos
+            registrar_advertencia(
+                'Recorrido completo de tabla',
+                f"{', '.join(e['tabla'] for e in escaneos)} en {origen}: {normalizada[:300]}")
+
+    def escaneos_completos(self) -> Dict[str, List[Dict[str, Any]]]:
+        """sql -> recorridos completos detectados (solo en modo desarrollo)"""
+        return {sql: escaneos for sql, escaneos in self._planes.items() if escaneos}
+
+    # ==================== REPORTES ====================
+
+    def recientes(self, cantidad: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Últimas ejecuciones, de la más antigua a la más reciente"""
+        with self._lock:
+            registros = list(self._recientes)
+        if cantidad is not None:
+            registros = registros[-cantidad:]
+        return [r.como_dict() for r in registros]
+
+    def reporte(self, top: int = 10, orden: str = 'tiempo') -> List[Dict[str, Any]]:
+        """
+        Sentencias ordenadas por tiempo total, frecuencia o duración máxima
+
+        Args:
+            top: cantidad de sentencias
+            orden: 'tiempo', 'frecuencia' o 'maximo'
+        """
+        if orden not in ORDENES_REPORTE:
+            raise ValueError(f"Orden de reporte inválido: {orden}")
+        clave = {
+            'tiempo': lambda a: a.total_ms,
+            'frecuencia': lambda a: a.ejecuciones,
+            'maximo': lambda a: a.maximo_ms
+        }[orden]
+        with self._lock:
+            agregados = sorted(self._agregados.values(), key=clave, reverse=True)[:top]
+            resultado = [a.como_dict() for a in agregados]
+        for fila in resultado:
+            fila['escaneos'] = self._planes.get(fila['sql'], [])
+        return resultado
+
+    def formatear_reporte(self, top: int = 10, orden: str = 'tiempo') -> str:
+        lineas = [f"{'Ejec':>6} {'Total ms':>10} {'Máx ms':>9} {'Filas':>8}  Sentencia"]
+        for fila in self.reporte(top, orden):
+            marca = ' [SCAN]' if fila['escaneos'] else ''
+            lineas.append(f"{fila['ejecuciones']:>6} {fila['total_ms']:>10.2f} {fila['maximo_ms']:>9.2f} "
+                          f"{fila['filas']:>8}  {fila['sql'][:90]}{marca}")
+        return '\n'.join(lineas)
+
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """Cursor que mide cada execute y cuenta las filas leídas"""
+
+    _registro = None
+
+    def execute(self, sql, parametros=()):
+        instrumentacion = self.connection.instrumentacion
+        if not instrumentacion.activa:
+            return super().execute(sql, parametros)
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            duracion = (time.perf_counter() - inicio) * 1000
+            self._registro = instrumentacion.registrar(
+                self.connection, sql, parametros, duracion, max(self.rowcount, 0))
+
+    def executemany(self, sql, secuencia):
+        instrumentacion = self.connection.instrumentacion
+        if not instrumentacion.activa:
+            return super().executemany(sql, secuencia)
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, secuencia)
+        finally:
+            duracion = (time.perf_counter() - inicio) * 1000
+            self._registro = instrumentacion.registrar(
+                self.connection, sql, None, duracion, max(self.rowcount, 0))
+
+    def fetchone(self):
+        fila = super().fetchone()
+        if fila is not None and self._registro is not None:
+            self.connection.instrumentacion.sumar_filas(self._registro, 1)
+        return fila
+
+    def fetchmany(self, *args, **kwargs):
+        filas = super().fetchmany(*args, **kwargs)
+        if filas and self._registro is not None:
+            self.connection.instrumentacion.sumar_filas(self._registro, len(filas))
+        return filas
+
+    def fetchall(self):
+        filas = super().fetchall()
+        if filas and self._registro is not None:
+            self.connection.instrumentacion.sumar_filas(self._registro, len(filas))
+        return filas
+
+
+class ConexionInstrumentada(sqlite3.Connection):
+    """Conexión cuyos cursores (y atajos execute) pasan por la instrumentación"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.instrumentacion = obtener_instrumentacion()
+
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+
+    # Connection.execute no llama a Cursor.execute: hay que redirigirlo
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+
+    def executemany(self, sql, secuencia):
+        return self.cursor().executemany(sql, secuencia)
+
+
+# Instancia global única
+_instrumentacion_global = None
+
+
+def obtener_instrumentacion() -> InstrumentacionBD:
+    """Obtener instancia global de la instrumentación"""
+    global _instrumentacion_global
+    if _instrumentacion_global is None:
+        _instrumentacion_global = InstrumentacionBD()
+    return _instrumentacion_global
@@ -0,0 +1,306 @@
+"""
+Mantenimiento automático de la base de datos SQLite
+Mantiene la BD rápida tras meses de uso sin ejecutar scripts a mano.
+
+- Checkpoint del WAL cuando el archivo -wal supera un umbral (PASSIVE) o
+  crece demasiado (TRUNCATE, que además reduce el archivo).
+- ``auto_vacuum=INCREMENTAL``: las páginas libres se devuelven al sistema de
+  a poco con ``incremental_vacuum`` durante el tiempo ocioso de Tk, sin el
+  bloqueo de un VACUUM completo. Una BD creada antes se convierte sola una
+  vez, al cerrar.
+- ``PRAGMA optimize`` al cerrar, para que el planificador tenga estadísticas
+  frescas de las tablas que sí se consultaron.
+- Verificación rápida de integridad y reporte de páginas, lista libre y WAL.
+
+Ningún paso se ejecuta si la conexión tiene una transacción abierta.
+"""
+
+import atexit
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import (
+    MANTENIMIENTO_CONVERSION_ESPERA_MS, MANTENIMIENTO_CONVERSION_MAX_MB,
+    MANTENIMIENTO_INTERVALO_SEG, MANTENIMIENTO_PAGINAS_POR_PASO,
+    MANTENIMIENTO_WAL_PASIVO_MB, MANTENIMIENTO_WAL_TRUNCAR_MB
+)
+from src.core.logger import registrar_error, registrar_operacion
+
+MODOS_AUTO_VACUUM = {0: 'NONE', 1: 'FULL', 2: 'INCREMENTAL'}
+AUTO_VACUUM_INCREMENTAL = 2
+MB = 1024 * 1024
+
+
+class MantenimientoBD:
+    """Tareas de mantenimiento cortas sobre la conexión de BaseDatosSQLite"""
+
+    def __init__(self, bd=None,
+                 wal_pasivo_mb: float = MANTENIMIENTO_WAL_PASIVO_MB,
+                 wal_truncar_mb: float = MANTENIMIENTO_WAL_TRUNCAR_MB,
+                 paginas_por_paso: int = MANTENIMIENTO_PAGINAS_POR_PASO,
+                 conversion_max_mb: float = MANTENIMIENTO_CONVERSION_MAX_MB):
+        if bd is None:
+            from src.core.base_datos_sqlite import obtener_bd
+            bd = obtener_bd()
+        self.bd = bd
+        self.wal_pasivo = int(wal_pasivo_mb * MB)
+        self.wal_truncar = int(wal_truncar_mb * MB)
+        self.paginas_por_paso = paginas_por_paso
+        self.conversion_max = int(conversion_max_mb * MB)
+        self._after_id = None
+        self._root = None
+
+    def _conexion(self) -> sqlite3.Connection:
+        return self.bd.conexion or self.bd.conectar()
+
+    def _ocupada(self, conexion: sqlite3.Connection) -> bool:
+        """No interrumpir una transacción en curso de la aplicación"""
+        return conexion.in_transaction
+
+    def _pragma(self, sentencia: str) -> Any:
+        fila = self._conexion().execute(sentencia).fetchone()
+        return fila[0] if fila else None
+
+    # ==================== WAL ====================
+
+    def tamano_wal(self) -> int:
+        """Tamaño en bytes del archivo -wal (0 si no existe)"""
+        try:
+            return os.path.getsize(self.bd.ruta_db + '-wal')
+        except OSError:
+            return 0
+
+    def checkpoint(self, modo: str = 'PASSIVE') -> Optional[Dict[str, int]]:
+        """
+        Ejecutar un checkpoint del WAL
+
+        Args:
+            modo: 'PASSIVE' (no espera a otros lectores) o 'TRUNCATE'
+
+        Returns:
+            dict con ocupado, paginas_wal y paginas_copiadas; None si no se pudo
+        """
+        modo = modo.upper()
+        if modo not in ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE'):
+            raise ValueError(f"Modo de checkpoint inválido: {modo}")
+        conexion = self._conexion()
+        if self._ocupada(conexion):
+            return None
+        try:
+            ocupado, paginas_wal, copiadas = conexion.execute(
+                f"PRAGMA wal_checkpoint({modo})").fetchone()
+            return {'ocupado': ocupado, 'paginas_wal': paginas_wal, 'paginas_copiadas': copiadas}
+        except sqlite3.Error as e:
+            registrar_error('MantenimientoBD', 'checkpoint', str(e), {'modo': modo})
+            return None
+
+    def checkpoint_si_necesario(self) -> Optional[Dict[str, Any]]:
+        """Checkpoint PASSIVE o TRUNCATE según el tamaño actual del WAL"""
+        tamano = self.tamano_wal()
+        if tamano >= self.wal_truncar:
+            modo = 'TRUNCATE'
+        elif tamano >= self.wal_pasivo:
+            modo = 'PASSIVE'
+        else:
+            return None
+        resultado = self.checkpoint(modo)
+        if resultado is not None:
+            resultado.update({'modo': modo, 'wal_antes': tamano, 'wal_despues': self.tamano_wal()})
+        return resultado
+
+    # ==================== ESPACIO LIBRE ====================
+
+    def asegurar_auto_vacuum(self) -> bool:
+        """
+        Pasar la BD a auto_vacuum=INCREMENTAL si todavía no lo está
+
+        Las BD nuevas ya se crean así (ver BaseDatosSQLite.conectar); las
+        existentes necesitan un VACUUM completo, que se hace una sola vez.
+
+        Returns:
+            True si hubo que convertirla
+        """
+        conexion = self._conexion()
+        if self._pragma("PRAGMA auto_vacuum") == AUTO_VACUUM_INCREMENTAL:
+            return False
+        if self._ocupada(conexion):
+            return False
+        try:
+            conexion.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conexion.execute("VACUUM")
+        except sqlite3.Error as e:
+            registrar_error('MantenimientoBD', 'asegurar_auto_vacuum', str(e))
+            return False
+        registrar_operacion('BD_AUTO_VACUUM', 'Base de datos convertida a auto_vacuum incremental',
+                            {'ruta': self.bd.ruta_db})
+        return True
+
+    def convertir_auto_vacuum_pendiente(self) -> bool:
+        """
+        Conversión única de una BD anterior a auto_vacuum=INCREMENTAL
+
+        Se llama al cerrar, cuando nadie espera a la ventana. Se omite si la BD
+        supera ``conversion_max_mb`` (para esas queda tools/optimizar_bd.py) o
+        si otro módulo la tiene ocupada más de MANTENIMIENTO_CONVERSION_ESPERA_MS;
+        en ese caso se reintenta en el próximo cierre.
+
+        Returns:
+            True si se convirtió
+        """
+        if self._pragma("PRAGMA auto_vacuum") == AUTO_VACUUM_INCREMENTAL:
+            return False
+        try:
+            tamano = os.path.getsize(self.bd.ruta_db)
+        except OSError:
+            return False
+        if tamano > self.conversion_max:
+            return False
+        conexion = self._conexion()
+        espera_anterior = self._pragma("PRAGMA busy_timeout")
+        conexion.execute(f"PRAGMA busy_timeout={int(MANTENIMIENTO_CONVERSION_ESPERA_MS)}")
+        try:
+            return self.asegurar_auto_vacuum()
+        finally:
+            conexion.execute(f"PRAGMA busy_timeout={int(espera_anterior or 0)}")
+
+    def vacuum_incremental(self, paginas: Optional[int] = None) -> int:
+        """
+        Devolver al sistema hasta ``paginas`` páginas de la lista libre
+
+        Returns:
+            Páginas liberadas
+        """
+        conexion = self._conexion()
+        if self._ocupada(conexion) or self._pragma("PRAGMA auto_vacuum") != AUTO_VACUUM_INCREMENTAL:
+            return 0
+        libres = self._pragma("PRAGMA freelist_count") or 0
+        if not libres:
+            return 0
+        paginas = int(paginas or self.paginas_por_paso)
+        try:
+            # execute() solo avanza un paso del PRAGMA; executescript lo completa
+            conexion.executescript(f"PRAGMA incremental_vacuum({paginas});")
+        except sqlite3.Error as e:
+            registrar_error('MantenimientoBD', 'vacuum_incremental', str(e))
+            return 0
+        return libres - (self._pragma("PRAGMA freelist_count") or 0)
+
+    # ==================== ESTADÍSTICAS ====================
+
+    def optimizar(self) -> bool:
+        """PRAGMA optimize: ANALYZE solo de lo que lo necesita"""
+        conexion = self._conexion()
+        if self._ocupada(conexion):
+            return False
+        try:
+            conexion.execute("PRAGMA optimize")
+            return True
+        except sqlite3.Error as e:
+            registrar_error('MantenimientoBD', 'optimizar', str(e))
+            return False
+
+    # ==================== CICLOS ====================
+
+    def paso_ocioso(self) -> Dict[str, Any]:
+        """Un paso acotado: checkpoint si hace falta y un tramo de incremental_vacuum"""
+        resultado = {'checkpoint': None, 'paginas_liberadas': 0}
+        try:
+            resultado['checkpoint'] = self.checkpoint_si_necesario()
+            resultado['paginas_liberadas'] = self.vacuum_incremental()
+        except sqlite3.Error as e:
+            registrar_error('MantenimientoBD', 'paso_ocioso', str(e))
+        return resultado
+
+    def al_cerrar(self) -> None:
+        """Optimizar estadísticas, convertir una BD anterior y truncar el WAL antes de salir"""
+        self.detener()
+        if self.bd.conexion is None:
+            return
+        try:
+            self.optimizar()
+            self.convertir_auto_vacuum_pendiente()
+            self.checkpoint('TRUNCATE')
+        except sqlite3.Error as e:
+            registrar_error('MantenimientoBD', 'al_cerrar', str(e))
+
+    def programar(self, root, intervalo_seg: int = MANTENIMIENTO_INTERVALO_SEG) -> None:
+        """Ejecutar paso_ocioso periódicamente cuando Tk no tiene eventos pendientes"""
+        self.detener()
+        self._root = root
+        intervalo_ms = int(intervalo_seg * 1000)
+
+        def ciclo():
+            try:
+                self.paso_ocioso()
+            finally:
+                if self._root is root:
+                    self._after_id = root.after(intervalo_ms, lambda: root.after_idle(ciclo))
+
+        self._after_id = root.after(intervalo_ms, lambda: root.after_idle(ciclo))
+
+    def detener(self) -> None:
+        if self._root is not None and self._after_id is not None:
+            try:
+                self._root.after_cancel(self._after_id)
+            except Exception:
+                pass  # La ventana ya fue destruida
+        self._root = None
+        self._after_id = None
+
+    # ==================== DIAGNÓSTICO ====================
+
+    def verificar_integridad(self) -> Tuple[bool, List[str]]:
+        """
+        PRAGMA quick_check (sin verificar índices contra tablas)
+
+        Returns:
+            (bool ok, list mensajes)
+        """
+        try:
+            filas = self._conexion().execute("PRAGMA quick_check").fetchall()
+        except sqlite3.Error as e:
+            registrar_error('MantenimientoBD', 'verificar_integridad', str(e))
+            return False, [str(e)]
+        mensajes = [fila[0] for fila in filas]
+        return mensajes == ['ok'], mensajes
+
+    def reporte(self) -> Dict[str, Any]:
+        """Páginas, lista libre, tamaños de archivo y modo de auto_vacuum"""
+        tamano_pagina = self._pragma("PRAGMA page_size") or 0
+        paginas = self._pragma("PRAGMA page_count") or 0
+        libres = self._pragma("PRAGMA freelist_count") or 0
+        try:
+            tamano_archivo = os.path.getsize(self.bd.ruta_db)
+        except OSError:
+            tamano_archivo = 0
+        return {
+            'tamano_pagina': tamano_pagina,
+            'paginas': paginas,
+            'paginas_libres': libres,
+            'porcentaje_libre': round(libres / paginas * 100, 1) if paginas else 0,
+            'tamano_bd': tamano_archivo,
+            'tamano_wal': self.tamano_wal(),
+            'auto_vacuum': MODOS_AUTO_VACUUM.get(self._pragma("PRAGMA auto_vacuum"), 'DESCONOCIDO'),
+            'modo_journal': self._pragma("PRAGMA journal_mode")
+        }
+
+
+# Instancia global única
+_mantenimiento_global = None
+
+
+def obtener_mantenimiento_bd() -> MantenimientoBD:
+    """Obtener instancia global del mantenimiento (cierra limpio al salir)"""
+    global _mantenimiento_global
+    if _mantenimiento_global is None:
+        _mantenimiento_global = MantenimientoBD()
+        atexit.register(_mantenimiento_global.al_cerrar)
+    return _mantenimiento_global
+
+
+def iniciar_mantenimiento_bd(root) -> MantenimientoBD:
+    """Programar el mantenimiento en tiempo ocioso de la ventana principal"""
+    mantenimiento = obtener_mantenimiento_bd()
+    mantenimiento.programar(root)
+    return mantenimiento
@@ -3,25 +3,63 @@ Sistema de Optimización de Interfaz de Usuario
 Proporciona debouncing, threading, caché y virtualización para mejorar la fluidez de la UI
 """
 
+import queue
 import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Callable, Any, Optional, Dict, List
-from functools import lru_cache
-import hashlib
-import json
+
+from src.config import (
+    UI_CACHE_MAX_SIZE, UI_CACHE_TTL_SECONDS,
+    UI_MAX_BACKGROUND_WORKERS, UI_WORKER_PUMP_MS
+)
 
 
 class DebounceManager:
     """
     Gestor de debouncing para evitar ejecuciones excesivas
     Retrasa la ejecución de funciones hasta que el usuario deja de interactuar
+
+    Con un widget de Tk asociado todo se programa con widget.after/after_cancel:
+    escribir rápido no crea hilos y los callbacks corren en el hilo de la UI.
+    Sin widget (scripts, tests) se usa threading.Timer como respaldo.
     """
     
-    def __init__(self):
+    def __init__(self, widget=None):
+        self._widget = widget
         self._timers: Dict[str, Any] = {}
-        self._locks: Dict[str, threading.Lock] = {}
+        self._pendientes: Dict[str, tuple] = {}
+        self._ultima_ejecucion: Dict[str, float] = {}
+        self._idle_jobs: Dict[str, Any] = {}
+        self._idle_pendientes: Dict[str, tuple] = {}
+    
+    def attach_widget(self, widget):
+        """Asociar el widget de Tk cuyo after() programará los callbacks"""
+        self.cancel_all()
+        self._widget = widget
+    
+    def _programar(self, delay_ms: int, func: Callable):
+        if self._widget is not None:
+            return self._widget.after(delay_ms, func)
+        timer = threading.Timer(delay_ms / 1000.0, func)
+        timer.daemon = True
+        timer.start()
+        return timer
+    
+    def _cancelar_job(self, job):
+        if not job:
+            return
+        try:
+            if isinstance(job, threading.Timer):
+                job.cancel()
+            elif self._widget is not None:
+                self._widget.after_cancel(job)
+        except Exception:
+            pass
     
-    def debounce(self, key: str, delay_ms: int, callback: Callable, *args, **kwargs):
+    def debounce(self, key: str, delay_ms: int, callback: Callable, *args,
+                 leading: bool = False, trailing: bool = True, **kwargs):
         """
         Ejecuta callback después de delay_ms sin nuevas llamadas
         
@@ -29,93 +67,152 @@ class DebounceManager:
             key: Identificador único para este debounce
             delay_ms: Tiempo de espera en milisegundos
             callback: Función a ejecutar
+            leading: Ejecutar en la primera llamada de una ráfaga
+            trailing: Ejecutar al terminar la ráfaga con los últimos argumentos
+                (si leading también es True, solo cuando hubo más de una llamada)
             *args, **kwargs: Argumentos para el callback
         """
-        # Cancelar timer anterior si existe
-        if key in self._timers and self._timers[key]:
-            try:
-                self._timers[key].cancel()
-            except:
-                pass
+        en_rafaga = bool(self._timers.get(key))
+        self._cancelar_job(self._timers.get(key))
         
-        # Crear nuevo timer
-        timer = threading.Timer(
-            delay_ms / 1000.0,
-            callback,
-            args=args,
-            kwargs=kwargs
-        )
-        timer.daemon = True
-        self._timers[key] = timer
-        timer.start()
+        if leading and not en_rafaga:
+            self._pendientes.pop(key, None)
+            callback(*args, **kwargs)
+        elif trailing:
+            self._pendientes[key] = (callback, args, kwargs)
+        
+        def _fin():
+            self._timers[key] = None
+            tarea = self._pendientes.pop(key, None)
+            if tarea:
+                tarea[0](*tarea[1], **tarea[2])
+        
+        self._timers[key] = self._programar(delay_ms, _fin)
+    
+    def throttle(self, key: str, interval_ms: int, callback: Callable, *args,
+                 trailing: bool = True, **kwargs):
+        """
+        Ejecuta callback como máximo una vez cada interval_ms
+        
+        La primera llamada se ejecuta de inmediato; las que llegan dentro del
+        intervalo se resumen en una sola ejecución final con los últimos
+        argumentos (si trailing es True).
+        """
+        restante = interval_ms / 1000.0 - (time.monotonic()
+                                           - self._ultima_ejecucion.get(key, float('-inf')))
+        if restante <= 0 and not self._timers.get(key):
+            self._ultima_ejecucion[key] = time.monotonic()
+            callback(*args, **kwargs)
+            return
+        
+        if not trailing:
+            return
+        self._pendientes[key] = (callback, args, kwargs)
+        if self._timers.get(key):
+            return
+        
+        def _fin():
+            self._timers[key] = None
+            tarea = self._pendientes.pop(key, None)
+            if tarea:
+                self._ultima_ejecucion[key] = time.monotonic()
+                tarea[0](*tarea[1], **tarea[2])
+        
+        self._timers[key] = self._programar(max(1, int(restante * 1000)), _fin)
+    
+    def idle(self, key: str, callback: Callable, *args, **kwargs):
+        """
+        Agrupar pedidos de redibujado hasta que el loop de Tk quede ocioso
+        
+        Varias llamadas con la misma key antes de after_idle producen una sola
+        ejecución con los últimos argumentos. Sin widget se ejecuta de inmediato.
+        """
+        if self._widget is None:
+            callback(*args, **kwargs)
+            return
+        
+        self._idle_pendientes[key] = (callback, args, kwargs)
+        if self._idle_jobs.get(key):
+            return
+        
+        def _fin():
+            self._idle_jobs[key] = None
+            tarea = self._idle_pendientes.pop(key, None)
+            if tarea:
+                tarea[0](*tarea[1], **tarea[2])
+        
+        self._idle_jobs[key] = self._widget.after_idle(_fin)
     
     def cancel(self, key: str):
         """Cancelar un debounce específico"""
-        if key in self._timers and self._timers[key]:
-            try:
-                self._timers[key].cancel()
-                self._timers[key] = None
-            except:
-                pass
+        self._cancelar_job(self._timers.get(key))
+        self._timers[key] = None
+        self._pendientes.pop(key, None)
+        if self._idle_jobs.get(key):
+            self._cancelar_job(self._idle_jobs[key])
+            self._idle_jobs[key] = None
+            self._idle_pendientes.pop(key, None)
     
     def cancel_all(self):
         """Cancelar todos los debounces activos"""
-        for key in list(self._timers.keys()):
+        for key in set(self._timers) | set(self._idle_jobs):
             self.cancel(key)
 
 
 class CacheManager:
     """
-    Gestor de caché para resultados de búsqueda y filtrado
-    Evita recalcular resultados idénticos
+    Gestor de caché LRU para resultados de búsqueda y filtrado
+    Evita recalcular resultados idénticos; get/set/expulsión en O(1)
     """
     
     def __init__(self, max_size: int = 100, ttl_seconds: int = 300):
         self.max_size = max_size
         self.ttl_seconds = ttl_seconds
-        self._cache: Dict[str, tuple] = {}  # key -> (timestamp, data)
+        self._cache: "OrderedDict[Any, tuple]" = OrderedDict()  # key -> (timestamp, data)
         self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
     
-    def _generate_key(self, *args, **kwargs) -> str:
-        """Generar clave única para argumentos"""
-        data = {
-            'args': str(args),
-            'kwargs': str(sorted(kwargs.items()))
-        }
-        return hashlib.md5(json.dumps(data, sort_keys=True).encode()).hexdigest()
+    @staticmethod
+    def _generate_key(*args, **kwargs) -> Any:
+        """Generar clave para argumentos (la tupla misma si es hashable)"""
+        key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+        try:
+            hash(key)
+            return key
+        except TypeError:
+            return repr(key)
     
     def get(self, *args, **kwargs) -> Optional[Any]:
         """Obtener valor del caché si existe y es válido"""
         key = self._generate_key(*args, **kwargs)
         
         with self._lock:
-            if key in self._cache:
-                timestamp, data = self._cache[key]
+            entry = self._cache.get(key)
+            if entry is not None:
+                timestamp, data = entry
                 # Verificar si el caché sigue siendo válido
-                if time.time() - timestamp < self.ttl_seconds:
+                if time.monotonic() - timestamp < self.ttl_seconds:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
                     return data
-                else:
-                    # Expirado, eliminar
-                    del self._cache[key]
+                # Expirado, eliminar
+                del self._cache[key]
+            self.misses += 1
         
         return None
     
     def set(self, data: Any, *args, **kwargs):
-        """Guardar valor en caché"""
+        """Guardar valor en caché (expulsa la entrada menos usada si está lleno)"""
         key = self._generate_key(*args, **kwargs)
         
         with self._lock:
-            # Limpiar caché si está lleno
-            if len(self._cache) >= self.max_size:
-                # Eliminar entradas más antiguas
-                oldest_keys = sorted(
-                    self._cache.keys(),
-                    key=lambda k: self._cache[k][0]
-                )[:self.max_size // 4]
-                for old_key in oldest_keys:
-                    del self._cache[old_key]
-            
-            self._cache[key] = (time.time(), data)
+            self._cache[key] = (time.monotonic(), data)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+                self.evictions += 1
     
     def clear(self):
         """Limpiar todo el caché"""
@@ -123,87 +220,246 @@ class CacheManager:
             self._cache.clear()
     
     def invalidate_pattern(self, pattern: str):
-        """Invalidar entradas que contengan un patrón"""
+        """Invalidar entradas cuya clave contenga un patrón"""
         with self._lock:
-            keys_to_remove = [k for k in self._cache.keys() if pattern in k]
+            keys_to_remove = [k for k in self._cache.keys() if pattern in str(k)]
             for key in keys_to_remove:
                 del self._cache[key]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas de uso: tamaño, aciertos, fallos, expulsiones y tasa de aciertos"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._cache),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': (self.hits / total) if total else 0.0,
+            }
 
 
 class BackgroundWorker:
     """
     Ejecutor de tareas en background para no bloquear la UI
+
+    Todas las tareas comparten un ThreadPoolExecutor de max_workers hilos.
+    Cada key tiene una generación: una tarea nueva con la misma key reemplaza
+    a la anterior y solo se entrega el resultado de la más reciente (la última
+    búsqueda gana). Con un root de Tk asociado (attach_root) los callbacks no
+    corren en el hilo del worker: se encolan y un único bombeo con root.after
+    los ejecuta en el hilo de la UI. Sin root (scripts, tests) el callback se
+    ejecuta directamente al terminar la tarea.
     """
     
-    def __init__(self, max_workers: int = 4):
+    def __init__(self, max_workers: int = UI_MAX_BACKGROUND_WORKERS,
+                 intervalo_bombeo_ms: int = UI_WORKER_PUMP_MS):
         self.max_workers = max_workers
-        self._active_workers: Dict[str, threading.Thread] = {}
-        self._cancel_flags: Dict[str, bool] = {}
+        self.intervalo_bombeo_ms = intervalo_bombeo_ms
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._generaciones: Dict[str, int] = {}
+        self._pendientes: Dict[str, Future] = {}
+        self._completadas: queue.Queue = queue.Queue()
         self._lock = threading.Lock()
+        self._root = None
+        self._bombeo_job = None
+        
+        # Métricas
+        self._encoladas = 0
+        self._en_ejecucion = 0
+        self._enviadas = 0
+        self._completas = 0
+        self._reemplazadas = 0
+        self._errores = 0
+        self._espera_total = 0.0
+        self._espera_max = 0.0
+        self._ejecucion_total = 0.0
+        self._ejecucion_max = 0.0
+    
+    # ===== Integración con Tk =====
+    
+    def attach_root(self, root):
+        """
+        Asociar el root de Tk que ejecutará los callbacks
+        
+        Debe llamarse desde el hilo de la UI. Si ya había otro root asociado,
+        el nuevo lo reemplaza.
+        """
+        self.detach_root()
+        self._root = root
+        self._programar_bombeo()
+    
+    def detach_root(self):
+        """Detener el bombeo y volver a ejecutar callbacks en el hilo del worker"""
+        if self._root is not None and self._bombeo_job is not None:
+            try:
+                self._root.after_cancel(self._bombeo_job)
+            except Exception:
+                pass
+        self._root = None
+        self._bombeo_job = None
+    
+    def _programar_bombeo(self):
+        try:
+            self._bombeo_job = self._root.after(self.intervalo_bombeo_ms, self._bombear)
+        except Exception:
+            # El root fue destruido
+            self._root = None
+            self._bombeo_job = None
+    
+    def _bombear(self):
+        """Drenar la cola de completadas en el hilo de la UI"""
+        self._bombeo_job = None
+        while True:
+            try:
+                key, generacion, callback, resultado = self._completadas.get_nowait()
+            except queue.Empty:
+                break
+            # Una tarea más nueva pudo encolarse mientras esta esperaba en la cola
+            if self._generaciones.get(key) != generacion:
+                with self._lock:
+                    self._reemplazadas += 1
+                continue
+            try:
+                callback(resultado)
+            except Exception as e:
+                print(f"Error en callback {key}: {e}")
+        if self._root is not None:
+            self._programar_bombeo()
+    
+    # ===== Ejecución =====
+    
+    def _obtener_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix='ui-worker')
+        return self._executor
     
     def run_async(self, key: str, task: Callable, callback: Optional[Callable] = None,
-                  *args, **kwargs):
+                  *args, **kwargs) -> Future:
         """
         Ejecutar tarea en background
         
         Args:
-            key: Identificador único para esta tarea
+            key: Identificador único para esta tarea (una nueva con la misma key
+                reemplaza a la anterior)
             task: Función a ejecutar en background
             callback: Función a ejecutar en UI thread con el resultado
             *args, **kwargs: Argumentos para task
+        
+        Returns:
+            Future de la tarea
         """
-        # Cancelar tarea anterior con la misma key
-        self.cancel(key)
+        with self._lock:
+            generacion = self._generaciones.get(key, 0) + 1
+            self._generaciones[key] = generacion
+            anterior = self._pendientes.get(key)
+            self._encoladas += 1
+            self._enviadas += 1
         
-        # Flag de cancelación
-        self._cancel_flags[key] = False
+        # Si la anterior aún no empezó, se descarta sin ocupar un hilo
+        if anterior is not None and anterior.cancel():
+            with self._lock:
+                self._encoladas -= 1
+                self._reemplazadas += 1
         
-        def _worker():
-            try:
-                # Ejecutar tarea
-                result = task(*args, **kwargs)
-                
-                # Si no fue cancelada, ejecutar callback
-                if not self._cancel_flags.get(key, True) and callback:
-                    callback(result)
-            except Exception as e:
-                print(f"Error en worker {key}: {e}")
-            finally:
-                # Limpiar
-                with self._lock:
-                    if key in self._active_workers:
-                        del self._active_workers[key]
-                    if key in self._cancel_flags:
-                        del self._cancel_flags[key]
+        futuro = self._obtener_executor().submit(
+            self._ejecutar, key, generacion, task, callback, time.monotonic(), args, kwargs
+        )
+        with self._lock:
+            self._pendientes[key] = futuro
+        return futuro
+    
+    def _ejecutar(self, key, generacion, task, callback, encolada_en, args, kwargs):
+        inicio = time.monotonic()
+        espera = inicio - encolada_en
+        with self._lock:
+            self._encoladas -= 1
+            self._en_ejecucion += 1
+            self._espera_total += espera
+            self._espera_max = max(self._espera_max, espera)
         
-        # Crear y lanzar thread
-        thread = threading.Thread(target=_worker, daemon=True)
+        resultado = None
+        error = False
+        try:
+            if self._generaciones.get(key) == generacion:
+                resultado = task(*args, **kwargs)
+        except Exception as e:
+            error = True
+            print(f"Error en worker {key}: {e}")
+        finally:
+            duracion = time.monotonic() - inicio
+            with self._lock:
+                self._en_ejecucion -= 1
+                self._completas += 1
+                self._errores += error
+                self._ejecucion_total += duracion
+                self._ejecucion_max = max(self._ejecucion_max, duracion)
+                vigente = self._generaciones.get(key) == generacion
+                if vigente:
+                    self._pendientes.pop(key, None)
+                else:
+                    self._reemplazadas += 1
         
-        with self._lock:
-            self._active_workers[key] = thread
+        if error or not vigente or callback is None:
+            return resultado
         
-        thread.start()
+        if self._root is not None:
+            self._completadas.put((key, generacion, callback, resultado))
+        else:
+            try:
+                callback(resultado)
+            except Exception as e:
+                print(f"Error en callback {key}: {e}")
+        return resultado
     
     def cancel(self, key: str):
-        """Cancelar una tarea específica"""
+        """Cancelar una tarea específica (su resultado ya no se entregará)"""
         with self._lock:
-            if key in self._cancel_flags:
-                self._cancel_flags[key] = True
-            
-            if key in self._active_workers:
-                # No podemos forzar la cancelación del thread,
-                # pero el flag indicará que debe detenerse
-                pass
+            if key in self._generaciones:
+                self._generaciones[key] += 1
+            futuro = self._pendientes.pop(key, None)
+        if futuro is not None and futuro.cancel():
+            with self._lock:
+                self._encoladas -= 1
     
     def cancel_all(self):
         """Cancelar todas las tareas activas"""
-        with self._lock:
-            for key in list(self._cancel_flags.keys()):
-                self._cancel_flags[key] = True
+        for key in list(self._generaciones.keys()):
+            self.cancel(key)
     
     def is_cancelled(self, key: str) -> bool:
-        """Verificar si una tarea fue cancelada"""
-        return self._cancel_flags.get(key, True)
+        """Verificar si una tarea fue cancelada o ya terminó"""
+        futuro = self._pendientes.get(key)
+        return futuro is None or futuro.done()
+    
+    def shutdown(self):
+        """Cancelar lo pendiente y liberar los hilos del pool"""
+        self.cancel_all()
+        self.detach_root()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Profundidad de cola, tareas en curso y latencias (en ms)"""
+        with self._lock:
+            completas = self._completas
+            return {
+                'max_workers': self.max_workers,
+                'en_cola': self._encoladas,
+                'en_ejecucion': self._en_ejecucion,
+                'callbacks_pendientes': self._completadas.qsize(),
+                'enviadas': self._enviadas,
+                'completadas': completas,
+                'reemplazadas': self._reemplazadas,
+                'errores': self._errores,
+                'espera_promedio_ms': (self._espera_total / completas * 1000) if completas else 0.0,
+                'espera_max_ms': self._espera_max * 1000,
+                'ejecucion_promedio_ms': (self._ejecucion_total / completas * 1000) if completas else 0.0,
+                'ejecucion_max_ms': self._ejecucion_max * 1000,
+            }
 
 
 class VirtualTable:
@@ -247,8 +503,18 @@ class UIOptimizer:
     
     def __init__(self):
         self.debounce = DebounceManager()
-        self.cache = CacheManager(max_size=200, ttl_seconds=600)
-        self.worker = BackgroundWorker(max_workers=4)
+        self.cache = CacheManager(max_size=UI_CACHE_MAX_SIZE, ttl_seconds=UI_CACHE_TTL_SECONDS)
+        self.worker = BackgroundWorker(max_workers=UI_MAX_BACKGROUND_WORKERS)
+    
+    def attach_root(self, root):
+        """Asociar el root de Tk: debounces con after() y callbacks asíncronos en la UI"""
+        self.debounce.attach_widget(root)
+        self.worker.attach_root(root)
+    
+    def detach_root(self):
+        """Desasociar el root (al cerrar la ventana que lo asoció)"""
+        self.debounce.attach_widget(None)
+        self.worker.detach_root()
     
     def debounce_search(self, widget_id: str, delay_ms: int, search_func: Callable,
                        *args, **kwargs):
@@ -263,7 +529,8 @@ class UIOptimizer:
         """
         self.debounce.debounce(f"search_{widget_id}", delay_ms, search_func, *args, **kwargs)
     
-    def cached_filter(self, filter_func: Callable, data: List, criteria: Any) -> List:
+    def cached_filter(self, filter_func: Callable, data: List, criteria: Any, *,
+                      conjunto: Any, version: Any, nombre: Optional[str] = None) -> List:
         """
         Filtrado con caché
         
@@ -271,12 +538,32 @@ class UIOptimizer:
             filter_func: Función que filtra los datos
             data: Lista de datos a filtrar
             criteria: Criterio de filtrado
+            conjunto: Qué lista es ``data`` (ej. 'censo_habitantes' o
+                ('coop', coop_id)); dos listas distintas filtradas con el mismo
+                criterio no comparten resultado
+            version: Versión de ese conjunto en el momento en que se leyó ``data``
+                (ej. obtener_gestor().version_datos tomado al cargar). Obligatorio:
+                cambia en cada alta, edición o baja, así que una edición en sitio
+                no sirve resultados viejos.
+            nombre: Nombre del filtro en la clave. Por omisión módulo y
+                ``__qualname__`` de filter_func, así una lambda creada en cada
+                llamada sigue encontrando su resultado; pasarlo si dos filtros
+                distintos comparten ese nombre (dos lambdas del mismo método).
         
         Returns:
             Lista filtrada
         """
+        if conjunto is None or version is None:
+            raise ValueError("cached_filter requiere el conjunto y la versión de los datos")
+        if nombre is None:
+            calificado = getattr(filter_func, '__qualname__', None)
+            if calificado is None:
+                raise ValueError("cached_filter requiere 'nombre' para filtros sin __qualname__")
+            nombre = f"{filter_func.__module__}.{calificado}"
+        key = ('filter', conjunto, version, nombre, repr(criteria))
+        
         # Intentar obtener del caché
-        cached_result = self.cache.get('filter', len(data), str(criteria))
+        cached_result = self.cache.get(*key)
         if cached_result is not None:
             return cached_result
         
@@ -284,7 +571,7 @@ class UIOptimizer:
         result = filter_func(data, criteria)
         
         # Guardar en caché
-        self.cache.set(result, 'filter', len(data), str(criteria))
+        self.cache.set(result, *key)
         
         return result
     
@@ -299,13 +586,17 @@ class UIOptimizer:
             ui_callback: Función a ejecutar en UI con el resultado
             *args, **kwargs: Argumentos para update_func
         """
-        self.worker.run_async(key, update_func, ui_callback, *args, **kwargs)
+        return self.worker.run_async(key, update_func, ui_callback, *args, **kwargs)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas del optimizador (caché de filtros y worker)"""
+        return {'cache': self.cache.get_stats(), 'worker': self.worker.get_stats()}
     
     def cleanup(self):
         """Limpiar recursos"""
         self.debounce.cancel_all()
         self.cache.clear()
-        self.worker.cancel_all()
+        self.worker.shutdown()
 
 
 # Instancia global para usar en toda la aplicación
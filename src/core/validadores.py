@@ -2,10 +2,16 @@
 Modulo de validaciones centralizadas
 Contiene todas las funciones de validacion del sistema
 Proporciona validacion robusta para entrada de datos en todos los modulos
+
+Cada validacion se implementa una sola vez como un revisor ``_revisar_*`` que
+devuelve (valor_limpio, None) o (None, mensaje) sin lanzar excepciones. Las
+funciones ``validar_*`` lanzan ErrorValidacion con ese mensaje (uso por campo
+en formularios) y EsquemaRegistro aplica los revisores a un registro o a un
+lote completo y junta todos los errores (importaciones masivas).
 """
 
 import re
-from datetime import datetime
+from datetime import date, datetime
 from src.config import (
     LONGITUD_MINIMA_NOMBRE,
     LONGITUD_MAXIMA_NOMBRE,
@@ -17,6 +23,192 @@ class ErrorValidacion(Exception):
     """Excepcion para errores de validacion"""
     pass
 
+
+# ============================================================================
+# PATRONES PRECOMPILADOS
+# ============================================================================
+# Se arman una vez al importar el modulo; antes cada llamada reconstruia su
+# conjunto de caracteres o volvia a interpretar la expresion regular.
+
+# Letras, numeros, espacios, guiones y acentos en minuscula
+_PATRON_NOMBRE = re.compile(r'[A-Za-z0-9 \-áéíóúñü]*')
+_PATRON_FOLIO = re.compile(r'(FOL|HAB)-\d{4}')
+_PATRON_TELEFONO = re.compile(r'[\d() \-]*')
+_PATRON_NO_DIGITO = re.compile(r'\D')
+_PATRON_FECHA_ISO = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})')
+_PATRON_FECHA_DMY = re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})')
+_PATRON_PELIGROSOS = re.compile(r'[<>\"\'%;()&+]')
+_PATRON_ESPACIOS = re.compile(r'\s+')
+_PATRONES_PELIGROSOS_EXCEPCIONES = {}
+
+GENEROS_VALIDOS = ('M', 'F', 'O', 'N/A')
+ESTADOS_PAGO_VALIDOS = ('pendiente', 'parcial', 'completo', 'pagado')
+_GENEROS = frozenset(GENEROS_VALIDOS)
+_ESTADOS_PAGO = frozenset(ESTADOS_PAGO_VALIDOS)
+
+_MENSAJE_GENERO = f"Genero invalido. Valores permitidos: {', '.join(GENEROS_VALIDOS)}"
+_MENSAJE_ESTADO_PAGO = f"Estado invalido. Valores permitidos: {', '.join(ESTADOS_PAGO_VALIDOS)}"
+
+
+def _fecha_iso(texto):
+    """date de 'YYYY-MM-DD' (mes y dia de 1 o 2 digitos), o None"""
+    partes = _PATRON_FECHA_ISO.fullmatch(texto)
+    if partes is None:
+        return None
+    try:
+        return date(int(partes[1]), int(partes[2]), int(partes[3]))
+    except ValueError:
+        return None
+
+
+def _fecha_dmy(texto):
+    """date de 'DD/MM/YYYY' (dia y mes de 1 o 2 digitos), o None"""
+    partes = _PATRON_FECHA_DMY.fullmatch(texto)
+    if partes is None:
+        return None
+    try:
+        return date(int(partes[3]), int(partes[2]), int(partes[1]))
+    except ValueError:
+        return None
+
+
+# ============================================================================
+# REVISORES (sin excepciones)
+# ============================================================================
+
+def _revisar_nombre(nombre):
+    if not isinstance(nombre, str):
+        return None, "El nombre debe ser texto"
+    nombre = nombre.strip()
+    if not nombre:
+        return None, "El nombre no puede estar vacio"
+    if len(nombre) < LONGITUD_MINIMA_NOMBRE:
+        return None, f"El nombre debe tener al menos {LONGITUD_MINIMA_NOMBRE} caracteres"
+    if len(nombre) > LONGITUD_MAXIMA_NOMBRE:
+        return None, f"El nombre no puede exceder {LONGITUD_MAXIMA_NOMBRE} caracteres"
+    if _PATRON_NOMBRE.fullmatch(nombre) is None:
+        return None, "El nombre contiene caracteres no permitidos"
+    return nombre, None
+
+
+def _revisar_monto(monto):
+    try:
+        monto_float = float(monto)
+    except (ValueError, TypeError):
+        return None, "El monto debe ser un número válido"
+    if monto_float < 0:
+        return None, "El monto no puede ser negativo"
+    if monto_float == 0:
+        return None, "El monto debe ser mayor a $0.00"
+    if monto_float < MONTO_MINIMO:
+        return None, f"El monto debe ser mayor o igual a ${MONTO_MINIMO:.2f}"
+    if monto_float > MONTO_MAXIMO:
+        return None, f"El monto no puede exceder ${MONTO_MAXIMO:.2f}"
+    monto_float = round(monto_float, 2)
+    if len(str(monto_float).split('.')[-1]) > 2:
+        return None, "El monto no puede tener más de 2 decimales"
+    return monto_float, None
+
+
+def _revisar_folio(folio):
+    if not isinstance(folio, str):
+        return None, "El folio debe ser texto"
+    folio = folio.strip().upper()
+    if not folio:
+        return None, "El folio no puede estar vacio"
+    if _PATRON_FOLIO.fullmatch(folio) is None:
+        return None, "El folio debe tener formato FOL-XXXX o HAB-XXXX"
+    if folio.startswith('HAB-'):
+        folio = 'FOL-' + folio[4:]
+    return folio, None
+
+
+def _revisar_email(email):
+    if not isinstance(email, str):
+        return None, "Email invalido"
+    email = email.strip().lower()
+    if not email:
+        return email, None
+    usuario, arroba, dominio = email.partition('@')
+    if not arroba or '.' not in dominio.split('@')[0]:
+        return None, "Email invalido"
+    if len(email) > 100:
+        return None, "Email demasiado largo"
+    return email, None
+
+
+def _revisar_telefono(telefono):
+    if not isinstance(telefono, str):
+        return None, "Telefono invalido"
+    telefono = telefono.strip()
+    if not telefono:
+        return telefono, None
+    if _PATRON_TELEFONO.fullmatch(telefono) is None:
+        return None, "Telefono invalido"
+    digitos = len(_PATRON_NO_DIGITO.sub('', telefono))
+    if digitos < 7:
+        return None, "Telefono debe tener al menos 7 digitos"
+    if digitos > 15:
+        return None, "Telefono demasiado largo"
+    return telefono, None
+
+
+def _revisar_url(url):
+    if not isinstance(url, str):
+        return None, "URL debe comenzar con http:// o https://"
+    url = url.strip()
+    if not url:
+        return url, None
+    if not url.startswith(('http://', 'https://')):
+        return None, "URL debe comenzar con http:// o https://"
+    if len(url) > 500:
+        return None, "URL demasiado larga"
+    return url, None
+
+
+def _revisar_genero(genero):
+    if not isinstance(genero, str):
+        return None, "El genero debe ser texto"
+    genero = genero.strip().upper()
+    if genero not in _GENEROS:
+        return None, _MENSAJE_GENERO
+    return genero, None
+
+
+def _revisar_estado_pago(estado):
+    if not isinstance(estado, str):
+        return None, "El estado debe ser texto"
+    estado = estado.strip().lower()
+    if estado not in _ESTADOS_PAGO:
+        return None, _MENSAJE_ESTADO_PAGO
+    return estado, None
+
+
+def _revisar_fecha_formato(fecha):
+    if not isinstance(fecha, str):
+        return None, "La fecha debe ser texto"
+    fecha = fecha.strip()
+    # Formato interno del sistema: se devuelve tal cual
+    if _fecha_iso(fecha) is not None:
+        return fecha, None
+    # Formato usuario: convertir a formato interno
+    if _fecha_dmy(fecha) is not None:
+        dia, mes, anio = fecha.split('/')
+        return f"{anio}-{mes}-{dia}", None
+    return None, "La fecha debe estar en formato YYYY-MM-DD o DD/MM/YYYY"
+
+
+def _lanzar(resultado):
+    valor, error = resultado
+    if error is not None:
+        raise ErrorValidacion(error)
+    return valor
+
+
+# ============================================================================
+# VALIDADORES POR CAMPO
+# ============================================================================
+
 def validar_nombre(nombre):
     """
     Valida un nombre de habitante o cooperacion
@@ -30,26 +222,7 @@ def validar_nombre(nombre):
     Raises:
         ErrorValidacion: Si el nombre no es valido
     """
-    if not isinstance(nombre, str):
-        raise ErrorValidacion("El nombre debe ser texto")
-    
-    nombre = nombre.strip()
-    
-    if not nombre:
-        raise ErrorValidacion("El nombre no puede estar vacio")
-    
-    if len(nombre) < LONGITUD_MINIMA_NOMBRE:
-        raise ErrorValidacion(f"El nombre debe tener al menos {LONGITUD_MINIMA_NOMBRE} caracteres")
-    
-    if len(nombre) > LONGITUD_MAXIMA_NOMBRE:
-        raise ErrorValidacion(f"El nombre no puede exceder {LONGITUD_MAXIMA_NOMBRE} caracteres")
-    
-    # Validar caracteres permitidos (letras, números, espacios, guiones, acentos)
-    caracteres_validos = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 -áéíóúñü')
-    if not all(c in caracteres_validos for c in nombre):
-        raise ErrorValidacion("El nombre contiene caracteres no permitidos")
-    
-    return nombre
+    return _lanzar(_revisar_nombre(nombre))
 
 def validar_monto(monto):
     """
@@ -74,36 +247,7 @@ def validar_monto(monto):
         ✓ Debe estar entre MONTO_MINIMO y MONTO_MAXIMO
         ✓ No puede tener más de 2 decimales
     """
-    # 1. Validar que sea un número válido
-    try:
-        monto_float = float(monto)
-    except (ValueError, TypeError):
-        raise ErrorValidacion("El monto debe ser un número válido")
-    
-    # 2. VALIDACIÓN CRÍTICA: Rechazar números negativos
-    if monto_float < 0:
-        raise ErrorValidacion("El monto no puede ser negativo")
-    
-    # 3. VALIDACIÓN CRÍTICA: Rechazar cero
-    if monto_float == 0:
-        raise ErrorValidacion("El monto debe ser mayor a $0.00")
-    
-    # 4. Validar contra límite mínimo
-    if monto_float < MONTO_MINIMO:
-        raise ErrorValidacion(f"El monto debe ser mayor o igual a ${MONTO_MINIMO:.2f}")
-    
-    # 5. Validar contra límite máximo
-    if monto_float > MONTO_MAXIMO:
-        raise ErrorValidacion(f"El monto no puede exceder ${MONTO_MAXIMO:.2f}")
-    
-    # 6. Redondear a 2 decimales (evitar errores de precisión flotante)
-    monto_float = round(monto_float, 2)
-    
-    # 7. Validar que tenga máximo 2 decimales
-    if len(str(monto_float).split('.')[-1]) > 2:
-        raise ErrorValidacion("El monto no puede tener más de 2 decimales")
-    
-    return monto_float
+    return _lanzar(_revisar_monto(monto))
 
 def validar_folio(folio):
     """
@@ -118,24 +262,7 @@ def validar_folio(folio):
     Raises:
         ErrorValidacion: Si el folio no es valido
     """
-    if not isinstance(folio, str):
-        raise ErrorValidacion("El folio debe ser texto")
-    
-    folio = folio.strip().upper()
-    
-    if not folio:
-        raise ErrorValidacion("El folio no puede estar vacio")
-    
-    # Aceptar tanto FOL- como HAB- como prefijo válido
-    import re
-    if not re.match(r'^(FOL|HAB)-\d{4}$', folio):
-        raise ErrorValidacion("El folio debe tener formato FOL-XXXX o HAB-XXXX")
-    
-    # Normalizar a FOL- si viene con HAB-
-    if folio.startswith('HAB-'):
-        folio = 'FOL-' + folio[4:]
-    
-    return folio
+    return _lanzar(_revisar_folio(folio))
 
 def validar_email(email):
     """
@@ -150,19 +277,7 @@ def validar_email(email):
     Raises:
         ErrorValidacion: Si el email no es valido
     """
-    email = email.strip().lower()
-    
-    if not email:
-        return email  # Email opcional
-    
-    # Validacion basica de email
-    if '@' not in email or '.' not in email.split('@')[1]:
-        raise ErrorValidacion("Email invalido")
-    
-    if len(email) > 100:
-        raise ErrorValidacion("Email demasiado largo")
-    
-    return email
+    return _lanzar(_revisar_email(email))
 
 def validar_telefono(telefono):
     """
@@ -177,25 +292,7 @@ def validar_telefono(telefono):
     Raises:
         ErrorValidacion: Si el telefono no es valido
     """
-    telefono = telefono.strip()
-    
-    if not telefono:
-        return telefono  # Telefono opcional
-    
-    # Solo debe contener numeros y caracteres de formato
-    if not all(c.isdigit() or c in '()- ' for c in telefono):
-        raise ErrorValidacion("Telefono invalido")
-    
-    # Remover espacios y caracteres de formato para contar digitos
-    digitos = ''.join(c for c in telefono if c.isdigit())
-    
-    if len(digitos) < 7:
-        raise ErrorValidacion("Telefono debe tener al menos 7 digitos")
-    
-    if len(digitos) > 15:
-        raise ErrorValidacion("Telefono demasiado largo")
-    
-    return telefono
+    return _lanzar(_revisar_telefono(telefono))
 
 def validar_url(url):
     """
@@ -210,18 +307,7 @@ def validar_url(url):
     Raises:
         ErrorValidacion: Si la URL no es valida
     """
-    url = url.strip()
-    
-    if not url:
-        return url  # URL opcional
-    
-    if not (url.startswith('http://') or url.startswith('https://')):
-        raise ErrorValidacion("URL debe comenzar con http:// o https://")
-    
-    if len(url) > 500:
-        raise ErrorValidacion("URL demasiado larga")
-    
-    return url
+    return _lanzar(_revisar_url(url))
 
 def validar_fechas(fecha_inicio, fecha_fin):
     """
@@ -237,10 +323,9 @@ def validar_fechas(fecha_inicio, fecha_fin):
     Raises:
         ErrorValidacion: Si las fechas no son validas
     """
-    try:
-        inicio = datetime.strptime(fecha_inicio, '%d/%m/%Y')
-        fin = datetime.strptime(fecha_fin, '%d/%m/%Y')
-    except ValueError:
+    inicio = _fecha_dmy(fecha_inicio) if isinstance(fecha_inicio, str) else None
+    fin = _fecha_dmy(fecha_fin) if isinstance(fecha_fin, str) else None
+    if inicio is None or fin is None:
         raise ErrorValidacion("Las fechas deben estar en formato DD/MM/YYYY")
     
     if inicio > fin:
@@ -296,17 +381,7 @@ def validar_genero(genero):
     Raises:
         ErrorValidacion: Si el genero no es valido
     """
-    if not isinstance(genero, str):
-        raise ErrorValidacion("El genero debe ser texto")
-    
-    genero = genero.strip().upper()
-    
-    generos_validos = ['M', 'F', 'O', 'N/A']
-    
-    if genero not in generos_validos:
-        raise ErrorValidacion(f"Genero invalido. Valores permitidos: {', '.join(generos_validos)}")
-    
-    return genero
+    return _lanzar(_revisar_genero(genero))
 
 
 def validar_campo_obligatorio(valor, nombre_campo):
@@ -406,17 +481,7 @@ def validar_estado_pago(estado):
     Raises:
         ErrorValidacion: Si el estado no es valido
     """
-    if not isinstance(estado, str):
-        raise ErrorValidacion("El estado debe ser texto")
-    
-    estado = estado.strip().lower()
-    
-    estados_validos = ['pendiente', 'parcial', 'completo', 'pagado']
-    
-    if estado not in estados_validos:
-        raise ErrorValidacion(f"Estado invalido. Valores permitidos: {', '.join(estados_validos)}")
-    
-    return estado
+    return _lanzar(_revisar_estado_pago(estado))
 
 
 def validar_fecha_formato(fecha):
@@ -432,28 +497,7 @@ def validar_fecha_formato(fecha):
     Raises:
         ErrorValidacion: Si la fecha no es valida
     """
-    if not isinstance(fecha, str):
-        raise ErrorValidacion("La fecha debe ser texto")
-    
-    fecha = fecha.strip()
-    
-    # Intentar formato YYYY-MM-DD (formato interno del sistema)
-    try:
-        datetime.strptime(fecha, '%Y-%m-%d')
-        return fecha  # Ya está en formato correcto
-    except ValueError:
-        pass
-    
-    # Intentar formato DD/MM/YYYY (formato usuario)
-    try:
-        datetime.strptime(fecha, '%d/%m/%Y')
-        # Convertir a formato interno
-        partes = fecha.split('/')
-        return f"{partes[2]}-{partes[1]}-{partes[0]}"
-    except ValueError:
-        pass
-    
-    raise ErrorValidacion("La fecha debe estar en formato YYYY-MM-DD o DD/MM/YYYY")
+    return _lanzar(_revisar_fecha_formato(fecha))
 
 
 def validar_fecha_no_futura(fecha):
@@ -461,18 +505,19 @@ def validar_fecha_no_futura(fecha):
     Valida que una fecha no sea posterior a hoy
     
     Args:
-        fecha (str): Fecha en formato DD/MM/YYYY
+        fecha (str): Fecha en formato YYYY-MM-DD o DD/MM/YYYY
         
     Returns:
-        str: Fecha validada
+        str: Fecha validada en formato YYYY-MM-DD
         
     Raises:
         ErrorValidacion: Si la fecha es futura
     """
     fecha_validada = validar_fecha_formato(fecha)
-    fecha_obj = datetime.strptime(fecha_validada, '%d/%m/%Y')
+    # validar_fecha_formato siempre devuelve YYYY-MM-DD
+    fecha_obj = _fecha_iso(fecha_validada)
     
-    if fecha_obj.date() > datetime.now().date():
+    if fecha_obj > date.today():
         raise ErrorValidacion("La fecha no puede ser posterior a hoy")
     
     return fecha_validada
@@ -496,12 +541,15 @@ def validar_no_caracteres_especiales(valor, nombre_campo, excepciones=''):
     if not isinstance(valor, str):
         raise ErrorValidacion(f"{nombre_campo} debe ser texto")
     
-    caracteres_peligrosos = r'[<>\"\'%;()&+]'
+    patron = _PATRON_PELIGROSOS
     if excepciones:
-        excepciones_escape = re.escape(excepciones)
-        caracteres_peligrosos = f'[<>\"\'%;()&+](?![{excepciones_escape}])'
+        patron = _PATRONES_PELIGROSOS_EXCEPCIONES.get(excepciones)
+        if patron is None:
+            excepciones_escape = re.escape(excepciones)
+            patron = re.compile(f'[<>\"\'%;()&+](?![{excepciones_escape}])')
+            _PATRONES_PELIGROSOS_EXCEPCIONES[excepciones] = patron
     
-    if re.search(caracteres_peligrosos, valor):
+    if patron.search(valor):
         raise ErrorValidacion(f"{nombre_campo} contiene caracteres no permitidos")
     
     return valor
@@ -554,6 +602,109 @@ def sanitizar_entrada(valor):
     valor = valor.strip()
     
     # Reemplazar multiples espacios con un solo espacio
-    valor = re.sub(r'\s+', ' ', valor)
+    valor = _PATRON_ESPACIOS.sub(' ', valor)
     
     return valor
+
+
+# ============================================================================
+# VALIDACION POR ESQUEMA (REGISTROS Y LOTES)
+# ============================================================================
+
+# Revisores disponibles para declarar los campos de un esquema
+REVISORES = {
+    'nombre': _revisar_nombre,
+    'monto': _revisar_monto,
+    'folio': _revisar_folio,
+    'email': _revisar_email,
+    'telefono': _revisar_telefono,
+    'url': _revisar_url,
+    'genero': _revisar_genero,
+    'estado_pago': _revisar_estado_pago,
+    'fecha': _revisar_fecha_formato,
+}
+
+
+class EsquemaRegistro:
+    """
+    Validador de registros completos armado una sola vez
+
+    Recorre todos los campos y junta todos los errores en lugar de cortar en
+    el primero, sin lanzar ni capturar excepciones por fila. Los campos que
+    no declara el esquema pasan sin cambios.
+    """
+
+    def __init__(self, campos):
+        """
+        Args:
+            campos (dict): {campo: (tipo, obligatorio)}; tipo es una clave de REVISORES
+        """
+        self.campos = tuple(
+            (campo, REVISORES[tipo], bool(obligatorio), f"{campo} es obligatorio")
+            for campo, (tipo, obligatorio) in campos.items()
+        )
+
+    def validar(self, registro):
+        """
+        Validar un registro
+
+        Args:
+            registro (dict): Datos a validar
+
+        Returns:
+            tuple: (dict limpio o None, lista de (campo, mensaje))
+        """
+        if not isinstance(registro, dict):
+            return None, [(None, "Los datos deben ser un diccionario")]
+
+        limpio = dict(registro)
+        errores = []
+        for campo, revisar, obligatorio, mensaje_obligatorio in self.campos:
+            valor = registro.get(campo)
+            if valor is None or (valor.__class__ is str and not valor.strip()):
+                if obligatorio:
+                    errores.append((campo, mensaje_obligatorio))
+                continue
+            valor, error = revisar(valor)
+            if error is None:
+                limpio[campo] = valor
+            else:
+                errores.append((campo, error))
+        return (None if errores else limpio), errores
+
+    def validar_lote(self, registros):
+        """
+        Validar muchos registros de una vez (importaciones)
+
+        Args:
+            registros (iterable): Registros (dict) a validar
+
+        Returns:
+            tuple: (lista de registros limpios, lista de (indice, campo, mensaje))
+        """
+        validar = self.validar
+        validos = []
+        errores = []
+        agregar_valido = validos.append
+        agregar_errores = errores.extend
+        for indice, registro in enumerate(registros):
+            limpio, errores_registro = validar(registro)
+            if errores_registro:
+                agregar_errores((indice, campo, mensaje) for campo, mensaje in errores_registro)
+            else:
+                agregar_valido(limpio)
+        return validos, errores
+
+
+ESQUEMA_HABITANTE = EsquemaRegistro({
+    'nombre': ('nombre', True),
+    'folio': ('folio', False),
+    'telefono': ('telefono', False),
+    'email': ('email', False),
+})
+
+ESQUEMA_PAGO = EsquemaRegistro({
+    'monto': ('monto', True),
+    'fecha': ('fecha', False),
+    'estado': ('estado_pago', False),
+})
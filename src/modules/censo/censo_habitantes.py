@@ -11,7 +11,6 @@ import sys
 import time
 import os
 from datetime import datetime
-import threading
 import queue
 
 # Configurar path para imports cuando se ejecuta directamente
@@ -25,6 +24,8 @@ from src.ui.tema_moderno import FUENTES
 from src.core.logger import registrar_operacion, registrar_error
 from src.core.optimizador_ui import get_ui_optimizer
 from src.core.gestor_datos_global import obtener_gestor
+from src.core.mantenimiento_bd import iniciar_mantenimiento_bd
+from src.core.instancia_unica import ACCION_MOSTRAR, abrir_o_enfocar, asegurar_instancia_unica
 from src.modules.indicadores.indicadores_estado import calcular_estado_habitante
 
 # Imports de módulos internos del censo
@@ -36,6 +37,9 @@ from src.modules.censo.censo_preferencias import cargar_preferencias, guardar_pr
 from src.modules.censo.censo_tooltips import configurar_tooltips, mostrar_tooltip_indicador, ocultar_tooltip_indicador
 from src.modules.censo.censo_optimizaciones import cargar_habitantes_async, actualizar_tabla_incremental
 
+# Resultado de un filtrado que falló: la tabla conserva las filas que tenía
+FILTRADO_FALLIDO = object()
+
 
 class SistemaCensoHabitantes:
     def __init__(self, root):
@@ -64,20 +68,19 @@ class SistemaCensoHabitantes:
         self.filtro_estado = tk.StringVar(value="Todos")
         self._search_job = None
         
-        # Sistema de optimización UI
+        # Sistema de optimización UI (los callbacks asíncronos corren en el hilo de Tk)
         self._optimizer = get_ui_optimizer()
-        self._search_cache = {}
+        self._optimizer.attach_root(self.root)
+        self._version_habitantes = None  # version_datos del gestor al cargar self.habitantes
         self._last_search_key = None
 
-        # Cache y threading para indicadores
+        # Cache para indicadores
         self._indicadores_cache_result = None
         self._indicadores_cache_time = 0
-        self._indicadores_worker = None
         
         # Control de threading y operaciones asíncronas
         self._carga_en_progreso = False
         self._actualizacion_en_progreso = False
-        self._cancelar_busqueda = False
         self._cola_tareas = queue.Queue()
         self._thread_worker = None
         
@@ -441,43 +444,41 @@ class SistemaCensoHabitantes:
             filtro
         )
     
-    def _ejecutar_busqueda_async(self, criterio: str, filtro: str):
-        """Ejecutar búsqueda de forma asíncrona"""
-        # Verificar caché primero
-        cache_key = f"{criterio}_{filtro}"
-        
-        if cache_key in self._search_cache:
-            # Usar resultado en caché
-            self.root.after(0, lambda: self._finalizar_filtrado(
-                self._search_cache[cache_key], criterio, filtro
-            ))
-            return
+    def _tarea_filtrado(self, criterio: str, filtro: str):
+        """
+        Tarea de filtrado para el worker sobre la lista cargada ahora
+        
+        Si el filtrado falla devuelve FILTRADO_FALLIDO: no se guarda en caché
+        ni deja la tabla vacía.
+        """
+        habitantes = self.habitantes
+        version = self._version_habitantes
         
-        # Ejecutar filtrado en background
         def _filtrar_task():
             try:
                 if not criterio and filtro == 'Todos':
-                    return self.habitantes.copy()
-                else:
-                    return aplicar_filtros(self.habitantes, criterio, filtro)
+                    return habitantes.copy()
+                if version is None:
+                    return aplicar_filtros(habitantes, criterio, filtro)
+                # Caché por versión de los datos: una recarga o edición no sirve resultados viejos
+                return self._optimizer.cached_filter(
+                    lambda datos, criterios: aplicar_filtros(datos, *criterios),
+                    habitantes, (criterio, filtro),
+                    conjunto='censo_habitantes', version=version, nombre='aplicar_filtros')
             except Exception as e:
-                print(f"Error filtrando: {e}")
-                return []
-        
-        def _on_complete(resultados):
-            # Guardar en caché (limitar tamaño)
-            if len(self._search_cache) > 50:
-                # Eliminar entradas antiguas
-                self._search_cache.clear()
-            
-            self._search_cache[cache_key] = resultados
-            self._finalizar_filtrado(resultados, criterio, filtro)
+                registrar_error('censo_habitantes', '_filtrar_task', str(e),
+                                {'criterio': criterio, 'filtro': filtro})
+                return FILTRADO_FALLIDO
         
-        # Ejecutar en background
+        return _filtrar_task
+    
+    def _ejecutar_busqueda_async(self, criterio: str, filtro: str):
+        """Ejecutar búsqueda de forma asíncrona"""
+        # Misma key que los filtros: la última búsqueda reemplaza a las anteriores
         self._optimizer.async_update(
             f"censo_filter_{id(self)}",
-            _filtrar_task,
-            _on_complete
+            self._tarea_filtrado(criterio, filtro),
+            lambda resultados: self._finalizar_filtrado(resultados, criterio, filtro)
         )
     
     def _aplicar_filtros_async(self):
@@ -487,41 +488,24 @@ class SistemaCensoHabitantes:
             self.root.after_cancel(self._search_job)
             self._search_job = None
         
-        # Prevenir actualizaciones concurrentes
-        if hasattr(self, '_actualizacion_en_progreso') and self._actualizacion_en_progreso:
-            return
-        
-        self._cancelar_busqueda = False
         self._actualizacion_en_progreso = True
         
         criterio = self.search_var.get().strip().lower()
         filtro = self.filtro_estado.get()
         
-        def _filtrar_thread():
-            try:
-                # Filtrar en background
-                if not criterio and filtro == 'Todos':
-                    resultados = self.habitantes.copy()
-                else:
-                    resultados = aplicar_filtros(self.habitantes, criterio, filtro)
-                
-                # Si fue cancelada, no actualizar
-                if not self._cancelar_busqueda:
-                    self.root.after(0, lambda: self._finalizar_filtrado(resultados, criterio, filtro))
-                else:
-                    self._actualizacion_en_progreso = False
-                    
-            except Exception as e:
-                print(f"Error filtrando: {e}")
-                self._actualizacion_en_progreso = False
-        
-        # Ejecutar filtrado en thread
-        thread = threading.Thread(target=_filtrar_thread, daemon=True)
-        thread.start()
+        # Un filtro nuevo reemplaza al que esté en curso: solo se pinta el último
+        self._optimizer.async_update(
+            f"censo_filter_{id(self)}",
+            self._tarea_filtrado(criterio, filtro),
+            lambda resultados: self._finalizar_filtrado(resultados, criterio, filtro)
+        )
     
     def _finalizar_filtrado(self, resultados, criterio, filtro):
         """Finaliza el filtrado actualizando la UI"""
         try:
+            if resultados is FILTRADO_FALLIDO:
+                # Error ya registrado: mantener las filas actuales
+                return
             if hasattr(self, 'habitantes_filtrados'):
                 self.habitantes_filtrados = resultados
             self._actualizar_tabla(resultados)
@@ -597,14 +581,14 @@ class SistemaCensoHabitantes:
     # ===== MÉTODOS DE PANEL LATERAL =====
     
     def _on_seleccionar_habitante(self, event=None):
-        """Maneja la selección de un habitante"""
-        folio = self.__folio_seleccionado()
-        if not folio:
-            return
+        """Maneja la selección de un habitante (con debounce: solo se pinta la última fila)"""
+        def _habitante_seleccionado():
+            folio = self.__folio_seleccionado()
+            if not folio:
+                return None
+            return next((h for h in self.habitantes if h['folio'] == folio), None)
         
-        habitante = next((h for h in self.habitantes if h['folio'] == folio), None)
-        if habitante:
-            self.panel_detalles.mostrar_detalles(habitante)
+        self.panel_detalles.programar_detalles(_habitante_seleccionado)
     
     def _editar_nota_seleccionada(self, habitante):
         """Edita la nota del habitante seleccionado"""
@@ -727,7 +711,8 @@ class SistemaCensoHabitantes:
                 return
 
             # Si ya hay un cálculo en curso, no iniciar otro
-            if self._indicadores_worker and self._indicadores_worker.is_alive():
+            clave_worker = f"censo_indicadores_{id(self)}"
+            if not self._optimizer.worker.is_cancelled(clave_worker):
                 return
 
             habitantes_snapshot = list(self.habitantes)
@@ -748,16 +733,14 @@ class SistemaCensoHabitantes:
                         total_faenas += estado['faenas']['ratio']
 
                     resultado = (total_pagos / count, total_faenas / count)
+                return resultado
 
-                def _aplicar():
-                    self._indicadores_cache_result = resultado
-                    self._indicadores_cache_time = time.time()
-                    self._pintar_indicadores(*resultado)
+            def _aplicar(resultado):
+                self._indicadores_cache_result = resultado
+                self._indicadores_cache_time = time.time()
+                self._pintar_indicadores(*resultado)
 
-                self.root.after(0, _aplicar)
-
-            self._indicadores_worker = threading.Thread(target=_calcular, daemon=True)
-            self._indicadores_worker.start()
+            self._optimizer.async_update(clave_worker, _calcular, _aplicar)
 
         except Exception as e:
             print(f"Error actualizando indicadores: {e}")
@@ -853,6 +836,11 @@ class SistemaCensoHabitantes:
         else:
             self.tree.column('nombre', width=0, minwidth=0)
     
+    def atender_peticion(self, accion, argumentos):
+        """Petición de otro lanzamiento del censo: un folio o texto se busca en la tabla"""
+        if argumentos:
+            self.search_var.set(' '.join(argumentos))
+
     def cleanup_procesos_hijos(self):
         """Termina procesos hijos de pagos y faenas al cerrar"""
         procesos = [
@@ -875,41 +863,40 @@ class SistemaCensoHabitantes:
     def cerrar_con_cleanup(self):
         """Cierra ventana y limpia procesos hijos"""
         self.cleanup_procesos_hijos()
+        self._optimizer.detach_root()
         self.root.destroy()
     
     def abrir_control_pagos(self):
         """Abre el módulo de control de pagos"""
-        self._abrir_modulo_rel("src/modules/pagos/control_pagos.py", proceso_attr="proceso_control_pagos")
+        self._abrir_modulo_rel("src/modules/pagos/control_pagos.py", proceso_attr="proceso_control_pagos",
+                               instancia="pagos")
     
     def abrir_registro_faenas(self):
         """Abre el módulo de registro de faenas"""
-        self._abrir_modulo_rel("src/modules/faenas/control_faenas.py", proceso_attr="proceso_control_faenas")
-
-    def _abrir_modulo_rel(self, rel_path, proceso_attr):
-        """Helper para abrir un módulo por ruta relativa al proyecto raiz"""
-        proceso_actual = getattr(self, proceso_attr, None)
-        if proceso_actual and proceso_actual.poll() is None:
-            messagebox.showinfo("Ventana abierta", "El módulo ya está abierto")
-            return
+        self._abrir_modulo_rel("src/modules/faenas/control_faenas.py", proceso_attr="proceso_control_faenas",
+                               instancia="faenas")
 
+    def _abrir_modulo_rel(self, rel_path, proceso_attr, instancia):
+        """Helper para abrir un módulo por ruta relativa al proyecto raiz (o enfocarlo si ya corre)"""
         try:
             script_dir = os.path.dirname(os.path.abspath(__file__))
             proyecto_raiz = os.path.abspath(os.path.join(script_dir, "..", "..", ".."))
             script_absoluto = os.path.join(proyecto_raiz, *rel_path.split('/'))
 
             if os.path.exists(script_absoluto):
-                if sys.platform == 'win32':
-                    pythonw_exe = sys.executable.replace("python.exe", "pythonw.exe")
-                    if os.path.exists(pythonw_exe):
-                        nuevo_proceso = subprocess.Popen([pythonw_exe, script_absoluto])
-                    else:
+                def lanzar():
+                    if sys.platform == 'win32':
+                        pythonw_exe = sys.executable.replace("python.exe", "pythonw.exe")
+                        if os.path.exists(pythonw_exe):
+                            return subprocess.Popen([pythonw_exe, script_absoluto])
                         CREATE_NO_WINDOW = 0x08000000
-                        nuevo_proceso = subprocess.Popen([sys.executable, script_absoluto],
-                                                         creationflags=CREATE_NO_WINDOW)
-                else:
-                    nuevo_proceso = subprocess.Popen([sys.executable, script_absoluto])
+                        return subprocess.Popen([sys.executable, script_absoluto],
+                                                creationflags=CREATE_NO_WINDOW)
+                    return subprocess.Popen([sys.executable, script_absoluto])
 
-                setattr(self, proceso_attr, nuevo_proceso)
+                nuevo_proceso = abrir_o_enfocar(instancia, lanzar)
+                if nuevo_proceso is not None:
+                    setattr(self, proceso_attr, nuevo_proceso)
             else:
                 messagebox.showerror("Error", f"No se encontró el módulo en: {script_absoluto}")
         except Exception as e:
@@ -917,8 +904,16 @@ class SistemaCensoHabitantes:
 
 
 def main():
+    instancia = asegurar_instancia_unica('censo', sys.argv[1:])
+    if instancia is None:
+        return  # Ya estaba abierto: se trajo al frente con esta petición
+
     root = tk.Tk()
     app = SistemaCensoHabitantes(root)
+    iniciar_mantenimiento_bd(root)
+    # Un folio pasado al arrancar se busca igual que uno enviado a la ventana abierta
+    app.atender_peticion(ACCION_MOSTRAR, sys.argv[1:])
+    instancia.atender(root, app.atender_peticion)
     root.mainloop()
 
 if __name__ == "__main__":
@@ -3,7 +3,6 @@ Funciones optimizadas para el censo
 Reemplazan las funciones originales para evitar congelamiento con grandes volúmenes
 """
 
-import threading
 import tkinter as tk
 from src.core.logger import registrar_error
 from src.config import CENSO_BATCH_INSERT_SIZE, CENSO_UPDATE_UI_EVERY_N
@@ -18,40 +17,56 @@ def cargar_habitantes_async(self):
     
     self._carga_en_progreso = True
     
-    def _cargar_thread():
+    def _cargar_task():
         try:
             print("[Censo] Iniciando carga de habitantes...")
-            habitantes = self.gestor.obtener_habitantes(incluir_inactivos=True)
-            
-            # Actualizar en hilo principal
-            self.root.after(0, lambda: _finalizar_carga_async(self, habitantes))
-            
+            # Versión tomada antes de leer: un cambio posterior deja la lista
+            # con una versión vieja (se vuelve a filtrar), nunca al revés
+            version = self.gestor.version_datos
+            return version, self.gestor.obtener_habitantes(incluir_inactivos=True)
         except Exception as e:
             print(f"Error cargando habitantes: {e}")
             registrar_error('censo_habitantes', 'cargar_habitantes', str(e))
+            return None
+    
+    def _on_cargado(resultado):
+        if resultado is None:
             self._carga_en_progreso = False
+            return
+        version, habitantes = resultado
+        _finalizar_carga_async(self, habitantes, version)
     
-    # Ejecutar en thread separado
-    thread = threading.Thread(target=_cargar_thread, daemon=True)
-    thread.start()
+    # El callback llega al hilo principal por el bombeo del optimizador
+    self._optimizer.async_update(f"censo_carga_{id(self)}", _cargar_task, _on_cargado)
 
 
-def _finalizar_carga_async(self, habitantes):
+def _finalizar_carga_async(self, habitantes, version=None):
     """Finaliza la carga de habitantes en el hilo principal"""
     try:
         self.habitantes = habitantes
+        self._version_habitantes = version
         if hasattr(self, 'habitantes_filtrados'):
             self.habitantes_filtrados = habitantes.copy()
         
-        # Actualizar UI solo si la tabla existe
+        # Actualizar UI solo si la tabla existe. Con una búsqueda o filtro activos
+        # (p. ej. un folio recibido al arrancar, o F5) se vuelven a aplicar
         if hasattr(self, 'tree'):
-            actualizar_tabla_incremental(self, habitantes)
+            if _hay_filtro_activo(self):
+                self._aplicar_filtros_async()
+            else:
+                actualizar_tabla_incremental(self, habitantes)
         
         print(f"[Censo] ✓ {len(habitantes)} habitantes cargados")
     finally:
         self._carga_en_progreso = False
 
 
+def _hay_filtro_activo(self):
+    if hasattr(self, 'search_var') and self.search_var.get().strip():
+        return True
+    return hasattr(self, 'filtro_estado') and self.filtro_estado.get() != 'Todos'
+
+
 def actualizar_tabla_incremental(self, habitantes):
     """Actualizar tabla de forma rápida sin bloquear UI con optimización por lotes"""
     try:
@@ -102,9 +117,11 @@ def actualizar_tabla_incremental(self, habitantes):
         if hasattr(self, 'total_label'):
             self.total_label.config(text=f"Total Habitantes: {len(habitantes)}")
         
-        # Actualizar indicadores y barra de estado de forma asíncrona (no bloquear)
-        if hasattr(self, 'root'):
-            self.root.after_idle(self._actualizar_indicadores_y_barra_async)
+        # Actualizar indicadores y barra de estado cuando la UI quede ociosa;
+        # varias actualizaciones seguidas de la tabla producen un solo redibujado
+        if hasattr(self, '_optimizer'):
+            self._optimizer.debounce.idle(f"censo_indicadores_barra_{id(self)}",
+                                          self._actualizar_indicadores_y_barra_async)
         
     except Exception as e:
         print(f"Error actualizando tabla: {e}")
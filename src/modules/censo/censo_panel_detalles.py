@@ -5,6 +5,8 @@ Muestra información completa del habitante seleccionado
 
 import tkinter as tk
 from tkinter import ttk
+from src.config import UI_DEBOUNCE_SELECCION
+from src.core.optimizador_ui import DebounceManager
 from .censo_utils import estado_texto_color_tag
 
 
@@ -34,135 +36,167 @@ class CensoPanelDetalles:
         self.callback_estado = callback_estado
         
         self.habitante_actual = None
+        self._nota_actual = None
+        self._debounce = DebounceManager(widget=parent)
+        
+        # Esqueleto fijo: se construye una vez y solo cambian sus valores
+        self._crear_esqueleto()
         
         # Crear panel inicial
         self.mostrar_mensaje_inicial()
     
-    def mostrar_mensaje_inicial(self):
-        """Muestra mensaje cuando no hay habitante seleccionado"""
-        self.limpiar_panel()
-        ttk.Label(self.parent, text="Selecciona un habitante\npara ver sus detalles",
+    def _crear_esqueleto(self):
+        """Crea una sola vez los widgets del mensaje inicial y de los detalles"""
+        self.folio_var = tk.StringVar(master=self.parent)
+        self.nombre_var = tk.StringVar(master=self.parent)
+        self.fecha_var = tk.StringVar(master=self.parent)
+        self.estado_var = tk.StringVar(master=self.parent)
+        self.boton_estado_var = tk.StringVar(master=self.parent)
+        
+        self.mensaje_frame = ttk.Frame(self.parent)
+        ttk.Label(self.mensaje_frame, text="Selecciona un habitante\npara ver sus detalles",
                  font=('Arial', 10), foreground='#888', justify=tk.CENTER).pack(expand=True)
-    
-    def limpiar_panel(self):
-        """Limpia todos los widgets del panel"""
-        for widget in self.parent.winfo_children():
-            widget.destroy()
-    
-    def mostrar_detalles(self, habitante):
-        """
-        Muestra los detalles del habitante en el panel
-        Optimizado: Solo actualiza si es un habitante diferente
         
-        Args:
-            habitante: Diccionario con datos del habitante
-        """
-        # Optimización: Si es el mismo habitante, solo actualizar campos que pueden cambiar
-        if self.habitante_actual and self.habitante_actual.get('folio') == habitante.get('folio'):
-            # Actualizar solo los campos dinámicos
-            self._actualizar_campos_dinamicos(habitante)
-            self.habitante_actual = habitante
-            return
-        
-        # Es un habitante diferente, redibujar todo
-        self.habitante_actual = habitante
-        self.limpiar_panel()
+        self.detalles_frame = ttk.Frame(self.parent)
+        contenedor = self.detalles_frame
         
         # Título
-        ttk.Label(self.parent, text="Información Completa", 
+        ttk.Label(contenedor, text="Información Completa", 
                  font=('Arial', 11, 'bold')).pack(pady=(0, 10), anchor=tk.W)
         
         # Datos del habitante
-        self.datos_frame = ttk.Frame(self.parent)
+        self.datos_frame = ttk.Frame(contenedor)
         self.datos_frame.pack(fill=tk.X, pady=5)
         
         ttk.Label(self.datos_frame, text="Folio:", font=('Arial', 9, 'bold')).grid(row=0, column=0, sticky=tk.W, pady=2)
-        self.folio_label = ttk.Label(self.datos_frame, text=habitante['folio'], font=('Arial', 9))
+        self.folio_label = ttk.Label(self.datos_frame, textvariable=self.folio_var, font=('Arial', 9))
         self.folio_label.grid(row=0, column=1, sticky=tk.W, pady=2, padx=5)
         
         ttk.Label(self.datos_frame, text="Nombre:", font=('Arial', 9, 'bold')).grid(row=1, column=0, sticky=tk.W, pady=2)
-        self.nombre_label = ttk.Label(self.datos_frame, text=habitante['nombre'], font=('Arial', 9), wraplength=180)
+        self.nombre_label = ttk.Label(self.datos_frame, textvariable=self.nombre_var, font=('Arial', 9), wraplength=180)
         self.nombre_label.grid(row=1, column=1, sticky=tk.W, pady=2, padx=5)
         
         ttk.Label(self.datos_frame, text="Fecha:", font=('Arial', 9, 'bold')).grid(row=2, column=0, sticky=tk.W, pady=2)
-        self.fecha_label = ttk.Label(self.datos_frame, text=habitante.get('fecha_registro', 'N/A'), 
-                 font=('Arial', 9))
+        self.fecha_label = ttk.Label(self.datos_frame, textvariable=self.fecha_var, font=('Arial', 9))
         self.fecha_label.grid(row=2, column=1, sticky=tk.W, pady=2, padx=5)
         
-        activo = habitante.get('activo', True)
-        estado_texto, estado_color, _tag = estado_texto_color_tag(activo)
-        
         ttk.Label(self.datos_frame, text="Estado:", font=('Arial', 9, 'bold')).grid(row=3, column=0, sticky=tk.W, pady=2)
-        self.estado_label = ttk.Label(self.datos_frame, text=estado_texto, font=('Arial', 9), foreground=estado_color)
+        self.estado_label = ttk.Label(self.datos_frame, textvariable=self.estado_var, font=('Arial', 9))
         self.estado_label.grid(row=3, column=1, sticky=tk.W, pady=2, padx=5)
         
         # Nota completa
-        ttk.Separator(self.parent, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=10)
-        ttk.Label(self.parent, text="Nota:", font=('Arial', 9, 'bold')).pack(anchor=tk.W, pady=(0, 5))
+        ttk.Separator(contenedor, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=10)
+        ttk.Label(contenedor, text="Nota:", font=('Arial', 9, 'bold')).pack(anchor=tk.W, pady=(0, 5))
         
-        self.nota_text = tk.Text(self.parent, height=5, width=25, font=('Arial', 9), 
-                           wrap=tk.WORD, relief=tk.SOLID, borderwidth=1)
+        self.nota_text = tk.Text(contenedor, height=5, width=25, font=('Arial', 9), 
+                           wrap=tk.WORD, relief=tk.SOLID, borderwidth=1, state=tk.DISABLED)
         self.nota_text.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
-        self.nota_text.insert('1.0', habitante.get('nota', 'Sin nota'))
-        self.nota_text.config(state=tk.DISABLED)
         
-        # Botones de acción
-        ttk.Separator(self.parent, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=10)
+        # Botones de acción (operan sobre habitante_actual)
+        ttk.Separator(contenedor, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=10)
         
-        self.botones_frame = ttk.Frame(self.parent)
+        self.botones_frame = ttk.Frame(contenedor)
         self.botones_frame.pack(fill=tk.X)
         
         ttk.Button(self.botones_frame, text="Editar Nombre", 
-                  command=lambda: self._editar_nombre(habitante)).pack(fill=tk.X, pady=2)
+                  command=lambda: self._editar_nombre(self.habitante_actual)).pack(fill=tk.X, pady=2)
         ttk.Button(self.botones_frame, text="Editar Nota", 
-                  command=lambda: self.callback_nota(habitante)).pack(fill=tk.X, pady=2)
+                  command=lambda: self.callback_nota(self.habitante_actual)).pack(fill=tk.X, pady=2)
         ttk.Button(self.botones_frame, text="Ver Pagos", 
                   command=self.callback_pagos).pack(fill=tk.X, pady=2)
         ttk.Button(self.botones_frame, text="Ver Faenas", 
                   command=self.callback_faenas).pack(fill=tk.X, pady=2)
-        
-        # Mostrar botón de historial (importar aquí para evitar circular)
-        from .censo_dialogos import mostrar_historial
         ttk.Button(self.botones_frame, text="Historial", 
-                  command=lambda: mostrar_historial(self.parent.winfo_toplevel(), habitante)).pack(fill=tk.X, pady=2)
+                  command=self._mostrar_historial).pack(fill=tk.X, pady=2)
         
-        # Botón de estado dinámico
-        self._crear_boton_estado(habitante, activo)
-    
-    def _crear_boton_estado(self, habitante, activo):
-        """Crea el botón de cambio de estado"""
-        if activo:
-            self.boton_estado = ttk.Button(self.botones_frame, text="Marcar Inactivo", 
-                      command=lambda: self.callback_estado(habitante['folio'], False))
-        else:
-            self.boton_estado = ttk.Button(self.botones_frame, text="Marcar Activo", 
-                      command=lambda: self.callback_estado(habitante['folio'], True))
+        # Botón de estado dinámico (solo cambia su texto)
+        self.boton_estado = ttk.Button(self.botones_frame, textvariable=self.boton_estado_var,
+                                       command=self._cambiar_estado)
         self.boton_estado.pack(fill=tk.X, pady=2)
     
+    def mostrar_mensaje_inicial(self):
+        """Muestra mensaje cuando no hay habitante seleccionado"""
+        self._debounce.cancel('seleccion')
+        self.habitante_actual = None
+        self.detalles_frame.pack_forget()
+        self.mensaje_frame.pack(fill=tk.BOTH, expand=True)
+    
+    def programar_detalles(self, obtener_habitante, delay_ms=UI_DEBOUNCE_SELECCION):
+        """
+        Muestra detalles cuando la selección se estabiliza
+        
+        Con una flecha mantenida la tabla dispara una selección por fila; solo se
+        renderiza la última.
+        
+        Args:
+            obtener_habitante: Función sin argumentos que devuelve el habitante
+                seleccionado (o None); se evalúa al vencer el debounce
+        """
+        def _mostrar():
+            habitante = obtener_habitante()
+            if habitante:
+                self.mostrar_detalles(habitante)
+        
+        self._debounce.debounce('seleccion', delay_ms, _mostrar)
+    
+    def mostrar_detalles(self, habitante):
+        """
+        Muestra los detalles del habitante en el panel
+        Actualiza las variables del esqueleto; no crea ni destruye widgets
+        
+        Args:
+            habitante: Diccionario con datos del habitante
+        """
+        if self.habitante_actual is None:
+            self.mensaje_frame.pack_forget()
+            self.detalles_frame.pack(fill=tk.BOTH, expand=True)
+        self.habitante_actual = habitante
+        
+        self._asignar(self.folio_var, habitante['folio'])
+        self._asignar(self.nombre_var, habitante['nombre'])
+        self._asignar(self.fecha_var, habitante.get('fecha_registro', 'N/A'))
+        self._actualizar_campos_dinamicos(habitante)
+    
+    @staticmethod
+    def _asignar(variable, valor):
+        """Escribe la variable solo si el valor cambió (evita redibujados)"""
+        if variable.get() != valor:
+            variable.set(valor)
+    
     def _actualizar_campos_dinamicos(self, habitante):
-        """Actualiza solo los campos que pueden haber cambiado sin redibujar todo"""
+        """Actualiza estado, nota y botón de estado"""
         try:
-            # Actualizar estado si cambió
             activo = habitante.get('activo', True)
             estado_texto, estado_color, _tag = estado_texto_color_tag(activo)
+            self._asignar(self.estado_var, estado_texto)
+            if str(self.estado_label.cget('foreground')) != estado_color:
+                self.estado_label.config(foreground=estado_color)
             
-            if hasattr(self, 'estado_label'):
-                self.estado_label.config(text=estado_texto, foreground=estado_color)
-            
-            # Actualizar nota si cambió
-            if hasattr(self, 'nota_text'):
+            nota = habitante.get('nota', 'Sin nota')
+            if nota != self._nota_actual:
+                self._nota_actual = nota
                 self.nota_text.config(state=tk.NORMAL)
                 self.nota_text.delete('1.0', tk.END)
-                self.nota_text.insert('1.0', habitante.get('nota', 'Sin nota'))
+                self.nota_text.insert('1.0', nota)
                 self.nota_text.config(state=tk.DISABLED)
             
-            # Actualizar botón de estado si cambió
-            if hasattr(self, 'boton_estado'):
-                self.boton_estado.destroy()
-                self._crear_boton_estado(habitante, activo)
+            self._asignar(self.boton_estado_var, "Marcar Inactivo" if activo else "Marcar Activo")
         except Exception as e:
             print(f"Error actualizando campos dinámicos: {e}")
     
+    def _cambiar_estado(self):
+        """Alterna el estado del habitante mostrado"""
+        if self.habitante_actual:
+            activo = self.habitante_actual.get('activo', True)
+            self.callback_estado(self.habitante_actual['folio'], not activo)
+    
+    def _mostrar_historial(self):
+        """Abre el historial del habitante mostrado"""
+        if self.habitante_actual:
+            # Importar aquí para evitar import circular
+            from .censo_dialogos import mostrar_historial
+            mostrar_historial(self.parent.winfo_toplevel(), self.habitante_actual)
+    
     def _editar_nombre(self, habitante):
         """Abre diálogo para editar nombre"""
         from .censo_dialogos import dialogo_editar_nombre
@@ -2,6 +2,10 @@ import tkinter as tk
 from tkinter import ttk
 from typing import List, Dict, Callable, Optional
 
+from src.config import UI_DEBOUNCE_SEARCH
+from src.core.optimizador_ui import DebounceManager
+from src.modules.faenas.faenas_consulta import parsear_consulta
+
 
 class BuscadorAvanzadoFaenas:
     def __init__(self, parent, on_busqueda: Callable):
@@ -10,6 +14,7 @@ class BuscadorAvanzadoFaenas:
         self.frame = tk.Frame(parent, bg="#f5f7fa")
         self.historial = []
         self.filtros_guardados = {}
+        self._debounce = DebounceManager(widget=self.frame)
         
     def pack(self, **kwargs):
         pack_kwargs = {k: v for k, v in kwargs.items() if k in ['fill', 'expand', 'padx', 'pady', 'side', 'anchor', 'ipadx', 'ipady']}
@@ -67,9 +72,13 @@ class BuscadorAvanzadoFaenas:
     def _on_cambio_entrada(self, event=None):
         texto = self.entrada.get()
         if len(texto) > 2:
-            self._ejecutar_busqueda()
+            # Buscar cuando el usuario deja de escribir, no en cada tecla
+            self._debounce.debounce('busqueda', UI_DEBOUNCE_SEARCH, self._ejecutar_busqueda)
+        else:
+            self._debounce.cancel('busqueda')
             
     def _ejecutar_busqueda(self):
+        self._debounce.cancel('busqueda')
         criterio = self.entrada.get()
         if criterio.strip():
             self.historial.insert(0, criterio)
@@ -79,32 +88,7 @@ class BuscadorAvanzadoFaenas:
         self.on_busqueda(filtros)
         
     def _parsear_criterio(self, criterio: str) -> Dict:
-        filtros = {
-            'texto': criterio,
-            'fecha': None,
-            'participante': None,
-            'peso_min': None,
-            'peso_max': None,
-            'estado': None
-        }
-        
-        partes = criterio.split()
-        for parte in partes:
-            if ':' in parte:
-                clave, valor = parte.split(':', 1)
-                if clave == 'fecha':
-                    filtros['fecha'] = valor
-                elif clave == 'participante':
-                    filtros['participante'] = valor.lower()
-                elif clave == 'peso':
-                    if valor.startswith('>'):
-                        filtros['peso_min'] = float(valor[1:])
-                    elif valor.startswith('<'):
-                        filtros['peso_max'] = float(valor[1:])
-                elif clave == 'estado':
-                    filtros['estado'] = valor.lower()
-        
-        return filtros
+        return parsear_consulta(criterio)
         
     def _aplicar_filtros(self):
         filtros = {
@@ -18,11 +18,17 @@ if __name__ == "__main__":
         sys.path.insert(0, proyecto_raiz)
 
 from src.core.logger import registrar_operacion, registrar_error
+from src.core.fechas import pertenece_a_mes
 from src.modules.historial.historial import GestorHistorial
 from src.modules.faenas.faenas_servicio import FaenasServicio
+from src.modules.faenas.faenas_consulta import IndiceFaenas
+from src.modules.faenas.faenas_kpi import ModeloKPIFaenas
+from src.modules.faenas.faenas_puntos import PuntosAnualesFaenas
 from src.modules.faenas.faenas_repo import FaenasRepositorio
 from src.modules.faenas.faenas_ui_manager import FaenasUIManager
 from src.core.gestor_datos_global import obtener_gestor
+from src.core.mantenimiento_bd import iniciar_mantenimiento_bd
+from src.core.instancia_unica import asegurar_instancia_unica
 from src.modules.faenas.dialogos_faenas import (
     DialogoAgregarParticipantes,
     DialogoRegistroPagoEnLugar
@@ -39,6 +45,9 @@ try:
 except Exception:
     db = None
 
+# Tramos de color del resumen anual (un tag por tramo en lugar de uno por fila)
+TRAMOS_COLOR_RESUMEN = 20
+
 
 class SistemaFaenas:
     """Controlador principal del sistema de registro de faenas"""
@@ -52,9 +61,13 @@ class SistemaFaenas:
 
         # Datos y servicios
         self.faenas: List[Dict] = []
+        self._indice_faenas: Optional[IndiceFaenas] = None  # Se arma en la primera búsqueda
         self.faena_seleccionada: Optional[Dict] = None
         self.habitantes_cache: List[Dict] = []
         self.default_year = default_year
+        self.kpi = ModeloKPIFaenas()  # KPIs del mes, actualizados faena por faena
+        self.puntos = PuntosAnualesFaenas()  # Puntos por habitante y año, incrementales
+        self._tags_resumen = set()  # Tags de color ya configurados en el resumen
 
         self.gestor_historial = GestorHistorial(id_cooperacion='faenas')
         self.repo = FaenasRepositorio(ARCHIVO_FAENAS, PASSWORD_CIFRADO)
@@ -67,6 +80,8 @@ class SistemaFaenas:
 
         # Configurar UI
         self._configurar_ui()
+        if self.ui_manager.dashboard:
+            self.ui_manager.dashboard.vincular_modelo(self.kpi)
 
         # Actualizar interfaz
         self.actualizar_listado_faenas()
@@ -105,9 +120,14 @@ class SistemaFaenas:
             self.faenas = resultado.get('faenas', [])
         else:
             self.faenas = []
+        self._indice_faenas = None
+        self.kpi.cargar(self.faenas)
+        self.puntos.cargar(self.faenas)
 
     def guardar_datos(self, mostrar_alerta: bool = False) -> None:
         """Guardar faenas en repositorio"""
+        # Toda modificación de faenas pasa por aquí: invalidar el índice de búsqueda
+        self._indice_faenas = None
         resultado = self.repo.guardar(self.faenas)
         if not resultado.get('ok'):
             if mostrar_alerta:
@@ -185,6 +205,8 @@ class SistemaFaenas:
         }
 
         self.faenas.append(faena)
+        self.kpi.agregar_faena(faena)
+        self.puntos.agregar_faena(faena)
         self.gestor_historial.registrar_creacion('FAENA', faena['id'], faena,
                                                   faena['creado_por'])
         registrar_operacion('FAENA_CREADA', 'Faena registrada',
@@ -223,10 +245,19 @@ class SistemaFaenas:
                                    "Ya no se pueden modificar los registros.")
             return
 
-        def callback_agregar(nuevos: List[Dict]):
+        def callback_agregar(seleccionados: List[Dict]):
             """Callback cuando se agregan participantes"""
-            for participante in nuevos:
-                self.faena_seleccionada['participantes'].append(participante)
+            resultado = self.servicio.agregar_participantes_en_lote(
+                self.faena_seleccionada,
+                seleccionados,
+                self.servicio.construir_indice_censo(self.habitantes_cache),
+                permitir_no_resueltos=True
+            )
+            nuevos = resultado['participantes']
+            if not nuevos:
+                return
+            self.kpi.actualizar_faena(self.faena_seleccionada)
+            self.puntos.actualizar_faena(self.faena_seleccionada)
 
             self.gestor_historial.registrar_cambio('AGREGAR', 'FAENA_PARTICIPANTE',
                                                     self.faena_seleccionada['id'],
@@ -270,6 +301,8 @@ class SistemaFaenas:
                                        "No puedes remover a alguien que ya pagó en lugar de asistir")
                 self.faena_seleccionada['participantes'].insert(idx, participante)
                 return
+            self.kpi.actualizar_faena(self.faena_seleccionada)
+            self.puntos.actualizar_faena(self.faena_seleccionada)
 
             self.gestor_historial.registrar_cambio('ELIMINAR', 'FAENA_PARTICIPANTE',
                                                     self.faena_seleccionada['id'],
@@ -368,6 +401,9 @@ class SistemaFaenas:
 
                 mensaje = f"{nombre_pagador} contrató a {nombre_ext} (externo)"
 
+            self.kpi.actualizar_faena(self.faena_seleccionada)
+            self.puntos.actualizar_faena(self.faena_seleccionada)
+
             self.gestor_historial.registrar_cambio('SUSTITUCION_FAENA', 'FAENA',
                                                     self.faena_seleccionada['id'],
                                                     {'tipo': tipo, 'pagador': folio_pagador,
@@ -501,6 +537,13 @@ class SistemaFaenas:
                 self.ui_manager.tree_faenas.see(seleccionar_id)
                 self.on_select_faena()
 
+    def atender_peticion(self, accion: str, argumentos: List[str]) -> None:
+        """Petición de otro lanzamiento de faenas ('--anio AAAA' cambia el resumen)"""
+        anio = anio_de_argumentos(argumentos)
+        if anio is not None:
+            self.ui_manager.anio_var.set(str(anio))
+            self.actualizar_resumen_anual()
+
     def actualizar_resumen_anual(self) -> None:
         """Actualizar resumen anual de puntos"""
         if not hasattr(self.ui_manager, 'tree_resumen'):
@@ -513,36 +556,41 @@ class SistemaFaenas:
         except ValueError:
             anio = datetime.now().year
 
-        años_disponibles = self.servicio.obtener_años_disponibles(self.faenas)
-        if hasattr(self.ui_manager, 'anio_combo'):
+        años_disponibles = self.puntos.anios_disponibles()
+        if self.ui_manager.anio_combo is not None:
             self.ui_manager.anio_combo['values'] = [str(a) for a in años_disponibles]
-            if str(anio) not in self.ui_manager.anio_combo['values']:
+            if anio not in años_disponibles:
                 self.ui_manager.anio_var.set(str(datetime.now().year))
                 anio = datetime.now().year
 
-        resumen = self.servicio.calcular_resumen_anual(self.faenas, anio)
-        puntos = resumen.get('puntos', {})
-        max_puntos = resumen.get('max_puntos', 1)
+        # Totales materializados: cambiar de año es una búsqueda, no un recálculo
+        resumen = self.puntos.resumen(anio)
+        filas = resumen['ordenados']
+        max_puntos = resumen['max_puntos']
 
         # Filtrar por búsqueda
         criterio = self.ui_manager.resumen_buscar_var.get().lower().strip()
         if criterio:
-            puntos = self.servicio.filtrar_resumen_por_criterio(puntos, criterio)
-
-        if not puntos:
-            return
-
-        # Configurar tags con colores
-        for data in sorted(puntos.values(), key=lambda x: (-x['puntos'], x['nombre'])):
-            color = self.servicio.calcular_color_por_puntaje(data['puntos'], max_puntos)
-            tag = f"color-{data['folio']}"
-            texto_color = '#ffffff' if data['puntos'] >= max_puntos * 0.7 else '#1f2937'
+            filas = [d for d in filas
+                     if criterio in d.get('folio', '').lower() or criterio in d.get('nombre', '').lower()]
+
+        tree = self.ui_manager.tree_resumen
+        for data in filas:
+            tree.insert('', tk.END,
+                        values=(data['folio'], data['nombre'], f"{data['puntos']:.1f}"),
+                        tags=(self._tag_color_resumen(data['puntos'], max_puntos),))
+
+    def _tag_color_resumen(self, puntos: float, max_puntos: float) -> str:
+        """Tag por tramo de color (5%), configurado una sola vez por tramo"""
+        tramo = int(min(puntos / max_puntos, 1.0) * TRAMOS_COLOR_RESUMEN) if max_puntos else 0
+        tag = f"tramo-{tramo}"
+        if tag not in self._tags_resumen:
+            color = self.servicio.calcular_color_por_puntaje(tramo, TRAMOS_COLOR_RESUMEN)
+            texto_color = '#ffffff' if tramo >= TRAMOS_COLOR_RESUMEN * 0.7 else '#1f2937'
             self.ui_manager.tree_resumen.tag_configure(tag, background=color,
                                                        foreground=texto_color)
-            self.ui_manager.tree_resumen.insert('', tk.END,
-                                                values=(data['folio'], data['nombre'],
-                                                       f"{data['puntos']:.1f}"),
-                                                tags=(tag,))
+            self._tags_resumen.add(tag)
+        return tag
 
     # =================================================================
     # HELPERS
@@ -591,55 +639,13 @@ class SistemaFaenas:
 
     def _obtener_datos_dashboard(self) -> Dict:
         """Obtener datos para el dashboard KPI"""
-        ahora = datetime.now()
-        mes_actual = ahora.month
-        anio_actual = ahora.year
-        
-        faenas_mes = [f for f in self.faenas 
-                     if self._pertenece_a_mes(f.get('fecha', ''), mes_actual, anio_actual)]
-        
-        horas_totales = sum([sum([p.get('horas_trabajadas', 0) 
-                                 for p in f.get('participantes', [])]) 
-                            for f in faenas_mes])
-        
-        participantes = set()
-        for faena in faenas_mes:
-            for part in faena.get('participantes', []):
-                participantes.add(part.get('nombre'))
-        
-        pendiente = sum([f.get('peso', 0) * 50 for f in faenas_mes if f.get('estado') != 'pagada'])
-        completadas = len([f for f in faenas_mes if f.get('estado') != 'registrada'])
-        promedio = horas_totales / len(faenas_mes) if faenas_mes else 0
-        
-        return {
-            'faenas_mes': len(faenas_mes),
-            'horas_mes': horas_totales,
-            'participantes': len(participantes),
-            'pendiente_pago': pendiente,
-            'completadas': completadas,
-            'promedio_horas': promedio
-        }
+        return self.kpi.datos()
 
     def _filtrar_busqueda_avanzada(self, filtros: Dict) -> None:
         """Filtrar faenas con búsqueda avanzada"""
-        resultados = []
-        
-        for faena in self.faenas:
-            cumple = True
-            
-            if filtros.get('fecha') and faena.get('fecha') != filtros['fecha']:
-                cumple = False
-            if filtros.get('participante'):
-                participantes = [p.get('nombre', '').lower() for p in faena.get('participantes', [])]
-                if not any(filtros['participante'].lower() in p for p in participantes):
-                    cumple = False
-            if filtros.get('peso_min') and faena.get('peso', 0) < filtros['peso_min']:
-                cumple = False
-            if filtros.get('estado') and faena.get('estado') != filtros['estado']:
-                cumple = False
-            
-            if cumple:
-                resultados.append(faena)
+        if self._indice_faenas is None:
+            self._indice_faenas = IndiceFaenas(self.faenas)
+        resultados = self._indice_faenas.buscar(filtros)
         
         if self.ui_manager and self.ui_manager.tree_faenas:
             for item in self.ui_manager.tree_faenas.get_children():
@@ -657,13 +663,7 @@ class SistemaFaenas:
 
     def _pertenece_a_mes(self, fecha_str: str, mes: int, anio: int) -> bool:
         """Verificar si una fecha pertenece a un mes y año específico"""
-        if not fecha_str:
-            return False
-        try:
-            partes = fecha_str.split('/')
-            return int(partes[1]) == mes and int(partes[2]) == anio
-        except:
-            return False
+        return pertenece_a_mes(fecha_str, mes, anio)
 
     def ver_detalles_faena(self) -> None:
         """Ver detalles de la faena seleccionada"""
@@ -689,16 +689,35 @@ class SistemaFaenas:
         
         if messagebox.askyesno("Confirmar", "Desea eliminar esta faena?"):
             self.faenas.remove(self.faena_seleccionada)
-            self.repo.guardar(self.faenas)
+            self.kpi.quitar_faena(self.faena_seleccionada)
+            self.puntos.quitar_faena(self.faena_seleccionada)
+            self.guardar_datos()
             self.actualizar_listado_faenas()
             messagebox.showinfo("Exito", "Faena eliminada correctamente")
 
 
+def anio_de_argumentos(args):
+    """Año de '--anio AAAA' en los argumentos, o None"""
+    try:
+        if '--anio' in args:
+            idx = args.index('--anio')
+            if idx + 1 < len(args):
+                return int(args[idx + 1])
+    except Exception:
+        pass
+    return None
+
+
 def main():
     """Punto de entrada principal con autenticación"""
     from src.auth.login_window import VentanaLogin
 
+    instancia = asegurar_instancia_unica('faenas', sys.argv[1:])
+    if instancia is None:
+        return  # Ya estaba abierto: se trajo al frente con esta petición
+
     login_root = tk.Tk()
+    instancia.atender(login_root)
 
     def on_login(usuario, gestor_auth):
         """Callback cuando el login es exitoso"""
@@ -707,17 +726,9 @@ def main():
         root = tk.Tk()
         root.title(f"Registro de Faenas - {usuario['nombre']} ({usuario['rol']})")
 
-        default_year = None
-        try:
-            args = sys.argv[1:]
-            if '--anio' in args:
-                idx = args.index('--anio')
-                if idx + 1 < len(args):
-                    default_year = int(args[idx + 1])
-        except Exception:
-            default_year = None
-
-        app = SistemaFaenas(root, usuario, gestor_auth, default_year=default_year)
+        app = SistemaFaenas(root, usuario, gestor_auth, default_year=anio_de_argumentos(sys.argv[1:]))
+        iniciar_mantenimiento_bd(root)
+        instancia.atender(root, app.atender_peticion)
         root.mainloop()
 
     VentanaLogin(login_root, on_login)
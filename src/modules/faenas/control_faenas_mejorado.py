@@ -12,6 +12,7 @@ if __name__ == "__main__":
         sys.path.insert(0, proyecto_raiz)
 
 from src.core.logger import registrar_operacion, registrar_error
+from src.core.fechas import pertenece_a_mes
 from src.modules.historial.historial import GestorHistorial
 from src.modules.faenas.faenas_servicio import FaenasServicio
 from src.modules.faenas.faenas_repo import FaenasRepositorio
@@ -202,14 +203,19 @@ class SistemaFaenas:
 
     def _agregar_participantes_a_faena(self, participantes: List[str]):
         if self.faena_seleccionada:
-            for part in participantes:
-                self.faena_seleccionada['participantes'].append({
-                    'nombre': part,
+            resultado = self.servicio.agregar_participantes_en_lote(
+                self.faena_seleccionada,
+                participantes,
+                self.servicio.construir_indice_censo(self.habitantes_cache),
+                plantilla={
                     'hora_entrada': datetime.now().strftime('%H:%M'),
                     'hora_salida': '',
                     'horas_trabajadas': 0
-                })
-            self.repo.guardar_faenas(self.faenas)
+                },
+                permitir_no_resueltos=True
+            )
+            if resultado['agregados']:
+                self.repo.guardar_faenas(self.faenas)
             self.actualizar_detalle_faena()
 
     def eliminar_participante(self):
@@ -302,13 +308,7 @@ class SistemaFaenas:
                 self.notificaciones.mostrar('Exito', 'Faena eliminada', 'exito')
 
     def _es_mismo_mes(self, fecha_str: str, mes: int, anio: int) -> bool:
-        if not fecha_str:
-            return False
-        try:
-            partes = fecha_str.split('/')
-            return int(partes[1]) == mes and int(partes[2]) == anio
-        except:
-            return False
+        return pertenece_a_mes(fecha_str, mes, anio)
 
 
 def main(root=None, usuario=None, gestor_auth=None):
@@ -4,45 +4,55 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Callable, Optional
 import math
 
+# (clave en datos, título, formato, color)
+TARJETAS_KPI = [
+    ('faenas_mes', "Faenas este mes", "{:d}", "#3498db"),
+    ('horas_mes', "Horas trabajadas", "{:.1f}h", "#2ecc71"),
+    ('participantes', "Participantes activos", "{:d}", "#9b59b6"),
+    ('pendiente_pago', "Pendiente de pago", "${:.0f}", "#e74c3c"),
+    ('completadas', "Completadas", "{:d}", "#16a085"),
+    ('promedio_horas', "Promedio horas", "{:.1f}h", "#f39c12"),
+]
+
 
 class DashboardFaenas:
-    def __init__(self, parent, datos_callback: Callable):
+    """Tarjetas KPI persistentes; actualizar solo cambia el texto de sus StringVar.
+
+    Los datos salen de un ModeloKPIFaenas (vincular_modelo), que empuja los
+    cambios incrementales, o en su defecto de datos_callback.
+    """
+
+    def __init__(self, parent, datos_callback: Optional[Callable] = None, modelo=None):
         self.parent = parent
         self.datos_callback = datos_callback
+        self.modelo = None
         self.frame = tk.Frame(parent, bg="#f5f7fa")
+        self._valores: Dict[str, tk.StringVar] = {}
+        self._crear_widgets()
+        if modelo is not None:
+            self.vincular_modelo(modelo)
+        else:
+            self.actualizar()
         
     def pack(self, **kwargs):
         pack_kwargs = {k: v for k, v in kwargs.items() if k in ['fill', 'expand', 'padx', 'pady', 'side', 'anchor', 'ipadx', 'ipady']}
         self.frame.pack(**pack_kwargs)
-        self._crear_widgets()
         
     def _crear_widgets(self):
         container = tk.Frame(self.frame, bg="#f5f7fa")
         container.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
         
-        datos = self.datos_callback()
-        
         grid = tk.Frame(container, bg="#f5f7fa")
         grid.pack(fill=tk.BOTH, expand=True)
         grid.columnconfigure(0, weight=1)
         grid.columnconfigure(1, weight=1)
         grid.columnconfigure(2, weight=1)
         
-        self._tarjeta_kpi(grid, 0, 0, "Faenas este mes", 
-                         str(datos.get('faenas_mes', 0)), "#3498db")
-        self._tarjeta_kpi(grid, 0, 1, "Horas trabajadas",
-                         f"{datos.get('horas_mes', 0):.1f}h", "#2ecc71")
-        self._tarjeta_kpi(grid, 0, 2, "Participantes activos",
-                         str(datos.get('participantes', 0)), "#9b59b6")
+        for i, (clave, titulo, _formato, color) in enumerate(TARJETAS_KPI):
+            self._valores[clave] = tk.StringVar(master=self.frame, value="")
+            self._tarjeta_kpi(grid, i // 3, i % 3, titulo, self._valores[clave], color)
         
-        self._tarjeta_kpi(grid, 1, 0, "Pendiente de pago",
-                         f"${datos.get('pendiente_pago', 0):.0f}", "#e74c3c")
-        self._tarjeta_kpi(grid, 1, 1, "Completadas",
-                         str(datos.get('completadas', 0)), "#16a085")
-        self._tarjeta_kpi(grid, 1, 2, "Promedio horas",
-                         f"{datos.get('promedio_horas', 0):.1f}h", "#f39c12")
-        
-    def _tarjeta_kpi(self, parent, row, col, titulo, valor, color):
+    def _tarjeta_kpi(self, parent, row, col, titulo, variable, color):
         tarjeta = tk.Frame(parent, bg="white", relief=tk.FLAT, bd=1)
         tarjeta.grid(row=row, column=col, padx=10, pady=10, sticky="nsew")
         tarjeta.columnconfigure(0, weight=1)
@@ -58,11 +68,29 @@ class DashboardFaenas:
                              bg="white", fg="#7f8c8d")
         lbl_titulo.pack(anchor=tk.W)
         
-        lbl_valor = tk.Label(content, text=valor, font=("Arial", 24, "bold"),
+        lbl_valor = tk.Label(content, textvariable=variable, font=("Arial", 24, "bold"),
                             bg="white", fg=color)
         lbl_valor.pack(anchor=tk.W, pady=(5, 0))
+    
+    def vincular_modelo(self, modelo):
+        """Escuchar los cambios del modelo de KPIs en lugar de consultar datos_callback"""
+        if self.modelo is not None:
+            self.modelo.desuscribir(self.pintar)
+        self.modelo = modelo
+        modelo.suscribir(self.pintar)
+        self.pintar(modelo.datos())
+    
+    def pintar(self, datos: Dict):
+        """Escribir los valores; las tarjetas cuyo texto no cambió no se tocan"""
+        for clave, _titulo, formato, _color in TARJETAS_KPI:
+            valor = datos.get(clave, 0) or 0
+            texto = formato.format(int(valor) if formato == "{:d}" else valor)
+            variable = self._valores[clave]
+            if variable.get() != texto:
+                variable.set(texto)
         
     def actualizar(self):
-        for widget in self.frame.winfo_children():
-            widget.destroy()
-        self._crear_widgets()
+        if self.modelo is not None:
+            self.pintar(self.modelo.datos())
+        elif self.datos_callback:
+            self.pintar(self.datos_callback())
@@ -65,6 +65,7 @@ class DialogoAgregarParticipantes:
         """Actualizar lista de habitantes según filtro"""
         self.tree.delete(*self.tree.get_children())
         criterio = self.filtro_var.get().lower().strip()
+        ya_en_faena = self._claves_en_faena()
 
         for h in self.habitantes_cache:
             folio = h.get('folio', '')
@@ -72,8 +73,7 @@ class DialogoAgregarParticipantes:
             texto = f"{folio} - {nombre}".strip()
 
             # No mostrar habitantes que ya están en la faena
-            if any(p.get('folio') == folio and p.get('nombre') == nombre
-                   for p in self.faena_seleccionada['participantes']):
+            if (folio, nombre) in ya_en_faena:
                 continue
 
             if criterio and criterio not in texto.lower():
@@ -81,6 +81,11 @@ class DialogoAgregarParticipantes:
 
             self.tree.insert('', tk.END, values=('☐', folio, nombre))
 
+    def _claves_en_faena(self) -> set:
+        """Pares (folio, nombre) ya registrados, para descartar duplicados en O(1)"""
+        return {(p.get('folio'), p.get('nombre'))
+                for p in self.faena_seleccionada['participantes']}
+
     def _toggle_item(self, event):
         """Toggle checkbox de un item"""
         item = self.tree.identify_row(event.y)
@@ -93,12 +98,12 @@ class DialogoAgregarParticipantes:
     def _agregar_seleccion(self):
         """Agregar participantes seleccionados"""
         nuevos = []
+        ya_en_faena = self._claves_en_faena()
         for item in self.tree.get_children():
             vals = self.tree.item(item, 'values')
             if vals and vals[0] == '☑':
                 folio, nombre = vals[1], vals[2]
-                if any(p.get('folio') == folio and p.get('nombre') == nombre
-                       for p in self.faena_seleccionada['participantes']):
+                if (folio, nombre) in ya_en_faena:
                     continue
                 participante = {
                     'folio': folio,
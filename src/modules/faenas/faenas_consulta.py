@@ -0,0 +1,193 @@
+"""Motor de consultas de faenas sobre índices precalculados.
+
+Traduce la mini-sintaxis del buscador avanzado (``fecha:``, ``participante:``,
+``peso:>``/``peso:<``, ``estado:``) a un plan sobre índices invertidos:
+fecha -> faenas, participante normalizado -> faenas, estado -> faenas y un
+índice ordenado de pesos. Cada filtro aporta un conjunto de posiciones y el
+resultado es su intersección, empezando por el más chico; no se recorre cada
+faena ni se pasan a minúsculas sus participantes en cada búsqueda.
+"""
+import unicodedata
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Optional, Set
+
+from src.core.fechas import normalizar_fecha_iso
+
+MESES = {
+    'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4, 'mayo': 5, 'junio': 6,
+    'julio': 7, 'agosto': 8, 'septiembre': 9, 'octubre': 10, 'noviembre': 11,
+    'diciembre': 12,
+}
+
+ESTADO_DEFECTO = 'registrada'
+
+
+def normalizar_texto(texto: Optional[str]) -> str:
+    """Minúsculas y sin acentos, para comparar nombres escritos de distintas formas."""
+    if not texto:
+        return ''
+    descompuesto = unicodedata.normalize('NFKD', str(texto).strip().lower())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def parsear_consulta(criterio: str) -> Dict[str, Any]:
+    """Convierte 'fecha:2026-01-14 participante:Juan peso:>5' en un dict de filtros.
+
+    Las claves sin filtro quedan en None. Un peso mal escrito se ignora en lugar
+    de lanzar ValueError mientras el usuario todavía está tecleando.
+    """
+    filtros = {
+        'texto': criterio,
+        'fecha': None,
+        'participante': None,
+        'peso_min': None,
+        'peso_max': None,
+        'estado': None
+    }
+
+    for parte in (criterio or '').split():
+        if ':' not in parte:
+            continue
+        clave, valor = parte.split(':', 1)
+        if not valor:
+            continue
+        if clave == 'fecha':
+            filtros['fecha'] = valor
+        elif clave == 'participante':
+            filtros['participante'] = valor.lower()
+        elif clave == 'peso':
+            try:
+                if valor.startswith('>'):
+                    filtros['peso_min'] = float(valor[1:])
+                elif valor.startswith('<'):
+                    filtros['peso_max'] = float(valor[1:])
+            except ValueError:
+                pass
+        elif clave == 'estado':
+            filtros['estado'] = valor.lower()
+
+    return filtros
+
+
+class IndiceFaenas:
+    """Índices invertidos sobre una lista de faenas para resolver búsquedas.
+
+    El índice es una foto de la lista: hay que reconstruirlo (``reconstruir``)
+    cuando se agregan, eliminan o editan faenas.
+    """
+
+    def __init__(self, faenas: Optional[List[Dict[str, Any]]] = None):
+        self.reconstruir(faenas or [])
+
+    def reconstruir(self, faenas: List[Dict[str, Any]]) -> None:
+        """Recalcula todos los índices en una sola pasada."""
+        self._faenas = list(faenas)
+        self._por_fecha: Dict[str, Set[int]] = {}
+        self._por_mes: Dict[int, Set[int]] = {}
+        self._por_estado: Dict[str, Set[int]] = {}
+        self._por_participante: Dict[str, Set[int]] = {}
+        self._nombres_faena: List[str] = []
+        pesos = []
+
+        for pos, faena in enumerate(self._faenas):
+            fecha = normalizar_fecha_iso(faena.get('fecha')) or ''
+            self._por_fecha.setdefault(fecha, set()).add(pos)
+            if fecha:
+                self._por_mes.setdefault(int(fecha[5:7]), set()).add(pos)
+
+            estado = (faena.get('estado') or ESTADO_DEFECTO).lower()
+            self._por_estado.setdefault(estado, set()).add(pos)
+
+            for participante in faena.get('participantes', []):
+                nombre = normalizar_texto(participante.get('nombre'))
+                if nombre:
+                    self._por_participante.setdefault(nombre, set()).add(pos)
+
+            self._nombres_faena.append(normalizar_texto(faena.get('nombre')))
+            pesos.append((float(faena.get('peso') or 0), pos))
+
+        pesos.sort()
+        self._pesos = [peso for peso, _ in pesos]
+        self._pesos_pos = [pos for _, pos in pesos]
+        # Búsquedas por subcadena de participante ya resueltas (se repiten al teclear)
+        self._coincidencias_participante: Dict[str, Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._faenas)
+
+    # ------------------------------------------------------------------
+    # Listas de posiciones por filtro
+    # ------------------------------------------------------------------
+
+    def _posiciones_participante(self, texto: str) -> Set[int]:
+        """Subcadena sobre los nombres distintos, no sobre cada participación."""
+        texto = normalizar_texto(texto)
+        posiciones = self._coincidencias_participante.get(texto)
+        if posiciones is None:
+            posiciones = set()
+            for nombre, faenas in self._por_participante.items():
+                if texto in nombre:
+                    posiciones |= faenas
+            self._coincidencias_participante[texto] = posiciones
+        return posiciones
+
+    def _posiciones_peso(self, peso_min: Optional[float],
+                         peso_max: Optional[float]) -> Set[int]:
+        inicio = bisect_left(self._pesos, peso_min) if peso_min is not None else 0
+        fin = bisect_right(self._pesos, peso_max) if peso_max is not None else len(self._pesos)
+        return set(self._pesos_pos[inicio:fin])
+
+    def _plan(self, filtros: Dict[str, Any]) -> Optional[List[Set[int]]]:
+        """Conjuntos de posiciones a intersectar; None si no hay ningún filtro."""
+        plan = []
+
+        if filtros.get('fecha'):
+            fecha = normalizar_fecha_iso(filtros['fecha']) or filtros['fecha']
+            plan.append(self._por_fecha.get(fecha, set()))
+
+        if filtros.get('mes'):
+            mes = MESES.get(normalizar_texto(filtros['mes']))
+            plan.append(self._por_mes.get(mes, set()))
+
+        if filtros.get('estado'):
+            plan.append(self._por_estado.get(filtros['estado'].lower(), set()))
+
+        if filtros.get('participante'):
+            plan.append(self._posiciones_participante(filtros['participante']))
+
+        if filtros.get('peso_min') is not None or filtros.get('peso_max') is not None:
+            plan.append(self._posiciones_peso(filtros.get('peso_min'), filtros.get('peso_max')))
+
+        if filtros.get('nombre'):
+            texto = normalizar_texto(filtros['nombre'])
+            plan.append({pos for pos, nombre in enumerate(self._nombres_faena)
+                         if texto in nombre})
+
+        return plan or None
+
+    # ------------------------------------------------------------------
+    # Consulta
+    # ------------------------------------------------------------------
+
+    def buscar(self, filtros: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Faenas que cumplen todos los filtros, en el orden original de la lista.
+
+        Acepta tanto el dict de ``parsear_consulta`` (claves en None = sin filtro)
+        como el de los filtros rápidos (estado, mes, participante).
+        """
+        plan = self._plan(filtros or {})
+        if plan is None:
+            return list(self._faenas)
+
+        plan.sort(key=len)
+        resultado = set(plan[0])
+        for posiciones in plan[1:]:
+            if not resultado:
+                break
+            resultado &= posiciones
+
+        return [self._faenas[pos] for pos in sorted(resultado)]
+
+    def buscar_texto(self, criterio: str) -> List[Dict[str, Any]]:
+        """Atajo: parsear la mini-sintaxis y buscar."""
+        return self.buscar(parsear_consulta(criterio))
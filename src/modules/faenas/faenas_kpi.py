@@ -0,0 +1,134 @@
+"""Modelo incremental de KPIs del mes para el dashboard de faenas.
+
+Los indicadores se mantienen como contadores: registrar, editar o eliminar una
+faena (o sus participantes) solo resta el aporte anterior de esa faena y suma
+el nuevo, sin volver a recorrer toda la lista.
+"""
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core.fechas import pertenece_a_mes
+
+# Monto estimado por punto de peso pendiente de pago
+TARIFA_PENDIENTE_POR_PESO = 50
+
+
+class ModeloKPIFaenas:
+    """Contadores del mes actual: faenas, horas, participantes, pendiente y completadas."""
+
+    def __init__(self, mes: Optional[int] = None, anio: Optional[int] = None):
+        ahora = datetime.now()
+        self._mes_fijo = mes is not None
+        self.mes = mes or ahora.month
+        self.anio = anio or ahora.year
+        self._faenas_ref: List[Dict[str, Any]] = []
+        self._suscriptores: List[Callable[[Dict[str, Any]], None]] = []
+        self._reiniciar()
+
+    def _reiniciar(self) -> None:
+        # id de faena -> (horas, nombres, pendiente, completada) con que aporta
+        self._aportes: Dict[str, tuple] = {}
+        self._nombres: Counter = Counter()
+        self._horas = 0.0
+        self._pendiente = 0.0
+        self._completadas = 0
+
+    # ------------------------------------------------------------------
+    # Carga y cambios
+    # ------------------------------------------------------------------
+
+    def cargar(self, faenas: List[Dict[str, Any]]) -> None:
+        """Recalcular desde cero (al cargar datos o al cambiar de mes)."""
+        self._faenas_ref = faenas
+        self._reiniciar()
+        for faena in faenas:
+            self._sumar(faena)
+        self._notificar()
+
+    def agregar_faena(self, faena: Dict[str, Any]) -> None:
+        self._sumar(faena)
+        self._notificar()
+
+    def quitar_faena(self, faena: Dict[str, Any]) -> None:
+        self._restar(self._clave(faena))
+        self._notificar()
+
+    def actualizar_faena(self, faena: Dict[str, Any]) -> None:
+        """Faena editada o con participantes agregados/quitados."""
+        self._restar(self._clave(faena))
+        self._sumar(faena)
+        self._notificar()
+
+    @staticmethod
+    def _clave(faena: Dict[str, Any]) -> str:
+        return faena.get('id') or str(id(faena))
+
+    def _sumar(self, faena: Dict[str, Any]) -> None:
+        if not pertenece_a_mes(faena.get('fecha', ''), self.mes, self.anio):
+            return
+        participantes = faena.get('participantes', [])
+        horas = sum(p.get('horas_trabajadas', 0) for p in participantes)
+        nombres = [p.get('nombre') for p in participantes]
+        pendiente = (faena.get('peso', 0) * TARIFA_PENDIENTE_POR_PESO
+                     if faena.get('estado') != 'pagada' else 0)
+        completada = faena.get('estado') != 'registrada'
+
+        self._aportes[self._clave(faena)] = (horas, nombres, pendiente, completada)
+        self._horas += horas
+        self._nombres.update(nombres)
+        self._pendiente += pendiente
+        self._completadas += completada
+
+    def _restar(self, clave: str) -> None:
+        aporte = self._aportes.pop(clave, None)
+        if aporte is None:
+            return
+        horas, nombres, pendiente, completada = aporte
+        self._horas -= horas
+        self._nombres.subtract(nombres)
+        for nombre in set(nombres):
+            if self._nombres[nombre] <= 0:
+                del self._nombres[nombre]
+        self._pendiente -= pendiente
+        self._completadas -= completada
+
+    # ------------------------------------------------------------------
+    # Lectura y suscripción
+    # ------------------------------------------------------------------
+
+    def datos(self) -> Dict[str, Any]:
+        """Mismo formato que devolvía _obtener_datos_dashboard."""
+        if not self._mes_fijo:
+            ahora = datetime.now()
+            if (ahora.month, ahora.year) != (self.mes, self.anio):
+                # Cambió el mes con la aplicación abierta
+                self.mes, self.anio = ahora.month, ahora.year
+                self._reiniciar()
+                for faena in self._faenas_ref:
+                    self._sumar(faena)
+
+        faenas_mes = len(self._aportes)
+        return {
+            'faenas_mes': faenas_mes,
+            'horas_mes': self._horas,
+            'participantes': len(self._nombres),
+            'pendiente_pago': self._pendiente,
+            'completadas': self._completadas,
+            'promedio_horas': self._horas / faenas_mes if faenas_mes else 0
+        }
+
+    def suscribir(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """Registrar un callback que recibe datos() tras cada cambio."""
+        self._suscriptores.append(callback)
+
+    def desuscribir(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        if callback in self._suscriptores:
+            self._suscriptores.remove(callback)
+
+    def _notificar(self) -> None:
+        if not self._suscriptores:
+            return
+        datos = self.datos()
+        for callback in list(self._suscriptores):
+            callback(datos)
@@ -0,0 +1,176 @@
+"""Puntos de faena por habitante y año, materializados e incrementales.
+
+Cada faena aporta ``peso * peso_aplicado`` a cada participante del año de su
+fecha. El modelo guarda el aporte de cada faena para poder restarlo y sumarlo
+de nuevo cuando se edita, así que registrar o cambiar participantes no recorre
+todas las faenas. Cambiar de año en el resumen es una búsqueda en un dict.
+
+Las horas de las cuotas no salen de aquí: se leen de participacion_faenas
+(ver SistemaCuotas).
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.core.fechas import parsear_fecha
+
+# Margen para comparar totales en coma flotante al verificar consistencia
+TOLERANCIA = 1e-6
+
+
+def anio_de_fecha(fecha: Optional[str]) -> int:
+    """Año de una fecha ISO (o DD/MM/YYYY); el año actual si no es válida."""
+    texto = str(fecha or '')
+    if len(texto) >= 10 and texto[4] == '-' and texto[:4].isdigit():
+        return int(texto[:4])
+    valor = parsear_fecha(texto)
+    return valor.year if valor else datetime.now().year
+
+
+class PuntosAnualesFaenas:
+    """Totales de puntos por año y habitante."""
+
+    def __init__(self, faenas: Optional[List[Dict[str, Any]]] = None):
+        self._faenas_ref: List[Dict[str, Any]] = []
+        self._reiniciar()
+        if faenas is not None:
+            self.cargar(faenas)
+
+    def _reiniciar(self) -> None:
+        # id de faena -> (anio, [(clave, folio, nombre, puntos), ...])
+        self._aportes: Dict[str, Tuple[int, List[tuple]]] = {}
+        # anio -> clave -> {'folio', 'nombre', 'puntos', 'participaciones'}
+        self._totales: Dict[int, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        # anio -> resumen ya ordenado (se descarta al cambiar ese año)
+        self._resumenes: Dict[int, Dict[str, Any]] = {}
+        self._corrupto = False
+
+    # ------------------------------------------------------------------
+    # Carga y cambios
+    # ------------------------------------------------------------------
+
+    def cargar(self, faenas: List[Dict[str, Any]]) -> None:
+        """Recalcular desde cero (al cargar datos)."""
+        self._faenas_ref = faenas
+        self.reconstruir()
+
+    def reconstruir(self) -> None:
+        """Rehacer todos los totales a partir de la lista de faenas."""
+        self._reiniciar()
+        for faena in self._faenas_ref:
+            self._sumar(faena)
+
+    def agregar_faena(self, faena: Dict[str, Any]) -> None:
+        self._sumar(faena)
+
+    def quitar_faena(self, faena: Dict[str, Any]) -> None:
+        self._restar(self._clave_faena(faena))
+
+    def actualizar_faena(self, faena: Dict[str, Any]) -> None:
+        """Faena editada o con participantes agregados/quitados."""
+        self._restar(self._clave_faena(faena))
+        self._sumar(faena)
+
+    @staticmethod
+    def _clave_faena(faena: Dict[str, Any]) -> str:
+        return faena.get('id') or str(id(faena))
+
+    @staticmethod
+    def clave_habitante(participante: Dict[str, Any]) -> str:
+        return participante.get('folio') or participante.get('nombre')
+
+    def _sumar(self, faena: Dict[str, Any]) -> None:
+        anio = anio_de_fecha(faena.get('fecha', ''))
+        peso = faena.get('peso', 0)
+        totales = self._totales[anio]
+
+        aporte = []
+        for p in faena.get('participantes', []):
+            clave = self.clave_habitante(p)
+            # peso_aplicado: 0.9 para quien contrató, 1.0 para el resto
+            puntos = peso * p.get('peso_aplicado', 1.0)
+            aporte.append((clave, p.get('folio', ''), p.get('nombre', ''), puntos))
+
+            total = totales.get(clave)
+            if total is None:
+                total = totales[clave] = {'folio': p.get('folio', ''), 'nombre': p.get('nombre', ''),
+                                          'puntos': 0, 'participaciones': 0}
+            total['participaciones'] += 1
+            total['puntos'] += puntos
+
+        self._aportes[self._clave_faena(faena)] = (anio, aporte)
+        self._resumenes.pop(anio, None)
+
+    def _restar(self, clave_faena: str) -> None:
+        registro = self._aportes.pop(clave_faena, None)
+        if registro is None:
+            return
+        anio, aporte = registro
+        totales = self._totales[anio]
+
+        for clave, _, _, puntos in aporte:
+            total = totales.get(clave)
+            if total is None:
+                self._corrupto = True
+                continue
+            total['participaciones'] -= 1
+            total['puntos'] -= puntos
+            if total['puntos'] < -TOLERANCIA:
+                self._corrupto = True
+            if total['participaciones'] <= 0:
+                del totales[clave]
+
+        self._resumenes.pop(anio, None)
+
+    # ------------------------------------------------------------------
+    # Consistencia
+    # ------------------------------------------------------------------
+
+    def es_consistente(self) -> bool:
+        """Comparar los totales con la suma de los aportes guardados."""
+        if self._corrupto:
+            return False
+        esperados: Dict[Tuple[int, str], float] = defaultdict(float)
+        for anio, aporte in self._aportes.values():
+            for clave, _, _, puntos in aporte:
+                esperados[(anio, clave)] += puntos
+        actuales = {(anio, clave): total['puntos']
+                    for anio, totales in self._totales.items()
+                    for clave, total in totales.items()}
+        if set(esperados) != set(actuales):
+            return False
+        return all(abs(esperados[k] - actuales[k]) <= TOLERANCIA for k in esperados)
+
+    def verificar(self) -> bool:
+        """Reconstruir si los totales no cuadran. Devuelve True si hubo que reparar."""
+        if self.es_consistente():
+            return False
+        self.reconstruir()
+        return True
+
+    # ------------------------------------------------------------------
+    # Lectura
+    # ------------------------------------------------------------------
+
+    def resumen(self, anio: int) -> Dict[str, Any]:
+        """Mismo formato que FaenasServicio.calcular_resumen_anual, más 'ordenados'."""
+        if self._corrupto:
+            self.reconstruir()
+        resumen = self._resumenes.get(anio)
+        if resumen is None:
+            puntos = self._totales.get(anio, {})
+            resumen = {
+                'puntos': puntos,
+                'ordenados': sorted(puntos.values(), key=lambda x: (-x['puntos'], x['nombre'])),
+                'max_puntos': max((v['puntos'] for v in puntos.values()), default=1),
+                'anio': anio,
+                'total_personas': len(puntos)
+            }
+            self._resumenes[anio] = resumen
+        return resumen
+
+    def anios_disponibles(self) -> List[int]:
+        """Años con faenas, más el actual, de más reciente a más antiguo."""
+        anios = {datetime.now().year}
+        anios.update(anio for anio, totales in self._totales.items() if totales)
+        return sorted(anios, reverse=True)
@@ -1,7 +1,9 @@
 """Servicio de lógica de negocio para faenas."""
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Union
 from src.core.gestor_datos_global import obtener_gestor
+from src.modules.faenas.faenas_consulta import normalizar_texto
+from src.modules.faenas.faenas_puntos import PuntosAnualesFaenas, anio_de_fecha
 
 
 class FaenasServicio:
@@ -13,37 +15,13 @@ class FaenasServicio:
     def calcular_resumen_anual(self, faenas: List[Dict[str, Any]], anio: int) -> Dict[str, Any]:
         """Calcula puntos por persona para un año específico.
         
+        Para consultas repetidas conviene mantener un PuntosAnualesFaenas vivo
+        (ver SistemaFaenas.puntos) en lugar de llamar a esta función.
+        
         Returns:
             Dict con 'puntos' (dict folio->data), 'max_puntos', 'anio'
         """
-        puntos = {}
-        
-        for faena in faenas:
-            if self._anio_de_faena(faena) != anio:
-                continue
-            
-            peso = faena.get('peso', 0)
-            for p in faena.get('participantes', []):
-                clave = p.get('folio') or p.get('nombre')
-                if clave not in puntos:
-                    puntos[clave] = {
-                        'folio': p.get('folio', ''),
-                        'nombre': p.get('nombre', ''),
-                        'puntos': 0
-                    }
-                
-                # Aplicar peso_aplicado (0.9 para quien contrató, 1.0 para resto)
-                multiplicador = p.get('peso_aplicado', 1.0)
-                puntos[clave]['puntos'] += peso * multiplicador
-        
-        max_puntos = max((v['puntos'] for v in puntos.values()), default=1)
-        
-        return {
-            'puntos': puntos,
-            'max_puntos': max_puntos,
-            'anio': anio,
-            'total_personas': len(puntos)
-        }
+        return PuntosAnualesFaenas(faenas).resumen(anio)
 
     def obtener_años_disponibles(self, faenas: List[Dict[str, Any]]) -> List[int]:
         """Extrae lista de años con faenas registradas."""
@@ -52,6 +30,111 @@ class FaenasServicio:
             años.add(self._anio_de_faena(f))
         return sorted(años, reverse=True)
 
+    def construir_indice_censo(
+        self,
+        habitantes: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Índice del censo para resolver participantes en una sola pasada.
+        
+        Args:
+            habitantes: Lista ya cargada; si es None se piden los activos al gestor
+        
+        Returns:
+            Dict con 'por_folio' (folio en mayúsculas -> habitante) y
+            'por_nombre' (nombre normalizado -> habitante)
+        """
+        if habitantes is None:
+            habitantes = [h for h in self.gestor.obtener_habitantes(incluir_inactivos=True)
+                          if h.get('activo', True)]
+        return {
+            'por_folio': {str(h['folio']).strip().upper(): h
+                          for h in habitantes if h.get('folio')},
+            'por_nombre': {normalizar_texto(h['nombre']): h
+                           for h in habitantes if h.get('nombre')},
+        }
+
+    @staticmethod
+    def _clave_participante(folio: Optional[str], nombre: Optional[str]) -> str:
+        """Clave de duplicado: el folio si existe, si no el nombre normalizado."""
+        if folio:
+            return 'F:' + str(folio).strip().upper()
+        return 'N:' + normalizar_texto(nombre)
+
+    def agregar_participantes_en_lote(
+        self,
+        faena: Dict[str, Any],
+        entradas: Iterable[Union[str, Dict[str, Any]]],
+        indice_censo: Optional[Dict[str, Dict[str, Dict[str, Any]]]] = None,
+        plantilla: Optional[Dict[str, Any]] = None,
+        permitir_no_resueltos: bool = False
+    ) -> Dict[str, Any]:
+        """Agrega muchos participantes a una faena en una sola operación.
+        
+        Cada entrada puede ser un folio, un nombre o un dict con 'folio'/'nombre'.
+        Se resuelven contra el índice del censo, se descartan duplicados (ya
+        presentes en la faena o repetidos en el lote) con un set y se agregan
+        todos juntos. No guarda: el llamador persiste una sola vez al final.
+        
+        Args:
+            faena: Faena a modificar (se modifica en sitio)
+            entradas: Folios, nombres o dicts de participantes
+            indice_censo: Resultado de construir_indice_censo (se arma si es None)
+            plantilla: Campos extra para cada participante nuevo
+            permitir_no_resueltos: Agregar por nombre a quien no está en el censo
+        
+        Returns:
+            Dict con 'agregados', 'omitidos', 'no_resueltos' (lista) y 'participantes'
+        """
+        indice = indice_censo or self.construir_indice_censo()
+        por_folio = indice['por_folio']
+        por_nombre = indice['por_nombre']
+
+        participantes = faena.setdefault('participantes', [])
+        existentes = {self._clave_participante(p.get('folio'), p.get('nombre'))
+                      for p in participantes}
+        hora = datetime.now().isoformat()
+
+        nuevos = []
+        omitidos = 0
+        no_resueltos = []
+        for entrada in entradas:
+            if isinstance(entrada, dict):
+                folio = str(entrada.get('folio') or '').strip()
+                nombre = str(entrada.get('nombre') or '').strip()
+            else:
+                folio, nombre = '', str(entrada or '').strip()
+            if not folio and not nombre:
+                continue
+
+            habitante = (por_folio.get(folio.upper()) if folio else None) \
+                or por_folio.get(nombre.upper()) \
+                or por_nombre.get(normalizar_texto(nombre))
+            if habitante:
+                folio, nombre = habitante.get('folio', ''), habitante.get('nombre', '')
+            elif not folio and not permitir_no_resueltos:
+                no_resueltos.append(nombre)
+                continue
+
+            clave = self._clave_participante(folio, nombre)
+            if clave in existentes:
+                omitidos += 1
+                continue
+            existentes.add(clave)
+
+            participante = {'folio': folio, 'nombre': nombre or folio, 'hora_registro': hora}
+            if plantilla:
+                participante.update(plantilla)
+            nuevos.append(participante)
+
+        participantes.extend(nuevos)
+        return {
+            'ok': True,
+            'agregados': len(nuevos),
+            'omitidos': omitidos,
+            'no_resueltos': no_resueltos,
+            'participantes': nuevos
+        }
+
     def sincronizar_participantes_con_censo(
         self, 
         faenas: List[Dict[str, Any]]
@@ -66,11 +149,8 @@ class FaenasServicio:
             habitantes_todos = self.gestor.obtener_habitantes(incluir_inactivos=True)
             habitantes = [h for h in habitantes_todos if h.get('activo', True)]
             
-            # Crear mapeo nombre -> habitante
-            nombre_a_hab = {
-                h.get('nombre', '').strip().lower(): h 
-                for h in habitantes if h.get('nombre')
-            }
+            # Índice nombre normalizado -> habitante (una sola vez para todas las faenas)
+            nombre_a_hab = self.construir_indice_censo(habitantes)['por_nombre']
             
             actualizados = 0
             total_participantes = 0
@@ -78,7 +158,7 @@ class FaenasServicio:
             for faena in faenas:
                 for participante in faena.get('participantes', []):
                     total_participantes += 1
-                    nombre = participante.get('nombre', '').strip().lower()
+                    nombre = normalizar_texto(participante.get('nombre', ''))
                     folio_actual = participante.get('folio', '')
                     
                     if nombre in nombre_a_hab:
@@ -180,7 +260,4 @@ class FaenasServicio:
     @staticmethod
     def _anio_de_faena(faena: Dict[str, Any]) -> int:
         """Extrae año de una faena."""
-        try:
-            return datetime.strptime(faena.get('fecha', ''), "%Y-%m-%d").year
-        except (ValueError, TypeError):
-            return datetime.now().year
+        return anio_de_fecha(faena.get('fecha', ''))
@@ -13,7 +13,7 @@ from src.config import (
 )
 from src.modules.faenas.dashboard_faenas import DashboardFaenas
 from src.modules.faenas.buscador_avanzado import BuscadorAvanzadoFaenas
-from src.core.optimizador_ui import get_ui_optimizer
+from src.core.optimizador_ui import DebounceManager
 
 
 class FaenasUIManager:
@@ -46,8 +46,8 @@ class FaenasUIManager:
         self.anio_var = tk.StringVar(value=str(datetime.now().year))
         self.resumen_buscar_var = tk.StringVar()
         
-        # Optimizador UI
-        self._optimizer = get_ui_optimizer()
+        # Debounce con root.after (sin hilos, callbacks en el hilo de Tk)
+        self._debounce = DebounceManager(widget=root)
 
         # Referencias a widgets
         self.barra: Optional[BarraSuperior] = None
@@ -57,6 +57,7 @@ class FaenasUIManager:
         self.lbl_faena_actual: Optional[tk.Label] = None
         self.anio_combo: Optional[ttk.Combobox] = None
         self.panel_resumen: Optional[PanelModerno] = None
+        self.dashboard: Optional[DashboardFaenas] = None
 
     def configurar_interfaz(self) -> None:
         """Configurar toda la interfaz de usuario"""
@@ -97,8 +98,8 @@ class FaenasUIManager:
         main.rowconfigure(2, weight=1)
         main.rowconfigure(3, weight=1)
 
-        dashboard = DashboardFaenas(main, self.callbacks.get('obtener_datos_dashboard', lambda: {}))
-        dashboard.frame.grid(row=0, column=0, columnspan=2, sticky='nsew', pady=(0, ESPACIADO['lg']))
+        self.dashboard = DashboardFaenas(main, self.callbacks.get('obtener_datos_dashboard', lambda: {}))
+        self.dashboard.frame.grid(row=0, column=0, columnspan=2, sticky='nsew', pady=(0, ESPACIADO['lg']))
         
         buscador = BuscadorAvanzadoFaenas(main, self.callbacks.get('busqueda_avanzada', lambda x: None))
         buscador.frame.grid(row=1, column=0, columnspan=2, sticky='nsew', pady=(0, ESPACIADO['lg']))
@@ -382,7 +383,7 @@ class FaenasUIManager:
     
     def _buscar_resumen_debounced(self):
         """Búsqueda en resumen con debouncing"""
-        self._optimizer.debounce.debounce(
+        self._debounce.debounce(
             'faenas_resumen_search',
             UI_DEBOUNCE_FILTER,
             self.callbacks.get('actualizar_resumen')
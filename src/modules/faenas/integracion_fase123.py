@@ -3,9 +3,12 @@ from tkinter import messagebox
 from datetime import datetime
 from typing import Dict, List, Optional, Callable
 
+from src.core.fechas import pertenece_a_mes
 from src.modules.faenas.dashboard_faenas import DashboardFaenas
 from src.modules.faenas.sistema_cuotas import SistemaCuotas, PanelCuotasUI
 from src.modules.faenas.buscador_avanzado import BuscadorAvanzadoFaenas
+from src.modules.faenas.faenas_consulta import IndiceFaenas
+from src.modules.faenas.faenas_kpi import ModeloKPIFaenas
 from src.modules.faenas.formulario_moderno import FormularioFaenaModerno, ValidadorFormularioFaena
 from src.modules.faenas.generador_reportes_faenas import GeneradorReportesFaenas, PanelReportesFaenas
 from src.modules.faenas.gestor_atajos import GestorAtajosRapidos
@@ -18,6 +21,8 @@ class FaenasIntegracion:
         self.callbacks = callbacks
         self.db = db
         self.faenas = []
+        self.indice = IndiceFaenas()
+        self.kpi = ModeloKPIFaenas()
         self.faena_seleccionada = None
         
         self.notificaciones = SistemaNotificaciones(parent_frame)
@@ -28,8 +33,7 @@ class FaenasIntegracion:
         self.widgets = {}
     
     def crear_panel_dashboard(self, parent) -> DashboardFaenas:
-        datos = self._obtener_datos_dashboard()
-        dashboard = DashboardFaenas(parent, lambda: self._obtener_datos_dashboard())
+        dashboard = DashboardFaenas(parent, modelo=self.kpi)
         return dashboard
     
     def crear_panel_buscador(self, parent) -> BuscadorAvanzadoFaenas:
@@ -76,78 +80,14 @@ class FaenasIntegracion:
         return gestor
     
     def _obtener_datos_dashboard(self) -> Dict:
-        ahora = datetime.now()
-        mes_actual = ahora.month
-        anio_actual = ahora.year
-        
-        faenas_mes = [f for f in self.faenas 
-                     if self._pertenece_al_mes(f.get('fecha', ''), mes_actual, anio_actual)]
-        
-        horas_totales = sum([sum([p.get('horas_trabajadas', 0) 
-                                 for p in f.get('participantes', [])]) 
-                            for f in faenas_mes])
-        
-        participantes_unicos = set()
-        for faena in faenas_mes:
-            for part in faena.get('participantes', []):
-                participantes_unicos.add(part.get('nombre'))
-        
-        pagos_pendientes = sum([f.get('peso', 0) * 50 
-                               for f in faenas_mes 
-                               if f.get('estado') != 'pagada'])
-        
-        completadas = len([f for f in faenas_mes if f.get('estado') != 'registrada'])
-        
-        promedio = horas_totales / len(faenas_mes) if faenas_mes else 0
-        
-        return {
-            'faenas_mes': len(faenas_mes),
-            'horas_mes': horas_totales,
-            'participantes': len(participantes_unicos),
-            'pendiente_pago': pagos_pendientes,
-            'completadas': completadas,
-            'promedio_horas': promedio
-        }
+        return self.kpi.datos()
     
     def _pertenece_al_mes(self, fecha_str: str, mes: int, anio: int) -> bool:
-        if not fecha_str:
-            return False
-        try:
-            partes = fecha_str.split('/')
-            return int(partes[1]) == mes and int(partes[2]) == anio
-        except:
-            return False
+        # Fechas ISO (y DD/MM/YYYY heredadas) resueltas en src.core.fechas
+        return pertenece_a_mes(fecha_str, mes, anio)
     
     def _ejecutar_busqueda(self, filtros: Dict):
-        resultados = []
-        
-        for faena in self.faenas:
-            cumple = True
-            
-            if 'fecha' in filtros:
-                if faena.get('fecha') != filtros['fecha']:
-                    cumple = False
-            
-            if 'nombre' in filtros:
-                if filtros['nombre'].lower() not in faena.get('nombre', '').lower():
-                    cumple = False
-            
-            if 'participante' in filtros:
-                participantes = [p.get('nombre') for p in faena.get('participantes', [])]
-                if not any(filtros['participante'].lower() in p.lower() for p in participantes):
-                    cumple = False
-            
-            if 'peso_min' in filtros:
-                if faena.get('peso', 0) < filtros['peso_min']:
-                    cumple = False
-            
-            if 'estado' in filtros:
-                if faena.get('estado') != filtros['estado']:
-                    cumple = False
-            
-            if cumple:
-                resultados.append(faena)
-        
+        resultados = self.indice.buscar(filtros)
         self.callbacks.get('actualizar_listado', lambda x: None)(resultados)
     
     def _guardar_cambios(self):
@@ -170,6 +110,8 @@ class FaenasIntegracion:
     
     def actualizar_faenas(self, faenas: List[Dict]):
         self.faenas = faenas
+        self.indice.reconstruir(faenas)
+        self.kpi.cargar(faenas)
     
     def obtener_cuotas_participante(self, nombre: str) -> Dict:
         if not self.sistema_cuotas:
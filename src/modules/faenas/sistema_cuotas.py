@@ -2,16 +2,23 @@ import tkinter as tk
 from tkinter import ttk
 from typing import Dict, List, Callable, Optional
 
+from src.core.fechas import pertenece_a_mes, rango_mes
+
 
 class SistemaCuotas:
+    """Cuotas de horas de faena; las horas salen de participacion_faenas en la BD"""
+    
     def __init__(self, db):
         self.db = db
         
     def obtener_cuota_mes(self, habitante_id: str, mes: int, anio: int) -> Dict:
         faenas = self.db.obtener_faenas_habitante(habitante_id)
-        horas_mes = sum([f.get('horas_trabajadas', 0) for f in faenas 
+        horas_mes = sum([f.get('horas_trabajadas') or 0 for f in faenas 
                         if self._es_mismo_mes(f.get('fecha'), mes, anio)])
-        
+        return self._cuota_mes(horas_mes)
+    
+    @staticmethod
+    def _cuota_mes(horas_mes: float) -> Dict:
         return {
             'horas_realizadas': horas_mes,
             'horas_minimas': 10,
@@ -22,8 +29,8 @@ class SistemaCuotas:
     
     def obtener_cuota_anual(self, habitante_id: str, anio: int) -> Dict:
         faenas = self.db.obtener_faenas_habitante(habitante_id)
-        horas_anio = sum([f.get('horas_trabajadas', 0) for f in faenas 
-                         if f.get('fecha', '')[:4] == str(anio)])
+        horas_anio = sum([f.get('horas_trabajadas') or 0 for f in faenas 
+                         if (f.get('fecha') or '')[:4] == str(anio)])
         
         return {
             'horas_realizadas': horas_anio,
@@ -35,10 +42,12 @@ class SistemaCuotas:
     
     def obtener_resumen_habitantes(self, mes: int, anio: int) -> List[Dict]:
         habitantes = self.db.obtener_todos_habitantes()
+        # Una consulta agrupada para todo el mes en vez de una por habitante
+        horas_por_habitante = self.db.obtener_horas_faenas_periodo(*rango_mes(mes, anio))
         resumen = []
         
         for hab in habitantes:
-            cuota = self.obtener_cuota_mes(hab.get('id'), mes, anio)
+            cuota = self._cuota_mes(horas_por_habitante.get(hab.get('id'), 0))
             resumen.append({
                 'nombre': hab.get('nombre'),
                 'cuota': cuota,
@@ -48,13 +57,7 @@ class SistemaCuotas:
         return sorted(resumen, key=lambda x: x['cuota']['porcentaje'], reverse=True)
     
     def _es_mismo_mes(self, fecha_str: str, mes: int, anio: int) -> bool:
-        if not fecha_str:
-            return False
-        try:
-            partes = fecha_str.split('/')
-            return int(partes[1]) == mes and int(partes[2]) == anio
-        except:
-            return False
+        return pertenece_a_mes(fecha_str, mes, anio)
 
 
 class PanelCuotasUI:
@@ -5,10 +5,21 @@ Registra todas las ediciones con timestamp, usuario y cambios
 
 import json
 import os
+from bisect import bisect_left
 from datetime import datetime
 from pathlib import Path
 from src.config import RUTA_SEGURA
 from src.core.logger import registrar_operacion, registrar_error
+from src.core.fechas import normalizar_fecha_iso, rango_dias
+
+
+def fecha_iso_registro(registro):
+    """Fecha ISO (YYYY-MM-DD) de un registro del historial"""
+    timestamp = registro.get('timestamp')
+    if timestamp:
+        return timestamp[:10]
+    return normalizar_fecha_iso(registro.get('fecha')) or ''
+
 
 class GestorHistorial:
     """Gestor de historial de cambios y auditoria independiente por cooperación"""
@@ -172,25 +183,24 @@ class GestorHistorial:
         """
         Obtiene cambios en un rango de fechas
         
+        El historial se agrega en orden cronológico, así que el rango se
+        localiza con búsqueda binaria sobre la fecha ISO de cada registro.
+        
         Args:
-            fecha_inicio (str): Fecha en formato DD/MM/YYYY
-            fecha_fin (str): Fecha en formato DD/MM/YYYY
+            fecha_inicio (str): Fecha en formato DD/MM/YYYY (o YYYY-MM-DD)
+            fecha_fin (str): Fecha en formato DD/MM/YYYY (o YYYY-MM-DD)
             
         Returns:
             list: Lista de cambios en el rango
         """
-        from datetime import datetime
-        
-        inicio = datetime.strptime(fecha_inicio, '%d/%m/%Y')
-        fin = datetime.strptime(fecha_fin, '%d/%m/%Y')
-        
-        registros = []
-        for r in self.historial:
-            fecha_registro = datetime.strptime(r['fecha'], '%d/%m/%Y')
-            if inicio <= fecha_registro <= fin:
-                registros.append(r)
+        rango = rango_dias(fecha_inicio, fecha_fin)
+        if rango is None:
+            return []
         
-        return registros
+        inicio, fin = rango
+        desde = bisect_left(self.historial, inicio, key=fecha_iso_registro)
+        hasta = bisect_left(self.historial, fin, lo=desde, key=fecha_iso_registro)
+        return self.historial[desde:hasta]
     
     def obtener_historial_tipo(self, tipo):
         """
@@ -3,7 +3,8 @@ Ventana para ver el historial de cambios del sistema
 """
 import tkinter as tk
 from tkinter import ttk, messagebox
-from src.modules.historial.historial import GestorHistorial
+from src.modules.historial.historial import GestorHistorial, fecha_iso_registro
+from src.core.fechas import normalizar_fecha_iso
 from datetime import datetime
 from src.ui.tema_moderno import TEMA_CLARO, TEMA_OSCURO, FUENTES
 
@@ -274,19 +275,16 @@ class VentanaHistorial:
             resultado = [r for r in resultado if r.get('usuario') == self.usuario_var.get()]
         
         # Filtrar por rango de fechas
+        # (comparación de texto sobre fechas ISO, sin strptime por registro)
         if hasattr(self, 'fecha_desde_var') and self.fecha_desde_var.get():
-            try:
-                fecha_desde = datetime.strptime(self.fecha_desde_var.get(), '%d/%m/%Y')
-                resultado = [r for r in resultado if self._comparar_fecha(r.get('fecha', ''), fecha_desde, '>=')]
-            except:
-                pass
+            fecha_desde = normalizar_fecha_iso(self.fecha_desde_var.get())
+            if fecha_desde:
+                resultado = [r for r in resultado if fecha_iso_registro(r) >= fecha_desde]
         
         if hasattr(self, 'fecha_hasta_var') and self.fecha_hasta_var.get():
-            try:
-                fecha_hasta = datetime.strptime(self.fecha_hasta_var.get(), '%d/%m/%Y')
-                resultado = [r for r in resultado if self._comparar_fecha(r.get('fecha', ''), fecha_hasta, '<=')]
-            except:
-                pass
+            fecha_hasta = normalizar_fecha_iso(self.fecha_hasta_var.get())
+            if fecha_hasta:
+                resultado = [r for r in resultado if fecha_iso_registro(r) <= fecha_hasta]
         
         # Filtrar por búsqueda general
         if hasattr(self, 'busqueda_var') and self.busqueda_var.get():
@@ -295,18 +293,6 @@ class VentanaHistorial:
         
         return resultado
     
-    def _comparar_fecha(self, fecha_str, fecha_ref, operador):
-        """Comparar fechas con operador específico"""
-        try:
-            fecha = datetime.strptime(fecha_str, '%d/%m/%Y')
-            if operador == '>=':
-                return fecha >= fecha_ref
-            elif operador == '<=':
-                return fecha <= fecha_ref
-            return False
-        except:
-            return False
-    
     def _contiene_busqueda(self, registro, busqueda):
         """Verificar si el registro contiene la búsqueda"""
         campos_buscar = [
@@ -16,6 +16,7 @@ if __name__ == "__main__":
         sys.path.insert(0, proyecto_raiz)
 
 from src.core.logger import registrar_operacion, registrar_error, registrar_transaccion
+from src.core.fechas import formatear_fecha_ui, hoy_iso
 from src.config import TEMAS, TAMAÑOS_LETRA
 from src.core.validadores import validar_nombre, validar_monto, ErrorValidacion
 from src.tools.exportador import ExportadorExcel
@@ -26,7 +27,11 @@ from src.ui.estilos_globales import TEMA_GLOBAL
 from src.ui.ui_moderna import BarraSuperior, PanelModerno, BotonModerno
 from src.ui.buscador import BuscadorAvanzado
 from src.modules.pagos.pagos_seguridad import GestorSeguridad
+from src.modules.pagos.pagos_estado import GestorEstadoPago, CODIGOS_ESTADO
 from src.core.gestor_datos_global import obtener_gestor
+from src.core.mantenimiento_bd import iniciar_mantenimiento_bd
+from src.core.autorizacion import rol_tiene_permiso
+from src.core.instancia_unica import asegurar_instancia_unica
 from src.modules.pagos.pagos_dialogos import (
     DialogoRegistrarPago, 
     DialogoAgregarPersona, 
@@ -39,6 +44,13 @@ from src.modules.pagos.pagos_barra_estado import BarraEstadoModerna
 from src.modules.pagos.pagos_tooltips import TooltipModerno
 from src.modules.pagos.pagos_confirmaciones import ConfirmacionMejorada
 
+# Tag de fila y orden de la columna 'estado' para cada código de estado
+TAG_POR_CODIGO = tuple('pagado' if estado in ('completado', 'excedente') else estado
+                       for estado in CODIGOS_ESTADO)
+ORDEN_POR_CODIGO = tuple({'pendiente': 2, 'parcial': 1}.get(estado, 0)
+                         for estado in CODIGOS_ESTADO)
+
+
 class SistemaControlPagos:
     # Los temas y tamaños ahora vienen de config.py
 
@@ -77,6 +89,8 @@ class SistemaControlPagos:
         self.usuario_actual = None
         self.gestor_auth = None
         self.tree_persona_map = {}
+        # Clasificación de pagos del ciclo de refresco en curso
+        self._clasificacion = None
         self.permisos_rol = {}
         self.barra_superior = None
         # BUGFIX: Inicializar variables UI temprano para evitar AttributeError
@@ -157,12 +171,23 @@ class SistemaControlPagos:
         rol = self.usuario_actual.get('rol')
         if not rol or rol not in self.permisos_rol:
             return True
-        permisos = self.permisos_rol[rol].get('permisos', [])
-        if '*' in permisos or permiso in permisos:
+        if rol_tiene_permiso(rol, permiso):
             return True
         messagebox.showerror("Permisos", f"Tu rol no permite realizar esta acción ({permiso}).")
         return False
     
+    def _gestor_personas_actual(self):
+        """
+        GestorPersonas sobre la lista de la cooperación mostrada
+        
+        Al cambiar de cooperación se reemplaza self.personas; los cambios hechos
+        directamente sobre una persona (pagos, monto) se avisan a este gestor
+        para mantener sus índices por estado y totales.
+        """
+        if self.gestor_personas.personas is not self.personas:
+            self.gestor_personas.cargar_personas(self.personas)
+        return self.gestor_personas
+    
     def obtener_colores(self):
         """Obtener paleta de colores del tema global"""
         return self.tema_global
@@ -348,9 +373,8 @@ class SistemaControlPagos:
                 return
             
             try:
-                # Verificar contraseña usando el sistema de autenticación
-                import hashlib
-                hash_ingresado = hashlib.sha256(password.encode()).hexdigest()
+                # Verificar contraseña usando el servicio de credenciales
+                from src.core.credenciales import obtener_servicio_credenciales
                 
                 # Obtener el nombre de usuario correcto del objeto usuario_actual
                 # Puede estar en 'usuario' o 'nombre'
@@ -365,7 +389,7 @@ class SistemaControlPagos:
                     pass_entry.focus()
                     return
                 
-                if hash_ingresado == usuario_bd['contraseña']:
+                if obtener_servicio_credenciales().verificar(password, usuario_bd['contraseña']):
                     resultado['success'] = True
                     dialog.destroy()
                 else:
@@ -544,22 +568,16 @@ class SistemaControlPagos:
     def _obtener_personas_coop_bd(self, coop_id):
         """Obtiene todas las personas de una cooperación desde BD"""
         try:
-            cursor = self.bd.conexion.cursor()
-            
-            cursor.execute('''
-                SELECT pc.id, pc.habitante_id, h.folio, h.nombre, 
-                       pc.monto_esperado, pc.estado, pc.notas, pc.fecha_agregado
-                FROM personas_cooperacion pc
-                LEFT JOIN habitantes h ON pc.habitante_id = h.id
-                WHERE pc.cooperacion_id = ?
-                ORDER BY h.nombre
-            ''', (coop_id,))
+            # Pagos de toda la cooperación en una sola consulta, agrupados por persona
+            pagos_por_persona = {}
+            for persona_coop_id, *pago in self.bd.filas('pagos_de_cooperacion', (coop_id,)):
+                pagos_por_persona.setdefault(persona_coop_id, []).append(self._pago_desde_fila(pago))
             
             personas = []
-            for pc_id, habitante_id, folio, nombre, monto_esp, estado, notas, fecha_agg in cursor.fetchall():
+            for (pc_id, habitante_id, folio, nombre, monto_esp, estado, notas,
+                 fecha_agg) in self.bd.filas('personas_cooperacion', (coop_id,)):
                 
-                # Obtener pagos de esta persona
-                pagos = self._obtener_pagos_persona_bd(pc_id)
+                pagos = pagos_por_persona.get(pc_id, [])
                 
                 persona = {
                     'id': habitante_id,
@@ -583,32 +601,26 @@ class SistemaControlPagos:
     def _obtener_pagos_persona_bd(self, persona_coop_id):
         """Obtiene todos los pagos de una persona desde BD"""
         try:
-            cursor = self.bd.conexion.cursor()
-            
-            cursor.execute('''
-                SELECT id, monto, fecha_pago, hora_pago, concepto, anulado
-                FROM pagos_coop
-                WHERE persona_coop_id = ?
-                ORDER BY fecha_pago DESC
-            ''', (persona_coop_id,))
-            
-            pagos = []
-            for pago_id, monto, fecha, hora, concepto, anulado in cursor.fetchall():
-                pagos.append({
-                    'id': pago_id,
-                    'monto': monto,
-                    'fecha': fecha,
-                    'hora': hora or '00:00',
-                    'concepto': concepto or 'Pago cooperación',
-                    'anulado': bool(anulado)
-                })
-            
-            return pagos
+            return [self._pago_desde_fila(fila)
+                    for fila in self.bd.filas('pagos_persona_cooperacion', (persona_coop_id,))]
         
         except Exception as e:
             print(f"Error obteniendo pagos: {e}")
             return []
     
+    @staticmethod
+    def _pago_desde_fila(fila):
+        """Pago en memoria a partir de (id, monto, fecha_pago, hora_pago, concepto, anulado)"""
+        pago_id, monto, fecha, hora, concepto, anulado = fila
+        return {
+            'id': pago_id,
+            'monto': monto,
+            'fecha': formatear_fecha_ui(fecha),
+            'hora': hora or '00:00',
+            'concepto': concepto or 'Pago cooperación',
+            'anulado': bool(anulado)
+        }
+    
     def aplicar_cooperacion_activa(self):
         """Aplica cooperación activa desde BD"""
         if not self.cooperaciones:
@@ -632,23 +644,25 @@ class SistemaControlPagos:
         """Persistir cambios de la cooperación activa en SQLite"""
         if not cooperacion or 'id' not in cooperacion:
             return False
+        usuario = self.usuario_actual['nombre'] if self.usuario_actual else 'Sistema'
         try:
-            cursor = self.bd.conexion.cursor()
-            cursor.execute(
-                """
-                UPDATE cooperaciones
-                SET nombre = ?, proyecto = ?, monto_cooperacion = ?, activa = ?
-                WHERE id = ?
-                """,
-                (
-                    cooperacion.get('nombre', 'Cooperación'),
-                    cooperacion.get('proyecto', ''),
-                    cooperacion.get('monto_cooperacion', 0),
-                    int(cooperacion.get('activa', True)),
-                    cooperacion['id'],
-                ),
-            )
-            self.bd.conexion.commit()
+            with self.bd.transaccion():
+                self.bd.conexion.execute(
+                    """
+                    UPDATE cooperaciones
+                    SET nombre = ?, proyecto = ?, monto_cooperacion = ?, activa = ?
+                    WHERE id = ?
+                    """,
+                    (
+                        cooperacion.get('nombre', 'Cooperación'),
+                        cooperacion.get('proyecto', ''),
+                        cooperacion.get('monto_cooperacion', 0),
+                        int(cooperacion.get('activa', True)),
+                        cooperacion['id'],
+                    ),
+                )
+                self.bd.registrar_auditoria(usuario, 'EDITAR_COOP', 'cooperaciones', cooperacion['id'],
+                                            cooperacion.get('nombre', 'Cooperación'))
             return True
         except Exception as e:
             registrar_error('control_pagos', '_guardar_cooperacion_en_bd', str(e))
@@ -726,7 +740,8 @@ class SistemaControlPagos:
             coop_id_bd = self.bd.crear_cooperacion_bd(
                 nueva['nombre'],
                 nueva['proyecto'],
-                nueva['monto_cooperacion']
+                nueva['monto_cooperacion'],
+                usuario=self.usuario_actual['nombre'] if self.usuario_actual else 'Sistema'
             )
             
             if coop_id_bd is None:
@@ -804,32 +819,20 @@ class SistemaControlPagos:
         if not coop:
             messagebox.showerror("Error", "No hay cooperacion activa")
             return
-        agregados = 0
         try:
-            # Obtener habitantes desde gestor centralizado
-            habitantes = self.gestor.obtener_habitantes(incluir_inactivos=True)
-            total_censo = len(habitantes)
-            
-            nombres_censo = {h.get('nombre', '').strip().lower() for h in habitantes}
-            personas_no_en_censo = [p for p in coop.get('personas', []) 
-                                   if p.get('nombre', '').strip().lower() not in nombres_censo]
-            
-            existentes = {p.get('nombre', '').lower(): p for p in coop.get('personas', [])}
-            for hab in habitantes:
-                nombre = hab.get('nombre', '').strip()
-                folio = hab.get('folio', 'SIN-FOLIO')
-                if not nombre:
-                    continue
-                if nombre.lower() not in existentes:
-                    nuevo = {
-                        'nombre': nombre,
-                        'folio': folio,
-                        'monto_esperado': coop.get('monto_cooperacion', self.monto_cooperacion),
-                        'pagos': [],
-                        'notas': ''
-                    }
-                    coop['personas'].append(nuevo)
-                    agregados += 1
+            # Anti-join en SQL: los faltantes se insertan en BD en un solo commit
+            from src.modules.pagos.pagos_conciliacion import ConciliadorCenso
+            resultado = ConciliadorCenso(self.bd).conciliar(
+                coop['id'],
+                coop.get('monto_cooperacion', self.monto_cooperacion),
+                coop.setdefault('personas', []),
+                usuario=self.usuario_actual['nombre'] if self.usuario_actual else 'Sistema'
+            )
+            if not resultado['exito']:
+                raise RuntimeError(resultado['mensaje'])
+            agregados = len(resultado['agregados'])
+            personas_no_en_censo = resultado['sin_censo']
+            total_censo = resultado['total_censo']
             
             self.personas = coop['personas']
             self.actualizar_tabla()
@@ -840,6 +843,10 @@ class SistemaControlPagos:
                 mensaje += f"Habitantes en censo: {total_censo}\n"
                 mensaje += f"Personas en cooperacion: {len(self.personas)}\n"
                 mensaje += f"Agregados desde censo: {agregados}\n"
+                if resultado['renombrados']:
+                    mensaje += f"Actualizados desde censo: {len(resultado['renombrados'])}\n"
+                if resultado['desactivados']:
+                    mensaje += f"Dados de baja en censo: {len(resultado['desactivados'])}\n"
                 
                 if personas_no_en_censo:
                     mensaje += f"\nAdvertencia: {len(personas_no_en_censo)} personas en cooperacion no estan en el censo:\n\n"
@@ -850,8 +857,8 @@ class SistemaControlPagos:
                     mensaje += f"\nDeseas eliminar estas personas de la cooperacion?"
                     
                     if messagebox.askyesno("Sincronizacion", mensaje):
-                        coop['personas'] = [p for p in coop['personas'] 
-                                          if p.get('nombre', '').strip().lower() in nombres_censo]
+                        quitar = {id(p) for p in personas_no_en_censo}
+                        coop['personas'] = [p for p in coop['personas'] if id(p) not in quitar]
                         self.personas = coop['personas']
                         self.actualizar_tabla()
                         self.actualizar_totales()
@@ -1493,6 +1500,7 @@ class SistemaControlPagos:
             num_personas_afectadas = len(self.personas)
             for persona in self.personas:
                 persona['monto_esperado'] = nuevo_monto
+            self._gestor_personas_actual().reindexar()
             
             # Registrar en el historial
             registrar_operacion('CAMBIO_MONTO', 'Monto de cooperación actualizado', {
@@ -1534,12 +1542,6 @@ class SistemaControlPagos:
         if not self._tiene_permiso('crear'):
             return
         
-        # BUGFIX: Verificar que gestor_personas esté inicializado
-        if not hasattr(self, 'gestor_personas'):
-            from src.modules.pagos.pagos_gestor_personas import GestorPersonas
-            self.gestor_personas = GestorPersonas()
-            self.gestor_personas.cargar_personas(self.personas)
-        
         # BUGFIX: Verificar que hay una cooperación activa antes de abrir el diálogo
         if not self.coop_activa_id:
             messagebox.showerror("Error", "No hay una cooperación activa seleccionada.\nPor favor, crea o selecciona una cooperación primero.")
@@ -1552,27 +1554,35 @@ class SistemaControlPagos:
                     messagebox.showerror("Error", "No hay una cooperación activa seleccionada")
                     return
                 
-                # Primero, obtener o crear habitante en BD
-                habitante = self.gestor.obtener_habitante_por_folio(persona['folio'])
-                if not habitante:
-                    # Crear habitante si no existe
-                    habitante_id, msg = self.gestor.crear_habitante(persona['folio'], persona['nombre'])
-                    if habitante_id is None:
-                        messagebox.showerror("Error", f"No se pudo crear habitante: {msg}")
-                        return
-                else:
-                    habitante_id = habitante.get('id')
-                
-                # Insertar persona en cooperación en BD
-                persona_coop_id = self.bd.agregar_persona_coop_bd(
-                    self.coop_activa_id,
-                    habitante_id,
-                    persona['monto_esperado'],
-                    persona.get('notas', '')
-                )
-                
-                if persona_coop_id is None:
-                    messagebox.showerror("Error", "No se pudo agregar la persona a la cooperación en BD")
+                usuario = self.usuario_actual['nombre'] if self.usuario_actual else 'Sistema'
+                # Habitante y relación con la cooperación en un solo commit: si falla
+                # cualquiera de los dos pasos se lanza para deshacer ambos. Los
+                # diálogos se muestran fuera del bloque para no retener el bloqueo
+                # de escritura mientras esperan al usuario.
+                try:
+                    with self.bd.transaccion():
+                        # Primero, obtener o crear habitante en BD
+                        habitante = self.bd.obtener_habitante_por_folio(persona['folio'])
+                        if not habitante:
+                            # Crear habitante si no existe
+                            habitante, msg = self.bd.crear_habitante(persona['folio'], persona['nombre'])
+                            if habitante is None:
+                                raise ValueError(f"No se pudo crear habitante: {msg}")
+                            self.bd.al_confirmar(self.gestor.refrescar_cache)
+                        habitante_id = habitante.get('id')
+                        
+                        # Insertar persona en cooperación en BD
+                        persona_coop_id = self.bd.agregar_persona_coop_bd(
+                            self.coop_activa_id,
+                            habitante_id,
+                            persona['monto_esperado'],
+                            persona.get('notas', ''),
+                            usuario=usuario
+                        )
+                        if persona_coop_id is None:
+                            raise ValueError("No se pudo agregar la persona a la cooperación en BD")
+                except ValueError as e:
+                    messagebox.showerror("Error", str(e))
                     return
                 
                 # Agregar ID de relación a la persona para referencia futura
@@ -1599,7 +1609,7 @@ class SistemaControlPagos:
                 parent=self.root,
                 monto_cooperacion=self.monto_cooperacion,
                 cooperacion_actual=nombre_coop,
-                gestor_personas=self.gestor_personas,
+                gestor_personas=self._gestor_personas_actual(),
                 gestor_historial=self.gestor_historial,
                 usuario_actual=self.usuario_actual,
                 callback_sincronizar_censo=self.sincronizar_con_censo,
@@ -1633,6 +1643,8 @@ class SistemaControlPagos:
             return
         
         def on_persona_editada(persona, cambios):
+            self._gestor_personas_actual().actualizar_persona(persona)
+            
             # Actualizar en BD si existen cambios
             persona_coop_id = persona.get('persona_coop_id')
             if persona_coop_id and cambios:
@@ -1778,16 +1790,21 @@ class SistemaControlPagos:
         
         # Callback para cuando se registre el pago exitosamente
         def on_pago_registrado(persona, monto_pago, nuevo_total, monto_esperado):
+            # El diálogo agregó el pago a persona['pagos']: actualizar su cubeta de estado
+            self._gestor_personas_actual().actualizar_persona(persona)
+            
             # Insertar pago en BD SQLite
             persona_coop_id = persona.get('persona_coop_id')
             if persona_coop_id:
+                # Pago y auditoría en un solo commit
                 pago_id = self.bd.registrar_pago_coop_bd(
                     persona_coop_id,
                     monto_pago,
-                    datetime.now().strftime("%d/%m/%Y"),
+                    hoy_iso(),
                     datetime.now().strftime("%H:%M:%S"),
                     'Pago cooperación',
-                    registrado_por=None  # Usuario actual ID si está disponible
+                    registrado_por=None,  # Usuario actual ID si está disponible
+                    usuario=self.usuario_actual['nombre'] if self.usuario_actual else 'Sistema'
                 )
                 
                 if pago_id is None:
@@ -1845,6 +1862,8 @@ class SistemaControlPagos:
         
         # Callback para cuando se anule el pago exitosamente
         def on_pago_anulado(persona, monto_anulado, nuevo_total):
+            self._gestor_personas_actual().actualizar_persona(persona)
+            
             # Refrescar datos y UI
             self.actualizar_totales()
             self.guardar_datos(mostrar_alerta=False)
@@ -1889,27 +1908,12 @@ class SistemaControlPagos:
                 if not persona:
                     return
                 
-                total_pagado = sum(p['monto'] for p in persona.get('pagos', []) if not p.get('anulado', False))
-                monto_esperado = persona.get('monto_esperado', 100)
-                
-                from src.modules.pagos.pagos_estado import GestorEstadoPago
-                estado_clave = GestorEstadoPago.obtener_estado(total_pagado, monto_esperado)
-                
-                tag_estado_map = {
-                    'completado': 'pagado',
-                    'excedente': 'pagado',
-                    'parcial': 'parcial',
-                    'pendiente': 'pendiente'
-                }
-                tag = tag_estado_map.get(estado_clave, 'pendiente')
-                self.tree.item(item, tags=(tag,))
+                self.tree.item(item, tags=(self._tag_estado_persona(persona),))
         
         pulso()
     
     def animar_fila_pagada(self, item, tipo='completado'):
         """Animar la fila con pulso de color - BUG FIX #1: Usa GestorEstadoPago"""
-        from src.modules.pagos.pagos_estado import GestorEstadoPago
-        
         tema_visual = self.obtener_colores()
         
         def pulso(idx=0):
@@ -1923,23 +1927,37 @@ class SistemaControlPagos:
                 if not persona:
                     return
                 
-                total_pagado = sum(p['monto'] for p in persona.get('pagos', []))
-                monto_esperado = persona.get('monto_esperado', 100)
-                
-                # Usar GestorEstadoPago para obtener estado consistente
-                estado_clave = GestorEstadoPago.obtener_estado(total_pagado, monto_esperado)
-                
-                tag_estado_map = {
-                    'completado': 'pagado',
-                    'excedente': 'pagado',
-                    'parcial': 'parcial',
-                    'pendiente': 'pendiente'
-                }
-                tag = tag_estado_map.get(estado_clave, 'pendiente')
-                self.tree.item(item, tags=(tag,))
+                # Usar la clasificación centralizada para obtener estado consistente
+                self.tree.item(item, tags=(self._tag_estado_persona(persona),))
         
         pulso()
     
+    def _tag_estado_persona(self, persona):
+        """Tag de la fila según el estado de pago actual de la persona"""
+        clasificacion = self._clasificacion_actual()
+        posicion = clasificacion.posicion(persona)
+        if posicion is None:
+            return 'pendiente'
+        return TAG_POR_CODIGO[clasificacion.codigos[posicion]]
+    
+    def _clasificacion_actual(self):
+        """
+        Clasificación de pagos compartida por tabla, orden, totales y animaciones
+        
+        Se calcula una vez por ciclo de refresco y se descarta cuando Tk queda
+        ocioso, así todos los que refrescan en el mismo evento ven las mismas cifras.
+        """
+        clasificacion = self._clasificacion
+        if clasificacion is None or not clasificacion.vigente_para(self.personas):
+            if clasificacion is None:
+                self.root.after_idle(self._descartar_clasificacion)
+            clasificacion = GestorEstadoPago.clasificar_cooperacion(self.personas)
+            self._clasificacion = clasificacion
+        return clasificacion
+    
+    def _descartar_clasificacion(self):
+        self._clasificacion = None
+    
     def ver_historial(self):
         """Ver historial de pagos de una persona"""
         seleccion = self.tree.selection()
@@ -1990,9 +2008,6 @@ class SistemaControlPagos:
         self._actualizar_contador_resultados()
     
     def actualizar_tabla(self, personas_mostrar=None):
-        # Importar GestorEstadoPago para usar lógica centralizada (BUG FIX #1 y #4)
-        from src.modules.pagos.pagos_estado import GestorEstadoPago
-        
         # Limpiar tabla pero guardar selección actual (BUG FIX #6)
         seleccion_anterior = self.tree.selection()
         persona_seleccionada = None
@@ -2020,6 +2035,10 @@ class SistemaControlPagos:
             else:
                 personas_mostrar = self.personas
         
+        # Estados y montos de toda la cooperación en una pasada (BUG FIX #1 y #4)
+        clasificacion = self._clasificacion_actual()
+        datos_estados = GestorEstadoPago.datos_estados()
+        
         # Agregar personas
         for idx, persona in enumerate(personas_mostrar):
             # Migrar datos antiguos si es necesario
@@ -2032,22 +2051,19 @@ class SistemaControlPagos:
             if 'nombre' not in persona:
                 persona['nombre'] = 'SIN-NOMBRE'
             
-            monto_esperado = persona['monto_esperado']
-            # Excluir pagos anulados del total
-            total_pagado = sum(pago['monto'] for pago in persona['pagos'] if not pago.get('anulado', False))
-            pendiente = max(0, monto_esperado - total_pagado)
-            
-            # BUG FIX #1 y #4: Usar GestorEstadoPago centralizado para determinar estado
-            estado_clave = GestorEstadoPago.obtener_estado(total_pagado, monto_esperado)
-            datos_estado = GestorEstadoPago.obtener_datos_estado(estado_clave)
-            
-            estado = datos_estado['nombre']
+            pos = clasificacion.posicion(persona)
+            if pos is None:
+                # Persona agregada después de clasificar: rehacer la foto
+                self._clasificacion = None
+                clasificacion = self._clasificacion_actual()
+                pos = clasificacion.posicion(persona)
             
-            # Obtener fecha del último pago
-            ultimo_pago = ''
-            if persona['pagos']:
-                ultimo = persona['pagos'][-1]
-                ultimo_pago = f"{ultimo['fecha']} {ultimo['hora']}"
+            # Los pagos anulados ya quedan excluidos del total
+            monto_esperado = clasificacion.esperados[pos]
+            total_pagado = clasificacion.pagados[pos]
+            pendiente = clasificacion.pendientes[pos]
+            estado = datos_estados[clasificacion.codigos[pos]]['nombre']
+            ultimo_pago = clasificacion.ultimos_pagos[pos]
             
             iid = self._persona_iid(persona)
             row_tag = 'fila_par' if idx % 2 == 0 else 'fila_impar'
@@ -2154,34 +2170,29 @@ class SistemaControlPagos:
         else:
             personas_mostradas = list(self.personas)
         
+        clasificacion = self._clasificacion_actual()
+        
         # Función para obtener valor de ordenamiento
         def get_sort_key(persona):
-            monto_esperado = persona.get('monto_esperado', 100)
-            # Excluir pagos anulados
-            pagado = sum(pago['monto'] for pago in persona.get('pagos', []) if not pago.get('anulado', False))
-            pendiente = max(0, monto_esperado - pagado)
+            pos = clasificacion.posicion(persona)
+            if pos is None:
+                return ''
             
             if col_name == 'folio':
                 return persona.get('folio', 'SIN-FOLIO').lower()
             elif col_name == 'nombre':
                 return persona.get('nombre', '').lower()
             elif col_name == 'monto_esperado':
-                return float(monto_esperado)
+                return clasificacion.esperados[pos]
             elif col_name == 'pagado':
-                return float(pagado)
+                return clasificacion.pagados[pos]
             elif col_name == 'pendiente':
-                return float(pendiente)
+                return clasificacion.pendientes[pos]
             elif col_name == 'estado':
-                if pagado >= monto_esperado:
-                    return 0  # Pagado
-                elif pagado > 0:
-                    return 1  # Parcial
-                else:
-                    return 2  # Pendiente
+                # Pagado, parcial, pendiente
+                return ORDEN_POR_CODIGO[clasificacion.codigos[pos]]
             elif col_name == 'ultimo_pago':
-                if persona.get('pagos'):
-                    return persona['pagos'][-1].get('fecha', '')
-                return ''
+                return clasificacion.ultimos_pagos[pos]
             elif col_name == 'notas':
                 return persona.get('notas', '').lower()
             return ''
@@ -2276,22 +2287,11 @@ class SistemaControlPagos:
     
     def actualizar_totales(self):
         """Actualizar los totales en el panel de información del proyecto"""
-        total_pagado = 0
-        total_pendiente = 0
-        personas_pagadas = 0
-        
-        for persona in self.personas:
-            monto_esperado = persona.get('monto_esperado', persona.get('monto', 100))
-            # Excluir pagos anulados
-            pagado = sum(pago['monto'] for pago in persona.get('pagos', []) if not pago.get('anulado', False))
-            pendiente = max(0, monto_esperado - pagado)
-            
-            total_pagado += pagado
-            total_pendiente += pendiente
-            
-            # Contar personas que completaron pago
-            if pagado >= monto_esperado:
-                personas_pagadas += 1
+        # Mismas cifras que la tabla (pagos anulados excluidos)
+        clasificacion = self._clasificacion_actual()
+        total_pagado = clasificacion.total_pagado
+        total_pendiente = clasificacion.total_pendiente
+        personas_pagadas = clasificacion.personas_completas
         
         # Actualizar labels principales en panel de información
         if hasattr(self, 'total_pagado_label'):
@@ -2515,8 +2515,13 @@ def main():
     """Punto de entrada principal con autenticación"""
     from src.auth.login_window import VentanaLogin
     
+    instancia = asegurar_instancia_unica('pagos', sys.argv[1:])
+    if instancia is None:
+        return  # Ya estaba abierto: se trajo al frente
+    
     # Crear ventana de login
     login_root = tk.Tk()
+    instancia.atender(login_root)
     
     def on_login_exitoso(usuario, gestor_auth):
         """Callback cuando el login es exitoso"""
@@ -2530,6 +2535,8 @@ def main():
         # Crear aplicación
         app = SistemaControlPagos(root)
         app.set_usuario(usuario, gestor_auth)
+        iniciar_mantenimiento_bd(root)
+        instancia.atender(root)
         
         # Cargar nombre de proyecto guardado si existe
         if hasattr(app, '_proyecto_guardado'):
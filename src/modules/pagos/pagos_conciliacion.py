@@ -0,0 +1,171 @@
+"""
+Conciliación entre el censo y los miembros de una cooperación
+Responsable de: Agregar a la cooperación a los habitantes activos que faltan y
+detectar miembros renombrados o dados de baja en el censo
+Objetivo: Que sincronizar una cooperación no recorra ni compare listas de nombres
+
+Los faltantes salen de un anti-join en SQL (habitantes sin fila en
+personas_cooperacion, resuelto con el índice UNIQUE(cooperacion_id,
+habitante_id)) y se insertan en una sola transacción. Las personas en memoria
+se enlazan por persona_coop_id; las que aún no tienen uno (datos heredados) se
+buscan por folio y luego por nombre normalizado.
+"""
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+from src.core.fechas import ahora_iso
+from src.core.logger import registrar_error, registrar_operacion
+
+# Habitantes activos que todavía no son miembros de la cooperación
+_SQL_FALTANTES = '''
+    SELECT h.id, h.folio, h.nombre
+    FROM habitantes h
+    WHERE h.activo = 1
+      AND NOT EXISTS (
+          SELECT 1 FROM personas_cooperacion pc
+          WHERE pc.cooperacion_id = :coop_id AND pc.habitante_id = h.id
+      )
+    ORDER BY h.nombre
+'''
+
+_SQL_INSERTAR = '''
+    INSERT INTO personas_cooperacion
+    (cooperacion_id, habitante_id, monto_esperado, estado, notas, fecha_agregado)
+    VALUES (?, ?, ?, 'pendiente', '', ?)
+'''
+
+# Miembros con el folio, nombre y estado actuales del censo
+_SQL_MIEMBROS = '''
+    SELECT pc.id, pc.habitante_id, h.folio, h.nombre, h.activo, pc.monto_esperado
+    FROM personas_cooperacion pc
+    JOIN habitantes h ON h.id = pc.habitante_id
+    WHERE pc.cooperacion_id = :coop_id
+    ORDER BY h.nombre
+'''
+
+
+def _normalizar_nombre(nombre: Optional[str]) -> str:
+    """Minúsculas, sin acentos y espacios colapsados (igual que en el censo)."""
+    texto = unicodedata.normalize('NFD', nombre or '')
+    texto = ''.join(c for c in texto if unicodedata.category(c) != 'Mn')
+    return re.sub(r'\s+', ' ', texto.lower()).strip()
+
+
+class ConciliadorCenso:
+    """Concilia personas_cooperacion con habitantes directamente en SQLite."""
+
+    def __init__(self, bd=None):
+        if bd is None:
+            from src.core.base_datos_sqlite import obtener_bd
+            bd = obtener_bd()
+        self.bd = bd
+
+    def conciliar(self, coop_id: int, monto_esperado: float,
+                  personas: Optional[List[Dict[str, Any]]] = None,
+                  usuario: str = 'Sistema') -> Dict[str, Any]:
+        """
+        Agregar los habitantes faltantes y actualizar la lista en memoria
+
+        Args:
+            coop_id: ID de la cooperación en la tabla cooperaciones
+            monto_esperado: Monto esperado para los miembros nuevos
+            personas: Lista en memoria de la cooperación; se modifica en sitio
+                (enlaces, nombres y folios del censo, miembros nuevos al final)
+            usuario: Usuario para la auditoría
+
+        Returns:
+            dict con exito, agregados, renombrados, desactivados, sin_censo
+            (personas en memoria que no corresponden a ningún habitante), total
+            y total_censo
+        """
+        personas = personas if personas is not None else []
+        params = {'coop_id': coop_id}
+        agregados_ids = set()
+        try:
+            with self.bd.transaccion():
+                conexion = self.bd.conexion
+                fecha = ahora_iso()
+                for habitante_id, _, _ in conexion.execute(_SQL_FALTANTES, params).fetchall():
+                    cursor = conexion.execute(_SQL_INSERTAR, (coop_id, habitante_id, monto_esperado, fecha))
+                    agregados_ids.add(cursor.lastrowid)
+                if agregados_ids:
+                    self.bd.registrar_auditoria(usuario, 'CONCILIAR_CENSO', 'personas_cooperacion', None,
+                                                f'cooperacion={coop_id} agregados={len(agregados_ids)}')
+                miembros = conexion.execute(_SQL_MIEMBROS, params).fetchall()
+                total_censo = conexion.execute('SELECT COUNT(*) FROM habitantes').fetchone()[0]
+        except Exception as e:
+            registrar_error('ConciliadorCenso', 'conciliar', str(e), {'coop_id': coop_id})
+            return {'exito': False, 'mensaje': str(e), 'agregados': [], 'renombrados': [],
+                    'desactivados': [], 'sin_censo': [], 'total': len(personas), 'total_censo': 0}
+
+        resultado = self._aplicar_en_memoria(personas, miembros, agregados_ids)
+        resultado['total_censo'] = total_censo
+        if agregados_ids or resultado['renombrados']:
+            registrar_operacion('CONCILIAR_CENSO', f'Cooperación {coop_id} conciliada con el censo', {
+                'agregados': len(resultado['agregados']),
+                'renombrados': len(resultado['renombrados']),
+                'desactivados': len(resultado['desactivados'])
+            }, usuario)
+        return resultado
+
+    @staticmethod
+    def _aplicar_en_memoria(personas, miembros, agregados_ids) -> Dict[str, Any]:
+        por_persona_coop = {p['persona_coop_id']: p for p in personas if p.get('persona_coop_id')}
+        sin_enlace = [p for p in personas if not p.get('persona_coop_id')]
+        por_folio = {p.get('folio'): p for p in sin_enlace if p.get('folio')}
+        por_nombre = {_normalizar_nombre(p.get('nombre')): p for p in sin_enlace if p.get('nombre')}
+
+        agregados, renombrados, desactivados = [], [], []
+        for pc_id, habitante_id, folio, nombre, activo, monto in miembros:
+            persona = por_persona_coop.get(pc_id)
+            if persona is None:
+                # Respaldo para personas sin enlace: folio y luego nombre normalizado
+                persona = por_folio.pop(folio, None) or por_nombre.pop(_normalizar_nombre(nombre), None)
+                if persona is not None:
+                    for indice, clave in ((por_folio, persona.get('folio')),
+                                          (por_nombre, _normalizar_nombre(persona.get('nombre')))):
+                        if indice.get(clave) is persona:
+                            del indice[clave]
+                    persona['persona_coop_id'] = pc_id
+                    persona['id'] = habitante_id
+
+            if persona is None:
+                persona = {
+                    'id': habitante_id,
+                    'folio': folio,
+                    'nombre': nombre,
+                    'monto_esperado': monto,
+                    'monto': monto,
+                    'pagos': [],
+                    'notas': '',
+                    'estado': 'pendiente',
+                    'persona_coop_id': pc_id
+                }
+                personas.append(persona)
+                if pc_id in agregados_ids:
+                    agregados.append(persona)
+            elif persona.get('nombre') != nombre or persona.get('folio') != folio:
+                renombrados.append({
+                    'persona_coop_id': pc_id,
+                    'folio_anterior': persona.get('folio'),
+                    'nombre_anterior': persona.get('nombre'),
+                    'folio': folio,
+                    'nombre': nombre
+                })
+                persona['folio'] = folio
+                persona['nombre'] = nombre
+
+            if not activo:
+                desactivados.append(persona)
+
+        restantes = {id(p) for p in por_folio.values()} | {id(p) for p in por_nombre.values()}
+        sin_censo = [p for p in sin_enlace if id(p) in restantes]
+        return {
+            'exito': True,
+            'agregados': agregados,
+            'renombrados': renombrados,
+            'desactivados': desactivados,
+            'sin_censo': sin_censo,
+            'total': len(personas)
+        }
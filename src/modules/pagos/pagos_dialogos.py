@@ -291,7 +291,7 @@ class DialogoAgregarPersona:
                 messagebox.showinfo("Éxito", f"Persona vinculada a censo\nFolio: {folio}")
             
             # Validar que el folio no esté duplicado EN ESTA COOPERACIÓN
-            if any(p.get('folio') == folio for p in gestor_personas.personas):
+            if gestor_personas.obtener_persona_por_folio(folio):
                 messagebox.showerror("Error", f"Folio {folio} ya está registrado en esta cooperación para otra persona.")
                 return
             
@@ -1033,12 +1033,12 @@ class DialogoAnularPago:
                 messagebox.showerror("Error", "No hay usuario autenticado")
                 return
             
-            # Verificar contraseña usando el sistema de autenticación
-            import hashlib
-            hash_ingresado = hashlib.sha256(password.encode()).hexdigest()
+            # Verificar contraseña usando el servicio de credenciales
+            from src.core.credenciales import obtener_servicio_credenciales
             usuario_bd = gestor_auth.bd.obtener_usuario(usuario_actual['nombre'])
             
-            if not usuario_bd or hash_ingresado != usuario_bd['contraseña']:
+            if not usuario_bd or not obtener_servicio_credenciales().verificar(
+                    password, usuario_bd['contraseña']):
                 messagebox.showerror("Error", "Contraseña incorrecta")
                 password_entry.delete(0, tk.END)
                 password_entry.focus()
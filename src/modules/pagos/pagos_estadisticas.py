@@ -4,28 +4,27 @@ Proporciona análisis detallados, métricas y visualizaciones
 """
 import tkinter as tk
 from tkinter import ttk, messagebox
-from datetime import datetime, timedelta
-from collections import Counter, defaultdict
 import calendar
 
 from src.ui.tema_moderno import FUENTES, ESPACIADO, ICONOS
 from src.ui.estilos_globales import TEMA_GLOBAL
 from src.ui.ui_moderna import PanelModerno, BotonModerno
+from src.core.optimizador_ui import get_ui_optimizer
+from src.modules.pagos.pagos_estadisticas_servicio import ServicioEstadisticasPagos, DIAS_SEMANA
 
 
 class VentanaEstadisticas:
     """Ventana con estadísticas avanzadas del sistema de pagos"""
     
-    def __init__(self, parent, personas, cooperacion, monto_cooperacion):
+    def __init__(self, parent, personas, cooperacion, monto_cooperacion, coop_id=None, bd=None):
         self.parent = parent
         self.personas = personas
         self.cooperacion = cooperacion
         self.monto_cooperacion = monto_cooperacion
+        self.coop_id = coop_id
+        self.bd = bd
         self.tema = TEMA_GLOBAL
         
-        # Calcular estadísticas
-        self.calcular_estadisticas()
-        
         # Crear ventana
         self.ventana = tk.Toplevel(parent)
         self.ventana.title(f"📊 Estadísticas - {cooperacion}")
@@ -37,110 +36,68 @@ class VentanaEstadisticas:
         self.ventana.grid_rowconfigure(0, weight=1)
         self.ventana.grid_columnconfigure(0, weight=1)
         
+        # Las consultas corren en un hilo de trabajo sobre una instantánea de
+        # solo lectura; la interfaz se arma cuando llegan los resultados
+        self.lbl_calculando = tk.Label(self.ventana, text="⏳ Calculando estadísticas...",
+                                       font=FUENTES['subtitulo'], bg=self.tema['bg_principal'],
+                                       fg=self.tema['fg_secundario'])
+        self.lbl_calculando.grid(row=0, column=0)
+        
+        optimizador = get_ui_optimizer()
+        optimizador.attach_root(self.parent.winfo_toplevel())
+        optimizador.async_update(f"estadisticas_{id(self)}", self.consultar_estadisticas,
+                                 self._mostrar_estadisticas)
+    
+    def consultar_estadisticas(self):
+        """Consultar las estadísticas en SQL (se ejecuta fuera del hilo de la UI)"""
+        servicio = ServicioEstadisticasPagos(self.bd)
+        coop_id = self.coop_id
+        if coop_id is None:
+            coop_id = servicio.obtener_id_cooperacion(self.cooperacion)
+        
+        if coop_id is None:
+            return coop_id, servicio.resultado_vacio()
+        return coop_id, servicio.calcular(coop_id, self.monto_cooperacion)
+    
+    def _mostrar_estadisticas(self, resultado):
+        """Callback en el hilo de la UI: guardar resultados y armar la interfaz"""
+        if not self.ventana.winfo_exists():
+            return
+        self.coop_id, stats = resultado
+        self.lbl_calculando.destroy()
+        self.calcular_estadisticas(stats)
         self.crear_interfaz()
         
-    def calcular_estadisticas(self):
-        """Calcular todas las estadísticas necesarias"""
-        personas_activas = [p for p in self.personas if p.get('activo', True)]
+    def calcular_estadisticas(self, stats=None):
+        """Guardar las estadísticas (agregadas en SQL) en atributos para la interfaz"""
+        if stats is None:
+            self.coop_id, stats = self.consultar_estadisticas()
         
         # Estadísticas básicas
-        self.total_personas = len(personas_activas)
-        self.total_esperado = self.total_personas * self.monto_cooperacion
-        
-        # Estados de pago
-        self.personas_pagado = []
-        self.personas_parcial = []
-        self.personas_pendiente = []
-        self.personas_excedente = []
-        self.total_recaudado = 0
-        
-        # Análisis de pagos
-        self.pagos_por_persona = []
-        self.montos_pagados = []
-        self.fechas_pagos = []
-        
-        for persona in personas_activas:
-            total_pagado = persona.get('total_pagado', 0)
-            self.total_recaudado += total_pagado
-            self.montos_pagados.append(total_pagado)
-            
-            porcentaje = (total_pagado / self.monto_cooperacion * 100) if self.monto_cooperacion > 0 else 0
-            
-            # Clasificar por estado
-            if total_pagado >= self.monto_cooperacion:
-                if total_pagado > self.monto_cooperacion:
-                    self.personas_excedente.append(persona)
-                else:
-                    self.personas_pagado.append(persona)
-            elif total_pagado > 0:
-                self.personas_parcial.append(persona)
-            else:
-                self.personas_pendiente.append(persona)
-            
-            # Analizar pagos individuales
-            pagos = persona.get('pagos', [])
-            self.pagos_por_persona.append(len(pagos))
-            
-            for pago in pagos:
-                try:
-                    fecha_str = pago.get('fecha', '')
-                    if fecha_str:
-                        fecha = datetime.strptime(fecha_str, '%Y-%m-%d %H:%M:%S')
-                        self.fechas_pagos.append(fecha)
-                except:
-                    pass
-        
-        # Calcular métricas
-        self.porcentaje_recaudacion = (self.total_recaudado / self.total_esperado * 100) if self.total_esperado > 0 else 0
-        self.promedio_pagado = sum(self.montos_pagados) / len(self.montos_pagados) if self.montos_pagados else 0
-        self.mediana_pagado = self._calcular_mediana(self.montos_pagados)
-        self.promedio_pagos_persona = sum(self.pagos_por_persona) / len(self.pagos_por_persona) if self.pagos_por_persona else 0
+        self.total_personas = stats['total_personas']
+        self.total_esperado = stats['total_esperado']
+        self.total_recaudado = stats['total_recaudado']
+        self.porcentaje_recaudacion = stats['porcentaje_recaudacion']
         
-        # Top 10
-        personas_ordenadas = sorted(personas_activas, key=lambda p: p.get('total_pagado', 0), reverse=True)
-        self.top_pagadores = personas_ordenadas[:10]
+        # Estados de pago (solo conteos)
+        self.conteo_estados = stats['estados']
         
-        personas_con_atrasos = [p for p in personas_activas if 0 < p.get('total_pagado', 0) < self.monto_cooperacion]
-        personas_con_atrasos.sort(key=lambda p: self.monto_cooperacion - p.get('total_pagado', 0), reverse=True)
-        self.top_atrasados = personas_con_atrasos[:10]
+        # Métricas
+        self.promedio_pagado = stats['promedio_pagado']
+        self.mediana_pagado = stats['mediana_pagado']
+        self.promedio_parcial = stats['promedio_parcial']
+        self.total_pagos = stats['total_pagos']
+        self.promedio_pagos_persona = stats['promedio_pagos_persona']
         
-        # Análisis temporal
-        self.analizar_temporal()
-        
-    def _calcular_mediana(self, valores):
-        """Calcular mediana de una lista de valores"""
-        if not valores:
-            return 0
-        valores_ordenados = sorted(valores)
-        n = len(valores_ordenados)
-        if n % 2 == 0:
-            return (valores_ordenados[n//2 - 1] + valores_ordenados[n//2]) / 2
-        else:
-            return valores_ordenados[n//2]
-    
-    def analizar_temporal(self):
-        """Analizar patrones temporales de pagos"""
-        if not self.fechas_pagos:
-            self.pagos_por_mes = {}
-            self.pagos_por_dia_semana = {}
-            self.ultimo_pago = None
-            return
-        
-        # Pagos por mes
-        self.pagos_por_mes = defaultdict(int)
-        for fecha in self.fechas_pagos:
-            mes_año = fecha.strftime('%Y-%m')
-            self.pagos_por_mes[mes_año] += 1
-        
-        # Pagos por día de la semana
-        dias_semana = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
-        self.pagos_por_dia_semana = {dia: 0 for dia in dias_semana}
-        for fecha in self.fechas_pagos:
-            dia = dias_semana[fecha.weekday()]
-            self.pagos_por_dia_semana[dia] += 1
+        # Top 10
+        self.top_pagadores = stats['top_pagadores']
+        self.top_atrasados = stats['top_atrasados']
         
-        # Último pago
-        self.ultimo_pago = max(self.fechas_pagos) if self.fechas_pagos else None
+        # Análisis temporal
+        self.pagos_por_mes = stats['pagos_por_mes']
+        self.pagos_por_dia_semana = stats['pagos_por_dia_semana']
+        self.primer_pago = stats['primer_pago']
+        self.ultimo_pago = stats['ultimo_pago']
         
     def crear_interfaz(self):
         """Crear la interfaz de estadísticas"""
@@ -210,10 +167,10 @@ class VentanaEstadisticas:
         estados_frame.pack(fill=tk.X, padx=ESPACIADO['md'], pady=ESPACIADO['md'])
         
         estados = [
-            ('🟢 Al corriente', len(self.personas_pagado), '#4CAF50'),
-            ('🟡 Atrasados', len(self.personas_parcial), '#FFC107'),
-            ('🔴 Sin pagar', len(self.personas_pendiente), '#F44336'),
-            ('⭐ Excedente', len(self.personas_excedente), '#2196F3')
+            ('🟢 Al corriente', self.conteo_estados['completado'], '#4CAF50'),
+            ('🟡 Atrasados', self.conteo_estados['parcial'], '#FFC107'),
+            ('🔴 Sin pagar', self.conteo_estados['pendiente'], '#F44336'),
+            ('⭐ Excedente', self.conteo_estados['excedente'], '#2196F3')
         ]
         
         for estado, cantidad, color in estados:
@@ -257,12 +214,15 @@ class VentanaEstadisticas:
         metricas_panel = PanelModerno(scrollable, titulo="💰 Métricas de Pagos", tema=self.tema, collapsible=False)
         metricas_panel.pack(fill=tk.X, pady=(0, ESPACIADO['md']))
         
+        al_corriente = self.conteo_estados['completado'] + self.conteo_estados['excedente']
+        tasa_cumplimiento = (al_corriente / self.total_personas * 100) if self.total_personas > 0 else 0
+        
         metricas_text = (
             f"Promedio pagado por persona: ${self.promedio_pagado:,.2f}\n"
             f"Mediana de pagos: ${self.mediana_pagado:,.2f}\n"
             f"Promedio de pagos por persona: {self.promedio_pagos_persona:.1f}\n"
-            f"Total de pagos registrados: {sum(self.pagos_por_persona)}\n"
-            f"Tasa de cumplimiento: {(len(self.personas_pagado) + len(self.personas_excedente)) / self.total_personas * 100:.1f}%"
+            f"Total de pagos registrados: {self.total_pagos}\n"
+            f"Tasa de cumplimiento: {tasa_cumplimiento:.1f}%"
         )
         
         label_metricas = tk.Label(metricas_panel.content, text=metricas_text, font=FUENTES['normal'],
@@ -274,9 +234,8 @@ class VentanaEstadisticas:
         proyeccion_panel.pack(fill=tk.X, pady=(0, ESPACIADO['md']))
         
         # Calcular proyección
-        if len(self.personas_parcial) > 0:
-            promedio_parcial = sum(p.get('total_pagado', 0) for p in self.personas_parcial) / len(self.personas_parcial)
-            proyeccion = self.total_recaudado + (promedio_parcial * len(self.personas_pendiente))
+        if self.conteo_estados['parcial'] > 0:
+            proyeccion = self.total_recaudado + (self.promedio_parcial * self.conteo_estados['pendiente'])
         else:
             proyeccion = self.total_recaudado
         
@@ -291,15 +250,14 @@ class VentanaEstadisticas:
         label_proyeccion.pack(anchor='w', padx=ESPACIADO['md'], pady=ESPACIADO['md'])
         
         # Análisis de tendencia
-        if len(self.fechas_pagos) >= 2:
+        if self.total_pagos >= 2 and self.primer_pago and self.ultimo_pago:
             tendencia_panel = PanelModerno(scrollable, titulo="📉 Tendencia", tema=self.tema, collapsible=False)
             tendencia_panel.pack(fill=tk.X, pady=(0, ESPACIADO['md']))
             
-            fechas_ordenadas = sorted(self.fechas_pagos)
-            dias_transcurridos = (fechas_ordenadas[-1] - fechas_ordenadas[0]).days
+            dias_transcurridos = (self.ultimo_pago - self.primer_pago).days
             
             if dias_transcurridos > 0:
-                pagos_por_dia = len(self.fechas_pagos) / dias_transcurridos
+                pagos_por_dia = self.total_pagos / dias_transcurridos
                 tendencia_text = (
                     f"Período analizado: {dias_transcurridos} días\n"
                     f"Promedio de pagos por día: {pagos_por_dia:.2f}\n"
@@ -408,10 +366,10 @@ class VentanaEstadisticas:
         canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=ESPACIADO['md'], pady=ESPACIADO['md'])
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        if not self.fechas_pagos:
+        if not self.pagos_por_mes:
             no_data = tk.Label(scrollable, text="No hay datos de pagos para analizar",
                              font=FUENTES['titulo'], bg=self.tema['bg_secundario'], 
-                             fg=self.tema['texto_secundario'])
+                             fg=self.tema['fg_secundario'])
             no_data.pack(pady=50)
             return
         
@@ -428,8 +386,7 @@ class VentanaEstadisticas:
         dia_panel = PanelModerno(scrollable, titulo="📊 Pagos por Día de la Semana", tema=self.tema, collapsible=False)
         dia_panel.pack(fill=tk.X, pady=(0, ESPACIADO['md']))
         
-        dias_data = [(dia, self.pagos_por_dia_semana[dia]) for dia in 
-                     ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']]
+        dias_data = [(dia, self.pagos_por_dia_semana[dia]) for dia in DIAS_SEMANA]
         
         self.crear_grafico_ascii_barras_horizontal(dia_panel.content, dias_data, "Día de la Semana")
     
@@ -0,0 +1,251 @@
+"""
+Servicio de estadísticas de cooperaciones calculadas en SQL
+Responsable de: Agregar totales, mediana, rankings e histogramas sobre pagos_coop
+Objetivo: Que VentanaEstadisticas no recorra ni ordene la lista de personas en Python
+
+Las consultas corren sobre una instantánea de solo lectura (BaseDatosSQLite.lectura),
+así que calcular() puede llamarse desde un hilo de trabajo mientras la UI escribe.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.core.logger import registrar_error
+
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+
+# Las tablas temporales se calculan una sola vez por consulta de estadísticas;
+# el resto de agregados trabaja sobre ellas (unos cientos o miles de filas).
+
+# Total pagado (sin anulados) por persona de la cooperación
+_SQL_CREAR_TOTALES = '''
+    CREATE TEMP TABLE estadisticas_totales AS
+    SELECT pc.id AS persona_coop_id,
+           h.folio AS folio,
+           h.nombre AS nombre,
+           COALESCE(SUM(p.monto), 0) AS total_pagado,
+           COUNT(p.id) AS num_pagos
+    FROM personas_cooperacion pc
+    LEFT JOIN habitantes h ON h.id = pc.habitante_id
+    LEFT JOIN pagos_coop p ON p.persona_coop_id = pc.id AND p.anulado = 0
+    WHERE pc.cooperacion_id = :coop_id
+    GROUP BY pc.id
+'''
+
+# Cantidad de pagos (sin anulados) por día ISO
+_SQL_CREAR_DIAS = '''
+    CREATE TEMP TABLE estadisticas_dias AS
+    SELECT p.fecha_pago_iso AS dia,
+           COUNT(*) AS cantidad,
+           MIN(COALESCE(p.hora_pago, '00:00')) AS hora_min,
+           MAX(COALESCE(p.hora_pago, '00:00')) AS hora_max
+    FROM personas_cooperacion pc
+    JOIN pagos_coop p ON p.persona_coop_id = pc.id AND p.anulado = 0
+    WHERE pc.cooperacion_id = :coop_id
+    GROUP BY p.fecha_pago_iso
+'''
+
+_SQL_RESUMEN = '''
+    SELECT COUNT(*) AS total_personas,
+           COALESCE(SUM(total_pagado), 0) AS total_recaudado,
+           COALESCE(AVG(total_pagado), 0) AS promedio_pagado,
+           COALESCE(SUM(num_pagos), 0) AS total_pagos,
+           SUM(total_pagado = 0) AS pendiente,
+           SUM(total_pagado > 0 AND total_pagado < :monto) AS parcial,
+           SUM(total_pagado > 0 AND total_pagado = :monto) AS completado,
+           SUM(total_pagado > 0 AND total_pagado > :monto) AS excedente,
+           AVG(CASE WHEN total_pagado > 0 AND total_pagado < :monto
+                    THEN total_pagado END) AS promedio_parcial
+    FROM estadisticas_totales
+'''
+
+_SQL_MEDIANA = '''
+    WITH ordenados AS (
+        SELECT total_pagado,
+               ROW_NUMBER() OVER (ORDER BY total_pagado) AS fila,
+               COUNT(*) OVER () AS n
+        FROM estadisticas_totales
+    )
+    SELECT AVG(total_pagado) AS mediana
+    FROM ordenados
+    WHERE fila IN ((n + 1) / 2, (n + 2) / 2)
+'''
+
+_SQL_TOP_PAGADORES = '''
+    SELECT folio, nombre, total_pagado
+    FROM estadisticas_totales
+    ORDER BY total_pagado DESC, nombre
+    LIMIT :limite
+'''
+
+_SQL_TOP_ATRASADOS = '''
+    SELECT folio, nombre, total_pagado
+    FROM estadisticas_totales
+    WHERE total_pagado > 0 AND total_pagado < :monto
+    ORDER BY total_pagado ASC, nombre
+    LIMIT :limite
+'''
+
+_SQL_POR_MES = '''
+    SELECT substr(dia, 1, 7) AS mes, SUM(cantidad)
+    FROM estadisticas_dias
+    WHERE dia IS NOT NULL
+    GROUP BY mes
+    ORDER BY mes
+'''
+
+# strftime('%w') devuelve 0 = domingo ... 6 = sábado
+_SQL_POR_DIA_SEMANA = '''
+    SELECT CAST(strftime('%w', dia) AS INTEGER) AS dia_semana, SUM(cantidad)
+    FROM estadisticas_dias
+    WHERE dia IS NOT NULL
+    GROUP BY dia_semana
+'''
+
+_SQL_RANGO_FECHAS = '''
+    SELECT MIN(dia || ' ' || hora_min), MAX(dia || ' ' || hora_max)
+    FROM estadisticas_dias
+    WHERE dia IS NOT NULL
+'''
+
+_SQL_BORRAR_TEMPORALES = (
+    'DROP TABLE IF EXISTS temp.estadisticas_totales',
+    'DROP TABLE IF EXISTS temp.estadisticas_dias',
+)
+
+
+class ServicioEstadisticasPagos:
+    """Calcula las métricas de la ventana de estadísticas directamente en SQLite."""
+
+    def __init__(self, bd=None, limite_top: int = 10):
+        if bd is None:
+            from src.core.base_datos_sqlite import obtener_bd
+            bd = obtener_bd()
+        self.bd = bd
+        self.limite_top = limite_top
+
+    def calcular(self, coop_id: int, monto_cooperacion: float) -> Dict[str, Any]:
+        """
+        Calcular todas las estadísticas de una cooperación
+
+        Args:
+            coop_id: ID de la cooperación en la tabla cooperaciones
+            monto_cooperacion: Monto esperado por persona para clasificar estados
+
+        Returns:
+            dict con totales, conteo por estado, mediana, tops e histogramas
+        """
+        params = {'coop_id': coop_id, 'monto': monto_cooperacion, 'limite': self.limite_top}
+        try:
+            # Las tablas TEMP viven en la conexión de lectura y se descartan al cerrarla
+            with self.bd.lectura(temporales=True) as conexion:
+                cursor = conexion.cursor()
+                self._borrar_temporales(cursor)
+                cursor.execute(_SQL_CREAR_TOTALES, params)
+                cursor.execute(_SQL_CREAR_DIAS, params)
+
+                resumen = dict(cursor.execute(_SQL_RESUMEN, params).fetchone())
+
+                mediana = cursor.execute(_SQL_MEDIANA).fetchone()[0]
+                top_pagadores = self._filas_a_personas(cursor.execute(_SQL_TOP_PAGADORES, params))
+                top_atrasados = self._filas_a_personas(cursor.execute(_SQL_TOP_ATRASADOS, params))
+
+                pagos_por_mes = dict(cursor.execute(_SQL_POR_MES).fetchall())
+
+                pagos_por_dia_semana = {dia: 0 for dia in DIAS_SEMANA}
+                for dia, cantidad in cursor.execute(_SQL_POR_DIA_SEMANA):
+                    if dia is not None:
+                        # Reordenar de domingo=0 a lunes=0
+                        pagos_por_dia_semana[DIAS_SEMANA[(dia + 6) % 7]] = cantidad
+
+                primero, ultimo = cursor.execute(_SQL_RANGO_FECHAS).fetchone()
+                self._borrar_temporales(cursor)
+        except Exception as e:
+            registrar_error('ServicioEstadisticasPagos', 'calcular', str(e),
+                            {'coop_id': coop_id})
+            return self.resultado_vacio()
+
+        total_personas = resumen['total_personas'] or 0
+        total_esperado = total_personas * monto_cooperacion
+        total_recaudado = resumen['total_recaudado'] or 0
+
+        return {
+            'total_personas': total_personas,
+            'total_esperado': total_esperado,
+            'total_recaudado': total_recaudado,
+            'porcentaje_recaudacion': (total_recaudado / total_esperado * 100)
+                                      if total_esperado > 0 else 0,
+            'estados': {
+                'completado': resumen['completado'] or 0,
+                'parcial': resumen['parcial'] or 0,
+                'pendiente': resumen['pendiente'] or 0,
+                'excedente': resumen['excedente'] or 0,
+            },
+            'promedio_pagado': resumen['promedio_pagado'] or 0,
+            'mediana_pagado': mediana or 0,
+            'promedio_parcial': resumen['promedio_parcial'] or 0,
+            'total_pagos': resumen['total_pagos'] or 0,
+            'promedio_pagos_persona': (resumen['total_pagos'] / total_personas)
+                                      if total_personas else 0,
+            'top_pagadores': top_pagadores,
+            'top_atrasados': top_atrasados,
+            'pagos_por_mes': pagos_por_mes,
+            'pagos_por_dia_semana': pagos_por_dia_semana,
+            'primer_pago': self._parsear_fecha(primero),
+            'ultimo_pago': self._parsear_fecha(ultimo),
+        }
+
+    def obtener_id_cooperacion(self, nombre: str) -> Optional[int]:
+        """Buscar el ID de una cooperación por su nombre (único en la tabla)"""
+        try:
+            with self.bd.lectura() as conexion:
+                fila = conexion.execute('SELECT id FROM cooperaciones WHERE nombre = ?',
+                                        (nombre,)).fetchone()
+            return fila[0] if fila else None
+        except Exception as e:
+            registrar_error('ServicioEstadisticasPagos', 'obtener_id_cooperacion', str(e))
+            return None
+
+    @staticmethod
+    def _borrar_temporales(cursor):
+        for sql in _SQL_BORRAR_TEMPORALES:
+            cursor.execute(sql)
+
+    @staticmethod
+    def _filas_a_personas(filas) -> List[Dict[str, Any]]:
+        return [
+            {'folio': folio or 'N/A', 'nombre': nombre or 'Sin nombre', 'total_pagado': total}
+            for folio, nombre, total in filas
+        ]
+
+    @staticmethod
+    def _parsear_fecha(valor: Optional[str]) -> Optional[datetime]:
+        """Convertir 'YYYY-MM-DD HH:MM[:SS]' a datetime (None si no es válido)"""
+        if not valor:
+            return None
+        for formato in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M'):
+            try:
+                return datetime.strptime(valor, formato)
+            except ValueError:
+                continue
+        return None
+
+    @staticmethod
+    def resultado_vacio() -> Dict[str, Any]:
+        return {
+            'total_personas': 0,
+            'total_esperado': 0,
+            'total_recaudado': 0,
+            'porcentaje_recaudacion': 0,
+            'estados': {'completado': 0, 'parcial': 0, 'pendiente': 0, 'excedente': 0},
+            'promedio_pagado': 0,
+            'mediana_pagado': 0,
+            'promedio_parcial': 0,
+            'total_pagos': 0,
+            'promedio_pagos_persona': 0,
+            'top_pagadores': [],
+            'top_atrasados': [],
+            'pagos_por_mes': {},
+            'pagos_por_dia_semana': {dia: 0 for dia in DIAS_SEMANA},
+            'primer_pago': None,
+            'ultimo_pago': None,
+        }
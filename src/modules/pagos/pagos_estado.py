@@ -6,9 +6,15 @@ Objetivo: Una única fuente de verdad para lógica de estados
 IMPORTANTE: Este módulo DEBE ser usado en lugar de lógica duplicada en otros archivos
 """
 
+from array import array
 from enum import Enum
 from src.core.logger import registrar_operacion
 
+# Códigos compactos de estado: posición en esta tupla
+CODIGOS_ESTADO = ('pendiente', 'parcial', 'completado', 'excedente')
+CODIGO_POR_ESTADO = {estado: codigo for codigo, estado in enumerate(CODIGOS_ESTADO)}
+MONTO_ESPERADO_DEFECTO = 100
+
 
 class EstadoPago(Enum):
     """Estados posibles de un pago"""
@@ -128,6 +134,45 @@ class GestorEstadoPago:
             'enum': datos['enum']
         }
     
+    # Colores de tema resueltos -> tupla de datos por código (compartida)
+    _datos_por_tema = {}
+
+    @staticmethod
+    def datos_estados(tema_global=None):
+        """
+        Datos de presentación de los cuatro estados, indexados por código
+
+        Se calculan una vez por combinación de colores del tema y se devuelve
+        siempre la misma tupla, así que cada fila solo hace una indexación.
+        No modificar los dicts devueltos.
+        """
+        colores = tuple(
+            tema_global.get(GestorEstadoPago.ESTADOS[estado]['color_fg'],
+                            GestorEstadoPago.ESTADOS[estado]['color_fg'])
+            if tema_global else GestorEstadoPago.ESTADOS[estado]['color_fg']
+            for estado in CODIGOS_ESTADO
+        )
+        datos = GestorEstadoPago._datos_por_tema.get(colores)
+        if datos is None:
+            datos = tuple(GestorEstadoPago.obtener_datos_estado(estado, tema_global)
+                          for estado in CODIGOS_ESTADO)
+            GestorEstadoPago._datos_por_tema[colores] = datos
+        return datos
+
+    @staticmethod
+    def clasificar_cooperacion(personas, monto_defecto=MONTO_ESPERADO_DEFECTO):
+        """
+        Clasificar de una vez a todos los integrantes de una cooperación
+
+        Args:
+            personas: list - Personas de la cooperación (con 'pagos')
+            monto_defecto: float - Monto esperado si la persona no lo tiene
+
+        Returns:
+            ClasificacionCooperacion con arreglos paralelos por persona
+        """
+        return ClasificacionCooperacion(personas, monto_defecto)
+
     @staticmethod
     def obtener_emoji_estado(estado):
         """Obtener solo el emoji de un estado"""
@@ -264,6 +309,102 @@ class GestorEstadoPago:
         return True
 
 
+class ClasificacionCooperacion:
+    """
+    Totales y estado de pago de toda una cooperación, calculados en una pasada
+
+    Guarda arreglos paralelos (una posición por persona, en el orden de la
+    lista): pagado, pendiente, porcentaje, código de estado y último pago. Los
+    pagos anulados no cuentan. Es una foto: si cambian los pagos hay que
+    volver a clasificar.
+    """
+
+    __slots__ = ('personas', 'esperados', 'pagados', 'pendientes', 'porcentajes',
+                 'codigos', 'ultimos_pagos', 'total_pagado', 'total_pendiente',
+                 'conteo_estados', '_posiciones')
+
+    def __init__(self, personas, monto_defecto=MONTO_ESPERADO_DEFECTO):
+        self.personas = personas
+        self.esperados = array('d')
+        self.pagados = array('d')
+        self.pendientes = array('d')
+        self.porcentajes = array('d')
+        self.codigos = array('b')
+        self.ultimos_pagos = []
+        self.conteo_estados = [0] * len(CODIGOS_ESTADO)
+        self._posiciones = {}
+
+        codigo_pendiente = CODIGO_POR_ESTADO['pendiente']
+        codigo_parcial = CODIGO_POR_ESTADO['parcial']
+        codigo_completado = CODIGO_POR_ESTADO['completado']
+        codigo_excedente = CODIGO_POR_ESTADO['excedente']
+        total_pagado = 0.0
+        total_pendiente = 0.0
+
+        for posicion, persona in enumerate(personas):
+            esperado = persona.get('monto_esperado', persona.get('monto', monto_defecto))
+            pagos = persona.get('pagos') or ()
+            pagado = 0
+            for pago in pagos:
+                if not pago.get('anulado', False):
+                    pagado += pago.get('monto', 0)
+            pendiente = max(0, esperado - pagado)
+
+            # Mismo criterio que obtener_estado
+            if pagado > esperado:
+                codigo = codigo_excedente
+            elif pagado == esperado:
+                codigo = codigo_completado
+            elif pagado > 0:
+                codigo = codigo_parcial
+            else:
+                codigo = codigo_pendiente
+
+            if pagos:
+                ultimo = pagos[-1]
+                ultimo_pago = f"{ultimo.get('fecha', '')} {ultimo.get('hora', '')}".strip()
+            else:
+                ultimo_pago = ''
+
+            self.esperados.append(esperado)
+            self.pagados.append(pagado)
+            self.pendientes.append(pendiente)
+            self.porcentajes.append(pagado / esperado * 100 if esperado > 0 else 0)
+            self.codigos.append(codigo)
+            self.ultimos_pagos.append(ultimo_pago)
+            self.conteo_estados[codigo] += 1
+            self._posiciones[id(persona)] = posicion
+            total_pagado += pagado
+            total_pendiente += pendiente
+
+        self.total_pagado = total_pagado
+        self.total_pendiente = total_pendiente
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def posicion(self, persona):
+        """Posición de la persona en los arreglos (None si no estaba al clasificar)"""
+        return self._posiciones.get(id(persona))
+
+    def estado(self, persona):
+        """Clave de estado ('pendiente', 'parcial', ...) de una persona"""
+        posicion = self._posiciones.get(id(persona))
+        if posicion is None:
+            return None
+        return CODIGOS_ESTADO[self.codigos[posicion]]
+
+    @property
+    def personas_completas(self):
+        """Personas con el pago completado o con excedente"""
+        return (self.conteo_estados[CODIGO_POR_ESTADO['completado']]
+                + self.conteo_estados[CODIGO_POR_ESTADO['excedente']])
+
+    def vigente_para(self, personas):
+        """True si se calculó sobre esta misma lista y sigue del mismo tamaño"""
+        return personas is self.personas and len(personas) == len(self.codigos)
+
+
 # Funciones de compatibilidad para código antiguo
 def obtener_estado(total_pagado, monto_esperado):
     """Función de compatibilidad - usar GestorEstadoPago.obtener_estado() en su lugar"""
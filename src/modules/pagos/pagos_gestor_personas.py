@@ -10,19 +10,126 @@ from src.core.validadores import validar_nombre, validar_monto
 from src.modules.pagos.pagos_constantes import PATRONES
 
 
+# Estados de pago posibles de una persona
+ESTADOS_PERSONA = ('sin_pagar', 'parcial', 'completado', 'excedente')
+
+
+def _normalizar_nombre(nombre):
+    return (nombre or '').strip().lower()
+
+
+def _clasificar(esperado, pagado):
+    if pagado >= esperado:
+        return 'completado' if pagado == esperado else 'excedente'
+    if pagado > 0:
+        return 'parcial'
+    return 'sin_pagar'
+
+
 class GestorPersonas:
-    """Gestor centralizado de personas y pagos"""
+    """Gestor centralizado de personas y pagos
+    
+    Mantiene índices por folio, por nombre normalizado y por estado de pago, más
+    los totales del grupo, actualizados en cada alta, edición, pago o baja. Si
+    la lista se reemplaza o cambia de tamaño desde fuera, los índices se
+    reconstruyen solos en el siguiente acceso; las ediciones hechas directamente
+    sobre el dict de una persona se avisan con ``actualizar_persona``.
+    """
     
     def __init__(self):
         self.personas = []
+        self.reindexar()
     
     def cargar_personas(self, personas):
         """Cargar personas de una cooperación"""
         self.personas = personas if personas else []
+        self.reindexar()
+    
+    # ==================== ÍNDICES ====================
+    
+    def reindexar(self):
+        """Reconstruir todos los índices desde la lista (una pasada)"""
+        self._lista_id = id(self.personas)
+        self._longitud = len(self.personas)
+        self._por_folio = {}
+        self._por_nombre = {}
+        self._por_estado = {estado: {} for estado in ESTADOS_PERSONA}
+        self._orden = {}
+        self._contador_orden = 0
+        self._aportes = {}
+        self._totales = {'esperado': 0, 'pagado': 0, 'pendiente': 0, 'activos': 0,
+                         'pagadas': 0, 'parciales': 0, 'sin_pagar': 0}
+        self._siguiente_local = 1
+        for persona in self.personas:
+            self._indexar(persona)
+    
+    def _asegurar_indices(self):
+        """La lista fue reemplazada o cambió de tamaño fuera del gestor"""
+        if self._lista_id != id(self.personas) or self._longitud != len(self.personas):
+            self.reindexar()
+    
+    def _indexar(self, persona):
+        folio = persona.get('folio')
+        if folio in self._por_folio:
+            return  # folio repetido en la lista: vale el primero, como antes
+        self._por_folio[folio] = persona
+        self._por_nombre.setdefault(_normalizar_nombre(persona.get('nombre')), set()).add(folio)
+        if folio not in self._orden:
+            self._orden[folio] = self._contador_orden
+            self._contador_orden += 1
+        
+        prefijo = PATRONES['folio_local_prefix'] + '-'
+        if folio and folio.startswith(prefijo) and folio[len(prefijo):].isdigit():
+            self._siguiente_local = max(self._siguiente_local, int(folio[len(prefijo):]) + 1)
+        
+        esperado = persona.get('monto_esperado', persona.get('monto', 100))
+        pagado = sum(pago['monto'] for pago in persona.get('pagos', []))
+        estado = _clasificar(esperado, pagado)
+        activo = persona.get('activo', True)
+        self._por_estado[estado][folio] = persona
+        self._aportes[folio] = (_normalizar_nombre(persona.get('nombre')), estado, esperado, pagado, activo)
+        if activo:
+            self._sumar_totales(esperado, pagado, 1)
+    
+    def _desindexar(self, folio):
+        aporte = self._aportes.pop(folio, None)
+        if aporte is None:
+            return
+        nombre, estado, esperado, pagado, activo = aporte
+        self._por_folio.pop(folio, None)
+        self._por_estado[estado].pop(folio, None)
+        folios = self._por_nombre.get(nombre)
+        if folios is not None:
+            folios.discard(folio)
+            if not folios:
+                del self._por_nombre[nombre]
+        if activo:
+            self._sumar_totales(esperado, pagado, -1)
+    
+    def _sumar_totales(self, esperado, pagado, signo):
+        totales = self._totales
+        totales['esperado'] += signo * esperado
+        totales['pagado'] += signo * pagado
+        totales['pendiente'] += signo * max(0, esperado - pagado)
+        totales['activos'] += signo
+        if pagado >= esperado:
+            totales['pagadas'] += signo
+        elif pagado > 0:
+            totales['parciales'] += signo
+        else:
+            totales['sin_pagar'] += signo
+    
+    def actualizar_persona(self, persona):
+        """Reindexar una persona editada directamente (nombre, monto, pagos o activo)"""
+        self._asegurar_indices()
+        folio = persona.get('folio')
+        self._desindexar(folio)
+        self._indexar(persona)
     
     def obtener_persona_por_folio(self, folio):
         """Obtener una persona por folio"""
-        return next((p for p in self.personas if p.get('folio') == folio), None)
+        self._asegurar_indices()
+        return self._por_folio.get(folio)
     
     def crear_persona(self, nombre, folio=None, monto=100.0, notas=''):
         """Crear una nueva persona"""
@@ -49,6 +156,8 @@ class GestorPersonas:
         }
         
         self.personas.append(persona)
+        self._longitud += 1
+        self._indexar(persona)
         
         registrar_operacion(
             'CREAR_PERSONA',
@@ -67,6 +176,32 @@ class GestorPersonas:
         cambios = {}
         cambios_bd = {}  # Cambios para sincronizar con BD de habitantes
         
+        try:
+            self._aplicar_edicion(persona, nombre, notas, monto_esperado, cambios, cambios_bd)
+        finally:
+            # Los índices guardan los valores anteriores: se reindexa aunque falle una validación
+            self.actualizar_persona(persona)
+        
+        # Sincronizar con la base de datos de habitantes si hay cambios
+        if cambios_bd and gestor_global:
+            try:
+                exito, mensaje = gestor_global.actualizar_habitante(folio, **cambios_bd)
+                if exito:
+                    print(f"[GestorPersonas] Habitante sincronizado: {folio}")
+                else:
+                    print(f"[GestorPersonas] Advertencia al sincronizar: {mensaje}")
+            except Exception as e:
+                print(f"[GestorPersonas] Error sincronizando con BD: {e}")
+        
+        if cambios:
+            registrar_operacion(
+                'EDITAR_PERSONA',
+                f'Persona editada: {persona["nombre"]}',
+                {**cambios, 'folio': folio}
+            )
+    
+    def _aplicar_edicion(self, persona, nombre, notas, monto_esperado, cambios, cambios_bd):
+        """Aplicar los cambios al dict de la persona, anotándolos en cambios y cambios_bd"""
         if nombre is not None:
             validar_nombre(nombre)
             cambios['nombre_anterior'] = persona['nombre']
@@ -87,24 +222,6 @@ class GestorPersonas:
             cambios['monto_nuevo'] = monto_esperado
         
         persona['fecha_modificacion'] = datetime.now().strftime(PATRONES['datetime_formato'])
-        
-        # Sincronizar con la base de datos de habitantes si hay cambios
-        if cambios_bd and gestor_global:
-            try:
-                exito, mensaje = gestor_global.actualizar_habitante(folio, **cambios_bd)
-                if exito:
-                    print(f"[GestorPersonas] Habitante sincronizado: {folio}")
-                else:
-                    print(f"[GestorPersonas] Advertencia al sincronizar: {mensaje}")
-            except Exception as e:
-                print(f"[GestorPersonas] Error sincronizando con BD: {e}")
-        
-        if cambios:
-            registrar_operacion(
-                'EDITAR_PERSONA',
-                f'Persona editada: {persona["nombre"]}',
-                {**cambios, 'folio': folio}
-            )
     
     def eliminar_persona(self, folio):
         """Eliminar una persona"""
@@ -112,7 +229,11 @@ class GestorPersonas:
         if not persona:
             raise ValueError(f"Persona con folio {folio} no encontrada")
         
-        self.personas = [p for p in self.personas if p.get('folio') != folio]
+        # Se modifica la lista en sitio: puede estar compartida con el controlador
+        del self.personas[next(i for i, p in enumerate(self.personas) if p is persona)]
+        self._longitud -= 1
+        self._desindexar(folio)
+        self._orden.pop(folio, None)
         
         registrar_operacion(
             'ELIMINAR_PERSONA',
@@ -136,11 +257,14 @@ class GestorPersonas:
         
         persona['pagos'].append(pago)
         persona['fecha_ultimo_pago'] = datetime.now().strftime(PATRONES['datetime_formato'])
+        self.actualizar_persona(persona)
         
         registrar_transaccion(
+            folio,
             'PAGO',
-            f'Pago registrado para {persona["nombre"]}',
-            {'folio': folio, 'monto': monto, 'notas': notas}
+            monto,
+            'COMPLETADA',
+            detalles=f'Pago registrado para {persona["nombre"]}' + (f' ({notas})' if notas else '')
         )
         
         return pago
@@ -156,19 +280,11 @@ class GestorPersonas:
         if not persona:
             return None
         
-        monto_esperado = persona.get('monto_esperado', persona.get('monto', 100))
-        total_pagado = sum(pago['monto'] for pago in persona.get('pagos', []))
+        # Total pagado y estado ya calculados al indexar
+        _, estado, monto_esperado, total_pagado, _ = self._aportes[folio]
         pendiente = monto_esperado - total_pagado
         porcentaje = (total_pagado / monto_esperado * 100) if monto_esperado > 0 else 0
         
-        # Determinar estado - LÓGICA CORREGIDA
-        if total_pagado >= monto_esperado:
-            estado = 'completado' if total_pagado == monto_esperado else 'excedente'
-        elif total_pagado > 0:
-            estado = 'parcial'
-        else:
-            estado = 'sin_pagar'
-        
         return {
             'folio': folio,
             'nombre': persona['nombre'],
@@ -183,44 +299,22 @@ class GestorPersonas:
         }
     
     def obtener_resumen_grupo(self):
-        """Obtener resumen de todo el grupo"""
-        total_esperado = 0
-        total_pagado = 0
-        total_pendiente = 0
-        personas_pagadas = 0
-        personas_parciales = 0
-        personas_sin_pagar = 0
-        
-        for persona in self.personas:
-            if not persona.get('activo', True):
-                continue
-            
-            monto_esperado = persona.get('monto_esperado', persona.get('monto', 100))
-            pagado = sum(pago['monto'] for pago in persona.get('pagos', []))
-            pendiente = max(0, monto_esperado - pagado)
-            
-            total_esperado += monto_esperado
-            total_pagado += pagado
-            total_pendiente += pendiente
-            
-            if pagado >= monto_esperado:
-                personas_pagadas += 1
-            elif pagado > 0:
-                personas_parciales += 1
-            else:
-                personas_sin_pagar += 1
-        
+        """Obtener resumen de todo el grupo (totales mantenidos al indexar)"""
+        self._asegurar_indices()
+        totales = self._totales
+        total_esperado = totales['esperado']
+        total_pagado = totales['pagado']
         porcentaje_general = (total_pagado / total_esperado * 100) if total_esperado > 0 else 0
         
         return {
             'total_esperado': total_esperado,
             'total_pagado': total_pagado,
-            'total_pendiente': total_pendiente,
+            'total_pendiente': totales['pendiente'],
             'porcentaje_general': porcentaje_general,
-            'personas_pagadas': personas_pagadas,
-            'personas_parciales': personas_parciales,
-            'personas_sin_pagar': personas_sin_pagar,
-            'total_personas': len([p for p in self.personas if p.get('activo', True)])
+            'personas_pagadas': totales['pagadas'],
+            'personas_parciales': totales['parciales'],
+            'personas_sin_pagar': totales['sin_pagar'],
+            'total_personas': totales['activos']
         }
     
     def buscar_personas(self, criterio, valor):
@@ -232,24 +326,24 @@ class GestorPersonas:
             valor: valor a buscar
         
         Returns:
-            Lista de personas que coinciden
+            Lista de personas que coinciden, en el orden de la lista
         """
-        resultados = []
+        self._asegurar_indices()
         valor_lower = str(valor).lower()
         
-        for persona in self.personas:
-            if criterio == 'nombre':
-                if valor_lower in persona['nombre'].lower():
-                    resultados.append(persona)
-            elif criterio == 'folio':
-                if valor_lower in persona.get('folio', '').lower():
-                    resultados.append(persona)
-            elif criterio == 'estado':
-                estado = self.obtener_estado_persona(persona['folio'])
-                if estado and estado['estado'] == valor_lower:
-                    resultados.append(persona)
-        
-        return resultados
+        if criterio == 'estado':
+            # Cubeta ya clasificada: proporcional a la cantidad de resultados
+            encontrados = self._por_estado.get(valor_lower, {})
+            return sorted(encontrados.values(), key=lambda p: self._orden[p.get('folio')])
+        
+        if criterio == 'nombre':
+            # Subcadena sobre los nombres ya normalizados (sin lower() por persona)
+            folios = [f for nombre, fs in self._por_nombre.items() if valor_lower in nombre for f in fs]
+        elif criterio == 'folio':
+            folios = [f for f in self._por_folio if valor_lower in (f or '').lower()]
+        else:
+            return []
+        return [self._por_folio[f] for f in sorted(folios, key=self._orden.__getitem__)]
     
     def validar_nombre_unico(self, nombre, folio_excluir=None):
         """
@@ -262,18 +356,9 @@ class GestorPersonas:
         Returns:
             True si el nombre es único, False si está duplicado
         """
-        nombre_normalizado = nombre.strip().lower()
-        
-        for persona in self.personas:
-            # Excluir la persona que se está editando
-            if folio_excluir and persona.get('folio') == folio_excluir:
-                continue
-            
-            # Comparar nombres (case insensitive)
-            if persona['nombre'].strip().lower() == nombre_normalizado:
-                return False
-        
-        return True
+        self._asegurar_indices()
+        folios = self._por_nombre.get(_normalizar_nombre(nombre), ())
+        return not any(f != folio_excluir for f in folios)
     
     def obtener_nombres_similares(self, nombre, max_resultados=5):
         """Buscar nombres similares para evitar duplicados"""
@@ -299,6 +384,7 @@ class GestorPersonas:
             raise ValueError(f"Persona con folio {folio} no encontrada")
         
         persona['activo'] = activo
+        self.actualizar_persona(persona)
         registrar_operacion(
             'CAMBIAR_ESTADO_PERSONA',
             f'Estado de {persona["nombre"]}: {"Activo" if activo else "Inactivo"}',
@@ -310,15 +396,12 @@ class GestorPersonas:
         return self.personas
     
     def _generar_folio(self):
-        """Generar un folio único"""
-        # Usar contador basado en folios locales existentes
-        folios_locales = [
-            p.get('folio') for p in self.personas 
-            if p.get('folio', '').startswith(PATRONES['folio_local_prefix'])
-        ]
-        
-        contador = 1
-        while f"{PATRONES['folio_local_prefix']}-{contador}" in folios_locales:
-            contador += 1
-        
-        return f"{PATRONES['folio_local_prefix']}-{contador}"
+        """Generar un folio único (contador local, sin recorrer la lista)"""
+        self._asegurar_indices()
+        prefijo = PATRONES['folio_local_prefix']
+        folio = f"{prefijo}-{self._siguiente_local}"
+        while folio in self._por_folio:
+            self._siguiente_local += 1
+            folio = f"{prefijo}-{self._siguiente_local}"
+        self._siguiente_local += 1
+        return folio
@@ -4,6 +4,7 @@ Responsable de: validar permisos, gestionar contraseñas, auditoría
 """
 
 from src.auth.seguridad import seguridad
+from src.core.autorizacion import COMODIN, permisos_de_rol, rol_tiene_permiso
 from src.core.logger import registrar_operacion, registrar_error
 
 
@@ -13,13 +14,11 @@ class GestorSeguridad:
     def __init__(self, gestor_auth=None):
         self.gestor_auth = gestor_auth
         self.usuario_actual = None
-        self.permisos_rol = {}
     
     def establecer_usuario(self, usuario, gestor_auth):
         """Establecer usuario autenticado actual"""
         self.usuario_actual = usuario
         self.gestor_auth = gestor_auth
-        self.permisos_rol = gestor_auth.ROLES if gestor_auth else {}
         
         registrar_operacion(
             'USUARIO_ESTABLECIDO',
@@ -40,14 +39,8 @@ class GestorSeguridad:
         if not self.usuario_actual:
             return False
         
-        rol = self.usuario_actual.get('rol')
-        if not rol or rol not in self.permisos_rol:
-            return False
-        
-        permisos = self.permisos_rol[rol].get('permisos', [])
-        
-        # Permisos con comodín o específicos
-        return '*' in permisos or permiso in permisos
+        # Permisos con comodín o específicos, compilados por rol
+        return rol_tiene_permiso(self.usuario_actual.get('rol'), permiso)
     
     def obtener_rol_actual(self):
         """Obtener rol del usuario actual"""
@@ -100,20 +93,17 @@ class GestorSeguridad:
     
     def obtener_permisos_usuario(self):
         """Obtener lista de permisos del usuario actual"""
-        rol = self.obtener_rol_actual()
-        if not rol or rol not in self.permisos_rol:
-            return []
-        
-        permisos = self.permisos_rol[rol].get('permisos', [])
+        # Misma fuente que tiene_permiso: los frozensets compilados por rol
+        permisos = permisos_de_rol(self.obtener_rol_actual())
         
-        if '*' in permisos:
+        if COMODIN in permisos:
             # Todos los permisos
             return [
                 'crear', 'editar', 'pagar', 'eliminar',
                 'exportar', 'visualizar'
             ]
         
-        return permisos
+        return sorted(permisos)
     
     def validar_acceso_cooperacion(self, coop_id):
         """
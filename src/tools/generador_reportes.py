@@ -25,6 +25,32 @@ class GeneradorReportes:
         """Obtener timestamp para nombres de archivo"""
         return datetime.now().strftime('%Y%m%d_%H%M%S')
     
+    def leer_datos_bd(self, bd=None):
+        """
+        Habitantes, pagos y faenas leídos de una misma instantánea de la BD
+        
+        Usa una conexión de solo lectura aparte de la UI, así que puede
+        llamarse desde un hilo de trabajo mientras se registran pagos.
+        
+        Returns:
+            dict: 'habitantes' (lista), 'habitantes_por_folio', 'pagos', 'faenas'
+        """
+        if bd is None:
+            from src.core.base_datos_sqlite import obtener_bd
+            bd = obtener_bd()
+        
+        with bd.lectura():
+            habitantes = bd.obtener_todos_habitantes()
+            pagos = bd.obtener_todos_pagos()
+            faenas = bd.obtener_todas_faenas()
+        
+        return {
+            'habitantes': habitantes,
+            'habitantes_por_folio': {h.get('folio'): h for h in habitantes},
+            'pagos': pagos,
+            'faenas': faenas
+        }
+    
     # ========================================================================
     # REPORTES DE CENSO
     # ========================================================================
@@ -356,18 +382,28 @@ class GeneradorReportes:
 _generador = GeneradorReportes()
 
 
-def generar_reporte_censo(habitantes, usuario="Sistema"):
-    """Generar reporte de censo"""
+def generar_reporte_censo(habitantes=None, usuario="Sistema", bd=None):
+    """Generar reporte de censo (sin habitantes, se leen de una instantánea de la BD)"""
+    if habitantes is None:
+        habitantes = _generador.leer_datos_bd(bd)['habitantes']
     return _generador.generar_reporte_censo_excel(habitantes, usuario)
 
 
-def generar_reporte_pagos(pagos, habitantes, usuario="Sistema"):
-    """Generar reporte de pagos"""
+def generar_reporte_pagos(pagos=None, habitantes=None, usuario="Sistema", bd=None):
+    """Generar reporte de pagos (lo que falte se lee de una instantánea de la BD)"""
+    if pagos is None or habitantes is None:
+        datos = _generador.leer_datos_bd(bd)
+        pagos = datos['pagos'] if pagos is None else pagos
+        habitantes = datos['habitantes'] if habitantes is None else habitantes
     return _generador.generar_reporte_pagos_excel(pagos, habitantes, usuario)
 
 
-def generar_reporte_faenas(faenas, habitantes, usuario="Sistema"):
-    """Generar reporte de faenas"""
+def generar_reporte_faenas(faenas=None, habitantes=None, usuario="Sistema", bd=None):
+    """Generar reporte de faenas (lo que falte se lee de una instantánea de la BD)"""
+    if faenas is None or habitantes is None:
+        datos = _generador.leer_datos_bd(bd)
+        faenas = datos['faenas'] if faenas is None else faenas
+        habitantes = datos['habitantes'] if habitantes is None else habitantes
     return _generador.generar_reporte_faenas_excel(faenas, habitantes, usuario)
 
 
@@ -3,9 +3,23 @@ Sistema de busqueda avanzada con filtros
 Permite buscar y filtrar datos por multiples criterios
 """
 
+from bisect import bisect_left, bisect_right
 from datetime import datetime
 from src.core.logger import registrar_error
 
+ESTADOS_PAGO = ('PAGADO', 'PENDIENTE', 'PARCIAL')
+
+
+def clasificar_estado_pago(esperado, pagado):
+    """Estado de pago de una persona: PAGADO, PENDIENTE o PARCIAL"""
+    pendiente = max(0, esperado - pagado)
+    if pendiente == 0:
+        return 'PAGADO'
+    if pagado == 0:
+        return 'PENDIENTE'
+    return 'PARCIAL'
+
+
 class BuscadorAvanzado:
     """Buscador con filtros avanzados"""
     
@@ -272,5 +286,114 @@ class BuscadorAvanzado:
             'porcentaje_pagadas': (pagadas / len(personas) * 100) if personas else 0
         }
 
+class IndiceBusquedaPersonas:
+    """
+    Índice preparado sobre una lista de personas de una cooperación
+
+    Calcula una sola vez por persona el total pagado, el pendiente y el estado,
+    agrupa las posiciones por estado y ordena los totales pagados para
+    resolver rangos de monto con bisect. Buscar no vuelve a sumar pagos ni a
+    pasar nombres a minúsculas. Hay que reconstruirlo si cambian los pagos.
+    """
+    
+    def __init__(self, personas):
+        self.personas = personas
+        self.nombres = []
+        self.folios = []
+        self.esperados = []
+        self.pagados = []
+        self.estados = []
+        self.por_estado = {estado: [] for estado in ESTADOS_PAGO}
+        
+        for pos, persona in enumerate(personas):
+            esperado = persona.get('monto_esperado', 0)
+            pagado = sum(p.get('monto', 0) for p in persona.get('pagos', []))
+            estado = clasificar_estado_pago(esperado, pagado)
+            
+            self.nombres.append(persona.get('nombre', '').lower())
+            self.folios.append(persona.get('folio', '').upper())
+            self.esperados.append(esperado)
+            self.pagados.append(pagado)
+            self.estados.append(estado)
+            self.por_estado[estado].append(pos)
+        
+        orden = sorted(range(len(personas)), key=self.pagados.__getitem__)
+        self._montos_ordenados = [self.pagados[pos] for pos in orden]
+        self._posiciones_por_monto = orden
+    
+    def __len__(self):
+        return len(self.personas)
+    
+    def buscar(self, criterios):
+        """
+        Posiciones (en el orden original) de las personas que cumplen los criterios
+        
+        Args:
+            criterios (dict): Mismas claves que BuscadorAvanzado.buscar_personas
+                (nombre, folio, estado_pago, monto_minimo, monto_maximo)
+                
+        Returns:
+            list: Índices en self.personas
+        """
+        candidatos = None
+        
+        estado = criterios.get('estado_pago')
+        if estado:
+            candidatos = set(self.por_estado.get(estado, ()))
+        
+        monto_min = criterios.get('monto_minimo')
+        monto_max = criterios.get('monto_maximo')
+        if monto_min is not None or monto_max is not None:
+            inicio = bisect_left(self._montos_ordenados, float(monto_min)) \
+                if monto_min is not None else 0
+            fin = bisect_right(self._montos_ordenados, float(monto_max)) \
+                if monto_max is not None else len(self._montos_ordenados)
+            en_rango = self._posiciones_por_monto[inicio:fin]
+            candidatos = set(en_rango) if candidatos is None else candidatos.intersection(en_rango)
+        
+        posiciones = sorted(candidatos) if candidatos is not None else range(len(self.personas))
+        
+        nombre = (criterios.get('nombre') or '').lower()
+        if nombre:
+            posiciones = [pos for pos in posiciones if nombre in self.nombres[pos]]
+        
+        folio = (criterios.get('folio') or '').upper()
+        if folio:
+            posiciones = [pos for pos in posiciones if folio in self.folios[pos]]
+        
+        return list(posiciones)
+    
+    def fila(self, pos):
+        """Valores precalculados de una persona para la tabla"""
+        esperado = self.esperados[pos]
+        pagado = self.pagados[pos]
+        return (self.personas[pos].get('folio', 'SIN-FOLIO'),
+                self.personas[pos].get('nombre', ''),
+                esperado, pagado, max(0, esperado - pagado), self.estados[pos])
+    
+    def estadisticas(self, posiciones):
+        """Totales de un resultado usando los montos ya calculados"""
+        total = len(posiciones)
+        total_esperado = sum(self.esperados[pos] for pos in posiciones)
+        total_recaudado = sum(self.pagados[pos] for pos in posiciones)
+        conteo = {estado: 0 for estado in ESTADOS_PAGO}
+        for pos in posiciones:
+            conteo[self.estados[pos]] += 1
+        
+        return {
+            'total_personas': total,
+            'pagado_completo': conteo['PAGADO'],
+            'pago_parcial': conteo['PARCIAL'],
+            'sin_pagar': conteo['PENDIENTE'],
+            'total_esperado': total_esperado,
+            'total_recaudado': total_recaudado,
+            'total_pendiente': sum(max(0, self.esperados[pos] - self.pagados[pos])
+                                   for pos in posiciones),
+            'promedio_esperado': total_esperado / total if total else 0,
+            'promedio_pagado': total_recaudado / total if total else 0,
+            'porcentaje_recaudacion': (total_recaudado / total_esperado * 100)
+                                      if total_esperado else 0,
+        }
+
 # Instancia global
 buscador = BuscadorAvanzado()
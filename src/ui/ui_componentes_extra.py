@@ -7,7 +7,7 @@ import tkinter as tk
 from tkinter import ttk
 from src.ui.tema_moderno import (TEMA_CLARO, TEMA_OSCURO, FUENTES, FUENTES_DISPLAY,
                           ESPACIADO, ICONOS, oscurecer_color, aclarar_color)
-from src.core.optimizador_ui import get_ui_optimizer
+from src.core.optimizador_ui import DebounceManager
 from src.config import UI_DEBOUNCE_SEARCH
 
 
@@ -126,8 +126,8 @@ class SearchBox(tk.Frame):
         self.placeholder = placeholder
         self.has_placeholder = True
         self.debounce_ms = debounce_ms or UI_DEBOUNCE_SEARCH
-        self._optimizer = get_ui_optimizer()
-        self._widget_id = f"search_{id(self)}"
+        # Debounce con self.after: sin hilos y el callback corre en el hilo de Tk
+        self._debounce = DebounceManager(widget=self)
         
         card_bg = self.tema.get('card_bg', self.tema['bg_secundario'])
         self.config(bg=card_bg, relief=tk.FLAT, bd=1,
@@ -201,8 +201,8 @@ class SearchBox(tk.Frame):
         # Ejecutar callback si hay y no es placeholder
         if self.callback and not self.has_placeholder:
             # El callback debe obtener el valor por sí mismo usando self.search_box.get()
-            self._optimizer.debounce_search(
-                self._widget_id,
+            self._debounce.debounce(
+                'busqueda',
                 self.debounce_ms,
                 self.callback,
                 None  # No pasar valor, el callback lo obtiene
@@ -230,6 +230,11 @@ class SearchBox(tk.Frame):
         self.has_placeholder = False  # Resetear flag primero
         self.entry.delete(0, tk.END)
         self._set_placeholder()
+    
+    def destroy(self):
+        """Cancelar búsquedas programadas antes de destruir el widget"""
+        self._debounce.cancel_all()
+        super().destroy()
 
 
 class Separator(tk.Frame):
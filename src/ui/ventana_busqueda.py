@@ -3,7 +3,8 @@ Ventana de búsqueda avanzada con filtros
 """
 import tkinter as tk
 from tkinter import ttk, messagebox
-from src.ui.buscador import BuscadorAvanzado
+from src.config import UI_FILAS_POR_PAGINA
+from src.ui.buscador import IndiceBusquedaPersonas
 
 class VentanaBusquedaAvanzada:
     """Ventana para búsqueda avanzada con múltiples filtros"""
@@ -12,8 +13,10 @@ class VentanaBusquedaAvanzada:
         self.parent = parent
         self.personas = personas
         self.callback_seleccion = callback_seleccion
-        self.buscador = BuscadorAvanzado()
-        self.resultados = []
+        # Totales, estados y montos ordenados se calculan una sola vez
+        self.indice = IndiceBusquedaPersonas(personas)
+        self.resultados = []          # Posiciones en self.personas
+        self._filas_mostradas = 0
         
         self.crear_ventana()
     
@@ -91,11 +94,16 @@ class VentanaBusquedaAvanzada:
         scrollbar_y = ttk.Scrollbar(tabla_frame, orient=tk.VERTICAL)
         scrollbar_x = ttk.Scrollbar(tabla_frame, orient=tk.HORIZONTAL)
         
-        # Treeview
+        # Treeview (al acercarse al final del scroll se inserta la siguiente página)
+        def _on_scroll_y(primero, ultimo):
+            scrollbar_y.set(primero, ultimo)
+            if float(ultimo) >= 0.95:
+                self._mostrar_pagina()
+        
         self.tree = ttk.Treeview(tabla_frame,
                                 columns=('folio', 'nombre', 'esperado', 'pagado', 'pendiente', 'estado'),
                                 show='headings',
-                                yscrollcommand=scrollbar_y.set,
+                                yscrollcommand=_on_scroll_y,
                                 xscrollcommand=scrollbar_x.set)
         
         # Configurar columnas
@@ -113,6 +121,11 @@ class VentanaBusquedaAvanzada:
         self.tree.column('pendiente', width=100, anchor=tk.CENTER)
         self.tree.column('estado', width=100, anchor=tk.CENTER)
         
+        # Colores por estado (una sola vez)
+        self.tree.tag_configure('pagado', background='#c8e6c9')
+        self.tree.tag_configure('pendiente', background='#ffccbc')
+        self.tree.tag_configure('parcial', background='#fff9c4')
+        
         # Posicionar elementos
         self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         scrollbar_y.grid(row=0, column=1, sticky=(tk.N, tk.S))
@@ -163,8 +176,8 @@ class VentanaBusquedaAvanzada:
             except ValueError:
                 pass
         
-        # Realizar búsqueda
-        self.resultados = self.buscador.buscar_personas(self.personas, criterios)
+        # Realizar búsqueda sobre el índice
+        self.resultados = self.indice.buscar(criterios)
         
         # Actualizar tabla
         self.actualizar_tabla()
@@ -175,43 +188,31 @@ class VentanaBusquedaAvanzada:
         )
     
     def actualizar_tabla(self):
-        """Actualizar tabla con resultados"""
-        # Limpiar tabla
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Agregar resultados
-        for persona in self.resultados:
-            folio = persona.get('folio', 'SIN-FOLIO')
-            nombre = persona.get('nombre', '')
-            esperado = persona.get('monto_esperado', 0)
-            pagos = persona.get('pagos', [])
-            pagado = sum(p.get('monto', 0) for p in pagos)
-            pendiente = max(0, esperado - pagado)
-            
-            if pendiente == 0:
-                estado = 'PAGADO'
-                tag = 'pagado'
-            elif pagado == 0:
-                estado = 'PENDIENTE'
-                tag = 'pendiente'
-            else:
-                estado = 'PARCIAL'
-                tag = 'parcial'
-            
-            self.tree.insert('', tk.END, values=(
+        """Actualizar tabla con resultados (solo la primera página)"""
+        hijos = self.tree.get_children()
+        if hijos:
+            self.tree.delete(*hijos)
+        self._filas_mostradas = 0
+        self._mostrar_pagina()
+    
+    def _mostrar_pagina(self):
+        """Insertar la siguiente página de resultados"""
+        inicio = self._filas_mostradas
+        if inicio >= len(self.resultados):
+            return
+        fin = min(inicio + UI_FILAS_POR_PAGINA, len(self.resultados))
+        self._filas_mostradas = fin
+        
+        for pos in self.resultados[inicio:fin]:
+            folio, nombre, esperado, pagado, pendiente, estado = self.indice.fila(pos)
+            self.tree.insert('', tk.END, iid=str(pos), values=(
                 folio,
                 nombre,
                 f'${esperado:.2f}',
                 f'${pagado:.2f}',
                 f'${pendiente:.2f}',
                 estado
-            ), tags=(tag,))
-        
-        # Configurar colores
-        self.tree.tag_configure('pagado', background='#c8e6c9')
-        self.tree.tag_configure('pendiente', background='#ffccbc')
-        self.tree.tag_configure('parcial', background='#fff9c4')
+            ), tags=(estado.lower(),))
     
     def limpiar_filtros(self):
         """Limpiar todos los filtros"""
@@ -228,7 +229,7 @@ class VentanaBusquedaAvanzada:
             messagebox.showinfo("Estadísticas", "No hay resultados para mostrar estadísticas")
             return
         
-        stats = self.buscador.obtener_estadisticas(self.resultados)
+        stats = self.indice.estadisticas(self.resultados)
         
         mensaje = f"""📊 ESTADÍSTICAS DE BÚSQUEDA
 
@@ -260,8 +261,7 @@ Porcentaje de Recaudación: {stats['porcentaje_recaudacion']:.1f}%
             messagebox.showwarning("Advertencia", "Por favor seleccione una persona")
             return
         
-        index = self.tree.index(seleccion[0])
-        persona_seleccionada = self.resultados[index]
+        persona_seleccionada = self.personas[int(seleccion[0])]
         
         self.callback_seleccion(persona_seleccionada)
         self.ventana.destroy()
@@ -0,0 +1,83 @@
+"""
+Pruebas de la caché de autorización
+Ejecutar: python tests/test_autorizacion.py
+"""
+
+import sys
+import os
+import tempfile
+
+# Agregar ruta del proyecto
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.core.autorizacion import CacheAutorizacion, rol_tiene_permiso
+from src.core.base_datos_sqlite import BaseDatosSQLite
+from src.core.gestor_usuarios_global import GestorUsuariosGlobal
+from src.modules.pagos.pagos_seguridad import GestorSeguridad
+
+
+def _crear_bd_temporal():
+    """BD aislada: la prueba crea usuarios y no debe tocar la BD real"""
+    bd = BaseDatosSQLite(os.path.join(tempfile.mkdtemp(), 'sistema.db'))
+    return bd
+
+
+def test_permisos_compilados():
+    """Roles compilados a frozensets"""
+    print("🧪 Test: Permisos compilados...")
+    assert rol_tiene_permiso('admin', 'cualquier_cosa')
+    assert rol_tiene_permiso('operador', 'pagar')
+    assert not rol_tiene_permiso('lectura', 'editar')
+    assert rol_tiene_permiso('reportes', 'exportar')
+    assert not rol_tiene_permiso('inexistente', 'ver')
+
+    # Pagos lista y verifica permisos desde la misma fuente
+    seguridad = GestorSeguridad()
+    seguridad.usuario_actual = {'nombre': 'x', 'rol': 'operador'}
+    assert seguridad.obtener_permisos_usuario() == ['crear', 'editar', 'pagar', 'ver']
+    assert all(seguridad.tiene_permiso(p) for p in seguridad.obtener_permisos_usuario())
+
+    # El gestor global no concede permisos a 'reportes' (igual que antes de compilar roles)
+    gestor = GestorUsuariosGlobal()
+    gestor.usuario_actual, gestor.rol_actual = 'x', 'reportes'
+    assert not gestor.tiene_permiso('ver') and not gestor.tiene_permiso('exportar')
+    print("✅ Permisos por rol correctos")
+
+
+def test_cache_usuarios_y_snapshot():
+    """Recarga solo cuando cambia la tabla y snapshot verificable sin BD"""
+    print("\n🧪 Test: Caché de usuarios...")
+    bd = _crear_bd_temporal()
+    ruta_clave = os.path.join(tempfile.mkdtemp(), 'clave')
+    cache = CacheAutorizacion(bd, ruta_clave=ruta_clave)
+
+    assert 'admin' in cache.usuarios()
+    cache.usuarios()
+    cache.obtener_usuario('admin')
+    assert cache.recargas == 1
+
+    # ultimo_acceso no afecta permisos: no invalida
+    bd.conexion.execute("UPDATE usuarios SET ultimo_acceso = '2026-01-01' WHERE nombre_usuario = 'admin'")
+    bd.conexion.commit()
+    cache.usuarios()
+    assert cache.recargas == 1
+
+    exito, _ = bd.crear_usuario('prueba_cache', 'secreto123', 'prueba_cache@local', 'lectura')
+    assert exito
+    assert cache.obtener_usuario('prueba_cache')['rol'] == 'lectura'
+    assert cache.recargas == 2
+
+    snapshot = cache.emitir_snapshot('prueba_cache', 'lectura')
+    otro_proceso = CacheAutorizacion(bd, ruta_clave=ruta_clave)
+    assert otro_proceso.verificar_snapshot(snapshot, 'ver')
+    assert not otro_proceso.verificar_snapshot(snapshot, 'editar')
+    alterado = dict(snapshot, permisos=['*'])
+    assert not otro_proceso.verificar_snapshot(alterado, 'editar')
+    bd.desconectar()
+    print("✅ Caché invalidada por versión y snapshot firmado")
+
+
+if __name__ == "__main__":
+    test_permisos_compilados()
+    test_cache_usuarios_y_snapshot()
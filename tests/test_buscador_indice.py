@@ -0,0 +1,73 @@
+"""
+Pruebas del índice de búsqueda de personas de la ventana de búsqueda avanzada
+Ejecutar: python tests/test_buscador_indice.py
+"""
+
+import sys
+import os
+import random
+import time
+
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.ui.buscador import BuscadorAvanzado, IndiceBusquedaPersonas
+
+
+def _personas(n=5000):
+    rnd = random.Random(7)
+    return [{
+        'folio': f'HAB-{i:04d}',
+        'nombre': f'Persona {i} {rnd.choice(["Pérez", "Gómez", "Ruiz"])}',
+        'monto_esperado': 100,
+        'pagos': [{'monto': rnd.choice([0, 25, 50, 100])} for _ in range(rnd.randint(0, 2))],
+    } for i in range(n)]
+
+
+def test_indice_equivale_a_buscar_personas():
+    """Mismos resultados, en el mismo orden, que BuscadorAvanzado.buscar_personas"""
+    personas = _personas()
+    indice = IndiceBusquedaPersonas(personas)
+    buscador = BuscadorAvanzado()
+    consultas = [
+        {},
+        {'nombre': 'gómez'},
+        {'folio': 'hab-01'},
+        {'estado_pago': 'PARCIAL', 'monto_minimo': 50.0},
+        {'estado_pago': 'PAGADO', 'nombre': 'ruiz', 'monto_maximo': 150.0},
+        {'monto_minimo': 25.0, 'monto_maximo': 75.0},
+    ]
+    for criterios in consultas:
+        esperado = buscador.buscar_personas(personas, criterios)
+        obtenido = [personas[pos] for pos in indice.buscar(criterios)]
+        assert obtenido == esperado, f"Diferencia con {criterios}"
+
+    stats = indice.estadisticas(indice.buscar({}))
+    assert stats['total_personas'] == len(personas)
+    assert stats['pagado_completo'] + stats['pago_parcial'] + stats['sin_pagar'] == len(personas)
+    print("✓ Índice equivalente a buscar_personas")
+
+
+def test_rendimiento_rango_montos():
+    """Un rango de montos sobre miles de personas no vuelve a sumar pagos"""
+    personas = _personas()
+    indice = IndiceBusquedaPersonas(personas)
+    criterios = {'estado_pago': 'PARCIAL', 'monto_minimo': 40.0, 'monto_maximo': 60.0}
+
+    inicio = time.perf_counter()
+    for _ in range(20):
+        indice.buscar(criterios)
+    indice_ms = (time.perf_counter() - inicio) / 20 * 1000
+
+    inicio = time.perf_counter()
+    BuscadorAvanzado().buscar_personas(personas, criterios)
+    lineal_ms = (time.perf_counter() - inicio) * 1000
+
+    print(f"  {len(personas)} personas: índice {indice_ms:.2f} ms, recorrido {lineal_ms:.2f} ms")
+    assert indice_ms < lineal_ms
+
+
+if __name__ == "__main__":
+    test_indice_equivale_a_buscar_personas()
+    test_rendimiento_rango_montos()
+    print("\n✅ Todas las pruebas pasaron")
@@ -0,0 +1,121 @@
+"""
+Pruebas del cache LRU con TTL y etiquetas
+Ejecutar: python tests/test_cache.py
+"""
+
+import sys
+import os
+import gc
+import time
+
+# Agregar ruta del proyecto
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.core.cache import Cache, cached, invalidar_cache_al_cambiar, obtener_estadisticas_cache
+
+
+def test_lru_y_limites():
+    """Expulsión LRU por entradas y por bytes"""
+    print("🧪 Test: Límites LRU...")
+    
+    cache = Cache(max_entradas=3, max_bytes=10_000)
+    for clave in ('a', 'b', 'c'):
+        cache.set(clave, clave)
+    cache.get('a')          # 'a' pasa a ser la más reciente
+    cache.set('d', 'd')     # expulsa 'b'
+    
+    assert cache.existe('a') and not cache.existe('b')
+    assert cache.obtener_estadisticas()['expulsiones'] == 1
+    
+    cache.set('grande', 'x' * 9_000)
+    stats = cache.obtener_estadisticas()
+    assert stats['bytes_aprox'] <= 10_000
+    assert cache.existe('grande')
+    print("✅ Límites LRU respetados")
+
+
+def test_ttl_y_etiquetas():
+    """Expiración con reloj monotónico e invalidación por etiqueta"""
+    print("\n🧪 Test: TTL y etiquetas...")
+    
+    cache = Cache(max_entradas=10)
+    cache.set('corto', 1, ttl_segundos=0.05)
+    cache.set('coop1', 'x', etiquetas=['coop:1'])
+    cache.set('coop2', 'y', etiquetas=['coop:2'])
+    cache.set('nulo', None)
+    
+    assert cache.existe('nulo'), "Un valor None cacheado debe contar como existente"
+    time.sleep(0.06)
+    assert cache.get('corto') is None
+    
+    assert cache.invalidar_etiqueta('coop:1') == 1
+    assert not cache.existe('coop1') and cache.existe('coop2')
+    print("✅ TTL y etiquetas funcionan")
+
+
+def test_decorador_cached():
+    """Claves estables, invalidación por etiqueta calculada y estadísticas"""
+    print("\n🧪 Test: Decorador cached...")
+    
+    llamadas = {'n': 0}
+    
+    @cached(ttl_segundos=60, etiquetas=lambda coop_id: [f'coop:{coop_id}'])
+    def total_coop(coop_id):
+        llamadas['n'] += 1
+        return coop_id * 10
+    
+    @invalidar_cache_al_cambiar(['estadisticas_censo'], etiquetas=['coop:7'])
+    def registrar_pago():
+        return True
+    
+    assert total_coop(7) == 70 and total_coop(7) == 70
+    assert llamadas['n'] == 1
+    
+    registrar_pago()
+    total_coop(7)
+    assert llamadas['n'] == 2
+    
+    stats = obtener_estadisticas_cache()
+    assert stats['aciertos'] >= 1 and stats['fallos'] >= 2
+    print("✅ Decorador cached correcto")
+
+
+def test_metodo_cached_no_hereda_resultado_de_otro_objeto():
+    """Un id reciclado tras el GC no devuelve el resultado de otro objeto"""
+    print("\n🧪 Test: Métodos cacheados e ids reciclados...")
+    
+    class Coop:
+        def __init__(self, total):
+            self.total = total
+        
+        @cached(ttl_segundos=60)
+        def resumen(self):
+            return self.total
+    
+    ids_vistos = set()
+    for total in range(200):
+        coop = Coop(total)
+        ids_vistos.add(id(coop))
+        assert coop.resumen() == total and coop.resumen() == total
+        del coop
+        gc.collect()
+    assert len(ids_vistos) < 200, "El intérprete no recicló ningún id; la prueba no ejerce el caso"
+    
+    @cached(ttl_segundos=60)
+    def describir(valor):
+        return repr(valor)
+    
+    try:
+        describir(object())
+        assert False, "Se aceptó un objeto sin weakref y sin clave_custom"
+    except TypeError:
+        pass
+    print("✅ Métodos cacheados correctos")
+
+
+if __name__ == "__main__":
+    test_lru_y_limites()
+    test_ttl_y_etiquetas()
+    test_decorador_cached()
+    test_metodo_cached_no_hereda_resultado_de_otro_objeto()
@@ -0,0 +1,50 @@
+"""
+Pruebas del filtrado del censo ante errores y con caché por versión
+Ejecutar: python tests/test_censo_filtrado.py
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+# Agregar ruta del proyecto
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.core.optimizador_ui import get_ui_optimizer
+from src.modules.censo.censo_habitantes import FILTRADO_FALLIDO, SistemaCensoHabitantes
+
+
+def _ventana(habitantes, version):
+    """Lo que usan _tarea_filtrado y _finalizar_filtrado, sin Tk"""
+    ventana = SimpleNamespace(habitantes=habitantes, _version_habitantes=version,
+                              _optimizer=get_ui_optimizer(), habitantes_filtrados=['fila actual'],
+                              _actualizacion_en_progreso=True, pintadas=[])
+    ventana._actualizar_tabla = ventana.pintadas.append
+    return ventana
+
+
+def test_error_de_filtrado_conserva_las_filas():
+    """Un error al filtrar no se guarda en caché ni vacía la tabla"""
+    print("\n🧪 Filtrado del censo con error...")
+    habitantes = [{'folio': 'FOL-0001', 'nombre': 'Ana'}, {'folio': 'FOL-0002', 'nombre': None}]
+    ventana = _ventana(habitantes, version=('prueba-error', 1))
+
+    tarea = SistemaCensoHabitantes._tarea_filtrado(ventana, 'an', 'Todos')
+    resultado = tarea()
+    assert resultado is FILTRADO_FALLIDO
+    SistemaCensoHabitantes._finalizar_filtrado(ventana, resultado, 'an', 'Todos')
+    assert ventana.pintadas == [] and ventana.habitantes_filtrados == ['fila actual']
+    assert not ventana._actualizacion_en_progreso
+
+    # Corregido el dato, el mismo criterio y versión se vuelve a calcular
+    habitantes[1]['nombre'] = 'Andrés'
+    resultado = SistemaCensoHabitantes._tarea_filtrado(ventana, 'an', 'Todos')()
+    assert [h['folio'] for h in resultado] == ['FOL-0001', 'FOL-0002']
+    SistemaCensoHabitantes._finalizar_filtrado(ventana, resultado, 'an', 'Todos')
+    assert ventana.pintadas == [resultado] and ventana.habitantes_filtrados is resultado
+    print("✅ Error de filtrado sin tabla vacía")
+
+
+if __name__ == "__main__":
+    test_error_de_filtrado_conserva_las_filas()
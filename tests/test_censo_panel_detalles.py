@@ -0,0 +1,93 @@
+"""
+Pruebas del debounce de selección del panel de detalles del censo
+Ejecutar: python tests/test_censo_panel_detalles.py
+"""
+
+import sys
+import os
+
+# Agregar ruta del proyecto
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.modules.censo.censo_panel_detalles import CensoPanelDetalles
+
+
+class _VentanaFalsa:
+    """after/after_cancel de Tk; los trabajos se ejecutan a mano con vencer()"""
+    
+    def __init__(self):
+        self.trabajos = {}
+        self._siguiente = 0
+    
+    def after(self, ms, funcion):
+        self._siguiente += 1
+        job = f'after#{self._siguiente}'
+        self.trabajos[job] = funcion
+        return job
+    
+    def after_cancel(self, job):
+        self.trabajos.pop(job, None)
+    
+    def vencer(self):
+        trabajos, self.trabajos = self.trabajos, {}
+        for funcion in trabajos.values():
+            funcion()
+
+
+class _FrameFalso:
+    def pack(self, **kwargs):
+        pass
+    
+    def pack_forget(self):
+        pass
+
+
+class _PanelSinWidgets(CensoPanelDetalles):
+    """El panel real sin el esqueleto de Tk: registra qué se pinta"""
+    
+    def _crear_esqueleto(self):
+        self.mensaje_frame = _FrameFalso()
+        self.detalles_frame = _FrameFalso()
+        self.pintados = []
+    
+    def mostrar_detalles(self, habitante):
+        self.habitante_actual = habitante
+        self.pintados.append(habitante['folio'])
+
+
+def test_flecha_mantenida_pinta_solo_la_ultima_fila():
+    """Una selección por fila al mantener la flecha: solo se pinta la última"""
+    print("\n🧪 Debounce de selección en el panel de detalles...")
+    ventana = _VentanaFalsa()
+    nada = lambda *args: None
+    panel = _PanelSinWidgets(ventana, None, nada, nada, nada, nada, nada)
+    
+    habitantes = [{'folio': f'FOL-{i:04d}', 'nombre': f'Habitante {i}'} for i in range(1, 21)]
+    seleccion = {'fila': None}
+    consultas = []
+    
+    def habitante_seleccionado():
+        consultas.append(seleccion['fila'])
+        return habitantes[seleccion['fila']]
+    
+    for fila in range(len(habitantes)):
+        seleccion['fila'] = fila
+        panel.programar_detalles(habitante_seleccionado)
+    
+    assert len(ventana.trabajos) == 1, "Quedaron varios pintados programados"
+    ventana.vencer()
+    assert panel.pintados == ['FOL-0020'], panel.pintados
+    # La fila se busca al vencer el debounce, no en cada evento
+    assert consultas == [19], consultas
+    
+    # Volver al mensaje inicial descarta un pintado pendiente
+    panel.programar_detalles(habitante_seleccionado)
+    panel.mostrar_mensaje_inicial()
+    ventana.vencer()
+    assert panel.pintados == ['FOL-0020'] and panel.habitante_actual is None
+    print("✅ Solo se pinta la fila final")
+
+
+if __name__ == "__main__":
+    test_flecha_mantenida_pinta_solo_la_ultima_fila()
@@ -0,0 +1,77 @@
+"""
+Pruebas de la conciliación censo - cooperación en SQL
+Ejecutar: python tests/test_conciliacion_censo.py
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+# Agregar ruta del proyecto
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.core.base_datos_sqlite import BaseDatosSQLite
+from src.modules.pagos.pagos_conciliacion import ConciliadorCenso
+
+
+def _crear_bd_temporal(habitantes):
+    """BD aislada con ``habitantes`` habitantes activos y una cooperación"""
+    bd = BaseDatosSQLite(os.path.join(tempfile.mkdtemp(), 'sistema.db'))
+    bd.conexion.executemany(
+        "INSERT INTO habitantes (folio, nombre, rut, activo) VALUES (?, ?, ?, 1)",
+        [(f"HAB-{i:04d}", f"Habitante {i}", f"{i}-K") for i in range(1, habitantes + 1)])
+    bd.conexion.commit()
+    coop_id = bd.crear_cooperacion_bd('Conciliación', 'Prueba', 100)
+    return bd, coop_id
+
+
+def test_conciliacion_censo():
+    """Faltantes en un commit, enlace por folio/nombre, renombrados y bajas"""
+    print("🧪 Test: Conciliación censo - cooperación...")
+    bd, coop_id = _crear_bd_temporal(5000)
+    conciliador = ConciliadorCenso(bd)
+
+    # Datos heredados en memoria: uno con folio, otro solo con nombre (sin acento
+    # y en minúsculas) y uno que no está en el censo
+    personas = [
+        {'folio': 'HAB-0001', 'nombre': 'Habitante 1', 'pagos': [{'monto': 50}]},
+        {'folio': 'SIN-FOLIO', 'nombre': ' habitante 2 ', 'pagos': []},
+        {'folio': 'SIN-FOLIO', 'nombre': 'Desconocido', 'pagos': []},
+    ]
+
+    confirmaciones = bd.conexion.confirmaciones
+    inicio = time.perf_counter()
+    resultado = conciliador.conciliar(coop_id, 100, personas)
+    ms = (time.perf_counter() - inicio) * 1000
+    print(f"   5000 habitantes conciliados en {ms:.1f} ms")
+
+    assert resultado['exito']
+    assert bd.conexion.confirmaciones == confirmaciones + 1
+    assert len(resultado['agregados']) == 4998
+    assert resultado['total'] == 5001 and resultado['total_censo'] == 5000
+    assert [p['nombre'] for p in resultado['sin_censo']] == ['Desconocido']
+    assert personas[0]['persona_coop_id'] and personas[0]['pagos'] == [{'monto': 50}]
+    assert personas[1]['persona_coop_id'] and personas[1]['folio'] == 'HAB-0002'
+    assert len(resultado['renombrados']) == 1  # ' habitante 2 ' -> 'Habitante 2'
+    assert bd.conexion.execute(
+        "SELECT COUNT(*) FROM personas_cooperacion WHERE cooperacion_id = ?", (coop_id,)).fetchone()[0] == 5000
+
+    # Cambios en el censo: un renombre y una baja; nada nuevo que insertar
+    bd.conexion.execute("UPDATE habitantes SET nombre = 'Habitante Tres' WHERE folio = 'HAB-0003'")
+    bd.conexion.execute("UPDATE habitantes SET activo = 0 WHERE folio = 'HAB-0004'")
+    bd.conexion.commit()
+    resultado = conciliador.conciliar(coop_id, 100, personas)
+    assert resultado['agregados'] == []
+    assert [(r['nombre_anterior'], r['nombre']) for r in resultado['renombrados']] == \
+        [('Habitante 3', 'Habitante Tres')]
+    assert [p['folio'] for p in resultado['desactivados']] == ['HAB-0004']
+    assert resultado['total'] == 5001
+
+    bd.desconectar()
+    print("✅ Conciliación correcta")
+
+
+if __name__ == "__main__":
+    test_conciliacion_censo()
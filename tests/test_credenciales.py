@@ -0,0 +1,72 @@
+"""
+Pruebas del servicio unificado de credenciales
+Ejecutar: python tests/test_credenciales.py
+"""
+
+import sys
+import os
+import hashlib
+import tempfile
+
+# Agregar ruta del proyecto
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.config import BCRYPT_ROUNDS, CREDENCIALES_COSTO_MIN
+from src.core.credenciales import ServicioCredenciales, describir_hash
+from src.core.base_datos_sqlite import BaseDatosSQLite
+from src.core.gestor_usuarios_global import GestorUsuariosGlobal
+
+
+def test_hash_y_calibracion():
+    """Costo dentro del hash, calibración persistida y piso de seguridad"""
+    print("🧪 Test: Hash y calibración...")
+    ruta = os.path.join(tempfile.mkdtemp(), 'calibracion.json')
+    servicio = ServicioCredenciales(ruta_calibracion=ruta, objetivo_ms=1)
+    assert servicio.costo == CREDENCIALES_COSTO_MIN  # equipo "lento": no baja del mínimo
+    assert servicio.costo >= BCRYPT_ROUNDS  # nunca más débil que el costo fijo anterior
+    assert ServicioCredenciales(ruta_calibracion=ruta, objetivo_ms=1)._cargar_calibracion() == servicio.costo
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write('{"costo": %d, "objetivo_ms": 1}' % (CREDENCIALES_COSTO_MIN - 2))
+    assert ServicioCredenciales(ruta_calibracion=ruta, objetivo_ms=1)._cargar_calibracion() is None
+
+    hash_nuevo = servicio.hashear('secreto123')
+    assert describir_hash(hash_nuevo) == {'algoritmo': 'bcrypt', 'costo': servicio.costo}
+    assert servicio.verificar('secreto123', hash_nuevo)
+    assert not servicio.verificar('otra', hash_nuevo)
+    assert not servicio.necesita_rehash(hash_nuevo)
+
+    heredado = hashlib.sha256(b'secreto123').hexdigest()
+    assert describir_hash(heredado)['algoritmo'] == 'sha256'
+    valida, reemplazo = servicio.verificar_y_actualizar('secreto123', heredado)
+    assert valida and describir_hash(reemplazo)['algoritmo'] == 'bcrypt'
+    assert servicio.verificar_y_actualizar('mala', heredado) == (False, None)
+    print("✅ Hashes con algoritmo y costo")
+
+
+def test_login_actualiza_hash_heredado():
+    """Un login correcto reemplaza el SHA256 sin sal por bcrypt"""
+    print("\n🧪 Test: Actualización transparente en login...")
+    # BD aislada: no dejar una cuenta con contraseña conocida en la BD real
+    directorio = tempfile.mkdtemp()
+    bd = BaseDatosSQLite(os.path.join(directorio, 'sistema.db'))
+    heredado = hashlib.sha256(b'clave_vieja').hexdigest()
+    bd.conexion.execute(
+        "INSERT OR REPLACE INTO usuarios (nombre_usuario, contraseña, email, rol, activo) "
+        "VALUES ('legado', ?, 'legado@local', 'operador', 1)", (heredado,))
+    bd.conexion.commit()
+
+    gestor = GestorUsuariosGlobal(bd, directorio)
+    assert not gestor.login('legado', 'incorrecta')['exito']
+    assert gestor.login('legado', 'clave_vieja')['exito']
+
+    guardado = bd.obtener_usuario('legado')['contraseña']
+    assert describir_hash(guardado)['algoritmo'] == 'bcrypt'
+    assert gestor.login('legado', 'clave_vieja')['exito']
+    bd.desconectar()
+    print("✅ Hash heredado actualizado a bcrypt")
+
+
+if __name__ == "__main__":
+    test_hash_y_calibracion()
+    test_login_actualiza_hash_heredado()
@@ -0,0 +1,67 @@
+"""
+Pruebas del servicio de estadísticas de pagos calculadas en SQL
+Ejecutar: python tests/test_estadisticas_pagos.py
+"""
+
+import sys
+import os
+import tempfile
+
+# Agregar ruta del proyecto
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.core.base_datos_sqlite import BaseDatosSQLite
+from src.modules.pagos.pagos_estadisticas_servicio import ServicioEstadisticasPagos
+
+
+def _crear_bd_temporal():
+    """Crear una BD SQLite aislada en un directorio temporal"""
+    bd = BaseDatosSQLite(os.path.join(tempfile.mkdtemp(), 'sistema.db'))
+    return bd
+
+
+def test_estadisticas_sql():
+    """Totales, mediana, tops e histogramas desde pagos_coop"""
+    print("🧪 Test: Estadísticas SQL de cooperación...")
+    
+    bd = _crear_bd_temporal()
+    coop_id = bd.crear_cooperacion_bd('Coop Test', 'Proyecto', 300.0)
+    
+    pagos = {
+        'Ana': [('06/01/2025', 300.0)],                          # completado
+        'Beto': [('07/01/2025', 100.0), ('03/02/2025', 50.0)],  # parcial 150
+        'Carla': [],                                              # pendiente
+        'Dario': [('10/02/2025', 400.0)],                        # excedente
+    }
+    for i, (nombre, lista) in enumerate(pagos.items(), 1):
+        habitante, _ = bd.crear_habitante(f'F-{i:03d}', nombre, rut=f'{i}-K')
+        pc_id = bd.agregar_persona_coop_bd(coop_id, habitante['id'], 300.0)
+        for fecha, monto in lista:
+            bd.registrar_pago_coop_bd(pc_id, monto, fecha, '10:00', 'Pago')
+    
+    # Un pago anulado no debe contar
+    bd.conexion.execute("UPDATE pagos_coop SET anulado = 1 WHERE monto = 50.0")
+    bd.conexion.commit()
+    
+    stats = ServicioEstadisticasPagos(bd).calcular(coop_id, 300.0)
+    
+    assert stats['total_personas'] == 4
+    assert stats['total_recaudado'] == 800.0
+    assert stats['estados'] == {'completado': 1, 'parcial': 1, 'pendiente': 1, 'excedente': 1}
+    assert stats['mediana_pagado'] == 200.0, stats['mediana_pagado']
+    assert stats['total_pagos'] == 3
+    assert [p['nombre'] for p in stats['top_pagadores']][:2] == ['Dario', 'Ana']
+    assert [p['nombre'] for p in stats['top_atrasados']] == ['Beto']
+    assert stats['pagos_por_mes'] == {'2025-01': 2, '2025-02': 1}
+    # 06/01/2025 lunes, 07/01/2025 martes, 10/02/2025 lunes
+    assert stats['pagos_por_dia_semana']['Lunes'] == 2
+    assert stats['pagos_por_dia_semana']['Martes'] == 1
+    assert stats['ultimo_pago'].strftime('%Y-%m-%d') == '2025-02-10'
+    
+    bd.desconectar()
+    print("✅ Estadísticas SQL correctas")
+
+
+if __name__ == "__main__":
+    test_estadisticas_sql()
@@ -0,0 +1,115 @@
+"""
+Pruebas del motor de consultas de faenas (índices invertidos)
+Ejecutar: python tests/test_faenas_consulta.py
+"""
+
+import sys
+import os
+import time
+
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.modules.faenas.faenas_consulta import IndiceFaenas, parsear_consulta
+
+
+def _generar_faenas(anios=5, por_dia=1, personas=300):
+    faenas = []
+    estados = ['registrada', 'completada', 'pagada']
+    for anio in range(2020, 2020 + anios):
+        for dia in range(1, 366, 1):
+            for k in range(por_dia):
+                n = len(faenas)
+                faenas.append({
+                    'id': str(n),
+                    'nombre': f'Faena {n}',
+                    'fecha': f'{anio}-{(dia % 12) + 1:02d}-{(dia % 28) + 1:02d}',
+                    'peso': n % 10,
+                    'estado': estados[n % 3],
+                    'participantes': [{'nombre': f'Persona{(n * 7 + j) % personas} Pérez'}
+                                      for j in range(20)],
+                })
+    return faenas
+
+
+def _buscar_lineal(faenas, filtros):
+    """Referencia: el recorrido original faena por faena"""
+    resultados = []
+    for faena in faenas:
+        if filtros.get('fecha') and faena.get('fecha') != filtros['fecha']:
+            continue
+        if filtros.get('participante'):
+            nombres = [p.get('nombre', '').lower() for p in faena.get('participantes', [])]
+            if not any(filtros['participante'] in n for n in nombres):
+                continue
+        if filtros.get('peso_min') is not None and faena.get('peso', 0) < filtros['peso_min']:
+            continue
+        if filtros.get('estado') and faena.get('estado') != filtros['estado']:
+            continue
+        resultados.append(faena)
+    return resultados
+
+
+def test_parsear_consulta():
+    """La mini-sintaxis produce el dict de filtros y tolera pesos incompletos"""
+    filtros = parsear_consulta('fecha:2026-01-14 participante:Juan peso:>5 estado:Pagada')
+    assert filtros['fecha'] == '2026-01-14'
+    assert filtros['participante'] == 'juan'
+    assert filtros['peso_min'] == 5.0
+    assert filtros['estado'] == 'pagada'
+    assert parsear_consulta('peso:>')['peso_min'] is None
+    assert parsear_consulta('peso:>x')['peso_min'] is None
+    print("✓ parsear_consulta")
+
+
+def test_indice_equivale_al_recorrido():
+    """El índice devuelve lo mismo que el recorrido lineal, en el mismo orden"""
+    faenas = _generar_faenas(anios=2)
+    indice = IndiceFaenas(faenas)
+    consultas = [
+        'participante:persona17',
+        'participante:pérez estado:pagada',
+        'peso:>7 estado:completada',
+        'fecha:2021-03-05',
+        'fecha:05/03/2021 participante:persona1',
+        'estado:inexistente',
+        '',
+    ]
+    for criterio in consultas:
+        filtros = parsear_consulta(criterio)
+        esperado = _buscar_lineal(faenas, dict(filtros, fecha=('2021-03-05' if filtros['fecha'] else None)))
+        obtenido = indice.buscar(filtros)
+        assert obtenido == esperado, f"Diferencia en '{criterio}': {len(obtenido)} vs {len(esperado)}"
+
+    # Filtros rápidos del panel (mes por nombre)
+    marzo = indice.buscar({'mes': 'marzo', 'estado': None, 'participante': None})
+    assert marzo and all(f['fecha'][5:7] == '03' for f in marzo)
+    print("✓ Índice equivalente al recorrido lineal")
+
+
+def test_rendimiento_indice():
+    """Búsquedas sobre varios años de historial en menos de un milisegundo"""
+    faenas = _generar_faenas(anios=5)
+    indice = IndiceFaenas(faenas)
+    filtros = parsear_consulta('participante:persona123 peso:>3 estado:pagada')
+    indice.buscar(filtros)  # calentar la caché de subcadenas
+
+    repeticiones = 200
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        indice.buscar(filtros)
+    promedio_ms = (time.perf_counter() - inicio) / repeticiones * 1000
+
+    inicio = time.perf_counter()
+    _buscar_lineal(faenas, filtros)
+    lineal_ms = (time.perf_counter() - inicio) * 1000
+
+    print(f"  {len(faenas)} faenas: índice {promedio_ms:.3f} ms, recorrido {lineal_ms:.1f} ms")
+    assert promedio_ms < 1.0, f"Búsqueda indexada lenta: {promedio_ms:.3f} ms"
+
+
+if __name__ == "__main__":
+    test_parsear_consulta()
+    test_indice_equivale_al_recorrido()
+    test_rendimiento_indice()
+    print("\n✅ Todas las pruebas pasaron")
@@ -0,0 +1,46 @@
+"""
+Pruebas del filtro mensual de FaenasIntegracion con fechas ISO
+Ejecutar: python tests/test_faenas_integracion.py
+"""
+
+import sys
+import os
+
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.modules.faenas.integracion_fase123 import FaenasIntegracion
+
+
+class _GeneradorFalso:
+    """Devuelve las faenas que recibe para revisar el filtro por mes"""
+
+    def generar_resumen_mensual(self, faenas):
+        return {'faenas': faenas}
+
+    def obtener_distribucion(self, faenas):
+        return {'faenas': faenas}
+
+
+def test_filtro_mensual_fechas_iso():
+    """Las faenas con fecha ISO se incluyen en el resumen y la distribución del mes"""
+    print("\n🧪 Filtro mensual de FaenasIntegracion...")
+    integracion = FaenasIntegracion.__new__(FaenasIntegracion)
+    integracion.generador_reportes = _GeneradorFalso()
+    integracion.faenas = [
+        {'id': '1', 'fecha': '2026-03-14'},
+        {'id': '2', 'fecha': '2026-04-01'},
+        {'id': '3', 'fecha': '20/03/2026'},  # formato heredado
+    ]
+
+    assert integracion._pertenece_al_mes('2026-03-14', 3, 2026)
+    assert not integracion._pertenece_al_mes('', 3, 2026)
+    ids = [f['id'] for f in integracion.generar_reporte_mensual(3, 2026)['faenas']]
+    assert ids == ['1', '3']
+    ids = [f['id'] for f in integracion.obtener_distribucion_actividades(4, 2026)['faenas']]
+    assert ids == ['2']
+    print("✅ Filtro mensual correcto con fechas ISO")
+
+
+if __name__ == "__main__":
+    test_filtro_mensual_fechas_iso()
@@ -0,0 +1,55 @@
+"""
+Pruebas del modelo incremental de KPIs de faenas
+Ejecutar: python tests/test_faenas_kpi.py
+"""
+
+import sys
+import os
+
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.modules.faenas.faenas_kpi import ModeloKPIFaenas
+
+
+def _faena(id_, fecha, peso, estado, nombres, horas=2):
+    return {'id': id_, 'fecha': fecha, 'peso': peso, 'estado': estado,
+            'participantes': [{'nombre': n, 'horas_trabajadas': horas} for n in nombres]}
+
+
+def test_kpi_incremental_igual_a_recalculo():
+    """Altas, ediciones y bajas dejan los mismos KPIs que recalcular desde cero"""
+    faenas = [
+        _faena('a', '2026-03-02', 3, 'registrada', ['Ana', 'Luis']),
+        _faena('b', '2026-03-09', 5, 'pagada', ['Ana']),
+        _faena('c', '2026-02-20', 4, 'completada', ['Eva']),   # otro mes
+    ]
+    modelo = ModeloKPIFaenas(mes=3, anio=2026)
+    recibidos = []
+    modelo.suscribir(recibidos.append)
+    modelo.cargar(faenas)
+
+    datos = modelo.datos()
+    assert datos['faenas_mes'] == 2 and datos['participantes'] == 2, datos
+    assert datos['horas_mes'] == 6 and datos['pendiente_pago'] == 150, datos
+    assert datos['completadas'] == 1, datos
+
+    nueva = _faena('d', '09/03/2026', 2, 'completada', ['Eva', 'Luis'])
+    faenas.append(nueva)
+    modelo.agregar_faena(nueva)
+    faenas[0]['participantes'].pop()          # se quita a Luis de 'a'
+    modelo.actualizar_faena(faenas[0])
+    faenas.remove(faenas[1])
+    modelo.quitar_faena({'id': 'b'})
+
+    recalculado = ModeloKPIFaenas(mes=3, anio=2026)
+    recalculado.cargar(faenas)
+    assert modelo.datos() == recalculado.datos(), (modelo.datos(), recalculado.datos())
+    assert modelo.datos()['participantes'] == 3   # Ana, Eva, Luis (sigue en 'd')
+    assert len(recibidos) == 4 and recibidos[-1] == modelo.datos()
+    print("✓ KPIs incrementales equivalentes al recálculo completo")
+
+
+if __name__ == "__main__":
+    test_kpi_incremental_igual_a_recalculo()
+    print("\n✅ Todas las pruebas pasaron")
@@ -0,0 +1,43 @@
+"""
+Prueba del alta masiva de participantes en faenas
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.faenas.faenas_servicio import FaenasServicio
+
+
+def test_agregar_participantes_en_lote():
+    """Resuelve folios y nombres en una pasada y descarta duplicados"""
+    print("\n=== TEST: alta masiva de participantes ===")
+    servicio = FaenasServicio()
+    habitantes = [{'folio': f'HAB-{i:04d}', 'nombre': f'Persona{i} Pérez', 'activo': True}
+                  for i in range(500)]
+    indice = servicio.construir_indice_censo(habitantes)
+
+    faena = {'id': 'F1', 'participantes': [{'folio': 'HAB-0001', 'nombre': 'Persona1 Pérez'}]}
+    entradas = ([f'hab-{i:04d}' for i in range(300)]          # folios en minúsculas
+                + ['persona5 perez', 'PERSONA400 PÉREZ']       # nombres sin acento/mayúsculas
+                + ['HAB-0002', 'Nadie Conocido', ''])
+    resultado = servicio.agregar_participantes_en_lote(faena, entradas, indice)
+
+    print(f"   agregados={resultado['agregados']} omitidos={resultado['omitidos']} "
+          f"no_resueltos={resultado['no_resueltos']}")
+    assert resultado['agregados'] == 300  # 0..299 sin el 1, más el 400
+    assert resultado['omitidos'] == 3     # HAB-0001 ya estaba, persona5 y HAB-0002 repetidos
+    assert resultado['no_resueltos'] == ['Nadie Conocido']
+    assert len(faena['participantes']) == 301
+    assert faena['participantes'][-1]['folio'] == 'HAB-0400'
+
+    plantilla = {'horas_trabajadas': 0}
+    resultado = servicio.agregar_participantes_en_lote(
+        faena, ['Nadie Conocido'], indice, plantilla=plantilla, permitir_no_resueltos=True)
+    assert resultado['agregados'] == 1
+    assert faena['participantes'][-1] == {**faena['participantes'][-1], 'folio': '',
+                                          'nombre': 'Nadie Conocido', 'horas_trabajadas': 0}
+    print("   ✓ Lote resuelto contra el índice del censo")
+
+
+if __name__ == "__main__":
+    test_agregar_participantes_en_lote()
@@ -0,0 +1,60 @@
+"""
+Prueba de los puntos anuales de faenas materializados
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.modules.faenas.faenas_puntos import PuntosAnualesFaenas
+from src.modules.faenas.faenas_servicio import FaenasServicio
+
+
+def _faena(id_, fecha, peso, participantes):
+    return {'id': id_, 'fecha': fecha, 'peso': peso,
+            'participantes': [{'folio': f, 'nombre': f'Nombre {f}', 'horas_trabajadas': 2,
+                               'peso_aplicado': pa} for f, pa in participantes]}
+
+
+def _puntos(modelo, clave, anio):
+    return modelo.resumen(anio)['puntos'][clave]['puntos']
+
+
+def test_puntos_incrementales():
+    """Los cambios incrementales coinciden con recalcular todo"""
+    print("\n=== TEST: puntos anuales materializados ===")
+    faenas = [
+        _faena('a', '2025-03-01', 5, [('F1', 1.0), ('F2', 0.9)]),
+        _faena('b', '2025-07-10', 3, [('F1', 1.0)]),
+        _faena('c', '2026-01-15', 4, [('F2', 1.0), ('F3', 1.0)]),
+    ]
+    puntos = PuntosAnualesFaenas(faenas)
+    assert {2025, 2026} <= set(puntos.anios_disponibles())
+    assert _puntos(puntos, 'F1', 2025) == 8
+    assert abs(_puntos(puntos, 'F2', 2025) - 4.5) < 1e-9
+
+    # Agregar participante, quitar faena y agregar otra
+    faenas[1]['participantes'].append({'folio': 'F3', 'nombre': 'Nombre F3', 'peso_aplicado': 1.0})
+    puntos.actualizar_faena(faenas[1])
+    puntos.quitar_faena(faenas.pop(0))
+    nueva = _faena('d', '2025-12-01', 2, [('F2', 1.0)])
+    faenas.append(nueva)
+    puntos.agregar_faena(nueva)
+
+    servicio = FaenasServicio()
+    for anio in (2025, 2026):
+        esperado = servicio.calcular_resumen_anual(faenas, anio)['puntos']
+        resumen = puntos.resumen(anio)
+        assert {k: v['puntos'] for k, v in resumen['puntos'].items()} == \
+               {k: v['puntos'] for k, v in esperado.items()}
+    assert [d['folio'] for d in puntos.resumen(2025)['ordenados']] == ['F1', 'F3', 'F2']
+    assert puntos.es_consistente()
+
+    # Un total corrupto se detecta y se reconstruye
+    puntos._totales[2025]['F1']['puntos'] = 999
+    assert puntos.verificar()
+    assert _puntos(puntos, 'F1', 2025) == 3
+    print("   ✓ Totales incrementales consistentes")
+
+
+if __name__ == "__main__":
+    test_puntos_incrementales()
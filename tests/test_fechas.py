@@ -0,0 +1,67 @@
+"""
+Pruebas de fechas ISO-8601 centralizadas y de la migración de columnas de fecha
+Ejecutar: python tests/test_fechas.py
+"""
+
+import sys
+import os
+import tempfile
+
+# Agregar ruta del proyecto
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.core.fechas import (
+    normalizar_fecha_iso, formatear_fecha_ui, pertenece_a_mes, rango_mes, rango_dias
+)
+from src.core.base_datos_sqlite import BaseDatosSQLite
+
+
+def test_accesores_fechas():
+    """Normalización, formato UI y pertenencia a mes"""
+    print("🧪 Test: Accesores de fechas...")
+    
+    assert normalizar_fecha_iso('05/03/2025') == '2025-03-05'
+    assert normalizar_fecha_iso('2025-03-05 10:20:30', con_hora=True) == '2025-03-05 10:20:30'
+    assert normalizar_fecha_iso('basura') is None
+    assert formatear_fecha_ui('2025-03-05') == '05/03/2025'
+    
+    assert pertenece_a_mes('2025-03-05', 3, 2025)
+    assert pertenece_a_mes('05/03/2025', 3, 2025)
+    assert not pertenece_a_mes('2025-04-01', 3, 2025)
+    
+    assert rango_mes(12, 2024) == ('2024-12-01', '2025-01-01')
+    assert rango_dias('01/03/2025', '31/03/2025') == ('2025-03-01', '2025-04-01')
+    print("✅ Accesores de fechas correctos")
+
+
+def test_migracion_fechas_iso():
+    """Las filas DD/MM/YYYY se reescriben a ISO y los rangos se resuelven en SQL"""
+    print("\n🧪 Test: Migración de fechas a ISO...")
+    
+    bd = BaseDatosSQLite(os.path.join(tempfile.mkdtemp(), 'sistema.db'))
+    
+    # Simular datos escritos por una versión anterior
+    bd.conexion.executemany(
+        "INSERT INTO historial (tipo_evento, fecha_evento) VALUES (?, ?)",
+        [('A', '28/02/2025 23:59:00'), ('B', '01/03/2025 08:00:00'), ('C', '02/04/2025 09:00:00')]
+    )
+    bd.conexion.execute("PRAGMA user_version = 0")
+    bd.conexion.commit()
+    
+    bd._migrar_esquema(bd.conexion.cursor())
+    
+    fechas = [r[0] for r in bd.conexion.execute(
+        "SELECT fecha_evento FROM historial ORDER BY fecha_evento")]
+    assert fechas == ['2025-02-28 23:59:00', '2025-03-01 08:00:00', '2025-04-02 09:00:00'], fechas
+    
+    eventos = bd.obtener_historial_fecha('28/02/2025', '01/03/2025')
+    assert [e['tipo_evento'] for e in eventos] == ['A', 'B']
+    
+    bd.desconectar()
+    print("✅ Migración de fechas correcta")
+
+
+if __name__ == "__main__":
+    test_accesores_fechas()
+    test_migracion_fechas_iso()
@@ -0,0 +1,87 @@
+"""
+Pruebas de los índices del gestor de personas de cooperación
+Ejecutar: python tests/test_gestor_personas.py
+"""
+
+import sys
+import os
+
+# Agregar ruta del proyecto
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.modules.pagos.pagos_gestor_personas import GestorPersonas
+
+
+def _personas():
+    return [
+        {'nombre': 'Ana Pérez', 'folio': 'HAB-1', 'monto_esperado': 100, 'pagos': [{'monto': 100}]},
+        {'nombre': 'Luis Soto', 'folio': 'LOC-3', 'monto_esperado': 100, 'pagos': [{'monto': 40}]},
+        {'nombre': 'Eva Ríos', 'folio': 'HAB-2', 'monto_esperado': 100, 'pagos': []},
+        {'nombre': 'Raúl Mena', 'folio': 'HAB-4', 'monto_esperado': 50, 'pagos': [], 'activo': False},
+    ]
+
+
+def test_indices_y_estados():
+    """Búsquedas por índice y cubetas de estado mantenidas en pagos y ediciones"""
+    print("🧪 Test: Índices de GestorPersonas...")
+    gestor = GestorPersonas()
+    gestor.cargar_personas(_personas())
+
+    assert gestor.obtener_persona_por_folio('HAB-2')['nombre'] == 'Eva Ríos'
+    assert not gestor.validar_nombre_unico('  ana pérez ')
+    assert gestor.validar_nombre_unico('Ana Pérez', folio_excluir='HAB-1')
+    assert [p['folio'] for p in gestor.buscar_personas('estado', 'sin_pagar')] == ['HAB-2', 'HAB-4']
+    assert [p['folio'] for p in gestor.buscar_personas('nombre', 'r')] == ['HAB-1', 'HAB-2', 'HAB-4']
+
+    resumen = gestor.obtener_resumen_grupo()
+    assert resumen['total_personas'] == 3 and resumen['total_pagado'] == 140
+    assert resumen['personas_pagadas'] == 1 and resumen['total_pendiente'] == 160
+
+    gestor.registrar_pago('HAB-2', 100)
+    assert [p['folio'] for p in gestor.buscar_personas('estado', 'completado')] == ['HAB-1', 'HAB-2']
+    gestor.editar_persona('LOC-3', nombre='Luis Soto Vera', monto_esperado=40)
+    assert gestor.obtener_estado_persona('LOC-3')['estado'] == 'completado'
+    assert gestor.validar_nombre_unico('Luis Soto')
+    assert gestor.obtener_resumen_grupo()['personas_pagadas'] == 3
+
+    # Contador local: continúa después del mayor LOC existente
+    nueva = gestor.crear_persona('Nueva Persona')
+    assert nueva['folio'] == 'LOC-4'
+    gestor.eliminar_persona('HAB-1')
+    assert gestor.obtener_persona_por_folio('HAB-1') is None
+    assert gestor.obtener_resumen_grupo()['total_personas'] == 3
+
+    # Cambios de tamaño hechos desde fuera se detectan solos
+    gestor.personas.append({'nombre': 'Externa', 'folio': 'EXT-1', 'monto_esperado': 10, 'pagos': []})
+    assert gestor.obtener_persona_por_folio('EXT-1') is not None
+    print("✅ Índices consistentes")
+
+
+def test_cambios_en_sitio_avisados():
+    """Pago agregado por el diálogo y cambio masivo de monto, avisados al gestor"""
+    print("🧪 Test: Cambios en sitio de GestorPersonas...")
+    gestor = GestorPersonas()
+    gestor.cargar_personas(_personas())
+
+    # DialogoRegistrarPago agrega el pago directamente al dict
+    persona = gestor.obtener_persona_por_folio('LOC-3')
+    persona['pagos'].append({'monto': 60})
+    gestor.actualizar_persona(persona)
+    assert [p['folio'] for p in gestor.buscar_personas('estado', 'parcial')] == []
+    assert gestor.obtener_resumen_grupo()['personas_pagadas'] == 2
+
+    # Cambio del monto de la cooperación para todas las personas
+    for p in gestor.personas:
+        p['monto_esperado'] = 200
+    gestor.reindexar()
+    assert [p['folio'] for p in gestor.buscar_personas('estado', 'parcial')] == ['HAB-1', 'LOC-3']
+    resumen = gestor.obtener_resumen_grupo()
+    assert resumen['total_esperado'] == 600 and resumen['total_pendiente'] == 400
+    assert resumen['personas_pagadas'] == 0
+    print("✅ Cambios en sitio reflejados")
+
+
+if __name__ == "__main__":
+    test_indices_y_estados()
+    test_cambios_en_sitio_avisados()
@@ -0,0 +1,87 @@
+"""
+Pruebas de la instancia única por módulo (bloqueo + canal local)
+Ejecutar: python tests/test_instancia_unica.py
+"""
+
+import sys
+import os
+import tempfile
+
+# Agregar ruta del proyecto
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.core.instancia_unica import InstanciaUnica
+
+
+class _VentanaFalsa:
+    """Lo mínimo de Tk que usan atender() y traer_al_frente()"""
+
+    def __init__(self):
+        self.al_frente = 0
+
+    def after(self, ms, funcion):
+        return 'after#1'
+
+    def after_cancel(self, after_id):
+        pass
+
+    def after_idle(self, *args):
+        pass
+
+    def deiconify(self):
+        self.al_frente += 1
+
+    def lift(self):
+        pass
+
+    def attributes(self, *args):
+        pass
+
+    def focus_force(self):
+        pass
+
+
+def test_segundo_lanzamiento_entrega_peticion():
+    """El segundo lanzamiento no se vuelve principal: pasa su petición al primero"""
+    print("\n🧪 Instancia única...")
+    directorio = tempfile.mkdtemp()
+    principal = InstanciaUnica('censo', directorio)
+    segunda = InstanciaUnica('censo', directorio)
+    otro_modulo = InstanciaUnica('pagos', directorio)
+
+    assert not segunda.en_ejecucion()
+    assert principal.adquirir()
+    assert segunda.en_ejecucion() and not segunda.adquirir()
+    assert otro_modulo.adquirir()  # Cada módulo tiene su propio bloqueo
+
+    ventana = _VentanaFalsa()
+    recibidas = []
+    principal.atender(ventana, lambda accion, argumentos: recibidas.append((accion, argumentos)))
+    assert segunda.enviar('mostrar', ['FOL-0042'])
+    assert segunda.enviar()
+    assert principal.procesar_pendientes() == 2
+    assert recibidas == [('mostrar', ['FOL-0042']), ('mostrar', [])]
+    assert ventana.al_frente == 2
+
+    # Durante el login no hay manejador: la última petición espera a la ventana principal
+    principal.atender(ventana)
+    assert segunda.enviar('mostrar', ['--anio', '2023'])
+    assert segunda.enviar('mostrar', ['--anio', '2024'])
+    assert principal.procesar_pendientes() == 2 and ventana.al_frente == 4
+    recibidas.clear()
+    principal.atender(_VentanaFalsa(), lambda accion, argumentos: recibidas.append((accion, argumentos)))
+    assert recibidas == [('mostrar', ['--anio', '2024'])]
+
+    # Al cerrar el principal, el siguiente lanzamiento toma su lugar
+    principal.liberar()
+    otro_modulo.liberar()
+    assert not segunda.en_ejecucion()
+    assert not segunda.enviar(espera_seg=0.2)
+    assert segunda.adquirir()
+    segunda.liberar()
+    print("✅ Instancia única correcta")
+
+
+if __name__ == "__main__":
+    test_segundo_lanzamiento_entrega_peticion()
@@ -0,0 +1,67 @@
+"""
+Pruebas de la instrumentación de consultas SQLite
+Ejecutar: python tests/test_instrumentacion_bd.py
+"""
+
+import sys
+import os
+import tempfile
+
+# Agregar ruta del proyecto
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.core.base_datos_sqlite import BaseDatosSQLite
+from src.core.instrumentacion_bd import obtener_instrumentacion
+
+
+def _crear_bd_temporal():
+    """Crear una BD SQLite aislada en un directorio temporal"""
+    bd = BaseDatosSQLite(os.path.join(tempfile.mkdtemp(), 'sistema.db'))
+    return bd
+
+
+def test_instrumentacion_y_planes():
+    """Tiempos, filas y orígenes registrados; búsquedas por folio sin recorrido completo"""
+    print("🧪 Test: Instrumentación de consultas...")
+    bd = _crear_bd_temporal()
+    for i in range(1, 6):
+        bd.crear_habitante(f"FOL-{i:04d}", f"Habitante {i}", rut=f"{i}-K")
+
+    instrumentacion = obtener_instrumentacion()
+    anterior = (instrumentacion.modo_desarrollo, instrumentacion.tabla_grande)
+    instrumentacion.configurar(modo_desarrollo=True, tabla_grande=0)
+    instrumentacion.reiniciar()
+    try:
+        for _ in range(3):
+            assert bd.obtener_habitante_por_folio('FOL-0002')['nombre'] == 'Habitante 2'
+        assert len(bd.obtener_todos_habitantes()) == 5
+        bd.obtener_todos_pagos()
+
+        # Los PRAGMA de cada conectar() también quedan registrados
+        recientes = [r for r in instrumentacion.recientes() if r['sql'].startswith('SELECT')]
+        assert len(recientes) == 5
+        assert recientes[-2]['filas'] == 5 and recientes[-1]['filas'] == 0
+        assert recientes[0]['origen'].startswith('base_datos_sqlite.py:')
+        assert recientes[0]['origen'].endswith('obtener_habitante_por_folio')
+
+        frecuente = next(f for f in instrumentacion.reporte(top=20, orden='frecuencia')
+                         if f['sql'].startswith('SELECT'))
+        assert 'folio = ?' in frecuente['sql']
+        assert frecuente['ejecuciones'] == 3 and frecuente['filas'] == 3
+        # Regresión: la búsqueda por folio debe seguir usando el índice único
+        assert frecuente['escaneos'] == []
+
+        # El listado de pagos recorre la tabla completa (alias p -> pagos) y queda marcado
+        escaneos = instrumentacion.escaneos_completos()
+        tablas = {e['tabla'] for lista in escaneos.values() for e in lista}
+        assert tablas == {'pagos'}
+        assert 'Ejec' in instrumentacion.formatear_reporte()
+    finally:
+        instrumentacion.configurar(modo_desarrollo=anterior[0], tabla_grande=anterior[1])
+        instrumentacion.reiniciar()
+    print("✅ Instrumentación correcta")
+
+
+if __name__ == "__main__":
+    test_instrumentacion_y_planes()
@@ -0,0 +1,104 @@
+"""
+Pruebas de las conexiones de solo lectura (BaseDatosSQLite.lectura)
+Ejecutar: python tests/test_lectura_bd.py
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import threading
+
+# Agregar ruta del proyecto
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.core.base_datos_sqlite import BaseDatosSQLite
+
+
+def _crear_bd_temporal():
+    """Crear una BD SQLite aislada en un directorio temporal"""
+    bd = BaseDatosSQLite(os.path.join(tempfile.mkdtemp(), 'sistema.db'))
+    return bd
+
+
+def _agregar_habitante(bd, i):
+    bd.conexion.execute("INSERT INTO habitantes (folio, nombre, rut, activo) VALUES (?, ?, ?, 1)",
+                        (f"HAB-{i:04d}", f"Habitante {i}", f"{i}-K"))
+    bd.conexion.commit()
+
+
+def test_lectura_instantanea():
+    """Instantánea coherente, solo lectura y sin bloquear a la conexión de la UI"""
+    print("🧪 Test: Lecturas en instantánea...")
+    bd = _crear_bd_temporal()
+    _agregar_habitante(bd, 1)
+
+    with bd.lectura() as conexion:
+        assert len(bd.obtener_todos_habitantes()) == 1
+        # La UI sigue escribiendo mientras el reporte lee
+        _agregar_habitante(bd, 2)
+        assert len(bd.obtener_todos_habitantes()) == 1
+        assert bd.obtener_estadisticas()['habitantes'] == 1
+        try:
+            conexion.execute("DELETE FROM habitantes")
+            assert False, "La conexión de lectura no debe escribir"
+        except sqlite3.OperationalError:
+            pass
+
+    # Fuera del bloque se vuelve a la conexión principal
+    assert len(bd.obtener_todos_habitantes()) == 2
+    assert bd.obtener_estadisticas()['habitantes'] == 2
+
+    # Desde un hilo de trabajo: la instantánea es de ese hilo, no del principal
+    resultado = {}
+    leyendo = threading.Event()
+    continuar = threading.Event()
+
+    def reporte():
+        with bd.lectura():
+            resultado['antes'] = len(bd.obtener_todos_habitantes())
+            leyendo.set()
+            continuar.wait(5)
+            resultado['despues'] = len(bd.obtener_todos_habitantes())
+
+    hilo = threading.Thread(target=reporte)
+    hilo.start()
+    assert leyendo.wait(5)
+    _agregar_habitante(bd, 3)
+    assert len(bd.obtener_todos_habitantes()) == 3
+    continuar.set()
+    hilo.join(5)
+    assert resultado == {'antes': 2, 'despues': 2}, resultado
+
+    bd.desconectar()
+    print("✅ Lecturas en instantánea correctas")
+
+
+def test_reporte_lee_de_instantanea():
+    """Sin datos, los reportes leen habitantes y pagos de una instantánea"""
+    print("🧪 Test: Reportes desde la instantánea...")
+    from openpyxl import load_workbook
+    from src.tools.generador_reportes import GeneradorReportes, generar_reporte_censo, generar_reporte_pagos
+
+    bd = _crear_bd_temporal()
+    _agregar_habitante(bd, 1)
+    _agregar_habitante(bd, 2)
+    datos = GeneradorReportes().leer_datos_bd(bd)
+    assert sorted(datos['habitantes_por_folio']) == ['HAB-0001', 'HAB-0002']
+    assert datos['pagos'] == [] and datos['faenas'] == []
+
+    ruta = generar_reporte_censo(usuario='prueba', bd=bd)
+    try:
+        nombres = [celda.value for fila in load_workbook(ruta).active.iter_rows() for celda in fila]
+        assert 'Habitante 1' in nombres and 'Habitante 2' in nombres
+    finally:
+        os.remove(ruta)
+    os.remove(generar_reporte_pagos(usuario='prueba', bd=bd))
+    bd.desconectar()
+    print("✅ Reportes desde la instantánea correctos")
+
+
+if __name__ == "__main__":
+    test_lectura_instantanea()
+    test_reporte_lee_de_instantanea()
@@ -0,0 +1,96 @@
+"""
+Pruebas del mantenimiento automático de SQLite
+Ejecutar: python tests/test_mantenimiento_bd.py
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+
+# Agregar ruta del proyecto
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.core.base_datos_sqlite import BaseDatosSQLite
+from src.core.mantenimiento_bd import MantenimientoBD
+
+
+def _crear_bd_temporal():
+    """Crear una BD SQLite aislada en un directorio temporal"""
+    bd = BaseDatosSQLite(os.path.join(tempfile.mkdtemp(), 'sistema.db'))
+    return bd
+
+
+def test_mantenimiento_bd():
+    """auto_vacuum incremental, checkpoint por umbral, integridad y reporte"""
+    print("🧪 Test: Mantenimiento de BD...")
+    bd = _crear_bd_temporal()
+    mantenimiento = MantenimientoBD(bd, wal_pasivo_mb=0.01, wal_truncar_mb=1000, paginas_por_paso=10)
+
+    reporte = mantenimiento.reporte()
+    assert reporte['auto_vacuum'] == 'INCREMENTAL' and reporte['modo_journal'] == 'wal'
+    assert mantenimiento.verificar_integridad() == (True, ['ok'])
+
+    conexion = bd.conexion
+    conexion.executemany(
+        "INSERT INTO auditoria (usuario, accion, fecha_operacion) VALUES (?, ?, ?)",
+        [('admin', 'X' * 400, '2000-01-01')] * 500)
+    conexion.commit()
+
+    # El WAL superó el umbral pasivo: checkpoint PASSIVE
+    resultado = mantenimiento.checkpoint_si_necesario()
+    assert resultado is not None and resultado['modo'] == 'PASSIVE'
+
+    # Una transacción abierta de la aplicación no se interrumpe
+    conexion.execute("DELETE FROM auditoria")
+    assert conexion.in_transaction
+    assert mantenimiento.vacuum_incremental() == 0 and mantenimiento.checkpoint() is None
+    conexion.commit()
+
+    libres = mantenimiento.reporte()['paginas_libres']
+    assert libres > 10
+    assert mantenimiento.paso_ocioso()['paginas_liberadas'] == 10
+    assert mantenimiento.reporte()['paginas_libres'] == libres - 10
+
+    assert mantenimiento.optimizar()
+    mantenimiento.al_cerrar()
+    assert mantenimiento.tamano_wal() == 0
+    bd.desconectar()
+    print("✅ Mantenimiento correcto")
+
+
+def test_bd_anterior_se_convierte_al_cerrar():
+    """Una BD creada con auto_vacuum=NONE se convierte sola una vez, al cerrar"""
+    print("🧪 Test: Conversión de BD anterior a auto_vacuum incremental...")
+    ruta = os.path.join(tempfile.mkdtemp(), 'sistema.db')
+    anterior = sqlite3.connect(ruta)
+    anterior.execute("CREATE TABLE heredada (valor TEXT)")
+    anterior.commit()
+    anterior.close()
+
+    bd = BaseDatosSQLite(ruta)
+    grande = MantenimientoBD(bd, conversion_max_mb=0)
+    assert grande.reporte()['auto_vacuum'] == 'NONE'
+    grande.al_cerrar()
+    assert grande.reporte()['auto_vacuum'] == 'NONE', "Se convirtió una BD por encima del límite"
+
+    mantenimiento = MantenimientoBD(bd)
+    mantenimiento.al_cerrar()
+    assert mantenimiento.reporte()['auto_vacuum'] == 'INCREMENTAL'
+    assert bd.conexion.execute("PRAGMA busy_timeout").fetchone()[0] == 10000
+    assert not mantenimiento.convertir_auto_vacuum_pendiente()
+
+    # Desde ahora lo borrado se devuelve en tiempo ocioso
+    bd.conexion.executemany("INSERT INTO heredada VALUES (?)", [('X' * 400,)] * 500)
+    bd.conexion.commit()
+    bd.conexion.execute("DELETE FROM heredada")
+    bd.conexion.commit()
+    assert mantenimiento.vacuum_incremental() > 0
+    bd.desconectar()
+    print("✅ Conversión automática correcta")
+
+
+if __name__ == "__main__":
+    test_mantenimiento_bd()
+    test_bd_anterior_se_convierte_al_cerrar()
@@ -45,6 +45,67 @@ def test_debounce():
     print("✅ Debouncing funciona correctamente")
 
 
+def test_debounce_tk():
+    """Test 1b: Debounce, throttle e idle sobre after() de Tk sin crear hilos"""
+    print("\n🧪 Test 1b: Programación con after()...")
+    
+    class WidgetFalso:
+        """Reemplaza after/after_cancel/after_idle; los jobs se ejecutan a mano"""
+        def __init__(self):
+            self.jobs = {}
+            self.siguiente = 0
+        def after(self, ms, func):
+            self.siguiente += 1
+            self.jobs[self.siguiente] = func
+            return self.siguiente
+        def after_idle(self, func):
+            return self.after(0, func)
+        def after_cancel(self, job):
+            self.jobs.pop(job, None)
+        def correr(self):
+            jobs, self.jobs = self.jobs, {}
+            for func in jobs.values():
+                func()
+    
+    widget = WidgetFalso()
+    debouncer = DebounceManager(widget=widget)
+    llamadas = []
+    hilos_antes = threading.active_count()
+    
+    # Trailing: 10 teclas -> 1 ejecución con el último valor
+    for i in range(10):
+        debouncer.debounce('busqueda', 300, llamadas.append, i)
+    assert len(widget.jobs) == 1 and llamadas == []
+    widget.correr()
+    assert llamadas == [9], llamadas
+    
+    # Leading + trailing: primera de inmediato, última al cerrar la ráfaga
+    llamadas.clear()
+    for i in range(5):
+        debouncer.debounce('lead', 300, llamadas.append, i, leading=True)
+    assert llamadas == [0]
+    widget.correr()
+    assert llamadas == [0, 4], llamadas
+    
+    # Throttle: una inmediata y una final con los últimos argumentos
+    llamadas.clear()
+    for i in range(5):
+        debouncer.throttle('scroll', 1000, llamadas.append, i)
+    assert llamadas == [0]
+    widget.correr()
+    assert llamadas == [0, 4], llamadas
+    
+    # Idle: varios pedidos de redibujado -> uno solo
+    llamadas.clear()
+    for i in range(3):
+        debouncer.idle('redibujar', llamadas.append, i)
+    widget.correr()
+    assert llamadas == [2], llamadas
+    
+    assert threading.active_count() == hilos_antes, "❌ Se crearon hilos"
+    print("✅ Programación con after() funciona correctamente")
+
+
 def test_cache():
     """Test 2: Verificar que el caché funciona"""
     print("\n🧪 Test 2: Caché...")
@@ -67,6 +128,53 @@ def test_cache():
     print("✅ Caché funciona correctamente")
 
 
+def test_cache_lru_y_version():
+    """Test 2b: LRU O(1) y filtros correctos tras ediciones con el mismo largo"""
+    print("\n🧪 Test 2b: Caché LRU y versión de datos...")
+    
+    cache = CacheManager(max_size=2, ttl_seconds=60)
+    cache.set("a", "k1")
+    cache.set("b", "k2")
+    cache.get("k1")          # k1 pasa a ser la más reciente
+    cache.set("c", "k3")     # expulsa k2
+    assert cache.get("k2") is None and cache.get("k1") == "a"
+    stats = cache.get_stats()
+    assert stats['evictions'] == 1 and stats['hits'] == 2, stats
+    
+    optimizer = get_ui_optimizer()
+    
+    def filtrar(data, criterio):
+        return [d for d in data if criterio in d['nombre']]
+    
+    datos = [{'nombre': 'juan'}, {'nombre': 'maria'}]
+    r1 = optimizer.cached_filter(filtrar, datos, 'juan', conjunto='prueba', version=1)
+    datos[1]['nombre'] = 'juana'  # edición que no cambia el largo
+    r2 = optimizer.cached_filter(filtrar, datos, 'juan', conjunto='prueba', version=2)
+    
+    assert len(r1) == 1 and len(r2) == 2, "❌ Filtro devolvió resultado obsoleto"
+    
+    # Una lambda nueva en cada llamada sigue encontrando el resultado guardado
+    llamadas = []
+    def buscar(criterio):
+        return optimizer.cached_filter(
+            lambda d, c: llamadas.append(c) or [x for x in d if c in x['nombre']],
+            datos, criterio, conjunto='prueba', version=2)
+    assert buscar('mar') == buscar('mar') and llamadas == ['mar'], llamadas
+    
+    # Dos listas con la misma versión global y el mismo criterio no se mezclan
+    coop_a = [{'nombre': 'juan a'}]
+    coop_b = [{'nombre': 'juan b'}, {'nombre': 'juan c'}]
+    assert optimizer.cached_filter(filtrar, coop_a, 'juan', conjunto=('coop', 1), version=7) == coop_a
+    assert optimizer.cached_filter(filtrar, coop_b, 'juan', conjunto=('coop', 2), version=7) == coop_b
+    
+    try:
+        optimizer.cached_filter(filtrar, datos, 'juan', conjunto='prueba', version=None)
+        assert False, "❌ Se aceptó un filtro sin token de versión"
+    except ValueError:
+        pass
+    print("✅ Caché LRU y versión de datos correctos")
+
+
 def test_background_worker():
     """Test 3: Verificar que el worker en background funciona"""
     print("\n🧪 Test 3: Background Worker...")
@@ -92,6 +200,58 @@ def test_background_worker():
     print("✅ Background Worker funciona correctamente")
 
 
+def test_worker_reemplazo_y_bombeo():
+    """Test 3b: La última tarea con la misma key gana y los callbacks pasan por el bombeo de Tk"""
+    print("\n🧪 Test 3b: Reemplazo por key y bombeo a la UI...")
+    
+    class RootFalso:
+        """Root mínimo: guarda el job de after para ejecutarlo a mano"""
+        def __init__(self):
+            self.jobs = []
+        def after(self, ms, func):
+            self.jobs.append(func)
+            return len(self.jobs)
+        def after_cancel(self, job):
+            pass
+    
+    worker = BackgroundWorker(max_workers=1)
+    root = RootFalso()
+    worker.attach_root(root)
+    
+    bloqueo = threading.Event()
+    entregados = []
+    hilo_ui = threading.get_ident()
+    
+    def lenta():
+        bloqueo.wait(1.0)
+        return 'lenta'
+    
+    def callback(resultado):
+        entregados.append((resultado, threading.get_ident()))
+    
+    worker.run_async('ocupar', lenta)            # ocupa el único hilo del pool
+    for i in range(5):
+        worker.run_async('busqueda', lambda i=i: i, callback)
+    bloqueo.set()
+    
+    inicio = time.time()
+    while worker.get_stats()['callbacks_pendientes'] == 0 and time.time() - inicio < 1.0:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    
+    # Nada se entrega hasta que corre el bombeo en el hilo de la UI
+    assert entregados == [], "❌ El callback corrió fuera del hilo de la UI"
+    root.jobs[-1]()
+    
+    assert entregados == [(4, hilo_ui)], f"❌ Esperado solo el último resultado: {entregados}"
+    stats = worker.get_stats()
+    assert stats['reemplazadas'] == 4, stats
+    assert stats['en_cola'] == 0 and stats['en_ejecucion'] == 0, stats
+    assert stats['espera_max_ms'] > 0, stats
+    worker.shutdown()
+    print("✅ Reemplazo por key y bombeo funcionan correctamente")
+
+
 def test_virtual_table():
     """Test 4: Verificar virtualización de tabla"""
     print("\n🧪 Test 4: Virtual Table...")
@@ -136,9 +296,9 @@ def test_ui_optimizer():
     datos = ["juan", "maria", "jose", "juan carlos"]
     
     # Primera vez - calcula
-    r1 = optimizer.cached_filter(filtrar, datos, "juan")
+    r1 = optimizer.cached_filter(filtrar, datos, "juan", conjunto="nombres", version=1)
     # Segunda vez - usa caché
-    r2 = optimizer.cached_filter(filtrar, datos, "juan")
+    r2 = optimizer.cached_filter(filtrar, datos, "juan", conjunto="nombres", version=1)
     
     assert r1 == r2, "❌ Cached filter no funciona"
     assert len(r1) == 2, "❌ Filtro incorrecto"
@@ -188,7 +348,7 @@ def test_performance():
     resultados_con_opt = []
     
     for i in range(10):
-        resultado = optimizer.cached_filter(filtrar_pares, datos, "criterio")
+        resultado = optimizer.cached_filter(filtrar_pares, datos, "criterio", conjunto="numeros", version=1)
         resultados_con_opt.append(len(resultado))
     
     tiempo_con_opt = time.time() - inicio
@@ -211,8 +371,11 @@ def main():
     
     try:
         test_debounce()
+        test_debounce_tk()
         test_cache()
+        test_cache_lru_y_version()
         test_background_worker()
+        test_worker_reemplazo_y_bombeo()
         test_virtual_table()
         test_ui_optimizer()
         test_performance()
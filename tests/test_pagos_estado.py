@@ -0,0 +1,61 @@
+"""
+Pruebas de la clasificación en lote de estados de pago
+Ejecutar: python tests/test_pagos_estado.py
+"""
+
+import sys
+import os
+
+# Agregar ruta del proyecto
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.modules.pagos.pagos_estado import CODIGOS_ESTADO, GestorEstadoPago
+
+
+def test_clasificar_cooperacion():
+    """Arreglos por persona iguales a la lógica individual, sin contar anulados"""
+    print("🧪 Test: Clasificación de cooperación en lote...")
+    personas = [
+        {'folio': 'A', 'monto_esperado': 100, 'pagos': [
+            {'monto': 60, 'fecha': '2026-01-02', 'hora': '10:00'},
+            {'monto': 40, 'fecha': '2026-01-05', 'hora': '11:30'}]},
+        {'folio': 'B', 'monto_esperado': 100, 'pagos': [
+            {'monto': 30, 'fecha': '2026-01-03', 'hora': '09:00'},
+            {'monto': 70, 'fecha': '2026-01-04', 'hora': '09:15', 'anulado': True}]},
+        {'folio': 'C', 'monto': 50, 'pagos': []},
+        {'folio': 'D', 'monto_esperado': 20, 'pagos': [{'monto': 25, 'fecha': '2026-02-01', 'hora': ''}]},
+    ]
+
+    clasificacion = GestorEstadoPago.clasificar_cooperacion(personas)
+    estados = [CODIGOS_ESTADO[c] for c in clasificacion.codigos]
+    assert estados == ['completado', 'parcial', 'pendiente', 'excedente']
+    assert list(clasificacion.pagados) == [100, 30, 0, 25]
+    assert list(clasificacion.pendientes) == [0, 70, 50, 0]
+    assert clasificacion.esperados[2] == 50
+    assert clasificacion.ultimos_pagos == ['2026-01-05 11:30', '2026-01-04 09:15', '', '2026-02-01']
+    assert clasificacion.total_pagado == 155 and clasificacion.total_pendiente == 120
+    assert clasificacion.personas_completas == 2
+
+    for persona, estado in zip(personas, estados):
+        pagado = sum(p['monto'] for p in persona['pagos'] if not p.get('anulado'))
+        esperado = persona.get('monto_esperado', persona.get('monto', 100))
+        assert GestorEstadoPago.obtener_estado(pagado, esperado) == estado
+        assert clasificacion.estado(persona) == estado
+
+    assert clasificacion.vigente_para(personas)
+    personas.append({'folio': 'E', 'pagos': []})
+    assert not clasificacion.vigente_para(personas)
+    assert clasificacion.posicion(personas[-1]) is None
+
+    # Metadatos por tema: la misma tupla para los mismos colores
+    tema = {'error': '#c00', 'warning': '#fa0', 'success': '#0a0', 'accent_primary': '#00f'}
+    datos = GestorEstadoPago.datos_estados(tema)
+    assert datos is GestorEstadoPago.datos_estados(dict(tema))
+    assert datos[0]['color_fg'] == '#c00' and datos[2]['nombre'] == 'Pagado'
+    assert GestorEstadoPago.datos_estados() is not datos
+    print("✅ Clasificación consistente")
+
+
+if __name__ == "__main__":
+    test_clasificar_cooperacion()
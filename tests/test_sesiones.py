@@ -0,0 +1,73 @@
+"""
+Pruebas de sesiones en SQLite
+Ejecutar: python tests/test_sesiones.py
+"""
+
+import sys
+import os
+import json
+import tempfile
+
+# Agregar ruta del proyecto
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.auth.autenticacion import GestorAutenticacion
+from src.core.base_datos_sqlite import BaseDatosSQLite
+
+
+def _crear_bd_temporal():
+    """BD aislada: la prueba no debe dejar sesiones en la BD real"""
+    directorio = tempfile.mkdtemp()
+    bd = BaseDatosSQLite(os.path.join(directorio, 'sistema.db'))
+    return bd, directorio
+
+
+def test_sesiones_sqlite():
+    """Login, validación sin escrituras, accesos en lote y expiración"""
+    print("🧪 Test: Sesiones en SQLite...")
+    bd, directorio = _crear_bd_temporal()
+    bd.crear_usuario('prueba_sesion', 'secreto123', 'prueba_sesion@local', 'operador')
+
+    # Sesión del formato anterior que debe migrarse
+    gestor = GestorAutenticacion(bd, directorio)
+    with open(gestor.archivo_sesiones, 'w', encoding='utf-8') as f:
+        json.dump({'viejo': {'usuario': 'prueba_sesion', 'rol': 'operador',
+                             'inicio': '2026-01-01T08:00:00.123456',
+                             'expiracion': '2099-01-01T08:00:00.123456'}}, f)
+    gestor = GestorAutenticacion(bd, directorio)
+    assert not os.path.exists(gestor.archivo_sesiones)
+    assert gestor.verificar_sesion('viejo')['expiracion'] == '2099-01-01 08:00:00'
+
+    # Muchas sesiones vencidas acumuladas
+    bd.conexion.executemany(
+        "INSERT INTO sesiones (token, usuario, rol, expiracion) VALUES (?, 'x', 'lectura', '2000-01-01 00:00:00')",
+        [(f'vencida{i}',) for i in range(500)])
+    bd.conexion.commit()
+
+    resultado = gestor.login('prueba_sesion', 'secreto123')
+    assert resultado['exito']
+    token = resultado['token']
+    assert bd.conexion.execute("SELECT COUNT(*) FROM sesiones WHERE usuario = 'x'").fetchone()[0] == 0
+
+    plan = bd.conexion.execute("EXPLAIN QUERY PLAN SELECT * FROM sesiones WHERE token = ?",
+                               (token,)).fetchall()
+    assert 'PRIMARY KEY' in ' '.join(str(fila[-1]) for fila in plan)
+
+    bd.conexion.execute("UPDATE sesiones SET ultimo_acceso = NULL WHERE token = ?", (token,))
+    bd.conexion.commit()
+    for _ in range(50):
+        assert gestor.verificar_sesion(token)['usuario'] == 'prueba_sesion'
+        assert gestor.verificar_permiso(token, 'editar')
+    assert bd.obtener_sesion(token)['ultimo_acceso'] is None  # aún en memoria
+    assert gestor.volcar_accesos() == 2
+    assert bd.obtener_sesion(token)['ultimo_acceso'] is not None
+
+    assert gestor.cerrar_sesion(token)
+    assert gestor.verificar_sesion(token) is None
+    bd.desconectar()
+    print("✅ Sesiones por clave primaria con accesos en lote")
+
+
+if __name__ == "__main__":
+    test_sesiones_sqlite()
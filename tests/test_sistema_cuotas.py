@@ -0,0 +1,55 @@
+"""
+Pruebas de las cuotas de horas de faena (horas desde participacion_faenas)
+Ejecutar: python tests/test_sistema_cuotas.py
+"""
+
+import sys
+import os
+import tempfile
+
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.core.base_datos_sqlite import BaseDatosSQLite
+from src.modules.faenas.sistema_cuotas import SistemaCuotas
+
+
+def _crear_bd_temporal():
+    """BD aislada con 3 habitantes y participaciones en marzo, abril y una faena cancelada"""
+    bd = BaseDatosSQLite(os.path.join(tempfile.mkdtemp(), 'sistema.db'))
+    conexion = bd.conexion
+    conexion.executemany(
+        "INSERT INTO habitantes (folio, nombre, rut, activo) VALUES (?, ?, ?, 1)",
+        [(f"FOL-{i:04d}", f"Habitante {i}", f"{i}-K") for i in range(1, 4)])
+    faenas = [('Limpieza', '2026-03-02', 'completada'), ('Caminos', '2026-03-20', 'completada'),
+              ('Pozo', '2026-04-05', 'completada'), ('Cancelada', '2026-03-10', 'cancelada')]
+    conexion.executemany("INSERT INTO faenas (nombre, fecha_inicio, estado) VALUES (?, ?, ?)", faenas)
+    # (faena_id, habitante_id, horas)
+    conexion.executemany(
+        "INSERT INTO participacion_faenas (faena_id, habitante_id, horas_trabajadas) VALUES (?, ?, ?)",
+        [(1, 1, 4), (2, 1, 7), (3, 1, 3), (4, 1, 8), (1, 2, 2.5), (3, 3, None)])
+    conexion.commit()
+    return bd
+
+
+def test_resumen_igual_a_cuota_individual():
+    """El resumen agrupado da la misma cuota que la consulta por habitante"""
+    print("\n🧪 Cuotas de faena...")
+    bd = _crear_bd_temporal()
+    cuotas = SistemaCuotas(bd)
+
+    resumen = {fila['nombre']: fila['cuota'] for fila in cuotas.obtener_resumen_habitantes(3, 2026)}
+    for habitante in bd.obtener_todos_habitantes():
+        assert resumen[habitante['nombre']] == cuotas.obtener_cuota_mes(habitante['id'], 3, 2026)
+
+    assert resumen['Habitante 1']['horas_realizadas'] == 11  # la cancelada no cuenta
+    assert resumen['Habitante 1']['completada']
+    assert resumen['Habitante 2']['horas_realizadas'] == 2.5 and resumen['Habitante 2']['en_riesgo']
+    assert resumen['Habitante 3']['horas_realizadas'] == 0
+    assert cuotas.obtener_cuota_anual(1, 2026)['horas_realizadas'] == 14
+    bd.desconectar()
+    print("✅ Cuotas consistentes entre resumen y consulta individual")
+
+
+if __name__ == "__main__":
+    test_resumen_igual_a_cuota_individual()
@@ -0,0 +1,119 @@
+"""
+Pruebas de BaseDatosSQLite.transaccion (unidad de trabajo con savepoints)
+Ejecutar: python tests/test_transacciones_bd.py
+"""
+
+import sys
+import os
+import tempfile
+
+# Agregar ruta del proyecto
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.core.base_datos_sqlite import BaseDatosSQLite
+
+
+def _crear_bd_temporal():
+    """Crear una BD SQLite aislada con una cooperación y una persona"""
+    bd = BaseDatosSQLite(os.path.join(tempfile.mkdtemp(), 'sistema.db'))
+    habitante_id = bd.conexion.execute(
+        "INSERT INTO habitantes (folio, nombre, activo) VALUES ('FOL-0001', 'Ana', 1)").lastrowid
+    bd.conexion.commit()
+    coop_id = bd.crear_cooperacion_bd('Prueba', 'Prueba', 100)
+    persona_coop_id = bd.agregar_persona_coop_bd(coop_id, habitante_id, 100)
+    return bd, persona_coop_id
+
+
+def _contar(bd, tabla):
+    return bd.conexion.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+
+
+def test_transacciones_bd():
+    """Un commit por acción, savepoints anidados y auditoría en el mismo commit"""
+    print("🧪 Test: Transacciones de BD...")
+    bd, persona_coop_id = _crear_bd_temporal()
+    conexion = bd.conexion
+    auditoria_inicial = _contar(bd, 'auditoria')
+    avisos = []
+
+    # Dos pagos, su auditoría y un evento: una sola confirmación
+    confirmaciones = conexion.confirmaciones
+    with bd.transaccion():
+        assert bd.registrar_pago_coop_bd(persona_coop_id, 30, '2026-01-01', '10:00', 'Pago')
+        assert bd.registrar_pago_coop_bd(persona_coop_id, 20, '2026-01-01', '10:01', 'Pago')
+        bd.registrar_evento('PAGO', 'Dos pagos')
+        bd.al_confirmar(lambda: avisos.append('ok'))
+        assert avisos == [] and _contar(bd, 'auditoria') == auditoria_inicial
+    assert conexion.confirmaciones == confirmaciones + 1
+    assert avisos == ['ok']
+    assert _contar(bd, 'pagos_coop') == 2
+    assert _contar(bd, 'auditoria') == auditoria_inicial + 2
+
+    # Un error en la transacción interna deshace solo su savepoint
+    with bd.transaccion():
+        bd.registrar_pago_coop_bd(persona_coop_id, 10, '2026-01-02', '10:00', 'Pago')
+        try:
+            with bd.transaccion():
+                bd.registrar_pago_coop_bd(persona_coop_id, 99, '2026-01-02', '10:01', 'Pago')
+                bd.al_confirmar(lambda: avisos.append('interna'))
+                raise ValueError("falla interna")
+        except ValueError:
+            pass
+    assert _contar(bd, 'pagos_coop') == 3
+    assert _contar(bd, 'auditoria') == auditoria_inicial + 3
+    assert avisos == ['ok']
+
+    # Un error en la externa deshace todo, incluida la auditoría pendiente
+    try:
+        with bd.transaccion():
+            bd.registrar_pago_coop_bd(persona_coop_id, 5, '2026-01-03', '10:00', 'Pago')
+            raise RuntimeError("falla externa")
+    except RuntimeError:
+        pass
+    assert _contar(bd, 'pagos_coop') == 3
+    assert _contar(bd, 'auditoria') == auditoria_inicial + 3
+    assert not conexion.in_transaction and not bd.en_transaccion()
+
+    # Un pago inválido dentro de la transacción devuelve None sin abortar el resto
+    with bd.transaccion():
+        assert bd.registrar_pago_coop_bd(999999, 5, '2026-01-03', '10:00', 'Pago') is None
+        assert bd.registrar_pago_coop_bd(persona_coop_id, 5, '2026-01-03', '10:01', 'Pago')
+    assert _contar(bd, 'pagos_coop') == 4
+
+    # rollback() dentro de la transacción la marca para deshacer al final
+    with bd.transaccion():
+        bd.registrar_pago_coop_bd(persona_coop_id, 5, '2026-01-04', '10:00', 'Pago')
+        conexion.rollback()
+    assert _contar(bd, 'pagos_coop') == 4
+
+    bd.desconectar()
+    print("✅ Transacciones correctas")
+
+
+def test_alta_habitante_y_membresia_atomica():
+    """Si la membresía falla, el habitante creado en la misma transacción se deshace"""
+    print("\n🧪 Test: Alta de habitante + membresía...")
+    bd, _ = _crear_bd_temporal()
+    habitantes_inicial = _contar(bd, 'habitantes')
+
+    try:
+        with bd.transaccion():
+            habitante, _ = bd.crear_habitante('FOL-0002', 'Beto')
+            assert habitante is not None
+            # Cooperación inexistente: la FK falla y agregar_persona_coop_bd devuelve None
+            if bd.agregar_persona_coop_bd(9999, habitante['id'], 100) is None:
+                raise ValueError("No se pudo agregar la persona a la cooperación en BD")
+    except ValueError:
+        pass
+
+    assert not bd.en_transaccion()
+    assert _contar(bd, 'habitantes') == habitantes_inicial
+    assert bd.obtener_habitante_por_folio('FOL-0002') is None
+    bd.desconectar()
+    print("✅ Habitante y membresía se confirman o deshacen juntos")
+
+
+if __name__ == "__main__":
+    test_transacciones_bd()
+    test_alta_habitante_y_membresia_atomica()
@@ -0,0 +1,85 @@
+"""
+Pruebas de los validadores precompilados y la validación por esquema
+Ejecutar: python tests/test_validadores.py
+"""
+
+import sys
+import os
+from datetime import date, timedelta
+
+# Agregar ruta del proyecto
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.core.validadores import (
+    ErrorValidacion, ESQUEMA_HABITANTE, ESQUEMA_PAGO, validar_nombre, validar_folio,
+    validar_telefono, validar_fecha_formato, validar_fecha_no_futura,
+    validar_no_caracteres_especiales, validar_fechas
+)
+
+
+def _error(funcion, *args):
+    try:
+        funcion(*args)
+    except ErrorValidacion as e:
+        return str(e)
+    return None
+
+
+def test_validadores_por_campo():
+    """Mismos resultados y mensajes que antes de precompilar"""
+    print("\n🧪 Validadores por campo...")
+    assert validar_nombre('  José Núñez-Pérez ') == 'José Núñez-Pérez'
+    assert _error(validar_nombre, 'Juan <b>') == "El nombre contiene caracteres no permitidos"
+    assert validar_folio(' hab-0012 ') == 'FOL-0012'
+    assert _error(validar_folio, 'FOL-12') == "El folio debe tener formato FOL-XXXX o HAB-XXXX"
+    assert validar_telefono('(555) 123-4567') == '(555) 123-4567'
+    assert _error(validar_telefono, '555-12a') == "Telefono invalido"
+    assert _error(validar_telefono, '123-45') == "Telefono debe tener al menos 7 digitos"
+    assert validar_fecha_formato('2025-3-7') == '2025-3-7'
+    assert validar_fecha_formato('07/03/2025') == '2025-03-07'
+    assert _error(validar_fecha_formato, '31/02/2025') is not None
+    assert _error(validar_fechas, '02/01/2025', '01/01/2025') == \
+        "La fecha de inicio no puede ser posterior a la de fin"
+    assert _error(validar_no_caracteres_especiales, 'a;b', 'Campo') == "Campo contiene caracteres no permitidos"
+    print("✅ Validadores por campo correctos")
+
+
+def test_fecha_no_futura():
+    """Antes fallaba con cualquier fecha válida (parseaba el resultado ISO como DD/MM/YYYY)"""
+    print("\n🧪 validar_fecha_no_futura...")
+    hoy = date.today()
+    assert validar_fecha_no_futura(hoy.strftime('%d/%m/%Y')) == hoy.isoformat()
+    manana = (hoy + timedelta(days=1)).isoformat()
+    assert _error(validar_fecha_no_futura, manana) == "La fecha no puede ser posterior a hoy"
+    print("✅ validar_fecha_no_futura correcta")
+
+
+def test_esquema_junta_todos_los_errores():
+    """Un registro reporta todos sus errores y un lote indica la fila de cada uno"""
+    print("\n🧪 Validación por esquema...")
+    limpio, errores = ESQUEMA_HABITANTE.validar(
+        {'nombre': ' Ana ', 'folio': 'hab-0001', 'telefono': '', 'activo': True})
+    assert errores == [] and limpio == {'nombre': 'Ana', 'folio': 'FOL-0001', 'telefono': '', 'activo': True}
+
+    limpio, errores = ESQUEMA_HABITANTE.validar({'folio': 'X', 'email': 'sin-arroba'})
+    assert limpio is None
+    assert [campo for campo, _ in errores] == ['nombre', 'folio', 'email']
+
+    registros = [{'nombre': f'Persona {i}'} for i in range(10_000)]
+    registros[3]['nombre'] = 'Mal;nombre'
+    registros[7] = {'nombre': ''}
+    validos, errores = ESQUEMA_HABITANTE.validar_lote(registros)
+    assert len(validos) == 9_998
+    assert errores == [(3, 'nombre', "El nombre contiene caracteres no permitidos"),
+                       (7, 'nombre', "nombre es obligatorio")]
+
+    limpio, errores = ESQUEMA_PAGO.validar({'monto': '150.5', 'fecha': '01/02/2025', 'estado': 'PAGADO'})
+    assert errores == [] and (limpio['monto'], limpio['fecha'], limpio['estado']) == (150.5, '2025-02-01', 'pagado')
+    print("✅ Validación por esquema correcta")
+
+
+if __name__ == "__main__":
+    test_validadores_por_campo()
+    test_fecha_no_futura()
+    test_esquema_junta_todos_los_errores()
@@ -0,0 +1,124 @@
+"""
+Micro-benchmark del costo por consulta en BaseDatosSQLite
+Compara el patrón anterior (conexión nueva por llamada, SQL armado en cada
+llamada y dicts por fila) con la conexión de larga vida y las consultas con
+nombre que devuelven tuplas o namedtuples.
+
+Ejecutar: python tools/benchmark_consultas.py [habitantes]
+"""
+
+import sys
+import os
+import sqlite3
+import tempfile
+import time
+
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.core.base_datos_sqlite import BaseDatosSQLite
+from src.core.instrumentacion_bd import obtener_instrumentacion
+
+
+def _crear_bd(habitantes, personas_coop):
+    bd = BaseDatosSQLite(os.path.join(tempfile.mkdtemp(), 'sistema.db'))
+    conexion = bd.conexion
+    conexion.executemany(
+        "INSERT INTO habitantes (folio, nombre, activo) VALUES (?, ?, 1)",
+        [(f"FOL-{i:04d}", f"Habitante {i}") for i in range(1, habitantes + 1)])
+    coop_id = conexion.execute(
+        "INSERT INTO cooperaciones (nombre, proyecto, monto_cooperacion, activa, fecha_creacion) "
+        "VALUES ('Benchmark', 'Benchmark', 100, 1, '2026-01-01')"
+    ).lastrowid
+    conexion.executemany(
+        "INSERT INTO personas_cooperacion (cooperacion_id, habitante_id, monto_esperado, fecha_agregado) "
+        "VALUES (?, ?, 100, '2026-01-01')",
+        [(coop_id, i) for i in range(1, personas_coop + 1)])
+    conexion.executemany(
+        "INSERT INTO pagos_coop (persona_coop_id, monto, fecha_pago, hora_pago, concepto, fecha_registro) "
+        "VALUES (?, 50, '2026-01-01', '10:00', 'Pago', '2026-01-01')",
+        [(pc,) for pc in range(1, personas_coop + 1) for _ in range(2)])
+    conexion.commit()
+    return bd, coop_id
+
+
+def _conectar_como_antes(ruta):
+    """Lo que hacía conectar() en cada llamada"""
+    conexion = sqlite3.connect(ruta, timeout=60.0, check_same_thread=False)
+    conexion.row_factory = sqlite3.Row
+    conexion.execute("PRAGMA foreign_keys = ON")
+    conexion.execute("PRAGMA journal_mode=WAL")
+    conexion.execute("PRAGMA busy_timeout=10000")
+    conexion.execute("PRAGMA synchronous=NORMAL")
+    conexion.execute("PRAGMA cache_size=10000")
+    return conexion
+
+
+def _medir(nombre, funcion, repeticiones, base=None):
+    inicio = time.perf_counter()
+    for i in range(repeticiones):
+        funcion(i)
+    us = (time.perf_counter() - inicio) / repeticiones * 1e6
+    mejora = f"{base / us:>6.1f}x" if base else ''
+    print(f"  {nombre:<44} {us:>9.1f} µs  {mejora}")
+    return us
+
+
+def ejecutar_benchmark(habitantes=2000, repeticiones=2000):
+    personas_coop = min(habitantes, 300)
+    bd, coop_id = _crear_bd(habitantes, personas_coop)
+    obtener_instrumentacion().configurar(activa=False)
+    folios = [f"FOL-{(i % habitantes) + 1:04d}" for i in range(repeticiones)]
+
+    print("=" * 72)
+    print(f"CONSULTA POR FOLIO ({habitantes} habitantes, {repeticiones} repeticiones)")
+    print("=" * 72)
+
+    def antes(i):
+        conexion = _conectar_como_antes(bd.ruta_db)
+        cursor = conexion.cursor()
+        cursor.execute("SELECT * FROM habitantes WHERE folio = ? AND activo = 1", (folios[i],))
+        fila = cursor.fetchone()
+        return dict(fila) if fila else None
+
+    base = _medir("conexión nueva + dict (antes)", antes, repeticiones // 10)
+    _medir("obtener_habitante_por_folio (dict)", lambda i: bd.obtener_habitante_por_folio(folios[i]),
+           repeticiones, base)
+    _medir("fila('habitante_por_folio') (tupla)", lambda i: bd.fila('habitante_por_folio', (folios[i],)),
+           repeticiones, base)
+    _medir("registro('habitante_por_folio') (namedtuple)",
+           lambda i: bd.registro('habitante_por_folio', (folios[i],)), repeticiones, base)
+
+    print()
+    print("=" * 72)
+    print(f"CARGA DE UNA COOPERACIÓN ({personas_coop} personas, 2 pagos c/u)")
+    print("=" * 72)
+
+    def carga_antes(_):
+        conexion = _conectar_como_antes(bd.ruta_db)
+        cursor = conexion.cursor()
+        cursor.execute(
+            "SELECT pc.id FROM personas_cooperacion pc LEFT JOIN habitantes h ON pc.habitante_id = h.id "
+            "WHERE pc.cooperacion_id = ? ORDER BY h.nombre", (coop_id,))
+        for (pc_id,) in cursor.fetchall():
+            conexion.execute(
+                "SELECT id, monto, fecha_pago, hora_pago, concepto, anulado FROM pagos_coop "
+                "WHERE persona_coop_id = ? ORDER BY fecha_pago DESC, hora_pago DESC", (pc_id,)).fetchall()
+
+    def carga_ahora(_):
+        pagos = {}
+        for persona_coop_id, *pago in bd.filas('pagos_de_cooperacion', (coop_id,)):
+            pagos.setdefault(persona_coop_id, []).append(pago)
+        for fila in bd.filas('personas_cooperacion', (coop_id,)):
+            pagos.get(fila[0], [])
+
+    base = _medir("una consulta de pagos por persona (antes)", carga_antes, 20)
+    _medir("personas + pagos_de_cooperacion", carga_ahora, 20, base)
+
+    obtener_instrumentacion().configurar(activa=True)
+    bd.desconectar()
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    ejecutar_benchmark(cantidad)
@@ -0,0 +1,45 @@
+"""
+Micro-benchmark de verificación de contraseñas por costo de bcrypt
+Muestra la latencia de una verificación en este equipo y el costo que
+elegiría la calibración.
+
+Ejecutar: python tools/benchmark_credenciales.py [objetivo_ms]
+"""
+
+import sys
+import os
+import tempfile
+
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.config import (
+    CREDENCIALES_COSTO_MAX, CREDENCIALES_COSTO_MIN, CREDENCIALES_LATENCIA_OBJETIVO_MS
+)
+from src.core.credenciales import ServicioCredenciales, medir_verificacion
+
+
+def ejecutar_benchmark(objetivo_ms=CREDENCIALES_LATENCIA_OBJETIVO_MS):
+    print("=" * 60)
+    print("LATENCIA DE VERIFICACIÓN POR COSTO (bcrypt)")
+    print("=" * 60)
+    print(f"{'Costo':>6} {'Mediana ms':>12}  ")
+
+    for costo in range(CREDENCIALES_COSTO_MIN - 2, CREDENCIALES_COSTO_MAX + 1):
+        latencia = medir_verificacion(costo)
+        marca = '✓' if latencia <= objetivo_ms else ''
+        print(f"{costo:>6} {latencia:>12.1f}  {marca}")
+        if latencia > objetivo_ms * 4:
+            print("   (se omiten costos mayores)")
+            break
+
+    ruta = os.path.join(tempfile.mkdtemp(), 'calibracion.json')
+    servicio = ServicioCredenciales(ruta_calibracion=ruta, objetivo_ms=objetivo_ms)
+    print()
+    print(f"Objetivo: {objetivo_ms} ms -> costo calibrado: {servicio.calibrar()}")
+    print(f"(mínimo permitido {CREDENCIALES_COSTO_MIN}, máximo {CREDENCIALES_COSTO_MAX})")
+
+
+if __name__ == "__main__":
+    objetivo = int(sys.argv[1]) if len(sys.argv) > 1 else CREDENCIALES_LATENCIA_OBJETIVO_MS
+    ejecutar_benchmark(objetivo)
@@ -0,0 +1,96 @@
+"""
+Benchmark de confirmaciones por registro de pago
+Compara el patrón anterior (pago, auditoría e historial con un commit cada uno)
+con BaseDatosSQLite.transaccion(), que los confirma juntos. Con
+synchronous=FULL cada commit en WAL es un fsync; con NORMAL (el valor de la
+aplicación) el fsync se difiere al checkpoint, pero cada commit sigue
+escribiendo su trama de cierre en el WAL.
+
+La métrica estable es commits/pago: el tiempo depende de cuánto tarda un
+fsync en el disco (milisegundos en discos sin caché de escritura, casi nada
+en una VM o en tmpfs).
+
+Ejecutar: python tools/benchmark_transacciones.py [pagos]
+"""
+
+import sys
+import os
+import tempfile
+import time
+
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.core.base_datos_sqlite import BaseDatosSQLite
+from src.core.fechas import ahora_iso, normalizar_fecha_iso
+from src.core.instrumentacion_bd import obtener_instrumentacion
+from src.core.logger import registrar_operacion
+
+
+def _crear_bd():
+    bd = BaseDatosSQLite(os.path.join(tempfile.mkdtemp(), 'sistema.db'))
+    conexion = bd.conexion
+    habitante_id = conexion.execute(
+        "INSERT INTO habitantes (folio, nombre, activo) VALUES ('FOL-0001', 'Benchmark', 1)").lastrowid
+    coop_id = conexion.execute(
+        "INSERT INTO cooperaciones (nombre, proyecto, monto_cooperacion, activa, fecha_creacion) "
+        "VALUES ('Benchmark', 'Benchmark', 100, 1, '2026-01-01')").lastrowid
+    persona_coop_id = conexion.execute(
+        "INSERT INTO personas_cooperacion (cooperacion_id, habitante_id, monto_esperado, fecha_agregado) "
+        "VALUES (?, ?, 100, '2026-01-01')", (coop_id, habitante_id)).lastrowid
+    conexion.commit()
+    return bd, persona_coop_id
+
+
+def _pago_separado(bd, persona_coop_id):
+    """Lo que hacía registrar un pago: cada escritura con su propio commit"""
+    conexion = bd.conexion
+    cursor = conexion.execute(
+        "INSERT INTO pagos_coop (persona_coop_id, monto, fecha_pago, hora_pago, concepto, fecha_registro, anulado) "
+        "VALUES (?, 10, ?, '10:00', 'Pago', ?, 0)",
+        (persona_coop_id, normalizar_fecha_iso('2026-01-01'), ahora_iso()))
+    conexion.commit()
+    registrar_operacion('PAGO_REGISTRADO', 'Pago registrado en cooperación', {'pago_id': cursor.lastrowid})
+    bd.registrar_auditoria('admin', 'PAGO_REGISTRADO', 'pagos_coop', cursor.lastrowid, 'monto=10')
+    bd.registrar_evento('PAGO', 'Pago registrado en cooperación')
+
+
+def _pago_transaccion(bd, persona_coop_id):
+    """registrar_pago_coop_bd (pago + auditoría) y el historial en una transacción"""
+    with bd.transaccion():
+        bd.registrar_pago_coop_bd(persona_coop_id, 10, '2026-01-01', '10:00', 'Pago', usuario='admin')
+        bd.registrar_evento('PAGO', 'Pago registrado en cooperación')
+
+
+def _medir(nombre, funcion, bd, persona_coop_id, pagos, base=None):
+    conexion = bd.conexion
+    confirmaciones = conexion.confirmaciones
+    inicio = time.perf_counter()
+    for _ in range(pagos):
+        funcion(bd, persona_coop_id)
+    ms = (time.perf_counter() - inicio) / pagos * 1000
+    por_pago = (conexion.confirmaciones - confirmaciones) / pagos
+    mejora = f"{base / ms:>6.1f}x" if base else ''
+    print(f"  {nombre:<36} {por_pago:>5.1f} commits/pago {ms:>8.3f} ms/pago  {mejora}")
+    return ms
+
+
+def ejecutar_benchmark(pagos=300):
+    obtener_instrumentacion().configurar(activa=False)
+    for sincronizacion in ('FULL', 'NORMAL'):
+        bd, persona_coop_id = _crear_bd()
+        bd.conexion.execute(f"PRAGMA synchronous={sincronizacion}")
+
+        print("=" * 78)
+        print(f"REGISTRO DE PAGO ({pagos} pagos, synchronous={sincronizacion})")
+        print("=" * 78)
+        base = _medir("un commit por escritura (antes)", _pago_separado, bd, persona_coop_id, pagos)
+        _medir("bd.transaccion()", _pago_transaccion, bd, persona_coop_id, pagos, base)
+        print()
+        bd.desconectar()
+    obtener_instrumentacion().configurar(activa=True)
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    ejecutar_benchmark(cantidad)
@@ -0,0 +1,186 @@
+"""
+Micro-benchmark de src/core/validadores.py
+Compara las validaciones anteriores (conjunto de caracteres armado en cada
+llamada, ``re`` sin compilar, strptime y una excepción por campo inválido)
+con los patrones precompilados y la validación por esquema sin excepciones.
+
+Ejecutar: python tools/benchmark_validadores.py [registros]
+"""
+
+import sys
+import os
+import re
+import time
+from datetime import datetime
+
+proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, proyecto_raiz)
+
+from src.config import LONGITUD_MINIMA_NOMBRE, LONGITUD_MAXIMA_NOMBRE
+from src.core.validadores import (
+    ErrorValidacion, ESQUEMA_HABITANTE, validar_nombre, validar_folio,
+    validar_telefono, validar_email, validar_fecha_formato
+)
+
+
+# ==================== IMPLEMENTACIÓN ANTERIOR ====================
+
+def _nombre_antes(nombre):
+    if not isinstance(nombre, str):
+        raise ErrorValidacion("El nombre debe ser texto")
+    nombre = nombre.strip()
+    if not nombre:
+        raise ErrorValidacion("El nombre no puede estar vacio")
+    if len(nombre) < LONGITUD_MINIMA_NOMBRE:
+        raise ErrorValidacion(f"El nombre debe tener al menos {LONGITUD_MINIMA_NOMBRE} caracteres")
+    if len(nombre) > LONGITUD_MAXIMA_NOMBRE:
+        raise ErrorValidacion(f"El nombre no puede exceder {LONGITUD_MAXIMA_NOMBRE} caracteres")
+    caracteres_validos = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 -áéíóúñü')
+    if not all(c in caracteres_validos for c in nombre):
+        raise ErrorValidacion("El nombre contiene caracteres no permitidos")
+    return nombre
+
+
+def _folio_antes(folio):
+    if not isinstance(folio, str):
+        raise ErrorValidacion("El folio debe ser texto")
+    folio = folio.strip().upper()
+    if not folio:
+        raise ErrorValidacion("El folio no puede estar vacio")
+    if not re.match(r'^(FOL|HAB)-\d{4}$', folio):
+        raise ErrorValidacion("El folio debe tener formato FOL-XXXX o HAB-XXXX")
+    if folio.startswith('HAB-'):
+        folio = 'FOL-' + folio[4:]
+    return folio
+
+
+def _telefono_antes(telefono):
+    telefono = telefono.strip()
+    if not telefono:
+        return telefono
+    if not all(c.isdigit() or c in '()- ' for c in telefono):
+        raise ErrorValidacion("Telefono invalido")
+    digitos = ''.join(c for c in telefono if c.isdigit())
+    if len(digitos) < 7:
+        raise ErrorValidacion("Telefono debe tener al menos 7 digitos")
+    if len(digitos) > 15:
+        raise ErrorValidacion("Telefono demasiado largo")
+    return telefono
+
+
+def _email_antes(email):
+    email = email.strip().lower()
+    if not email:
+        return email
+    if '@' not in email or '.' not in email.split('@')[1]:
+        raise ErrorValidacion("Email invalido")
+    if len(email) > 100:
+        raise ErrorValidacion("Email demasiado largo")
+    return email
+
+
+def _fecha_antes(fecha):
+    if not isinstance(fecha, str):
+        raise ErrorValidacion("La fecha debe ser texto")
+    fecha = fecha.strip()
+    try:
+        datetime.strptime(fecha, '%Y-%m-%d')
+        return fecha
+    except ValueError:
+        pass
+    try:
+        datetime.strptime(fecha, '%d/%m/%Y')
+        partes = fecha.split('/')
+        return f"{partes[2]}-{partes[1]}-{partes[0]}"
+    except ValueError:
+        pass
+    raise ErrorValidacion("La fecha debe estar en formato YYYY-MM-DD o DD/MM/YYYY")
+
+
+def _lote_antes(registros):
+    """Cómo se validaba un lote: campo por campo, con try/except por fila"""
+    validos, errores = [], []
+    for indice, registro in enumerate(registros):
+        try:
+            limpio = dict(registro)
+            limpio['nombre'] = _nombre_antes(registro['nombre'])
+            if registro.get('folio'):
+                limpio['folio'] = _folio_antes(registro['folio'])
+            if registro.get('telefono'):
+                limpio['telefono'] = _telefono_antes(registro['telefono'])
+            if registro.get('email'):
+                limpio['email'] = _email_antes(registro['email'])
+            validos.append(limpio)
+        except ErrorValidacion as e:
+            errores.append((indice, None, str(e)))
+    return validos, errores
+
+
+# ==================== DATOS ====================
+
+def _registros(cantidad, porcentaje_invalidos=5):
+    registros = []
+    for i in range(cantidad):
+        registro = {
+            'nombre': f"Habitante Número {i} Pérez",
+            'folio': f"HAB-{i % 10000:04d}",
+            'telefono': f"(555) 123-{i % 10000:04d}",
+            'email': f"persona{i}@ejemplo.com",
+        }
+        if i % 100 < porcentaje_invalidos:
+            registro['nombre'] = f"Habitante <{i}>"
+        registros.append(registro)
+    return registros
+
+
+def _medir(nombre, funcion, repeticiones, base=None):
+    inicio = time.perf_counter()
+    funcion()
+    segundos = time.perf_counter() - inicio
+    us = segundos / repeticiones * 1e6
+    mejora = f"{base / us:>6.1f}x" if base else ''
+    print(f"  {nombre:<44} {us:>8.2f} µs  {mejora}")
+    return us
+
+
+def ejecutar_benchmark(cantidad=100_000):
+    registros = _registros(cantidad)
+    nombres = [r['nombre'] for r in registros if '<' not in r['nombre']]
+    fechas = [f"{(i % 28) + 1:02d}/{(i % 12) + 1:02d}/2025" for i in range(cantidad)]
+
+    # Ambas implementaciones tienen que dar lo mismo
+    for antes, ahora, datos in ((_nombre_antes, validar_nombre, nombres[:2000]),
+                                (_folio_antes, validar_folio, [r['folio'] for r in registros[:2000]]),
+                                (_telefono_antes, validar_telefono, [r['telefono'] for r in registros[:2000]]),
+                                (_email_antes, validar_email, [r['email'] for r in registros[:2000]]),
+                                (_fecha_antes, validar_fecha_formato, fechas[:2000])):
+        assert [antes(v) for v in datos] == [ahora(v) for v in datos], antes.__name__
+
+    print("=" * 72)
+    print(f"VALIDACIÓN POR CAMPO ({cantidad} valores, µs por llamada)")
+    print("=" * 72)
+    for etiqueta, antes, ahora, datos in (
+            ('validar_nombre', _nombre_antes, validar_nombre, nombres),
+            ('validar_folio', _folio_antes, validar_folio, [r['folio'] for r in registros]),
+            ('validar_telefono', _telefono_antes, validar_telefono, [r['telefono'] for r in registros]),
+            ('validar_fecha_formato (DD/MM/YYYY)', _fecha_antes, validar_fecha_formato, fechas)):
+        base = _medir(f"{etiqueta} (antes)", lambda: [antes(v) for v in datos], len(datos))
+        _medir(etiqueta, lambda: [ahora(v) for v in datos], len(datos), base)
+
+    print()
+    print("=" * 72)
+    print(f"LOTE DE IMPORTACIÓN ({cantidad} habitantes, 5% inválidos, µs por registro)")
+    print("=" * 72)
+    validos_antes, errores_antes = _lote_antes(registros)
+    validos, errores = ESQUEMA_HABITANTE.validar_lote(registros)
+    assert validos == validos_antes and len(errores) == len(errores_antes)
+
+    base = _medir("campo por campo con excepciones (antes)", lambda: _lote_antes(registros), cantidad)
+    _medir("ESQUEMA_HABITANTE.validar_lote", lambda: ESQUEMA_HABITANTE.validar_lote(registros),
+           cantidad, base)
+    print(f"\n  {len(validos)} válidos, {len(errores)} errores")
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    ejecutar_benchmark(cantidad)
@@ -17,6 +17,10 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.core.gestor_datos_global import obtener_gestor
 from src.core.logger import registrar_operacion, registrar_error
+from src.core.validadores import EsquemaRegistro
+
+# Solo se importa el nombre; el folio del archivo se usa para buscar duplicados
+ESQUEMA_IMPORTACION = EsquemaRegistro({'nombre': ('nombre', True)})
 
 
 def extraer_habitantes_desde_lista(ruta_archivo: str) -> list[dict]:
@@ -146,6 +150,16 @@ def main():
         print(f"📄 Primer habitante: {habitantes[0]['folio']} - {habitantes[0]['nombre']}")
         print(f"📄 Último habitante: {habitantes[-1]['folio']} - {habitantes[-1]['nombre']}")
         
+        # Validar todo el lote antes de tocar la BD y mostrar todos los errores juntos
+        habitantes, errores_validacion = ESQUEMA_IMPORTACION.validar_lote(habitantes)
+        if errores_validacion:
+            print(f"\n⚠️  {len(errores_validacion)} registros no pasan la validación y se omitirán:")
+            for indice, campo, mensaje in errores_validacion:
+                print(f"   - registro {indice + 1} ({campo}): {mensaje}")
+            if not habitantes:
+                print("❌ Ningún habitante válido para importar")
+                sys.exit(1)
+        
         # Confirmar antes de proceder
         respuesta = input("\n¿Deseas continuar con la importación? (s/n): ").strip().lower()
         if respuesta != 's':
@@ -9,6 +9,7 @@ proyecto_raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, proyecto_raiz)
 
 from src.core.base_datos_sqlite import BaseDatosSQLite
+from src.core.mantenimiento_bd import MantenimientoBD
 
 
 def aplicar_optimizaciones():
@@ -46,32 +47,40 @@ def aplicar_optimizaciones():
         
         bd.conexion.commit()
         
+        mantenimiento = MantenimientoBD(bd)
+        
         print()
-        print("🔧 Optimizando base de datos...")
-        cursor.execute("VACUUM")
-        print("✅ Base de datos optimizada")
+        print("🔎 Verificando integridad (quick_check)...")
+        ok, mensajes = mantenimiento.verificar_integridad()
+        print("✅ Integridad correcta" if ok else f"❌ Problemas: {mensajes[:5]}")
         
+        print()
+        print("🔧 Optimizando base de datos...")
+        if mantenimiento.asegurar_auto_vacuum():
+            print("✅ Convertida a auto_vacuum incremental (VACUUM completo, solo esta vez)")
+        liberadas = mantenimiento.vacuum_incremental(paginas=1000000)
+        print(f"✅ Páginas libres devueltas al sistema: {liberadas}")
         print()
         print("📈 Analizando estadísticas...")
         cursor.execute("ANALYZE")
+        mantenimiento.optimizar()
         print("✅ Estadísticas actualizadas")
+        mantenimiento.checkpoint('TRUNCATE')
+        print("✅ WAL consolidado")
         
-        bd.conexion.commit()
-        
+        reporte = mantenimiento.reporte()
         print()
         print("=" * 80)
         print("OPTIMIZACIONES APLICADAS EXITOSAMENTE")
         print("=" * 80)
         print()
-        print("Mejoras aplicadas:")
-        print("  • Índices en columnas clave para búsquedas más rápidas")
-        print("  • Base de datos compactada (VACUUM)")
-        print("  • Estadísticas actualizadas para mejor planificación de consultas")
+        print(f"  Páginas: {reporte['paginas']} de {reporte['tamano_pagina']} bytes")
+        print(f"  Lista libre: {reporte['paginas_libres']} ({reporte['porcentaje_libre']}%)")
+        print(f"  Tamaño BD: {reporte['tamano_bd'] / 1024:.1f} KB | WAL: {reporte['tamano_wal'] / 1024:.1f} KB")
+        print(f"  auto_vacuum: {reporte['auto_vacuum']} | journal: {reporte['modo_journal']}")
         print()
-        print("Resultado esperado:")
-        print("  • Búsquedas hasta 10x más rápidas")
-        print("  • Menor uso de memoria")
-        print("  • Mejor rendimiento general del sistema")
+        print("El mantenimiento continuo (checkpoints, vacuum incremental y PRAGMA optimize)")
+        print("corre solo desde las ventanas principales; este script ya no es necesario a diario.")
         
     except Exception as e:
         print(f"❌ Error: {e}")
@@ -2,6 +2,7 @@
 import sys, os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from src.core.base_datos_sqlite import BaseDatosSQLite
+from src.core.instrumentacion_bd import obtener_instrumentacion
 
 bd = BaseDatosSQLite()
 cursor = bd.conexion.cursor()
@@ -22,4 +23,24 @@ print('\nPrimeros 5 registros ordenados por folio:')
 for row in cursor.fetchall():
     print(f'  {row["folio"]} - {row["nombre"]}')
 
+# Planes de las consultas más usadas: marca recorridos completos sin índice
+instrumentacion = obtener_instrumentacion()
+instrumentacion.configurar(modo_desarrollo=True)
+instrumentacion.reiniciar()
+bd.obtener_todos_habitantes()
+bd.buscar_habitante('a')
+bd.obtener_habitante_por_folio('FOL-0001')
+bd.obtener_todos_pagos()
+bd.obtener_historial()
+bd.obtener_auditoria()
+bd.obtener_usuarios(activos_solo=False)
+
+print('\nConsultas más lentas:')
+print(instrumentacion.formatear_reporte(top=10, orden='tiempo'))
+escaneos = instrumentacion.escaneos_completos()
+print(f'\nRecorridos completos en tablas de {instrumentacion.tabla_grande}+ filas: {len(escaneos)}')
+for sql, detalles in escaneos.items():
+    for detalle in detalles:
+        print(f'  {detalle["tabla"]} ({detalle["filas_tabla"]} filas): {sql[:100]}')
+
 bd.desconectar()